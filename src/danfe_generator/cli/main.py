@@ -8,34 +8,134 @@ Comandos:
     danfe              - Modo interativo com menu de seleção
     danfe arquivo.xml  - Gera DANFE para um arquivo específico
     danfe --batch DIR  - Processa todos XMLs de um diretório
+    danfe --batch ZIP  - Processa os XMLs de um .zip/.tar(.gz) sem extrair
+    danfe - -o -       - Lê o XML do stdin e escreve o PDF no stdout
+    danfe --batch --files0-from - - Processa caminhos separados por NUL
+    danfe --db DSN --db-query SQL - Processa XMLs lidos de um banco de dados
+    danfe --manifest ARQUIVO - Processa as linhas de um manifesto CSV/JSONL
+    danfe ingest-mail CAIXA - Processa XMLs anexados a e-mails (Maildir/mbox)
+    danfe --retry-failed RUNID - Reprocessa as falhas em quarentena de um lote
+    danfe --validate-only DIR - Valida os XMLs sem gerar PDFs (relatório JSONL)
+    danfe perf history - Mostra o histórico de desempenho e as regressões
+    danfe estimate DIR - Estima a duração de um lote antes de executá-lo
 
 Opções:
     -o, --output PATH    Caminho de saída do PDF
     -l, --logo PATH      Caminho da logo da empresa
     -c, --config FILE    Arquivo de configuração YAML
     -v, --verbose        Modo verboso (debug)
-    --format TYPE        Formato de saída: simple, detailed, json
+    --format TYPE        Formato de saída: simple, detailed, json, jsonl (um registro
+                         por documento, em streaming no modo lote)
+    -j, --jobs N|auto    Workers paralelos no modo lote (padrão: auto)
+    --worker-memory MB   Limite de memória por worker no modo lote
+    --adaptive           Ajusta workers pela vazão (--jobs vira o máximo)
+    --shard i/N          Processa apenas o shard i de N (lote distribuído)
+    --lease-dir DIR      Distribui o lote entre nós via leases em DIR
+    --pipeline           Usa pipeline em estágios (leitura/validação/render/escrita)
+    --stage-workers SPEC Concorrência por estágio (ex.: read=2,render=4,write=2)
+    --output-archive FMT Grava os PDFs em arquivos zip/tar/tar.gz com rollover
+    --db DSN             Lê os XMLs de um banco (SQLite ou driver DB-API)
+    --db-query SQL       Consulta que retorna (identificador, xml)
+    --db-writeback SQL   Grava (pdf, erro, identificador) de volta no banco
+    --fsync POLÍTICA     Durabilidade dos PDFs: none, file ou batch
+    --output-template M  Caminho de cada PDF pela chave (ex.: {cnpj}/{aaaa}/{mm}/{chave}.pdf)
+    --dedupe-db ARQUIVO  Ignora NF-e já geradas (mesma chave), também entre lotes
+    --quarantine DIR     Registra (e copia) as entradas que falharam em DIR
+    --report ARQUIVO     Relatório por documento (csv, jsonl ou parquet) e resumo
+                         com erros por tipo, vazão e os documentos mais lentos
+    --perf-history [DB]  Grava as métricas do lote no histórico de desempenho (SQLite)
 
 Example:
     Linha de comando::
 
         $ danfe nota.xml -o ./output/nota.pdf --logo ./logo.png
         $ danfe --batch ./xmls -o ./output
+        $ danfe --batch ./notas_2024_01.zip -o ./output
+        $ danfe --batch ./xmls -o ./output --jobs 4 --worker-memory 512
+        $ danfe --batch ./xmls -o ./output --fsync batch
+        $ danfe --batch ./xmls -o ./output --format jsonl | vector --config shipper.toml
+        $ danfe --batch ./entrada -o ./output --dedupe-db ./output/.danfe-keys.db
+        $ danfe --batch ./xmls -o ./output --quarantine ./quarentena
+        $ danfe --batch ./xmls -o ./output --report ./relatorio.csv --report-top 20
+        $ danfe --batch ./xmls -o ./output --perf-history
+        $ danfe perf history --limit 20
+        $ danfe estimate /mnt/backfill --jobs 16
+        $ danfe --retry-failed 20240115-093012-a1b2c3 --quarantine ./quarentena
+        $ danfe --validate-only ./xmls -o invalidos.jsonl --jobs auto
+        $ danfe --batch ./xmls -o ./output --output-template '{cnpj}/{aaaa}/{mm}/{serie}-{nNF}-{chave}.pdf'
+        $ danfe --batch /mnt/xmls -o /mnt/pdfs --shard 3/8
+        $ danfe --batch /mnt/xmls -o /mnt/pdfs --lease-dir /mnt/xmls/.leases
+        $ danfe --batch ./xmls -o ./output --output-archive zip --archive-max-mb 512
+        $ danfe --batch ./xmls -o s3://notas/danfes/2024-01
+        $ danfe --db notas.db --db-query "SELECT chave, xml FROM nfe" -o ./output
+        $ danfe ingest-mail ~/Maildir/fornecedores -o ./output
+        $ danfe --manifest jobs.jsonl -o ./output --jobs 4
+        $ cat nota.xml | danfe - -o - > nota.pdf
+        $ find /arquivo -name '*.xml' -print0 | danfe --batch --files0-from - -o ./output
         $ danfe --config config.yaml nota.xml
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
+import json
 import logging
 import sys
+import time
+from dataclasses import replace
 from enum import Enum
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, TextIO
 
 from danfe_generator.core import DANFEConfig, DANFEGenerator
+from danfe_generator.core.dedupe import KeyRegistry
+from danfe_generator.core.estimate import (
+    DEFAULT_CALIBRATION_SIZE,
+    DEFAULT_SAMPLE_SIZE,
+    calibrate,
+    cost_from_history,
+    estimate_duration,
+    scan_corpus,
+)
+from danfe_generator.core.generator import BatchResult
+from danfe_generator.core.history import (
+    DEFAULT_HISTORY_PATH,
+    DEFAULT_THRESHOLD,
+    DEFAULT_WINDOW,
+    PerfHistory,
+    Regression,
+    find_regressions,
+    summarize_run,
+)
+from danfe_generator.core.leases import DEFAULT_LEASE_TTL
+from danfe_generator.core.naming import OutputTemplate
+from danfe_generator.core.pipeline import DEFAULT_QUEUE_SIZE, STAGES
+from danfe_generator.core.quarantine import (
+    DEFAULT_QUARANTINE_DIR,
+    Quarantine,
+    load_run,
+    retry_inputs,
+)
+from danfe_generator.core.report import DEFAULT_TOP_N, BatchReport, summary_path
+from danfe_generator.core.resources import plan_workers
+from danfe_generator.core.s3 import S3Sink, parse_s3_url
+from danfe_generator.core.sharding import SHARD_BY_CHOICES, Shard
+from danfe_generator.core.sinks import ARCHIVE_FORMATS, ArchiveSink
+from danfe_generator.sources.compressed import find_xml_files, read_xml, xml_stem
+from danfe_generator.sources.database import (
+    DEFAULT_DRIVER,
+    DEFAULT_FETCH_SIZE,
+    DatabaseSource,
+    connect,
+)
+from danfe_generator.sources.mail import MailSource
+from danfe_generator.sources.pipe import STDIO, iter_nul_paths, read_stream
+from danfe_generator.utils.atomic import FSYNC_POLICIES
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     from danfe_generator.core.generator import GenerationResult
 
 
@@ -45,6 +145,7 @@ class OutputFormat(str, Enum):
     SIMPLE = "simple"
     DETAILED = "detailed"
     JSON = "json"
+    JSONL = "jsonl"
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -67,6 +168,35 @@ def setup_logging(verbose: bool = False) -> None:
     root_logger.addHandler(handler)
 
 
+def load_config(
+    config_file: str | None,
+    logo: str | None,
+    fsync: str | None = None,
+    output_template: str | None = None,
+) -> DANFEConfig:
+    """
+    Carrega a configuração do YAML (ou da logo informada).
+
+    Args:
+        config_file: Arquivo de configuração YAML
+        logo: Caminho da logo, usado quando não há YAML
+        fsync: Sobrepõe a política de fsync da configuração
+        output_template: Sobrepõe o modelo de caminho dos PDFs
+
+    Returns:
+        Configuração do gerador
+    """
+    if config_file:
+        config = DANFEConfig.from_yaml(config_file)
+    else:
+        config = DANFEConfig(logo_path=Path(logo) if logo else None)
+    if fsync is not None:
+        config = replace(config, fsync=fsync)
+    if output_template is not None:
+        config = replace(config, output_template=output_template)
+    return config
+
+
 def print_banner() -> None:
     """Imprime banner do aplicativo."""
     print(
@@ -79,24 +209,53 @@ def print_banner() -> None:
     )
 
 
+def result_record(result: GenerationResult) -> dict[str, Any]:
+    """Registro JSON de um resultado (formatos json e jsonl)."""
+    return {
+        "xml": str(result.xml_path),
+        "pdf": str(result.pdf_path) if result.pdf_path else None,
+        "success": result.success,
+        "error": result.error_message,
+        "error_type": result.error_type,
+        "size_kb": result.file_size_kb,
+        "access_key": result.access_key,
+        "timings_ms": {stage: round(s * 1000, 3) for stage, s in result.timings.items()},
+    }
+
+
+def jsonl_writer(stream: TextIO) -> Callable[[GenerationResult], None]:
+    """Cria o callback ``on_result`` que emite um registro JSON por linha."""
+
+    def write(result: GenerationResult) -> None:
+        stream.write(json.dumps(result_record(result), ensure_ascii=False) + "\n")
+        # Uma linha por documento, visível ao leitor do pipe assim que pronta
+        stream.flush()
+
+    return write
+
+
+def combine_callbacks(
+    *callbacks: Callable[[GenerationResult], None] | None,
+) -> Callable[[GenerationResult], None] | None:
+    """Combina callbacks ``on_result`` (ignora os None) em um só."""
+    active = [callback for callback in callbacks if callback is not None]
+    if len(active) <= 1:
+        return active[0] if active else None
+
+    def call(result: GenerationResult) -> None:
+        for callback in active:
+            callback(result)
+
+    return call
+
+
 def print_result(result: GenerationResult, format_type: OutputFormat = OutputFormat.SIMPLE) -> None:
     """Imprime resultado da geração."""
 
     if format_type == OutputFormat.JSON:
-        import json
-
-        print(
-            json.dumps(
-                {
-                    "xml": str(result.xml_path),
-                    "pdf": str(result.pdf_path) if result.pdf_path else None,
-                    "success": result.success,
-                    "error": result.error_message,
-                    "size_kb": result.file_size_kb,
-                },
-                indent=2,
-            )
-        )
+        print(json.dumps(result_record(result), indent=2))
+    elif format_type == OutputFormat.JSONL:
+        jsonl_writer(sys.stdout)(result)
     elif format_type == OutputFormat.DETAILED:
         status = "✓" if result.success else "✗"
         print(f"\n{status} {result.xml_path.name}")
@@ -117,6 +276,7 @@ def cmd_generate(
     config_file: str | None = None,
     verbose: bool = False,
     format_type: OutputFormat = OutputFormat.SIMPLE,
+    fsync: str | None = None,
 ) -> int:
     """
     Gera DANFE para um único arquivo XML.
@@ -128,22 +288,21 @@ def cmd_generate(
         config_file: Arquivo de configuração YAML
         verbose: Modo verboso
         format: Formato de saída
+        fsync: Política de fsync dos PDFs ("none", "file" ou "batch");
+            se None, usa a da configuração
 
     Returns:
         Código de saída (0 = sucesso)
     """
     setup_logging(verbose)
 
-    # Carregar configuração
-    if config_file:
-        config = DANFEConfig.from_yaml(config_file)
-    else:
-        config = DANFEConfig(logo_path=Path(logo) if logo else None)
+    config = load_config(config_file, logo, fsync)
 
     generator = DANFEGenerator(config)
 
     try:
         result = generator.generate(xml_path, output)
+        generator.writer.sync()
         print_result(result, format_type)
         return 0 if result.success else 1
     except OSError as e:
@@ -154,56 +313,788 @@ def cmd_generate(
         return 1
 
 
+def cmd_pipe(
+    xml_path: str,
+    output: str | None = None,
+    logo: str | None = None,
+    config_file: str | None = None,
+    verbose: bool = False,
+    fsync: str | None = None,
+) -> int:
+    """
+    Gera um DANFE em modo pipe: XML do stdin e/ou PDF no stdout.
+
+    O XML é renderizado em memória, sem arquivos temporários. Como o
+    stdout pode carregar o PDF, mensagens vão para o stderr.
+
+    Args:
+        xml_path: Caminho do XML, ou "-" para o stdin
+        output: Caminho do PDF, ou "-"/None para o stdout
+        logo: Caminho da logo
+        config_file: Arquivo de configuração YAML
+        verbose: Modo verboso
+        fsync: Política de fsync dos PDFs ("none", "file" ou "batch");
+            se None, usa a da configuração
+
+    Returns:
+        Código de saída (0 = sucesso)
+    """
+    setup_logging(verbose)
+
+    config = load_config(config_file, logo, fsync)
+
+    generator = DANFEGenerator(config)
+
+    try:
+        if xml_path == STDIO:
+            name, content = "<stdin>", read_stream(sys.stdin.buffer)
+        else:
+            name, content = xml_path, read_xml(Path(xml_path))
+
+        with next(generator.render_many([(name, content)])) as pdf:
+            if not pdf.success:
+                print(f"✗ {pdf.error_message}", file=sys.stderr)
+                return 1
+            if output is None or output == STDIO:
+                pdf.write_to(sys.stdout.buffer)
+                sys.stdout.buffer.flush()
+            else:
+                Path(output).parent.mkdir(parents=True, exist_ok=True)
+                with generator.writer.open(output) as f:
+                    pdf.write_to(f)
+                generator.writer.sync()
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"✗ Erro de E/S: {e}", file=sys.stderr)
+        return 1
+
+
 def cmd_batch(
     input_dir: str,
     output_dir: str | None = None,
     logo: str | None = None,
     config_file: str | None = None,
     verbose: bool = False,
-    _format_type: OutputFormat = OutputFormat.SIMPLE,  # noqa: ARG001
+    format_type: OutputFormat = OutputFormat.SIMPLE,
+    jobs: int | None = None,
+    worker_memory_mb: int | None = None,
+    adaptive: bool = False,
+    shard: Shard | None = None,
+    shard_by: str = "path",
+    lease_dir: str | None = None,
+    lease_ttl: float = DEFAULT_LEASE_TTL,
+    pipeline: bool = False,
+    stage_workers: dict[str, int] | None = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    archive_format: str | None = None,
+    archive_max_mb: int | None = None,
+    archive_max_files: int | None = None,
+    files0_from: str | None = None,
+    fsync: str | None = None,
+    output_template: str | None = None,
+    dedupe_db: str | None = None,
+    quarantine_dir: str | None = None,
+    report_path: str | None = None,
+    report_top: int = DEFAULT_TOP_N,
+    perf_history: str | None = None,
 ) -> int:
     """
     Processa múltiplos XMLs de um diretório.
 
+    Args:
+        input_dir: Diretório contendo XMLs, ou arquivo .zip/.tar(.gz)
+        output_dir: Diretório de saída
+        logo: Caminho da logo
+        config_file: Arquivo de configuração
+        verbose: Modo verboso
+        format_type: Formato de saída. Com "jsonl", cada documento é
+            emitido no stdout assim que termina, e o resumo vai para o stderr.
+        jobs: Quantidade de workers. Se None, dimensiona pelo cgroup.
+        worker_memory_mb: Limite de memória por worker em MB
+        adaptive: Ajusta a concorrência pela vazão observada
+        shard: Shard deste nó (processa apenas parte do diretório)
+        shard_by: Critério de hash do shard ("path" ou "key")
+        lease_dir: Diretório de leases compartilhado (modo coordenado)
+        lease_ttl: Validade dos leases em segundos
+        pipeline: Usa o pipeline em estágios
+        stage_workers: Concorrência por estágio do pipeline
+        queue_size: Capacidade das filas entre estágios
+        archive_format: Grava os PDFs em arquivos "zip", "tar" ou "tar.gz"
+        archive_max_mb: Tamanho máximo de cada arquivo, em MB
+        archive_max_files: Quantidade máxima de PDFs por arquivo
+        files0_from: Arquivo (ou "-" para o stdin) com caminhos de XMLs
+            separados por NUL; substitui ``input_dir``
+        fsync: Política de fsync dos PDFs ("none", "file" ou "batch");
+            se None, usa a da configuração
+        output_template: Modelo do caminho de cada PDF no diretório de
+            saída (ex.: "{cnpj}/{aaaa}/{mm}/{chave}.pdf")
+        dedupe_db: Registro SQLite de chaves de acesso já geradas; NF-e
+            duplicadas são ignoradas (":memory:" vale só para este lote)
+        quarantine_dir: Diretório de quarentena das entradas que falharam
+            (reprocessáveis com ``--retry-failed``)
+        report_path: Relatório por documento (.csv, .jsonl ou .parquet),
+            gravado durante o lote, com resumo em ``<relatório>.summary.json``
+        report_top: Quantidade de documentos mais lentos e maiores no resumo
+        perf_history: Histórico SQLite onde gravar as métricas do lote
+            (vazão, p95 por estágio, versões); avisa se houve regressão
+
+    Returns:
+        Código de saída
+    """
+    setup_logging(verbose)
+
+    config = load_config(config_file, logo, fsync, output_template)
+
+    generator = DANFEGenerator(config)
+
+    report = None
+    if report_path:
+        try:
+            report = BatchReport(report_path, top_n=report_top)
+        except (ValueError, OSError) as e:
+            print(f"✗ Relatório inválido: {e}")
+            return 1
+
+    jsonl = None
+    summary_output: contextlib.AbstractContextManager[object] = contextlib.nullcontext()
+    if format_type == OutputFormat.JSONL:
+        # O stdout fica reservado aos registros; resumo e mensagens vão para o stderr
+        jsonl = jsonl_writer(sys.stdout)
+        summary_output = contextlib.redirect_stdout(sys.stderr)
+    on_result = combine_callbacks(jsonl, report.add if report is not None else None)
+
+    with summary_output:
+        registry = None
+        try:
+            registry = open_registry(dedupe_db)
+            if files0_from:
+                return _batch_from_list(
+                    generator,
+                    files0_from,
+                    output_dir,
+                    jobs,
+                    worker_memory_mb,
+                    adaptive,
+                    shard,
+                    shard_by,
+                    pipeline,
+                    stage_workers,
+                    queue_size,
+                    build_sink(
+                        archive_format,
+                        output_dir or ".",
+                        archive_max_mb,
+                        archive_max_files,
+                        generator.output_template,
+                    ),
+                    registry,
+                    quarantine_dir,
+                    on_result,
+                    perf_history,
+                )
+
+            input_path = Path(input_dir)
+            sink = build_sink(
+                archive_format,
+                output_dir or (input_path if input_path.is_dir() else input_path.parent),
+                archive_max_mb,
+                archive_max_files,
+                generator.output_template,
+            )
+
+            with sink or contextlib.nullcontext():
+                result = generator.generate_from_directory(
+                    input_dir,
+                    output_dir,
+                    workers=jobs,
+                    memory_per_worker_mb=worker_memory_mb,
+                    adaptive=adaptive,
+                    shard=shard,
+                    shard_by=shard_by,
+                    lease_dir=lease_dir,
+                    lease_ttl=lease_ttl,
+                    pipeline=pipeline,
+                    stage_workers=stage_workers,
+                    queue_size=queue_size,
+                    sink=sink,
+                    registry=registry,
+                    on_result=on_result,
+                )
+
+            print_batch_summary(result)
+            quarantine_failures(result, quarantine_dir, output_dir, input_dir)
+            record_perf_history(
+                result, perf_history, str(input_path.resolve()), jobs, worker_memory_mb
+            )
+            return 0 if result.failed == 0 else 1
+        except OSError as e:
+            print(f"✗ Erro de E/S ao processar diretório: {e}")
+            return 1
+        except Exception as e:
+            print(f"✗ Erro inesperado: {e}")
+            return 1
+        finally:
+            if registry is not None:
+                registry.close()
+            close_report(report)
+
+
+def _batch_from_list(
+    generator: DANFEGenerator,
+    files0_from: str,
+    output_dir: str | None,
+    jobs: int | None,
+    worker_memory_mb: int | None,
+    adaptive: bool,
+    shard: Shard | None,
+    shard_by: str,
+    pipeline: bool,
+    stage_workers: dict[str, int] | None,
+    queue_size: int,
+    sink: ArchiveSink | S3Sink | None,
+    registry: KeyRegistry | None = None,
+    quarantine_dir: str | None = None,
+    on_result: Callable[[GenerationResult], None] | None = None,
+    perf_history: str | None = None,
+) -> int:
+    """Processa a lista de caminhos separados por NUL de ``--files0-from``."""
+    try:
+        with contextlib.ExitStack() as stack:
+            if files0_from == STDIO:
+                stream = sys.stdin.buffer
+            else:
+                stream = stack.enter_context(Path(files0_from).open("rb"))
+            if sink is not None:
+                stack.enter_context(sink)
+
+            result = generator.generate_batch(
+                iter_nul_paths(stream),
+                output_dir,
+                workers=jobs,
+                memory_per_worker_mb=worker_memory_mb,
+                adaptive=adaptive,
+                shard=shard,
+                shard_by=shard_by,
+                pipeline=pipeline,
+                stage_workers=stage_workers,
+                queue_size=queue_size,
+                sink=sink,
+                registry=registry,
+                on_result=on_result,
+            )
+
+        print_batch_summary(result)
+        quarantine_failures(result, quarantine_dir, output_dir, files0_from)
+        record_perf_history(result, perf_history, files0_from, jobs, worker_memory_mb)
+        return 0 if result.failed == 0 else 1
+    except OSError as e:
+        print(f"✗ Erro de E/S ao ler a lista de arquivos: {e}")
+        return 1
+    except Exception as e:
+        print(f"✗ Erro inesperado: {e}")
+        return 1
+
+
+def build_sink(
+    archive_format: str | None,
+    directory: str | Path,
+    archive_max_mb: int | None = None,
+    archive_max_files: int | None = None,
+    template: OutputTemplate | None = None,
+) -> ArchiveSink | S3Sink | None:
+    """
+    Cria o destino dos PDFs, se não forem arquivos soltos em disco.
+
+    Uma saída ``s3://bucket/prefixo`` envia os PDFs ao bucket (endpoint e
+    credenciais das variáveis ``AWS_*``); ``archive_format`` grava em
+    arquivos compactados. Em ambos, ``template`` (``--output-template``)
+    define a chave ou o nome do membro de cada PDF.
+
+    Raises:
+        ValueError: Se ``archive_format`` for combinado com saída S3
+    """
+    if str(directory).startswith("s3://"):
+        if archive_format is not None:
+            raise ValueError("--output-archive não pode ser combinado com saída s3://")
+        bucket, prefix = parse_s3_url(str(directory))
+        return S3Sink(bucket, prefix, template=template)
+    if archive_format is None:
+        return None
+    return ArchiveSink(
+        directory,
+        archive_format,
+        max_bytes=archive_max_mb * 1024 * 1024 if archive_max_mb else None,
+        max_files=archive_max_files,
+        template=template,
+    )
+
+
+# Valor de --dedupe-db para um registro só em memória (duplicatas do lote)
+MEMORY_REGISTRY = ":memory:"
+
+
+def open_registry(dedupe_db: str | None) -> KeyRegistry | None:
+    """Abre o registro de chaves de ``--dedupe``/``--dedupe-db`` (None se desativado)."""
+    if dedupe_db is None:
+        return None
+    return KeyRegistry(None if dedupe_db == MEMORY_REGISTRY else dedupe_db)
+
+
+def quarantine_failures(
+    result: BatchResult,
+    quarantine_dir: str | None,
+    output_dir: str | None,
+    source: str,
+) -> Quarantine | None:
+    """Registra as falhas do lote em ``--quarantine`` e imprime o id da execução."""
+    if quarantine_dir is None or result.failed == 0:
+        return None
+    quarantine = Quarantine(
+        quarantine_dir,
+        output_dir=Path(output_dir).resolve() if output_dir else None,
+        source=source,
+    )
+    quarantine.record_batch(result)
+    print(f"\n🧪 Falhas em quarentena: {quarantine.run_dir}")
+    print(f"   Reprocessar: danfe --retry-failed {quarantine.run_id} --quarantine {quarantine_dir}")
+    return quarantine
+
+
+def close_report(report: BatchReport | None, shown: int = 5) -> None:
+    """Fecha o relatório de ``--report`` e imprime os documentos mais lentos."""
+    if report is None:
+        return
+    summary = report.close()
+    print(f"\n📈 Relatório: {report.path} (resumo em {summary_path(report.path)})")
+    if summary["errors"]:
+        errors = ", ".join(f"{name}={count}" for name, count in summary["errors"].items())
+        print(f"   Erros: {errors}")
+    for row in summary["slowest"][:shown]:
+        items = row["items"] if row["items"] is not None else "?"
+        print(f"   {row['total_ms']:>9.1f} ms  {items:>5} itens  {row['xml']}")
+
+
+def format_regression(regression: Regression) -> str:
+    """Linha de uma regressão (métrica, referência, valor e mudanças de ambiente)."""
+    line = (
+        f"#{regression.run_id} {regression.metric}: {regression.baseline:.2f} → "
+        f"{regression.value:.2f} (+{regression.change:.0%} pior)"
+    )
+    if regression.changes:
+        line += f" [{'; '.join(regression.changes)}]"
+    return line
+
+
+def record_perf_history(
+    result: BatchResult,
+    history_path: str | None,
+    label: str,
+    jobs: int | None,
+    worker_memory_mb: int | None,
+) -> None:
+    """Grava as métricas do lote em ``--perf-history`` e avisa sobre regressões."""
+    if history_path is None or not result.results:
+        return
+    workers = jobs if jobs is not None else plan_workers(None, worker_memory_mb).workers
+    metrics = summarize_run(result, label=label, workers=workers)
+    with PerfHistory(history_path) as history:
+        history.record(metrics)
+        runs = history.runs(limit=DEFAULT_WINDOW + 1, label=label)
+
+    print(
+        f"\n📉 Histórico ({history_path}): execução #{metrics.id}, {metrics.docs_per_s:.2f} doc/s"
+    )
+    for regression in find_regressions(runs):
+        if regression.run_id == metrics.id:
+            print(f"   ⚠ Regressão: {format_regression(regression)}")
+
+
+def cmd_retry(
+    run_id: str,
+    quarantine_dir: str = DEFAULT_QUARANTINE_DIR,
+    output_dir: str | None = None,
+    logo: str | None = None,
+    config_file: str | None = None,
+    verbose: bool = False,
+    jobs: int | None = None,
+    worker_memory_mb: int | None = None,
+    fsync: str | None = None,
+    output_template: str | None = None,
+) -> int:
+    """
+    Reprocessa apenas as entradas que falharam em uma execução anterior.
+
+    Usa o arquivo original se ainda existir (pode ter sido corrigido) e,
+    senão, a cópia em quarentena. Falhas que persistirem vão para uma
+    nova execução na mesma quarentena.
+
+    Args:
+        run_id: Identificador da execução (impresso ao final do lote)
+        quarantine_dir: Diretório de quarentena
+        output_dir: Diretório de saída. Se None, usa o da execução original.
+        logo: Caminho da logo
+        config_file: Arquivo de configuração
+        verbose: Modo verboso
+        jobs: Quantidade de workers. Se None, dimensiona pelo cgroup.
+        worker_memory_mb: Limite de memória por worker em MB
+        fsync: Política de fsync dos PDFs ("none", "file" ou "batch");
+            se None, usa a da configuração
+        output_template: Modelo do caminho de cada PDF no diretório de saída
+
+    Returns:
+        Código de saída
+    """
+    setup_logging(verbose)
+
+    try:
+        metadata, failures = load_run(quarantine_dir, run_id)
+        paths = retry_inputs(quarantine_dir, run_id)
+    except (OSError, ValueError) as e:
+        print(f"✗ Execução {run_id} não encontrada em {quarantine_dir}: {e}")
+        return 1
+
+    if not paths:
+        print(f"Nenhuma entrada a reprocessar ({len(failures)} falha(s) registrada(s))")
+        return 0 if not failures else 1
+
+    config = load_config(config_file, logo, fsync, output_template)
+    generator = DANFEGenerator(config)
+    output_dir = output_dir or metadata.get("output_dir")
+    print(f"Reprocessando {len(paths)} de {len(failures)} falha(s) de {run_id}")
+
+    try:
+        result = generator.generate_batch(
+            paths,
+            output_dir,
+            workers=jobs,
+            memory_per_worker_mb=worker_memory_mb,
+        )
+    except OSError as e:
+        print(f"✗ Erro de E/S ao reprocessar: {e}")
+        return 1
+
+    print_batch_summary(result)
+    quarantine_failures(result, quarantine_dir, output_dir, f"retry:{run_id}")
+    return 0 if result.failed == 0 and len(paths) == len(failures) else 1
+
+
+def cmd_validate(
+    input_dir: str,
+    report: str | None = None,
+    verbose: bool = False,
+    jobs: int | None = None,
+    worker_memory_mb: int | None = None,
+    files0_from: str | None = None,
+) -> int:
+    """
+    Valida os XMLs de um lote sem renderizar (preflight).
+
+    Grava um relatório JSONL com uma linha ``{"input", "error"}`` por XML
+    inválido, à medida que são encontrados.
+
     Args:
         input_dir: Diretório contendo XMLs
+        report: Arquivo do relatório JSONL. Se None ou "-", usa o stdout
+            (e o resumo vai para o stderr).
+        verbose: Modo verboso
+        jobs: Quantidade de workers. Se None, dimensiona pelo cgroup.
+        worker_memory_mb: Limite de memória por worker em MB
+        files0_from: Arquivo (ou "-" para o stdin) com caminhos de XMLs
+            separados por NUL; substitui ``input_dir``
+
+    Returns:
+        Código de saída (1 se algum XML for inválido)
+    """
+    setup_logging(verbose)
+
+    generator = DANFEGenerator(DANFEConfig())
+    report_path = Path(report) if report and report != STDIO else None
+    summary_stream = sys.stdout if report_path else sys.stderr
+    total = invalid = 0
+    start = time.perf_counter()
+
+    try:
+        with contextlib.ExitStack() as stack:
+            if files0_from == STDIO:
+                paths: Iterable[Path] = iter_nul_paths(sys.stdin.buffer)
+            elif files0_from:
+                paths = iter_nul_paths(stack.enter_context(Path(files0_from).open("rb")))
+            else:
+                input_path = Path(input_dir)
+                if not input_path.is_dir():
+                    print(f"✗ Diretório não encontrado: {input_dir}")
+                    return 1
+                paths = find_xml_files(input_path)
+
+            out = (
+                stack.enter_context(report_path.open("w", encoding="utf-8"))
+                if report_path
+                else sys.stdout
+            )
+            for xml_path, error in generator.validate_many(paths, jobs, worker_memory_mb):
+                total += 1
+                if error is not None:
+                    invalid += 1
+                    record = {"input": str(xml_path), "error": error}
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"✗ Erro de E/S na validação: {e}")
+        return 1
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print("\n🔎 Validação:", file=summary_stream)
+    print(f"   Total:     {total}", file=summary_stream)
+    print(f"   Válidos:   {total - invalid} ✓", file=summary_stream)
+    print(f"   Inválidos: {invalid} ✗", file=summary_stream)
+    print(f"   Tempo:     {elapsed:.1f}s ({rate:.0f} XML/s)", file=summary_stream)
+    return 0 if invalid == 0 else 1
+
+
+def print_batch_summary(result: BatchResult) -> None:
+    """Imprime o resumo de um lote."""
+    print("\n📊 Resumo:")
+    print(f"   Total:   {result.total}")
+    print(f"   Sucesso: {result.successful} ✓")
+    print(f"   Erro:    {result.failed} ✗")
+    if result.duplicates:
+        print(f"   Duplic.: {result.duplicates} (ignoradas)")
+    print(f"   Taxa:    {result.success_rate:.1f}%")
+
+    if result.stage_stats:
+        print("\n⚙️  Estágios:")
+        for stats in result.stage_stats.values():
+            print(
+                f"   {stats.name:<9} workers={stats.workers:<3} "
+                f"utilização={stats.utilization:6.1%}  fila máx={stats.max_queue_depth}"
+            )
+
+
+def cmd_database(
+    dsn: str,
+    query: str,
+    output_dir: str | None = None,
+    logo: str | None = None,
+    config_file: str | None = None,
+    verbose: bool = False,
+    driver: str = DEFAULT_DRIVER,
+    writeback: str | None = None,
+    fetch_size: int = DEFAULT_FETCH_SIZE,
+    jobs: int | None = None,
+    worker_memory_mb: int | None = None,
+    archive_format: str | None = None,
+    archive_max_mb: int | None = None,
+    archive_max_files: int | None = None,
+    fsync: str | None = None,
+    output_template: str | None = None,
+    dedupe_db: str | None = None,
+) -> int:
+    """
+    Processa XMLs lidos de um banco de dados.
+
+    Args:
+        dsn: Caminho do banco SQLite ou string de conexão do driver
+        query: Consulta que retorna (identificador, xml)
         output_dir: Diretório de saída
         logo: Caminho da logo
         config_file: Arquivo de configuração
         verbose: Modo verboso
-        format: Formato de saída
+        driver: Módulo DB-API (padrão: sqlite3)
+        writeback: Instrução SQL para gravar (pdf, erro, identificador)
+        fetch_size: Linhas por lote de leitura
+        jobs: Quantidade de workers. Se None, dimensiona pelo cgroup.
+        worker_memory_mb: Limite de memória por worker em MB
+        archive_format: Grava os PDFs em arquivos "zip", "tar" ou "tar.gz"
+        archive_max_mb: Tamanho máximo de cada arquivo, em MB
+        archive_max_files: Quantidade máxima de PDFs por arquivo
+        fsync: Política de fsync dos PDFs ("none", "file" ou "batch");
+            se None, usa a da configuração
+        output_template: Modelo do caminho de cada PDF no diretório de
+            saída (ex.: "{cnpj}/{aaaa}/{mm}/{chave}.pdf")
+        dedupe_db: Registro SQLite de chaves de acesso já geradas; NF-e
+            duplicadas são ignoradas (":memory:" vale só para este lote)
 
     Returns:
         Código de saída
     """
     setup_logging(verbose)
 
-    # Carregar configuração
-    if config_file:
-        config = DANFEConfig.from_yaml(config_file)
-    else:
-        config = DANFEConfig(logo_path=Path(logo) if logo else None)
+    config = load_config(config_file, logo, fsync, output_template)
 
     generator = DANFEGenerator(config)
 
     try:
-        result = generator.generate_from_directory(input_dir, output_dir)
+        connection = connect(dsn, driver)
+    except Exception as e:
+        print(f"✗ Erro ao conectar ao banco: {e}")
+        return 1
 
-        print("\n📊 Resumo:")
-        print(f"   Total:   {result.total}")
-        print(f"   Sucesso: {result.successful} ✓")
-        print(f"   Erro:    {result.failed} ✗")
-        print(f"   Taxa:    {result.success_rate:.1f}%")
+    try:
+        source = DatabaseSource(connection, query, fetch_size=fetch_size, writeback=writeback)
+        sink = build_sink(
+            archive_format,
+            output_dir or ".",
+            archive_max_mb,
+            archive_max_files,
+            generator.output_template,
+        )
+        registry = open_registry(dedupe_db)
+        with sink or contextlib.nullcontext(), registry or contextlib.nullcontext():
+            result = generator.generate_from_database(
+                source,
+                output_dir,
+                workers=jobs,
+                memory_per_worker_mb=worker_memory_mb,
+                sink=sink,
+                registry=registry,
+            )
 
+        print_batch_summary(result)
         return 0 if result.failed == 0 else 1
+    except Exception as e:
+        print(f"✗ Erro processando banco de dados: {e}")
+        return 1
+    finally:
+        connection.close()
+
+
+def manifest_results_path(manifest: str | Path) -> Path:
+    """Arquivo de resultados padrão: ``<manifesto>.results.jsonl``."""
+    manifest = Path(manifest)
+    return manifest.with_name(f"{manifest.stem}.results.jsonl")
+
+
+def cmd_manifest(
+    manifest: str,
+    results_file: str | None = None,
+    output_dir: str | None = None,
+    logo: str | None = None,
+    config_file: str | None = None,
+    verbose: bool = False,
+    jobs: int | None = None,
+    worker_memory_mb: int | None = None,
+    fsync: str | None = None,
+) -> int:
+    """
+    Processa as linhas de um manifesto CSV/JSONL.
+
+    Os resultados são gravados em JSONL, um por linha do manifesto e na
+    mesma ordem, à medida que ficam prontos.
+
+    Args:
+        manifest: Arquivo de manifesto (.csv ou .jsonl)
+        results_file: Arquivo JSONL de resultados. Se None, usa
+            ``<manifesto>.results.jsonl``.
+        output_dir: Diretório dos PDFs das linhas sem ``output``
+        logo: Caminho da logo
+        config_file: Arquivo de configuração (linhas sem ``profile``)
+        verbose: Modo verboso
+        jobs: Quantidade de workers. Se None, dimensiona pelo cgroup.
+        worker_memory_mb: Limite de memória por worker em MB
+        fsync: Política de fsync dos PDFs ("none", "file" ou "batch");
+            se None, usa a da configuração
+
+    Returns:
+        Código de saída
+    """
+    setup_logging(verbose)
+
+    config = load_config(config_file, logo, fsync)
+
+    generator = DANFEGenerator(config)
+    results_path = Path(results_file) if results_file else manifest_results_path(manifest)
+    # Contadores apenas: os resultados vão para o arquivo, não para a memória
+    summary = BatchResult()
+
+    try:
+        results = generator.generate_from_manifest(
+            manifest,
+            output_dir,
+            workers=jobs,
+            memory_per_worker_mb=worker_memory_mb,
+        )
+        with results_path.open("w", encoding="utf-8") as out:
+            for entry, result in results:
+                record = entry.to_record()
+                record.update(
+                    output=str(result.pdf_path) if result.pdf_path else None,
+                    success=result.success,
+                    error=result.error_message,
+                    size_kb=round(result.file_size_kb, 2),
+                )
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                summary.total += 1
+                if result.success:
+                    summary.successful += 1
+                else:
+                    summary.failed += 1
+
+        print(f"\n📝 Resultados: {results_path}")
+        print_batch_summary(summary)
+        return 0 if summary.failed == 0 else 1
     except OSError as e:
-        print(f"✗ Erro de E/S ao processar diretório: {e}")
+        print(f"✗ Erro de E/S ao processar manifesto: {e}")
         return 1
     except Exception as e:
         print(f"✗ Erro inesperado: {e}")
         return 1
 
 
+def parse_jobs(value: str) -> int | None:
+    """Converte o argumento --jobs ("auto" ou inteiro positivo)."""
+    if value.lower() == "auto":
+        return None
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inválido para --jobs: {value}") from None
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("--jobs deve ser 'auto' ou um inteiro >= 1")
+    return jobs
+
+
+def parse_worker_memory(value: str) -> int:
+    """Converte o argumento --worker-memory (inteiro positivo, em MB)."""
+    try:
+        megabytes = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inválido para --worker-memory: {value}") from None
+    if megabytes < 1:
+        raise argparse.ArgumentTypeError("--worker-memory deve ser um inteiro >= 1 (MB)")
+    return megabytes
+
+
+def parse_shard(value: str) -> Shard:
+    """Converte o argumento --shard no formato i/N."""
+    try:
+        return Shard.parse(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def parse_output_template(value: str) -> str:
+    """Valida o argumento --output-template."""
+    try:
+        OutputTemplate(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
+def parse_stage_workers(value: str) -> dict[str, int]:
+    """Converte o argumento --stage-workers (ex.: "read=2,render=4")."""
+    stages: dict[str, int] = {}
+    for part in value.split(","):
+        name, sep, count = part.strip().partition("=")
+        if not sep or name not in STAGES or not count.isdigit() or int(count) < 1:
+            raise argparse.ArgumentTypeError(
+                f"valor inválido para --stage-workers: {part!r} "
+                f"(esperado estágio=N, estágios: {', '.join(STAGES)})"
+            )
+        stages[name] = int(count)
+    return stages
+
+
 def cmd_interactive(
     logo: str | None = None,
     config_file: str | None = None,
@@ -227,7 +1118,7 @@ def cmd_interactive(
         print(f"✗ Diretório não encontrado: {xml_dir}")
         return 1
 
-    xml_files = list(xml_dir.glob("*.xml"))
+    xml_files = find_xml_files(xml_dir)
 
     if not xml_files:
         print(f"✗ Nenhum XML encontrado em {xml_dir}")
@@ -264,7 +1155,7 @@ def cmd_interactive(
             raise IndexError(f"Índice inválido: {opcao}")
 
         xml_file = xml_files[idx]
-        output_file = output_dir / f"{xml_file.stem}.pdf"
+        output_file = output_dir / f"{xml_stem(xml_file)}.pdf"
 
         single_result = generator.generate(xml_file, output_file)
         print_result(single_result, OutputFormat.DETAILED)
@@ -278,12 +1169,384 @@ def cmd_interactive(
         return 1
 
 
+def cmd_ingest_mail(
+    mailbox_path: str,
+    output_dir: str | None = None,
+    logo: str | None = None,
+    config_file: str | None = None,
+    verbose: bool = False,
+    state_path: str | None = None,
+    dedupe: bool = True,
+    jobs: int | None = None,
+    worker_memory_mb: int | None = None,
+    archive_format: str | None = None,
+    archive_max_mb: int | None = None,
+    archive_max_files: int | None = None,
+    fsync: str | None = None,
+    output_template: str | None = None,
+) -> int:
+    """
+    Processa XMLs anexados a e-mails de uma caixa local.
+
+    Args:
+        mailbox_path: Maildir (diretório) ou arquivo mbox
+        output_dir: Diretório de saída
+        logo: Caminho da logo
+        config_file: Arquivo de configuração
+        verbose: Modo verboso
+        state_path: Arquivo de estado (Message-IDs e chaves processados)
+        dedupe: Ignora chaves de acesso já processadas
+        jobs: Quantidade de workers. Se None, dimensiona pelo cgroup.
+        worker_memory_mb: Limite de memória por worker em MB
+        archive_format: Grava os PDFs em arquivos "zip", "tar" ou "tar.gz"
+        archive_max_mb: Tamanho máximo de cada arquivo, em MB
+        archive_max_files: Quantidade máxima de PDFs por arquivo
+        fsync: Política de fsync dos PDFs ("none", "file" ou "batch");
+            se None, usa a da configuração
+        output_template: Modelo do caminho de cada PDF no diretório de
+            saída (ex.: "{cnpj}/{aaaa}/{mm}/{chave}.pdf")
+
+    Returns:
+        Código de saída
+    """
+    setup_logging(verbose)
+
+    config = load_config(config_file, logo, fsync, output_template)
+
+    generator = DANFEGenerator(config)
+
+    try:
+        source = MailSource(mailbox_path, state_path, dedupe)
+        sink = build_sink(
+            archive_format,
+            output_dir or ".",
+            archive_max_mb,
+            archive_max_files,
+            generator.output_template,
+        )
+        with sink or contextlib.nullcontext():
+            result = generator.generate_from_source(
+                source,
+                output_dir,
+                workers=jobs,
+                memory_per_worker_mb=worker_memory_mb,
+                sink=sink,
+            )
+
+        print(f"\n📬 Mensagens novas: {source.messages}  Duplicadas: {source.duplicates}")
+        print_batch_summary(result)
+        return 0 if result.failed == 0 else 1
+    except OSError as e:
+        print(f"✗ Erro de E/S ao ler a caixa de e-mail: {e}")
+        return 1
+    except Exception as e:
+        print(f"✗ Erro inesperado: {e}")
+        return 1
+
+
+def ingest_mail_app(argv: list[str]) -> int:
+    """Subcomando ``danfe ingest-mail``."""
+    parser = argparse.ArgumentParser(
+        prog="danfe ingest-mail",
+        description="Gera DANFEs dos XMLs anexados a e-mails (Maildir ou mbox)",
+    )
+    parser.add_argument("mailbox", help="Diretório Maildir ou arquivo mbox")
+    parser.add_argument("-o", "--output", help="Diretório de saída dos PDFs")
+    parser.add_argument("-l", "--logo", help="Caminho da logo da empresa")
+    parser.add_argument("-c", "--config", dest="config_file", help="Arquivo de configuração YAML")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Modo verboso (debug)")
+    parser.add_argument(
+        "--state",
+        metavar="ARQUIVO",
+        help="Arquivo de estado com mensagens e chaves já processadas",
+    )
+    parser.add_argument(
+        "--no-dedupe",
+        dest="dedupe",
+        action="store_false",
+        help="Não ignora NF-e com chave de acesso já processada",
+    )
+    parser.add_argument("-j", "--jobs", type=parse_jobs, default=None, metavar="N|auto")
+    parser.add_argument(
+        "--worker-memory", dest="worker_memory_mb", type=parse_worker_memory, metavar="MB"
+    )
+    parser.add_argument("--output-archive", dest="archive_format", choices=ARCHIVE_FORMATS)
+    parser.add_argument("--archive-max-mb", type=int, metavar="MB")
+    parser.add_argument("--archive-max-files", type=int, metavar="N")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES)
+    parser.add_argument("--output-template", type=parse_output_template, metavar="MODELO")
+
+    args = parser.parse_args(argv)
+    return cmd_ingest_mail(
+        args.mailbox,
+        args.output,
+        args.logo,
+        args.config_file,
+        args.verbose,
+        args.state,
+        args.dedupe,
+        args.jobs,
+        args.worker_memory_mb,
+        args.archive_format,
+        args.archive_max_mb,
+        args.archive_max_files,
+        fsync=args.fsync,
+        output_template=args.output_template,
+    )
+
+
+def cmd_perf_history(
+    db: str = DEFAULT_HISTORY_PATH,
+    limit: int | None = 20,
+    label: str | None = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    check: bool = False,
+) -> int:
+    """
+    Mostra o histórico de desempenho e as regressões entre execuções.
+
+    Args:
+        db: Arquivo SQLite do histórico
+        limit: Quantidade de execuções mais recentes exibidas (None = todas)
+        label: Apenas execuções com este rótulo (diretório de origem)
+        threshold: Piora relativa mínima para marcar regressão
+        check: Retorna 1 se a execução mais recente tiver regressão
+
+    Returns:
+        Código de saída
+    """
+    if not Path(db).is_file():
+        print(f"✗ Histórico não encontrado: {db}")
+        return 1
+
+    with PerfHistory(db) as history:
+        # Execuções anteriores às exibidas servem de referência para as primeiras
+        runs = history.runs(limit=limit + DEFAULT_WINDOW if limit else None, label=label)
+    if not runs:
+        print("Nenhuma execução registrada.")
+        return 0
+
+    regressions = find_regressions(runs, threshold)
+    flagged = {regression.run_id for regression in regressions}
+    shown = runs[-limit:] if limit else runs
+
+    print(
+        f"{'':2}{'#':>5}  {'início':<24} {'docs':>7} {'doc/s':>8} {'p95 render':>11} "
+        f"{'ms/item':>8} {'falhas':>7} {'workers':>7}  brazilfiscalreport  rótulo"
+    )
+    for run in shown:
+        marker = "⚠" if run.id in flagged else ""
+        p95 = run.p95("render")
+        print(
+            f"{marker:2}{run.id:>5}  {run.started:<24} {run.total:>7} {run.docs_per_s:>8.2f} "
+            f"{p95 if p95 is not None else '-':>11} "
+            f"{run.ms_per_item if run.ms_per_item is not None else '-':>8} "
+            f"{run.failed:>7} {run.workers if run.workers is not None else '-':>7}  "
+            f"{run.renderer_version or '-':<18}  {run.label or '-'}"
+        )
+
+    shown_ids = {run.id for run in shown}
+    visible = [regression for regression in regressions if regression.run_id in shown_ids]
+    if visible:
+        print(f"\n⚠ Regressões (piora acima de {threshold:.0%} sobre a mediana anterior):")
+        for regression in visible:
+            print(f"   {format_regression(regression)}")
+
+    return 1 if check and runs[-1].id in flagged else 0
+
+
+def perf_app(argv: list[str]) -> int:
+    """Subcomando ``danfe perf``."""
+    parser = argparse.ArgumentParser(
+        prog="danfe perf",
+        description="Histórico de desempenho dos lotes",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    history = commands.add_parser(
+        "history",
+        help="Mostra a tendência das execuções e marca regressões",
+    )
+    history.add_argument(
+        "--db",
+        default=DEFAULT_HISTORY_PATH,
+        metavar="ARQUIVO",
+        help=f"Histórico SQLite (padrão: {DEFAULT_HISTORY_PATH})",
+    )
+    history.add_argument("--limit", type=int, default=20, metavar="N", help="Execuções exibidas")
+    history.add_argument("--label", metavar="ROTULO", help="Apenas execuções com este rótulo")
+    history.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        metavar="FRAÇÃO",
+        help=f"Piora relativa que caracteriza regressão (padrão: {DEFAULT_THRESHOLD})",
+    )
+    history.add_argument(
+        "--check",
+        action="store_true",
+        help="Sai com código 1 se a execução mais recente tiver regressão",
+    )
+
+    args = parser.parse_args(argv)
+    return cmd_perf_history(args.db, args.limit or None, args.label, args.threshold, args.check)
+
+
+def format_duration(seconds: float) -> str:
+    """Duração legível (ex.: "2h 05min", "3min 20s", "1.5s")."""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, secs = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}min"
+    return f"{minutes}min {secs:02d}s"
+
+
+def cmd_estimate(
+    input_dir: str,
+    jobs: int | None = None,
+    worker_memory_mb: int | None = None,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    calibration_size: int | None = None,
+    history_db: str = DEFAULT_HISTORY_PATH,
+    pattern: str = "*.xml",
+    logo: str | None = None,
+    config_file: str | None = None,
+    verbose: bool = False,
+) -> int:
+    """
+    Estima a duração de um lote sem gerá-lo.
+
+    Args:
+        input_dir: Diretório dos XMLs
+        jobs: Quantidade de workers. Se None, dimensiona pelo cgroup.
+        worker_memory_mb: Limite de memória por worker em MB
+        sample_size: XMLs lidos para contar itens
+        calibration_size: XMLs renderizados para medir o custo. Se None,
+            usa o histórico de desempenho e calibra só se ele estiver vazio.
+        history_db: Histórico de desempenho (``--perf-history``)
+        pattern: Padrão glob dos XMLs
+        logo: Caminho da logo (afeta o custo de renderização)
+        config_file: Arquivo de configuração
+        verbose: Modo verboso
+
+    Returns:
+        Código de saída
+    """
+    setup_logging(verbose)
+
+    input_path = Path(input_dir)
+    if not input_path.is_dir():
+        print(f"✗ Diretório não encontrado: {input_dir}")
+        return 1
+
+    stats = scan_corpus(find_xml_files(input_path, pattern), sample_size)
+    if stats.files == 0:
+        print(f"✗ Nenhum XML encontrado em {input_dir}")
+        return 1
+
+    model = None
+    if calibration_size is None and Path(history_db).is_file():
+        with PerfHistory(history_db) as history:
+            model = cost_from_history(history.runs())
+    try:
+        if model is None:
+            generator = DANFEGenerator(load_config(config_file, logo))
+            sample = stats.sample[: calibration_size or DEFAULT_CALIBRATION_SIZE]
+            model = calibrate(generator, sample)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    workers = jobs if jobs is not None else plan_workers(None, worker_memory_mb).workers
+    estimate = estimate_duration(stats, model, workers)
+
+    print(f"📂 {stats.files} XML(s), {stats.total_bytes / 1024 / 1024:.1f} MB")
+    print(
+        f"🔎 Amostra: {stats.sampled} XML(s), {stats.mean_items:.1f} item(ns)/XML "
+        f"→ ~{estimate.items} item(ns) no total"
+    )
+    print(
+        f"⏱  Custo: {model.ms_per_doc:.1f} ms/XML + {model.ms_per_item:.2f} ms/item "
+        f"({model.source})"
+    )
+    print(
+        f"⏳ Estimativa com {workers} worker(s): {format_duration(estimate.wall_s)} "
+        f"(CPU: {format_duration(estimate.cpu_s)})"
+    )
+    if estimate.parallelism < workers:
+        print(f"   ⚠ Paralelismo limitado a {estimate.parallelism:g} CPU(s) disponível(is)")
+    return 0
+
+
+def estimate_app(argv: list[str]) -> int:
+    """Subcomando ``danfe estimate``."""
+    parser = argparse.ArgumentParser(
+        prog="danfe estimate",
+        description="Estima a duração de um lote (varredura de metadados e amostra)",
+    )
+    parser.add_argument("input_dir", help="Diretório dos XMLs")
+    parser.add_argument("-j", "--jobs", type=parse_jobs, default=None, metavar="N|auto")
+    parser.add_argument(
+        "--worker-memory", dest="worker_memory_mb", type=parse_worker_memory, metavar="MB"
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=DEFAULT_SAMPLE_SIZE,
+        metavar="N",
+        help=f"XMLs lidos para contar itens (padrão: {DEFAULT_SAMPLE_SIZE})",
+    )
+    parser.add_argument(
+        "--calibrate",
+        type=int,
+        metavar="N",
+        help="Mede o custo renderizando N XMLs da amostra, em vez de usar o histórico",
+    )
+    parser.add_argument(
+        "--history",
+        default=DEFAULT_HISTORY_PATH,
+        metavar="ARQUIVO",
+        help=f"Histórico de desempenho com o custo por item (padrão: {DEFAULT_HISTORY_PATH})",
+    )
+    parser.add_argument("--pattern", default="*.xml", help="Padrão glob dos XMLs")
+    parser.add_argument("-l", "--logo", help="Caminho da logo da empresa")
+    parser.add_argument("-c", "--config", dest="config_file", help="Arquivo de configuração YAML")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Modo verboso (debug)")
+
+    args = parser.parse_args(argv)
+    return cmd_estimate(
+        args.input_dir,
+        args.jobs,
+        args.worker_memory_mb,
+        args.sample,
+        args.calibrate,
+        args.history,
+        args.pattern,
+        args.logo,
+        args.config_file,
+        args.verbose,
+    )
+
+
+# Subcomandos despachados antes do parser principal (que aceita um XML posicional)
+SUBCOMMANDS: dict[str, Callable[[list[str]], int]] = {
+    "ingest-mail": ingest_mail_app,
+    "perf": perf_app,
+    "estimate": estimate_app,
+}
+
+
 def cli_app() -> int:
     """
     Ponto de entrada principal da CLI.
 
     Processa argumentos e executa comando apropriado.
     """
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser(
         description="DANFE Generator - Gerador de DANFE Personalizado",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -291,6 +1554,8 @@ def cli_app() -> int:
 Exemplos:
   danfe nota.xml -o ./output/nota.pdf
   danfe --batch ./xmls -o ./output
+  danfe --batch ./notas.tar.gz -o ./output
+  danfe --batch ./xmls -o ./output --jobs 4
   danfe --config config.yaml nota.xml
 """,
     )
@@ -334,7 +1599,219 @@ Exemplos:
     parser.add_argument(
         "--batch",
         action="store_true",
-        help="Processa todos XMLs de um diretório",
+        help="Processa todos XMLs de um diretório (ou de um .zip/.tar/.tar.gz)",
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=parse_jobs,
+        default=None,
+        metavar="N|auto",
+        help="Workers paralelos no modo lote (padrão: auto, pelos limites do container)",
+    )
+
+    parser.add_argument(
+        "--worker-memory",
+        dest="worker_memory_mb",
+        type=parse_worker_memory,
+        metavar="MB",
+        help="Limite de memória por worker em MB (padrão: memória do container / workers)",
+    )
+
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Ajusta a quantidade de workers pela vazão observada (--jobs define o máximo)",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="i/N",
+        help="Processa apenas o shard i de N do diretório (divisão entre máquinas)",
+    )
+
+    parser.add_argument(
+        "--shard-by",
+        choices=SHARD_BY_CHOICES,
+        default="path",
+        help="Critério de hash do shard: caminho relativo ou chave de acesso",
+    )
+
+    parser.add_argument(
+        "--lease-dir",
+        metavar="DIR",
+        help="Diretório compartilhado de leases: vários nós dividem o lote dinamicamente",
+    )
+
+    parser.add_argument(
+        "--lease-ttl",
+        type=float,
+        default=DEFAULT_LEASE_TTL,
+        metavar="SEGUNDOS",
+        help="Validade dos leases; leases de nós mortos são reclamados após expirar",
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Usa pipeline em estágios com filas limitadas (sobrepõe E/S e CPU)",
+    )
+
+    parser.add_argument(
+        "--stage-workers",
+        type=parse_stage_workers,
+        metavar="SPEC",
+        help="Concorrência por estágio do pipeline (ex.: read=2,render=4,write=2)",
+    )
+
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="Capacidade das filas entre estágios do pipeline",
+    )
+
+    parser.add_argument(
+        "--output-archive",
+        dest="archive_format",
+        choices=ARCHIVE_FORMATS,
+        help="Grava os PDFs em arquivos compactados sequenciais (com índice JSONL)",
+    )
+
+    parser.add_argument(
+        "--archive-max-mb",
+        type=int,
+        metavar="MB",
+        help="Tamanho máximo de cada arquivo de saída antes do rollover",
+    )
+
+    parser.add_argument(
+        "--archive-max-files",
+        type=int,
+        metavar="N",
+        help="Quantidade máxima de PDFs por arquivo de saída",
+    )
+
+    parser.add_argument(
+        "--db",
+        metavar="DSN",
+        help="Lê os XMLs de um banco de dados (arquivo SQLite ou DSN do driver)",
+    )
+
+    parser.add_argument(
+        "--db-driver",
+        default=DEFAULT_DRIVER,
+        metavar="MODULO",
+        help="Módulo DB-API usado com --db (ex.: sqlite3, psycopg)",
+    )
+
+    parser.add_argument(
+        "--db-query",
+        metavar="SQL",
+        help="Consulta que retorna duas colunas: identificador e XML",
+    )
+
+    parser.add_argument(
+        "--db-writeback",
+        metavar="SQL",
+        help="Instrução executada por documento com (pdf, erro, identificador)",
+    )
+
+    parser.add_argument(
+        "--db-fetch-size",
+        type=int,
+        default=DEFAULT_FETCH_SIZE,
+        metavar="N",
+        help="Linhas lidas por lote (fetchmany)",
+    )
+
+    parser.add_argument(
+        "--files0-from",
+        metavar="ARQUIVO",
+        help="Lista de XMLs separados por NUL (find -print0); '-' lê do stdin",
+    )
+
+    parser.add_argument(
+        "--manifest",
+        metavar="ARQUIVO",
+        help="Manifesto CSV/JSONL com xml|xml_base64, output, profile e id por linha",
+    )
+
+    parser.add_argument(
+        "--manifest-results",
+        metavar="ARQUIVO",
+        help="Arquivo JSONL de resultados (padrão: <manifesto>.results.jsonl)",
+    )
+
+    parser.add_argument(
+        "--fsync",
+        choices=FSYNC_POLICIES,
+        help="Durabilidade dos PDFs: none, file (fsync por arquivo) ou batch (ao final do lote)",
+    )
+
+    parser.add_argument(
+        "--output-template",
+        type=parse_output_template,
+        metavar="MODELO",
+        help="Caminho de cada PDF pela chave de acesso (ex.: '{cnpj}/{aaaa}/{mm}/{nNF}.pdf')",
+    )
+
+    parser.add_argument(
+        "--dedupe",
+        dest="dedupe_db",
+        action="store_const",
+        const=MEMORY_REGISTRY,
+        help="Ignora NF-e repetidas no lote (mesma chave; prefere a versão nfeProc)",
+    )
+
+    parser.add_argument(
+        "--dedupe-db",
+        dest="dedupe_db",
+        metavar="ARQUIVO",
+        help="Como --dedupe, lembrando as chaves já geradas entre lotes (SQLite)",
+    )
+
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Apenas valida os XMLs do lote, sem gerar PDFs; -o recebe o relatório JSONL",
+    )
+
+    parser.add_argument(
+        "--quarantine",
+        dest="quarantine_dir",
+        metavar="DIR",
+        help="Registra as entradas que falharam (cópia e motivo) em DIR para --retry-failed",
+    )
+
+    parser.add_argument(
+        "--retry-failed",
+        metavar="RUNID",
+        help=f"Reprocessa só as falhas da execução RUNID (quarentena: {DEFAULT_QUARANTINE_DIR})",
+    )
+
+    parser.add_argument(
+        "--report",
+        dest="report_path",
+        metavar="ARQUIVO",
+        help="Grava um relatório por documento no lote (.csv, .jsonl ou .parquet) e um resumo",
+    )
+
+    parser.add_argument(
+        "--report-top",
+        type=int,
+        default=DEFAULT_TOP_N,
+        metavar="N",
+        help=f"Documentos mais lentos e maiores no resumo do relatório (padrão: {DEFAULT_TOP_N})",
+    )
+
+    parser.add_argument(
+        "--perf-history",
+        nargs="?",
+        const=DEFAULT_HISTORY_PATH,
+        metavar="ARQUIVO",
+        help=f"Grava as métricas do lote no histórico de desempenho ({DEFAULT_HISTORY_PATH})",
     )
 
     # Se nenhum argumento for passado, sys.argv terá apenas o nome do script
@@ -348,7 +1825,70 @@ Exemplos:
         return 1
 
     # Lógica de despacho
-    if args.batch:
+    if args.validate_only:
+        return cmd_validate(
+            args.input_path or "./xmls",
+            args.output,
+            args.verbose,
+            args.jobs,
+            args.worker_memory_mb,
+            args.files0_from,
+        )
+
+    if args.retry_failed:
+        return cmd_retry(
+            args.retry_failed,
+            args.quarantine_dir or DEFAULT_QUARANTINE_DIR,
+            args.output,
+            args.logo,
+            args.config_file,
+            args.verbose,
+            args.jobs,
+            args.worker_memory_mb,
+            fsync=args.fsync,
+            output_template=args.output_template,
+        )
+
+    if args.manifest:
+        return cmd_manifest(
+            args.manifest,
+            args.manifest_results,
+            args.output,
+            args.logo,
+            args.config_file,
+            args.verbose,
+            args.jobs,
+            args.worker_memory_mb,
+            fsync=args.fsync,
+        )
+
+    if args.db:
+        if not args.db_query:
+            parser.error("--db requer --db-query")
+        return cmd_database(
+            args.db,
+            args.db_query,
+            args.output,
+            args.logo,
+            args.config_file,
+            args.verbose,
+            args.db_driver,
+            args.db_writeback,
+            args.db_fetch_size,
+            args.jobs,
+            args.worker_memory_mb,
+            args.archive_format,
+            args.archive_max_mb,
+            args.archive_max_files,
+            fsync=args.fsync,
+            output_template=args.output_template,
+            dedupe_db=args.dedupe_db,
+        )
+
+    if args.batch or args.files0_from:
+        if args.files0_from and args.lease_dir:
+            # Leases são relativos ao diretório de entrada, que a lista não tem
+            parser.error("--lease-dir não pode ser usado com --files0-from")
         input_dir = args.input_path or "./xmls"
         return cmd_batch(
             input_dir,
@@ -357,6 +1897,37 @@ Exemplos:
             args.config_file,
             args.verbose,
             args.format,
+            args.jobs,
+            args.worker_memory_mb,
+            args.adaptive,
+            args.shard,
+            args.shard_by,
+            args.lease_dir,
+            args.lease_ttl,
+            args.pipeline,
+            args.stage_workers,
+            args.queue_size,
+            args.archive_format,
+            args.archive_max_mb,
+            args.archive_max_files,
+            args.files0_from,
+            fsync=args.fsync,
+            output_template=args.output_template,
+            dedupe_db=args.dedupe_db,
+            quarantine_dir=args.quarantine_dir,
+            report_path=args.report_path,
+            report_top=args.report_top,
+            perf_history=args.perf_history,
+        )
+
+    if args.input_path == STDIO or args.output == STDIO:
+        return cmd_pipe(
+            args.input_path or STDIO,
+            args.output,
+            args.logo,
+            args.config_file,
+            args.verbose,
+            fsync=args.fsync,
         )
 
     if args.input_path:
@@ -368,6 +1939,7 @@ Exemplos:
             args.config_file,
             args.verbose,
             args.format,
+            fsync=args.fsync,
         )
 
     # Fallback para interativo se tiver flags mas sem input path?
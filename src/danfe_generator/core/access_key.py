@@ -0,0 +1,213 @@
+"""Extração rápida da chave de acesso (e da quantidade de itens) de NF-e.
+
+A chave de acesso (44 dígitos) aparece no atributo ``Id`` de ``infNFe``
+(``Id="NFe<chave>"``) e, em XMLs autorizados, em ``protNFe/infProt/chNFe``.
+Para sharding, deduplicação e nomeação de saída não é necessário fazer o
+parse completo do documento: basta varrer os primeiros bytes do arquivo.
+A versão autorizada (raiz ``nfeProc``, com o protocolo) também é
+reconhecida pelo início do documento. A quantidade de itens (``det``),
+usada em relatórios e estimativas de custo, também é contada nos bytes,
+sem parse.
+
+Classes:
+    AccessKey: Campos da chave de acesso (UF, emissão, CNPJ, série, número...).
+
+Functions:
+    find_access_key: Procura a chave de acesso em um trecho de bytes.
+    is_authorized: Indica se o trecho é de uma NF-e autorizada (nfeProc).
+    count_items: Conta os itens (``det``) em um trecho de bytes.
+    read_access_key: Lê a chave de acesso de um arquivo sem parse completo.
+    read_document_key: Lê a chave e se o arquivo é a versão autorizada.
+
+Example:
+    >>> from danfe_generator.core.access_key import read_access_key
+    >>> read_access_key(Path("nota.xml"))
+    '35231212345678000195550010000000011000000015'
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Buffer
+from dataclasses import dataclass
+from pathlib import Path
+
+from danfe_generator.sources.compressed import DECOMPRESSION_ERRORS, open_xml
+
+ACCESS_KEY_LENGTH = 44
+
+_ID_PATTERN = re.compile(rb'Id\s*=\s*["\']NFe(\d{44})["\']')
+_CHNFE_PATTERN = re.compile(rb"<(?:\w+:)?chNFe>\s*(\d{44})\s*</(?:\w+:)?chNFe>")
+_PROC_PATTERN = re.compile(rb"<(?:\w+:)?nfeProc[\s>]")
+_ITEM_PATTERN = re.compile(rb"<(?:\w+:)?det[\s>]")
+
+# Tamanho do bloco lido por vez e sobreposição entre blocos (para não
+# perder uma chave dividida entre dois blocos)
+_CHUNK_SIZE = 64 * 1024
+_OVERLAP = 128
+
+
+@dataclass(frozen=True)
+class AccessKey:
+    """Campos da chave de acesso, na ordem do leiaute da NF-e.
+
+    Os campos numéricos mantêm os zeros à esquerda da chave (ex.: série
+    ``001``, número ``000000123``), o que preserva a ordenação por nome.
+
+    Attributes:
+        chave: Chave completa (44 dígitos).
+        cUF: Código IBGE da UF do emitente.
+        aa: Ano de emissão (dois dígitos).
+        mm: Mês de emissão.
+        cnpj: CNPJ (ou CPF com zeros à esquerda) do emitente.
+        mod: Modelo do documento (55 = NF-e, 65 = NFC-e).
+        serie: Série.
+        nNF: Número do documento.
+        tpEmis: Forma de emissão.
+        cNF: Código numérico.
+        cDV: Dígito verificador.
+    """
+
+    chave: str
+    cUF: str
+    aa: str
+    mm: str
+    cnpj: str
+    mod: str
+    serie: str
+    nNF: str
+    tpEmis: str
+    cNF: str
+    cDV: str
+
+    @classmethod
+    def parse(cls, key: str) -> AccessKey:
+        """
+        Separa os campos de uma chave de acesso.
+
+        Args:
+            key: Chave de 44 dígitos
+
+        Returns:
+            AccessKey com os campos da chave
+
+        Raises:
+            ValueError: Se a chave não tiver 44 dígitos
+        """
+        if len(key) != ACCESS_KEY_LENGTH or not key.isdigit():
+            raise ValueError(f"Chave de acesso inválida: {key!r}")
+        return cls(
+            chave=key,
+            cUF=key[0:2],
+            aa=key[2:4],
+            mm=key[4:6],
+            cnpj=key[6:20],
+            mod=key[20:22],
+            serie=key[22:25],
+            nNF=key[25:34],
+            tpEmis=key[34],
+            cNF=key[35:43],
+            cDV=key[43],
+        )
+
+    @property
+    def aaaa(self) -> str:
+        """Ano de emissão com quatro dígitos."""
+        return f"20{self.aa}"
+
+
+def find_access_key(data: Buffer) -> str | None:
+    """
+    Procura a chave de acesso em um trecho de XML.
+
+    Args:
+        data: Bytes do XML (completo ou parcial; aceita mmap)
+
+    Returns:
+        Chave de 44 dígitos, ou None se não encontrada
+    """
+    match = _ID_PATTERN.search(data) or _CHNFE_PATTERN.search(data)
+    return match.group(1).decode("ascii") if match else None
+
+
+def count_items(data: Buffer) -> int:
+    """
+    Conta os itens (``det``) de um XML de NF-e, sem parse.
+
+    Args:
+        data: Bytes do XML (completo; aceita mmap)
+
+    Returns:
+        Quantidade de elementos ``det``
+    """
+    return sum(1 for _ in _ITEM_PATTERN.finditer(data))
+
+
+def is_authorized(data: bytes) -> bool:
+    """
+    Indica se um trecho inicial de XML é de uma NF-e autorizada.
+
+    A versão autorizada tem raiz ``nfeProc`` (NF-e + ``protNFe``), que
+    aparece antes de ``infNFe``; a NF-e "pura" tem raiz ``NFe``.
+
+    Args:
+        data: Bytes iniciais do XML
+
+    Returns:
+        True se o documento for um ``nfeProc``
+    """
+    return _PROC_PATTERN.search(data) is not None
+
+
+def read_access_key(path: Path, max_bytes: int | None = 1024 * 1024) -> str | None:
+    """
+    Lê a chave de acesso de um arquivo XML sem fazer o parse completo.
+
+    O arquivo é lido em blocos até a chave aparecer; em NF-e típicas o
+    atributo ``Id`` está nas primeiras centenas de bytes.
+
+    Args:
+        path: Caminho do arquivo XML
+        max_bytes: Limite de bytes a varrer. Se None, varre o arquivo todo.
+
+    Returns:
+        Chave de 44 dígitos, ou None se não encontrada ou ilegível
+    """
+    return read_document_key(path, max_bytes)[0]
+
+
+def read_document_key(
+    path: Path,
+    max_bytes: int | None = 1024 * 1024,
+) -> tuple[str | None, bool]:
+    """
+    Lê a chave de acesso e se o arquivo é a versão autorizada (nfeProc).
+
+    Args:
+        path: Caminho do arquivo XML
+        max_bytes: Limite de bytes a varrer. Se None, varre o arquivo todo.
+
+    Returns:
+        (chave ou None, autorizada)
+    """
+    authorized = False
+    try:
+        with open_xml(path) as f:
+            tail = b""
+            scanned = 0
+            while max_bytes is None or scanned < max_bytes:
+                chunk = f.read(_CHUNK_SIZE)
+                if not chunk:
+                    return None, authorized
+                scanned += len(chunk)
+                authorized = authorized or is_authorized(tail + chunk)
+                key = find_access_key(tail + chunk)
+                if key:
+                    return key, authorized
+                tail = chunk[-_OVERLAP:]
+    except OSError:
+        return None, False
+    except DECOMPRESSION_ERRORS:
+        # Corrompido: a falha aparece na renderização, só deste documento
+        return None, False
+    return None, authorized
@@ -0,0 +1,188 @@
+"""Transferência de PDFs entre processos sem cópias extras.
+
+Retornar ``bytes`` de um processo worker exige serializar (pickle) o PDF
+inteiro pelo pipe, duplicando a memória e consumindo CPU nos dois lados.
+Aqui o worker grava o PDF em um segmento de ``multiprocessing.shared_memory``
+e devolve apenas um handle (nome e tamanho); o processo pai lê o segmento
+como ``memoryview`` e o envia ao destino (arquivo, resposta HTTP) sem
+copiar.
+
+Classes:
+    SharedPDF: Handle serializável de um PDF em memória compartilhada.
+    RenderedPDF: PDF renderizado em memória, local ou compartilhado.
+
+Example:
+    >>> for pdf in generator.render_many(items, workers=4):
+    ...     with pdf:
+    ...         if pdf.success:
+    ...             pdf.write_to(response)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from types import TracebackType
+from typing import IO, Any
+
+from danfe_generator.exceptions import DANFEError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SharedPDF:
+    """Handle de um PDF em memória compartilhada.
+
+    Attributes:
+        name: Nome do segmento de memória compartilhada.
+        size: Tamanho do PDF em bytes (o segmento pode ser maior).
+    """
+
+    name: str
+    size: int
+
+    @classmethod
+    def from_bytes(cls, data: bytes | bytearray) -> SharedPDF:
+        """
+        Copia os bytes para um novo segmento (no processo worker).
+
+        O segmento não é removido aqui: o processo que recebe o handle
+        é responsável por chamar ``release``.
+        """
+        segment = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        try:
+            assert segment.buf is not None
+            segment.buf[: len(data)] = data
+            return cls(name=segment.name, size=len(data))
+        finally:
+            segment.close()
+
+    @contextlib.contextmanager
+    def view(self) -> Iterator[memoryview]:
+        """Abre o segmento e fornece um memoryview do PDF (sem cópia)."""
+        segment = shared_memory.SharedMemory(name=self.name)
+        try:
+            assert segment.buf is not None
+            view = segment.buf[: self.size]
+            try:
+                yield view
+            finally:
+                view.release()
+        finally:
+            segment.close()
+
+    def release(self) -> None:
+        """Remove o segmento de memória compartilhada."""
+        try:
+            segment = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return
+        segment.close()
+        segment.unlink()
+
+
+@dataclass
+class RenderedPDF:
+    """PDF renderizado em memória.
+
+    O conteúdo fica em ``data`` (renderização local) ou em memória
+    compartilhada (renderização em processo worker). Use como context
+    manager, ou chame ``close``, para liberar a memória compartilhada.
+
+    Attributes:
+        name: Identificador do documento de origem.
+        data: Bytes do PDF quando renderizado no próprio processo.
+        shared: Handle do PDF quando renderizado em um worker.
+        error_message: Mensagem de erro, se a renderização falhou.
+        access_key: Chave de acesso do XML de origem, se encontrada.
+        item_count: Quantidade de itens (``det``) do XML de origem.
+        error_type: Nome da exceção, se a renderização falhou.
+        error_details: ``DANFEError.details`` da exceção, se houver.
+        timings: Duração em segundos de cada estágio já medido (``render``).
+    """
+
+    name: str
+    data: bytes | None = None
+    shared: SharedPDF | None = None
+    error_message: str | None = None
+    access_key: str | None = None
+    item_count: int | None = None
+    error_type: str | None = None
+    error_details: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def failed(cls, name: str, error: BaseException) -> RenderedPDF:
+        """Cria o resultado de uma renderização que falhou."""
+        return cls(
+            name=name,
+            error_message=str(error),
+            error_type=type(error).__name__,
+            error_details=dict(error.details) if isinstance(error, DANFEError) else {},
+        )
+
+    @property
+    def success(self) -> bool:
+        """Se a renderização teve sucesso."""
+        return self.error_message is None
+
+    @property
+    def size(self) -> int:
+        """Tamanho do PDF em bytes."""
+        if self.shared is not None:
+            return self.shared.size
+        return len(self.data) if self.data is not None else 0
+
+    @contextlib.contextmanager
+    def view(self) -> Iterator[memoryview]:
+        """Fornece um memoryview do PDF, sem cópia."""
+        if self.shared is not None:
+            with self.shared.view() as view:
+                yield view
+        elif self.data is not None:
+            with memoryview(self.data) as view:
+                yield view
+        else:
+            raise ValueError(f"PDF indisponível para {self.name}: {self.error_message}")
+
+    def write_to(self, stream: IO[bytes]) -> int:
+        """
+        Escreve o PDF em um stream binário sem cópias intermediárias.
+
+        Args:
+            stream: Destino (arquivo, socket, resposta HTTP)
+
+        Returns:
+            Quantidade de bytes escritos
+        """
+        with self.view() as view:
+            stream.write(view)
+            return len(view)
+
+    def tobytes(self) -> bytes:
+        """Retorna uma cópia do PDF como bytes."""
+        if self.data is not None:
+            return self.data
+        with self.view() as view:
+            return view.tobytes()
+
+    def close(self) -> None:
+        """Libera a memória compartilhada, se houver."""
+        if self.shared is not None:
+            self.shared.release()
+            self.shared = None
+
+    def __enter__(self) -> RenderedPDF:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
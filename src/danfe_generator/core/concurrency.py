@@ -0,0 +1,172 @@
+"""Controle adaptativo de concorrência guiado pela vazão observada.
+
+O número ideal de workers depende do disco, do tamanho das notas e de
+outros processos na máquina, então um ``--jobs`` fixo sempre erra em
+algum cenário. O controlador mede documentos/segundo em janelas de tempo
+e ajusta o limite de documentos em andamento no estilo AIMD: aumento
+aditivo enquanto a vazão não piora e redução multiplicativa quando cai.
+
+Classes:
+    AdaptiveConcurrency: Controlador AIMD do limite de concorrência.
+
+Example:
+    >>> controller = AdaptiveConcurrency(maximum=8)
+    >>> controller.limit
+    4
+    >>> controller.record_completion()  # a cada documento concluído
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ConcurrencyDecision:
+    """Decisão tomada ao fim de uma janela de medição.
+
+    Attributes:
+        previous: Limite antes da decisão.
+        limit: Limite após a decisão.
+        throughput: Vazão da janela em documentos/segundo.
+        action: "increase", "decrease" ou "hold".
+    """
+
+    previous: int
+    limit: int
+    throughput: float
+    action: str
+
+
+class AdaptiveConcurrency:
+    """
+    Controlador AIMD do limite de documentos em andamento.
+
+    Ao fim de cada janela (``window_seconds`` e ao menos ``min_samples``
+    documentos), compara a vazão com a referência (a janela anterior):
+
+    - caiu mais que ``tolerance``: limite multiplicado por ``decrease_factor``;
+    - caso contrário: limite incrementado em ``increase_step`` (até o máximo).
+
+    Depois de uma redução a referência é descartada: com menos documentos
+    em andamento a vazão cai por consequência da própria redução, e
+    compará-la com a janela anterior a leria como congestionamento,
+    reduzindo em cascata até o mínimo. A janela seguinte apenas mede a
+    nova referência (e volta a aumentar o limite).
+
+    Attributes:
+        limit: Limite atual de documentos em andamento.
+        maximum: Limite máximo configurado.
+        decisions: Histórico de decisões tomadas.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        initial: int | None = None,
+        minimum: int = 1,
+        window_seconds: float = 2.0,
+        min_samples: int = 4,
+        increase_step: int = 1,
+        decrease_factor: float = 0.75,
+        tolerance: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Inicializa o controlador.
+
+        Args:
+            maximum: Limite máximo de concorrência
+            initial: Limite inicial. Se None, usa metade do máximo.
+            minimum: Limite mínimo de concorrência
+            window_seconds: Duração mínima de cada janela de medição
+            min_samples: Documentos mínimos por janela
+            increase_step: Incremento aditivo
+            decrease_factor: Fator multiplicativo de redução (0 < f < 1)
+            tolerance: Variação relativa de vazão considerada ruído
+            clock: Função de relógio monotônico (injetável em testes)
+
+        Raises:
+            ValueError: Se os limites ou o fator de redução forem inválidos
+        """
+        if minimum < 1 or maximum < minimum:
+            raise ValueError("Limites inválidos: requer 1 <= minimum <= maximum")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor deve estar entre 0 e 1")
+
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = min(maximum, max(minimum, initial or maximum // 2))
+        self.decisions: list[ConcurrencyDecision] = []
+
+        self._window_seconds = window_seconds
+        self._min_samples = min_samples
+        self._increase_step = increase_step
+        self._decrease_factor = decrease_factor
+        self._tolerance = tolerance
+        self._clock = clock
+
+        self._window_start = clock()
+        self._window_count = 0
+        self._last_throughput: float | None = None
+
+    def record_completion(self, count: int = 1) -> ConcurrencyDecision | None:
+        """
+        Registra documentos concluídos e reavalia o limite se a janela fechou.
+
+        Args:
+            count: Quantidade de documentos concluídos
+
+        Returns:
+            ConcurrencyDecision se a janela foi avaliada, senão None
+        """
+        self._window_count += count
+        elapsed = self._clock() - self._window_start
+
+        if elapsed <= 0 or elapsed < self._window_seconds or self._window_count < self._min_samples:
+            return None
+
+        throughput = self._window_count / elapsed
+        decision = self._decide(throughput)
+
+        # Após reduzir, a vazão da janela seguinte é a nova referência
+        self._last_throughput = None if decision.action == "decrease" else throughput
+        self._window_start = self._clock()
+        self._window_count = 0
+        return decision
+
+    def _decide(self, throughput: float) -> ConcurrencyDecision:
+        """Aplica a regra AIMD e registra a decisão."""
+        previous = self.limit
+        last = self._last_throughput
+
+        if last is not None and throughput < last * (1 - self._tolerance):
+            self.limit = max(self.minimum, int(previous * self._decrease_factor))
+            action = "decrease"
+        else:
+            self.limit = min(self.maximum, previous + self._increase_step)
+            action = "increase"
+
+        if self.limit == previous:
+            action = "hold"
+
+        decision = ConcurrencyDecision(
+            previous=previous,
+            limit=self.limit,
+            throughput=throughput,
+            action=action,
+        )
+        self.decisions.append(decision)
+        logger.info(
+            "Concorrência adaptativa: %d -> %d (%s, %.1f docs/s)",
+            previous,
+            self.limit,
+            action,
+            throughput,
+        )
+        return decision
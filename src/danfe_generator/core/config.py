@@ -33,6 +33,8 @@ from typing import Self
 
 import yaml
 
+from danfe_generator.utils.atomic import FSYNC_POLICIES
+
 
 @dataclass(frozen=True)
 class MarginsConfig:
@@ -107,6 +109,11 @@ class DANFEConfig:
     show_company_info: bool = True
     show_additional_info: bool = True
 
+    # Saída: política de fsync dos PDFs gravados ("none", "file" ou "batch")
+    # e modelo do caminho de cada PDF no diretório de saída (ver core.naming)
+    fsync: str = "none"
+    output_template: str | None = None
+
     def __post_init__(self) -> None:
         """Converte e valida campos."""
         if self.logo_path is not None and not isinstance(self.logo_path, Path):
@@ -115,6 +122,9 @@ class DANFEConfig:
         if self.layout_type not in ("complete", "simplified"):
             raise ValueError("layout_type deve ser 'complete' ou 'simplified'")
 
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync deve ser um de: {', '.join(FSYNC_POLICIES)}")
+
     @classmethod
     def from_yaml(cls, yaml_path: str | Path) -> Self:
         """Carrega configuração de arquivo YAML."""
@@ -134,6 +144,8 @@ class DANFEConfig:
             show_logo=data.get("layout", {}).get("show_logo", True),
             show_company_info=data.get("layout", {}).get("show_company_info", True),
             show_additional_info=data.get("layout", {}).get("show_additional_info", True),
+            fsync=data.get("output", {}).get("fsync", "none"),
+            output_template=data.get("output", {}).get("template"),
         )
 
     def to_dict(self) -> dict:
@@ -153,4 +165,6 @@ class DANFEConfig:
                 "accent": list(self.colors.accent),
             },
             "layout_type": self.layout_type,
+            "fsync": self.fsync,
+            "output_template": self.output_template,
         }
@@ -0,0 +1,199 @@
+"""Detecção de NF-e duplicadas (mesma chave de acesso) dentro e entre lotes.
+
+A mesma nota costuma chegar várias vezes: como ``NFe`` "pura", como
+``nfeProc`` (autorizada, com o protocolo) e reenviada por e-mail. O
+registro guarda as chaves de acesso já renderizadas em um banco SQLite
+(ou em memória, só para o lote atual) e decide, antes da renderização,
+se cada documento deve ser gerado:
+
+- chave nova: gera;
+- chave já gerada (ou em andamento no lote): ignora a cópia;
+- exceção: a versão autorizada (``nfeProc``) substitui uma ``NFe``
+  pura já gerada, e é gerada novamente.
+
+A chave é marcada como gerada apenas após o sucesso; documentos que
+falharam (ou foram interrompidos) voltam a ser gerados no lote seguinte. A
+consulta é feita por chave primária, com memória constante mesmo com
+milhões de chaves.
+
+Classes:
+    KeyRegistry: Registro persistente de chaves de acesso já geradas.
+
+Example:
+    >>> with KeyRegistry("./output/.danfe-keys.db") as registry:
+    ...     result = generator.generate_batch(xml_files, "./output", registry=registry)
+    >>> print(f"Duplicadas ignoradas: {result.duplicates}")
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+
+logger = logging.getLogger(__name__)
+
+# Confirmações acumuladas antes de um commit no banco
+COMMIT_INTERVAL = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    chave TEXT PRIMARY KEY,
+    authorized INTEGER NOT NULL,
+    name TEXT,
+    pdf TEXT
+)
+"""
+
+
+class KeyRegistry:
+    """Registro de chaves de acesso já geradas.
+
+    Seguro para uso por várias threads (a admissão pode ocorrer na thread
+    de leitura do pipeline e a confirmação na thread que consome os
+    resultados).
+
+    Attributes:
+        path: Arquivo SQLite, ou None para um registro só em memória.
+        duplicates: Documentos ignorados por duplicidade.
+        superseded: NF-e puras substituídas pela versão autorizada.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        """
+        Abre (ou cria) o registro.
+
+        Args:
+            path: Arquivo SQLite persistente. Se None, o registro vale
+                apenas enquanto o objeto existir (duplicatas do lote).
+        """
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            str(self.path) if self.path is not None else ":memory:",
+            check_same_thread=False,
+        )
+        self._connection.execute(_SCHEMA)
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(documents)")}
+        if "pdf" not in columns:
+            # Registro criado antes da coluna com a localização do PDF
+            self._connection.execute("ALTER TABLE documents ADD COLUMN pdf TEXT")
+        self._lock = threading.Lock()
+        # Documentos admitidos e ainda não concluídos: nome → (chave, autorizada)
+        self._inflight: dict[str, tuple[str, bool]] = {}
+        self._inflight_keys: dict[str, bool] = {}
+        self._uncommitted = 0
+        self.duplicates = 0
+        self.superseded = 0
+
+    def admit(self, name: str, key: str | None, authorized: bool) -> bool:
+        """
+        Decide se um documento deve ser gerado.
+
+        Args:
+            name: Nome do documento (como aparecerá em ``GenerationResult.xml_path``)
+            key: Chave de acesso, ou None se não encontrada (sempre gera)
+            authorized: Se o documento é a versão autorizada (nfeProc)
+
+        Returns:
+            True se o documento deve ser gerado
+        """
+        if key is None:
+            return True
+
+        with self._lock:
+            previous = self._inflight_keys.get(key)
+            if previous is None:
+                row = self._connection.execute(
+                    "SELECT authorized FROM documents WHERE chave = ?",
+                    (key,),
+                ).fetchone()
+                previous = bool(row[0]) if row is not None else None
+
+            if previous is not None and (previous or not authorized):
+                self.duplicates += 1
+                logger.info("Chave %s já gerada; ignorando %s", key, name)
+                return False
+            if previous is not None:
+                self.superseded += 1
+                logger.info("Versão autorizada de %s substitui a NF-e pura: %s", key, name)
+
+            self._inflight[name] = (key, authorized)
+            self._inflight_keys[key] = authorized
+            return True
+
+    def complete(self, name: str, success: bool, pdf_path: str | None = None) -> None:
+        """
+        Conclui um documento admitido; registra a chave se gerado com sucesso.
+
+        Args:
+            name: Nome usado em ``admit``
+            success: Se o PDF foi gerado
+            pdf_path: Localização do PDF gerado (ver ``pdf_for``)
+        """
+        with self._lock:
+            entry = self._inflight.pop(name, None)
+            if entry is None:
+                return
+            key, authorized = entry
+            if self._inflight_keys.get(key) == authorized:
+                del self._inflight_keys[key]
+            if not success:
+                return
+            self._connection.execute(
+                "INSERT INTO documents (chave, authorized, name, pdf) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET "
+                "authorized = MAX(authorized, excluded.authorized), "
+                "name = CASE WHEN excluded.authorized >= authorized "
+                "THEN excluded.name ELSE name END, "
+                "pdf = CASE WHEN excluded.authorized >= authorized "
+                "THEN excluded.pdf ELSE pdf END",
+                (key, int(authorized), name, pdf_path),
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_INTERVAL:
+                self._connection.commit()
+                self._uncommitted = 0
+
+    def __contains__(self, key: object) -> bool:
+        """Se a chave já foi gerada (em lotes anteriores ou no atual)."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM documents WHERE chave = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def pdf_for(self, key: str) -> str | None:
+        """Localização do PDF gerado para a chave, se conhecida."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT pdf FROM documents WHERE chave = ?", (key,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def close(self) -> None:
+        """Grava as chaves pendentes e fecha o banco."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+        if self.duplicates or self.superseded:
+            logger.info(
+                "Duplicadas: %d ignorada(s), %d substituída(s) pela versão autorizada",
+                self.duplicates,
+                self.superseded,
+            )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,285 @@
+"""Estimativa da duração de um lote a partir de estatísticas do corpus.
+
+Antes de dedicar um nó a um backfill, ``estimate_duration`` prevê quanto
+tempo o lote levará com uma dada quantidade de workers, sem renderizá-lo:
+
+1. ``scan_corpus``: varredura só de metadados (tamanho dos arquivos) e
+   contagem de itens (``det``) em uma amostra, extrapolada para o corpus
+   pela razão itens/byte;
+2. um ``CostModel`` (``ms_por_nota + ms_por_item * itens``), vindo do
+   histórico de desempenho (``cost_from_history``) ou de uma calibração
+   rápida com alguns XMLs da amostra (``calibrate``);
+3. o tempo de CPU total dividido pelo paralelismo efetivo (workers
+   limitados às CPUs disponíveis).
+
+A previsão assume escalabilidade linear até o número de CPUs; disco lento
+ou workers limitados por memória deixam o lote real mais lento.
+
+Classes:
+    CorpusStats: Estatísticas do corpus (arquivos, bytes, itens amostrados).
+    CostModel: Custo de renderização por documento e por item.
+    Estimate: Duração prevista de um lote.
+
+Functions:
+    scan_corpus: Varre os metadados e conta os itens de uma amostra.
+    cost_from_history: Modelo de custo da execução mais recente do histórico.
+    calibrate: Modelo de custo medido renderizando alguns XMLs.
+    estimate_duration: Combina estatísticas e custo na duração prevista.
+
+Example:
+    >>> stats = scan_corpus(find_xml_files(Path("./backfill")))
+    >>> model = calibrate(DANFEGenerator(), stats.sample[:5])
+    >>> print(f"{estimate_duration(stats, model, workers=8).wall_s / 3600:.1f} h")
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import socket
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from danfe_generator.core.access_key import count_items
+from danfe_generator.core.history import RunMetrics, fit_cost_model
+from danfe_generator.core.resources import detect_limits
+from danfe_generator.sources.compressed import map_xml, read_xml
+
+if TYPE_CHECKING:
+    from danfe_generator.core.generator import DANFEGenerator
+
+logger = logging.getLogger(__name__)
+
+# XMLs lidos para contar itens
+DEFAULT_SAMPLE_SIZE = 200
+# XMLs renderizados na calibração
+DEFAULT_CALIBRATION_SIZE = 5
+
+
+@dataclass
+class CorpusStats:
+    """Estatísticas do corpus.
+
+    Attributes:
+        files: Quantidade de XMLs.
+        total_bytes: Soma dos tamanhos em disco.
+        sampled: XMLs lidos na amostra.
+        sampled_bytes: Tamanho em disco dos XMLs da amostra.
+        sampled_items: Itens (``det``) encontrados na amostra.
+        sample: Caminhos da amostra (reusados na calibração).
+    """
+
+    files: int
+    total_bytes: int
+    sampled: int = 0
+    sampled_bytes: int = 0
+    sampled_items: int = 0
+    sample: list[Path] = field(default_factory=list, repr=False)
+
+    @property
+    def items(self) -> int:
+        """Itens estimados no corpus (razão itens/byte da amostra)."""
+        if self.sampled_bytes <= 0:
+            return 0
+        return round(self.total_bytes * self.sampled_items / self.sampled_bytes)
+
+    @property
+    def mean_items(self) -> float:
+        """Média de itens por XML na amostra."""
+        return self.sampled_items / self.sampled if self.sampled else 0.0
+
+
+@dataclass
+class CostModel:
+    """Custo de renderização (tempo de CPU por worker).
+
+    Attributes:
+        ms_per_doc: Custo fixo por documento (ms).
+        ms_per_item: Custo por item ``det`` (ms).
+        source: Origem do modelo (ex.: "histórico #12", "calibração (5 XMLs)").
+    """
+
+    ms_per_doc: float
+    ms_per_item: float
+    source: str
+
+
+@dataclass
+class Estimate:
+    """Duração prevista de um lote.
+
+    Attributes:
+        files: XMLs do lote.
+        items: Itens estimados.
+        workers: Workers pedidos.
+        parallelism: Workers efetivos (limitados às CPUs disponíveis).
+        cpu_s: Tempo de CPU total previsto, em segundos.
+        wall_s: Duração prevista, em segundos.
+        model: Modelo de custo usado.
+    """
+
+    files: int
+    items: int
+    workers: int
+    parallelism: float
+    cpu_s: float
+    wall_s: float
+    model: CostModel
+
+
+def scan_corpus(
+    paths: Sequence[Path],
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    seed: int | None = None,
+) -> CorpusStats:
+    """
+    Varre os metadados do corpus e conta os itens de uma amostra.
+
+    Apenas os XMLs da amostra são lidos (mapeados em memória quando
+    grandes); dos demais, só o tamanho em disco.
+
+    Args:
+        paths: XMLs do corpus
+        sample_size: Quantidade de XMLs lidos para contar itens
+        seed: Semente da amostragem (para resultados reproduzíveis)
+
+    Returns:
+        CorpusStats do corpus
+    """
+    sizes: dict[Path, int] = {}
+    for path in paths:
+        try:
+            sizes[path] = path.stat().st_size
+        except OSError as e:
+            logger.warning("Ignorando %s: %s", path, e)
+
+    stats = CorpusStats(files=len(sizes), total_bytes=sum(sizes.values()))
+    candidates = list(sizes)
+    sample = random.Random(seed).sample(candidates, min(sample_size, len(candidates)))
+    for path in sample:
+        try:
+            with map_xml(path) as data:
+                items = count_items(data)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignorando %s na amostra: %s", path, e)
+            continue
+        stats.sampled += 1
+        stats.sampled_bytes += sizes[path]
+        stats.sampled_items += items
+        stats.sample.append(path)
+
+    logger.info(
+        "Corpus: %d XML(s), %d bytes; amostra de %d com %.1f item(ns)/XML",
+        stats.files,
+        stats.total_bytes,
+        stats.sampled,
+        stats.mean_items,
+    )
+    return stats
+
+
+def cost_from_history(
+    runs: Iterable[RunMetrics],
+    host: str | None = None,
+) -> CostModel | None:
+    """
+    Modelo de custo da execução mais recente do histórico que o tenha.
+
+    Args:
+        runs: Execuções do histórico, da mais antiga para a mais recente
+        host: Prefere execuções deste host (o custo depende da CPU). Se
+            None, usa o host atual.
+
+    Returns:
+        CostModel, ou None se nenhuma execução tiver o modelo
+    """
+    host = host or socket.gethostname()
+    candidates = [run for run in runs if run.ms_per_doc is not None]
+    if not candidates:
+        return None
+    same_host = [run for run in candidates if run.host == host]
+    run = (same_host or candidates)[-1]
+    return CostModel(
+        ms_per_doc=run.ms_per_doc or 0.0,
+        ms_per_item=run.ms_per_item or 0.0,
+        source=f"histórico #{run.id} ({run.started}, {run.host})",
+    )
+
+
+def calibrate(generator: DANFEGenerator, paths: Sequence[Path]) -> CostModel:
+    """
+    Mede o custo renderizando (em memória) alguns XMLs.
+
+    O primeiro XML é renderizado uma vez antes da medição, para não contar
+    o carregamento de fontes e módulos.
+
+    Args:
+        generator: Gerador com a configuração do lote
+        paths: XMLs de calibração (de preferência com quantidades de itens
+            variadas)
+
+    Returns:
+        CostModel medido
+
+    Raises:
+        ValueError: Se nenhum XML puder ser renderizado
+    """
+    points: list[tuple[int, float]] = []
+    warmed_up = False
+    for path in paths:
+        try:
+            content = read_xml(path)
+            if not warmed_up:
+                generator.render(content)
+                warmed_up = True
+            start = time.perf_counter()
+            generator.render(content)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            logger.warning("Ignorando %s na calibração: %s", path, e)
+            continue
+        points.append((count_items(content), elapsed_ms))
+
+    ms_per_doc, ms_per_item = fit_cost_model(points)
+    if ms_per_doc is None:
+        raise ValueError("Nenhum XML de calibração pôde ser renderizado")
+    return CostModel(
+        ms_per_doc=ms_per_doc,
+        ms_per_item=ms_per_item or 0.0,
+        source=f"calibração ({len(points)} XML(s))",
+    )
+
+
+def estimate_duration(
+    stats: CorpusStats,
+    model: CostModel,
+    workers: int = 1,
+    cpus: float | None = None,
+) -> Estimate:
+    """
+    Prevê a duração de um lote.
+
+    Args:
+        stats: Estatísticas do corpus
+        model: Custo por documento e por item
+        workers: Quantidade de workers do lote
+        cpus: CPUs disponíveis. Se None, usa os limites do cgroup/host.
+
+    Returns:
+        Estimate com o tempo de CPU e a duração previstos
+    """
+    cpus = cpus if cpus is not None else detect_limits().cpus
+    parallelism = max(min(float(workers), cpus), 1.0)
+    cpu_s = (stats.files * model.ms_per_doc + stats.items * model.ms_per_item) / 1000
+    return Estimate(
+        files=stats.files,
+        items=stats.items,
+        workers=workers,
+        parallelism=parallelism,
+        cpu_s=cpu_s,
+        wall_s=cpu_s / parallelism,
+        model=model,
+    )
@@ -36,33 +36,115 @@ Example:
 from __future__ import annotations
 
 import logging
-from collections.abc import Iterator
+import time
+from collections import deque
+from collections.abc import Buffer, Callable, Iterable, Iterator, Mapping, Sized
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+from xml.etree import ElementTree
 
 from brazilfiscalreport.danfe import Danfe
 from brazilfiscalreport.danfe.config import DanfeConfig, Margins
 
+from danfe_generator.core.access_key import (
+    count_items,
+    find_access_key,
+    is_authorized,
+    read_access_key,
+    read_document_key,
+)
+from danfe_generator.core.buffers import RenderedPDF
+from danfe_generator.core.concurrency import AdaptiveConcurrency
 from danfe_generator.core.config import DANFEConfig
+from danfe_generator.core.dedupe import KeyRegistry
+from danfe_generator.core.leases import (
+    DEFAULT_LEASE_TTL,
+    Lease,
+    LeaseManager,
+    LeaseRenewer,
+    claim_items,
+)
+from danfe_generator.core.naming import OutputTemplate
+from danfe_generator.core.pipeline import DEFAULT_QUEUE_SIZE, Pipeline, StageStats
+from danfe_generator.core.progress import CancellationToken, Progress, ProgressTracker
+from danfe_generator.core.resources import WorkerPlan, plan_workers
+from danfe_generator.core.sharding import Shard, select_shard
+from danfe_generator.core.sinks import DeferredSink, DirectorySink, OutputSink
 from danfe_generator.core.validators import LogoValidator, XMLValidator
-from danfe_generator.exceptions import DirectoryNotFoundError, GenerationError
+from danfe_generator.exceptions import (
+    DANFEError,
+    DirectoryNotFoundError,
+    GenerationError,
+    InvalidXMLError,
+)
+from danfe_generator.sources.archive import is_archive, iter_archive
+from danfe_generator.sources.base import DocumentSource
+from danfe_generator.sources.compressed import find_xml_files, map_xml, read_xml, xml_stem
+from danfe_generator.sources.database import DatabaseSource
+from danfe_generator.sources.encoding import recode_legacy
+from danfe_generator.utils.atomic import AtomicWriter
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+    from danfe_generator.sources.manifest import ManifestEntry
+
 logger = logging.getLogger(__name__)
 
+# Perfil de configuração: (nome, configuração), com cache por nome nos workers
+type Profile = tuple[str, DANFEConfig]
+# Item de renderização: (nome, XML) ou (nome, XML, perfil)
+type RenderItem = tuple[str, bytes] | tuple[str, bytes, Profile | None]
+
+# Linhas do manifesto aguardando (em renderização ou inválidas atrás delas)
+MANIFEST_QUEUE_LIMIT = 256
+
 
 @dataclass
 class GenerationResult:
-    """Resultado da geração de um DANFE."""
+    """Resultado da geração de um DANFE.
+
+    Em falhas, ``error_type`` é o nome da exceção e ``error_details`` o
+    ``DANFEError.details`` dela (vazio para outras exceções). ``timings``
+    guarda a duração, em segundos, de cada estágio medido (``read``,
+    ``validate``, ``render``, ``write``).
+    """
 
     xml_path: Path
     pdf_path: Path | None
     success: bool
     error_message: str | None = None
     file_size_kb: float = 0.0
+    error_type: str | None = None
+    error_details: dict[str, Any] = field(default_factory=dict)
+    access_key: str | None = None
+    item_count: int | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def failure(cls, xml_path: Path, error: BaseException | str) -> GenerationResult:
+        """
+        Cria o resultado de uma falha a partir da exceção (ou mensagem).
+
+        Args:
+            xml_path: XML (ou nome do documento) que falhou
+            error: Exceção levantada, ou apenas a mensagem de erro
+
+        Returns:
+            GenerationResult de falha com tipo e detalhes do erro
+        """
+        if isinstance(error, str):
+            return cls(xml_path=xml_path, pdf_path=None, success=False, error_message=error)
+        return cls(
+            xml_path=xml_path,
+            pdf_path=None,
+            success=False,
+            error_message=str(error),
+            error_type=type(error).__name__,
+            error_details=dict(error.details) if isinstance(error, DANFEError) else {},
+        )
 
 
 @dataclass
@@ -72,14 +154,36 @@ class BatchResult:
     total: int = 0
     successful: int = 0
     failed: int = 0
+    duplicates: int = 0
     results: list[GenerationResult] = field(default_factory=list)
+    stage_stats: dict[str, StageStats] = field(default_factory=dict)
+    cancelled: bool = False
+    elapsed_s: float = 0.0
 
     @property
     def success_rate(self) -> float:
-        """Taxa de sucesso em porcentagem."""
-        if self.total == 0:
+        """Taxa de sucesso em porcentagem (sem contar duplicatas ignoradas)."""
+        processed = self.total - self.duplicates
+        if processed <= 0:
             return 0.0
-        return (self.successful / self.total) * 100
+        return (self.successful / processed) * 100
+
+
+@dataclass(frozen=True)
+class _BatchRun:
+    """Opções de execução comuns aos lotes (ver ``generate_batch``)."""
+
+    workers: int | None
+    memory_per_worker_mb: int | None
+    adaptive: bool
+    pipeline: bool
+    stage_workers: Mapping[str, int] | None
+    queue_size: int
+    sink: OutputSink | None
+    registry: KeyRegistry | None
+    on_result: Callable[[GenerationResult], None] | None
+    on_progress: Callable[[Progress], None] | None
+    cancel: CancellationToken | None
 
 
 class DANFEGenerator:
@@ -89,6 +193,11 @@ class DANFEGenerator:
     Esta classe encapsula a lógica de geração de DANFE usando a biblioteca
     brazilfiscalreport, com suporte a personalização de logo, cores e margens.
 
+    Os PDFs são gravados de forma atômica por ``writer``, com a política
+    de fsync da configuração; no modo "batch", os métodos de lote
+    sincronizam ao final, e chamadas avulsas a ``generate`` devem ser
+    seguidas de ``writer.sync()``.
+
     Exemplo:
         >>> config = DANFEConfig(logo_path=Path("./logo.png"))
         >>> generator = DANFEGenerator(config)
@@ -108,6 +217,30 @@ class DANFEGenerator:
         self._xml_validator = XMLValidator()
         self._validated_logo: Path | None = None
         self._logo_validation_done: bool = False
+        self._profile_generators: dict[str, DANFEGenerator] = {}
+        # Escrita atômica dos PDFs, com a política de fsync da configuração
+        self.writer = AtomicWriter(self.config.fsync)
+        self.output_template = (
+            OutputTemplate(self.config.output_template) if self.config.output_template else None
+        )
+
+    def for_profile(self, profile: Profile | None) -> DANFEGenerator:
+        """
+        Gerador para um perfil de configuração (criado uma vez por nome).
+
+        Args:
+            profile: Par (nome, configuração), ou None para este gerador
+
+        Returns:
+            Gerador com a configuração do perfil
+        """
+        if profile is None:
+            return self
+        name, config = profile
+        generator = self._profile_generators.get(name)
+        if generator is None:
+            generator = self._profile_generators[name] = DANFEGenerator(config)
+        return generator
 
     def _validate_logo(self) -> Path | None:
         """Valida e retorna o caminho da logo se válido."""
@@ -144,6 +277,128 @@ class DANFEGenerator:
             margins=margins,
         )
 
+    def render(self, xml_content: str | Buffer) -> bytes:
+        """
+        Renderiza o PDF do DANFE em memória.
+
+        O conteúdo em bytes é passado ao parser sem decodificação, que
+        respeita o encoding declarado no XML. XMLs em ISO-8859-1/Windows-1252
+        sem declaração (comuns em ERPs antigos) são convertidos para UTF-8.
+
+        Args:
+            xml_content: Conteúdo do XML de NFe (bytes, mmap ou str)
+
+        Returns:
+            Bytes do PDF gerado
+        """
+        config = self._build_danfe_config()
+        try:
+            danfe = Danfe(xml_content, config=config)
+        except ElementTree.ParseError:
+            recoded = None if isinstance(xml_content, str) else recode_legacy(xml_content)
+            if recoded is None:
+                raise
+            danfe = Danfe(recoded, config=config)
+        return bytes(danfe.output())
+
+    def _render_checked(self, name: str, xml_content: bytes, validate: bool = True) -> bytes:
+        """Valida (opcionalmente) e renderiza, levantando exceções do pacote."""
+        if validate:
+            result = self._xml_validator.validate_bytes(xml_content)
+            if not result.is_valid:
+                raise InvalidXMLError(name, result.error_message or "Erro desconhecido")
+        try:
+            return self.render(xml_content)
+        except Exception as e:
+            raise GenerationError(name, str(e)) from e
+
+    def render_many(
+        self,
+        items: Iterable[RenderItem],
+        workers: int | None = 1,
+        memory_per_worker_mb: int | None = None,
+        ordered: bool = False,
+    ) -> Iterator[RenderedPDF]:
+        """
+        Renderiza PDFs em memória a partir de conteúdos XML.
+
+        Útil para a interface web ou serviços HTTP, que não precisam do PDF
+        em disco. Com mais de um worker, cada PDF volta do processo worker
+        em memória compartilhada e pode ser enviado ao destino com
+        ``RenderedPDF.write_to`` sem cópias extras.
+
+        Args:
+            items: Pares (nome, conteúdo do XML), opcionalmente com um
+                perfil de configuração (nome, DANFEConfig) por item
+            workers: Quantidade de processos worker (None = automático)
+            memory_per_worker_mb: Limite de memória por worker em MB
+            ordered: Se True, mantém a ordem de ``items`` também com workers
+
+        Yields:
+            RenderedPDF para cada item (na ordem de conclusão com workers,
+            salvo ``ordered``); feche cada um (``with pdf:``) para liberar a
+            memória compartilhada
+        """
+        plan = self._plan(workers, memory_per_worker_mb)
+
+        if plan.workers > 1:
+            from danfe_generator.core.parallel import render_parallel
+
+            yield from render_parallel(self.config, items, plan, ordered)
+            return
+
+        for item in items:
+            name, xml_content = item[0], item[1]
+            generator = self.for_profile(item[2] if len(item) > 2 else None)
+            try:
+                start = time.perf_counter()
+                pdf = generator._render_checked(name, xml_content)
+                yield RenderedPDF(
+                    name=name,
+                    data=pdf,
+                    access_key=find_access_key(xml_content),
+                    item_count=count_items(xml_content),
+                    timings={"render": time.perf_counter() - start},
+                )
+            except DANFEError as e:
+                logger.error("Erro renderizando %s: %s", name, e)
+                yield RenderedPDF.failed(name, e)
+
+    def validate_many(
+        self,
+        xml_paths: Iterable[str | Path],
+        workers: int | None = 1,
+        memory_per_worker_mb: int | None = None,
+    ) -> Iterator[tuple[Path, str | None]]:
+        """
+        Valida XMLs sem renderizar (preflight de um lote).
+
+        Aplica as verificações de ``XMLValidator`` (existência, extensão,
+        boa formação e tags de NFe), com parse incremental que para no
+        primeiro erro. Os caminhos são consumidos sob demanda.
+
+        Args:
+            xml_paths: Caminhos dos XMLs
+            workers: Quantidade de processos worker. Se None, dimensiona
+                pelo cgroup.
+            memory_per_worker_mb: Limite de memória por worker em MB
+
+        Yields:
+            (caminho, mensagem de erro ou None se válido); com workers, na
+            ordem de conclusão
+        """
+        paths = (Path(xml_path) for xml_path in xml_paths)
+        plan = self._plan(workers, memory_per_worker_mb)
+
+        if plan.workers > 1:
+            from danfe_generator.core.parallel import validate_parallel
+
+            yield from validate_parallel(paths, plan)
+            return
+
+        for xml_path in paths:
+            yield xml_path, self._xml_validator.validate(xml_path).error_message
+
     def generate(
         self,
         xml_path: str | Path,
@@ -167,27 +422,31 @@ class DANFEGenerator:
         logger.info("Gerando DANFE para: %s", xml_path)
 
         # Validar XML
+        start = time.perf_counter()
         self._xml_validator.validate_or_raise(xml_path)
+        timings = {"validate": time.perf_counter() - start}
 
         # Definir output
-        output_path = xml_path.with_suffix(".pdf") if output_path is None else Path(output_path)
-
-        # Garantir que diretório de saída existe
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path is None:
+            output_path = xml_path.with_name(f"{xml_stem(xml_path)}.pdf")
+        output_path = Path(output_path)
 
         try:
-            # Ler XML
-            xml_content = xml_path.read_text(encoding="utf-8")
-
-            # Criar DANFE
-            danfe_config = self._build_danfe_config()
-            danfe = Danfe(xml_content, config=danfe_config)
-
-            # Gerar PDF
-            danfe.output(str(output_path))
+            # Ler XML em bytes (mmap para arquivos grandes, descompressão
+            # em stream para .xml.gz/.xml.bz2/.xml.zst) e gerar PDF
+            start = time.perf_counter()
+            with map_xml(xml_path) as xml_content:
+                access_key = find_access_key(xml_content)
+                item_count = count_items(xml_content)
+                pdf = self.render(xml_content)
+            timings["render"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.writer.write_bytes(output_path, pdf)
+            timings["write"] = time.perf_counter() - start
 
             # Stats
-            file_size_kb = output_path.stat().st_size / 1024
+            file_size_kb = len(pdf) / 1024
 
             logger.info("DANFE gerada com sucesso: %s (%.2f KB)", output_path, file_size_kb)
 
@@ -196,54 +455,292 @@ class DANFEGenerator:
                 pdf_path=output_path,
                 success=True,
                 file_size_kb=file_size_kb,
+                access_key=access_key,
+                item_count=item_count,
+                timings=timings,
             )
 
         except Exception as e:
             logger.exception("Erro ao gerar DANFE: %s", e)
             raise GenerationError(str(xml_path), str(e)) from e
 
+    def _generate_safe(
+        self,
+        xml_path: Path,
+        output_path: Path | None,
+    ) -> GenerationResult:
+        """Gera DANFE convertendo exceções em GenerationResult de falha."""
+        try:
+            return self.generate(xml_path, output_path)
+        except Exception as e:
+            logger.error("Erro processando %s: %s", xml_path, e)
+            return GenerationResult.failure(xml_path, e)
+
     def generate_batch(
         self,
-        xml_paths: Sequence[str | Path],
+        xml_paths: Iterable[str | Path],
         output_dir: str | Path | None = None,
+        workers: int | None = 1,
+        memory_per_worker_mb: int | None = None,
+        adaptive: bool = False,
+        shard: Shard | str | None = None,
+        shard_by: str = "path",
+        pipeline: bool = False,
+        stage_workers: Mapping[str, int] | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        sink: OutputSink | None = None,
+        registry: KeyRegistry | None = None,
+        on_result: Callable[[GenerationResult], None] | None = None,
+        on_progress: Callable[[Progress], None] | None = None,
+        cancel: CancellationToken | None = None,
     ) -> BatchResult:
         """
         Gera DANFEs em lote.
 
+        Com mais de um worker, os documentos são gerados em processos
+        paralelos e ``results`` fica na ordem de conclusão.
+
+        ``xml_paths`` pode ser um iterável sob demanda (ex.: caminhos lidos
+        de um pipe): a geração começa antes de a lista terminar e o total é
+        contado ao final.
+
         Args:
-            xml_paths: Lista de caminhos de XMLs
+            xml_paths: Caminhos de XMLs (lista ou iterável)
             output_dir: Diretório de saída. Se None, usa mesmo diretório de cada XML.
+            workers: Quantidade de processos worker. Se None, dimensiona
+                automaticamente a partir dos limites de CPU/memória do cgroup.
+            memory_per_worker_mb: Limite de memória por worker em MB. Se None,
+                divide a memória do container entre os workers.
+            adaptive: Se True, ajusta a concorrência durante o lote pela vazão
+                observada (AIMD), usando ``workers`` como máximo.
+            shard: Processa apenas o shard ``i/N`` dos XMLs (ex.: "3/8"),
+                para dividir o lote entre nós sem coordenação.
+            shard_by: Critério de hash do shard: "path" (caminho) ou "key"
+                (chave de acesso).
+            pipeline: Se True, usa o pipeline em estágios (leitura, validação,
+                renderização e escrita concorrentes, ligados por filas
+                limitadas). As estatísticas ficam em ``stage_stats``.
+            stage_workers: Concorrência por estágio do pipeline. Sem "render",
+                usa a quantidade de ``workers``.
+            queue_size: Capacidade das filas entre estágios do pipeline.
+            sink: Destino dos PDFs renderizados em memória (ex.: ArchiveSink
+                para ZIP/TAR com rollover). Substitui ``output_dir`` e não
+                cria arquivos soltos; o chamador fecha o destino.
+            registry: Registro de chaves de acesso já geradas. XMLs com
+                chave já gerada (ou em andamento) são ignorados e contados
+                em ``duplicates``; a versão autorizada (nfeProc) substitui
+                uma NF-e pura já gerada.
+            on_result: Chamado com cada GenerationResult assim que o
+                documento termina (ex.: para emitir progresso em streaming)
+            on_progress: Chamado a cada documento concluído com o Progress
+                do lote (concluídos/total, vazão e ETA)
+            cancel: Token de cancelamento cooperativo. Acionado, o lote para
+                de admitir XMLs, conclui os que estão em andamento e retorna
+                com ``cancelled=True`` (``total`` conta só os processados).
 
         Returns:
             BatchResult com estatísticas e resultados individuais
         """
+        if shard is not None:
+            shard = Shard.parse(shard) if isinstance(shard, str) else shard
+            xml_paths = list(select_shard(map(Path, xml_paths), shard, by=shard_by))
+            logger.info("Shard %s: %d arquivo(s) selecionado(s)", shard, len(xml_paths))
+
+        run = _BatchRun(
+            workers=workers,
+            memory_per_worker_mb=memory_per_worker_mb,
+            adaptive=adaptive,
+            pipeline=pipeline,
+            stage_workers=stage_workers,
+            queue_size=queue_size,
+            sink=sink,
+            registry=registry,
+            on_result=on_result,
+            on_progress=on_progress,
+            cancel=cancel,
+        )
+        return self._batch(xml_paths, output_dir, run)
+
+    def _batch(
+        self,
+        xml_paths: Iterable[str | Path],
+        output_dir: str | Path | None,
+        run: _BatchRun,
+    ) -> BatchResult:
+        """Admite os XMLs (cancelamento e registro) e executa o lote."""
+        total = len(xml_paths) if isinstance(xml_paths, Sized) else None
+        if run.cancel is not None:
+            xml_paths = run.cancel.guard(xml_paths)
+        paths: Iterable[Path] = map(Path, xml_paths)
+        if run.registry is not None:
+            paths = self._admit_paths(paths, run.registry)
+        return self._execute(paths, output_dir, run, total)
+
+    def _execute(
+        self,
+        xml_paths: Iterable[Path],
+        output_dir: str | Path | None,
+        run: _BatchRun,
+        total: int | None,
+        completed: Callable[[Iterable[GenerationResult]], Iterable[GenerationResult]] | None = None,
+    ) -> BatchResult:
+        """
+        Gera XMLs já admitidos pelo caminho escolhido (destino, pipeline ou workers).
+
+        Args:
+            xml_paths: XMLs a gerar, sob demanda
+            output_dir: Diretório de saída (ignorado com ``run.sink``)
+            run: Opções do lote
+            total: Total de XMLs, ou None se desconhecido
+            completed: Aplicado aos resultados antes da coleta (ex.: concluir
+                os leases do modo coordenado)
+
+        Returns:
+            BatchResult do lote
+        """
         output_dir = Path(output_dir) if output_dir else None
-        if output_dir:
+        if output_dir and run.sink is None:
             output_dir.mkdir(parents=True, exist_ok=True)
+        tracker = ProgressTracker(total, run.on_progress) if run.on_progress is not None else None
+
+        def collect(results: Iterable[GenerationResult]) -> BatchResult:
+            if completed is not None:
+                results = completed(results)
+            return self._collect(results, total, run.registry, run.on_result, tracker, run.cancel)
+
+        if run.sink is not None:
+            if run.pipeline or run.adaptive:
+                logger.warning("Pipeline e modo adaptativo não se aplicam a destinos; ignorados")
+            return collect(
+                self._generate_to_sink(xml_paths, run.sink, run.workers, run.memory_per_worker_mb)
+            )
+
+        tasks = (
+            (xml_path, self._output_path(output_dir, xml_path) if output_dir else None)
+            for xml_path in xml_paths
+        )
+
+        if run.pipeline:
+            engine = self._build_pipeline(
+                run.workers, run.memory_per_worker_mb, run.stage_workers, run.queue_size
+            )
+            batch_result = collect(engine.run(tasks))
+            batch_result.stage_stats = engine.stats()
+            return batch_result
+
+        return collect(
+            self._iter_results(tasks, run.workers, run.memory_per_worker_mb, run.adaptive)
+        )
 
-        batch_result = BatchResult(total=len(xml_paths))
+    def _output_path(self, output_dir: Path, xml_path: Path) -> Path:
+        """Caminho do PDF de um XML no diretório de saída (modelo ou ``<nome>.pdf``)."""
+        if self.output_template is None:
+            return output_dir / f"{xml_stem(xml_path)}.pdf"
+        access_key = read_access_key(xml_path) if self.output_template.uses_key else None
+        return output_dir / self.output_template.render(str(xml_path), access_key)
 
+    @staticmethod
+    def _admit_paths(xml_paths: Iterable[Path], registry: KeyRegistry) -> Iterator[Path]:
+        """Filtra XMLs cuja chave de acesso já foi gerada (leitura do início do arquivo)."""
         for xml_path in xml_paths:
-            xml_path = Path(xml_path)
+            if registry.admit(str(xml_path), *read_document_key(xml_path)):
+                yield xml_path
+
+    @staticmethod
+    def _admit_items[T: RenderItem](items: Iterable[T], registry: KeyRegistry) -> Iterator[T]:
+        """Filtra documentos em memória cuja chave de acesso já foi gerada."""
+        for item in items:
+            content = item[1]
+            if registry.admit(str(Path(item[0])), find_access_key(content), is_authorized(content)):
+                yield item
+
+    @staticmethod
+    def _plan(workers: int | None, memory_per_worker_mb: int | None) -> WorkerPlan:
+        """Plano de workers (cgroup apenas quando há paralelismo)."""
+        if workers is None or workers > 1:
+            return plan_workers(workers, memory_per_worker_mb)
+        return WorkerPlan(workers=1)
+
+    def _build_pipeline(
+        self,
+        workers: int | None,
+        memory_per_worker_mb: int | None,
+        stage_workers: Mapping[str, int] | None,
+        queue_size: int,
+    ) -> Pipeline:
+        """Cria o pipeline, usando o plano de workers para a renderização."""
+        stages = dict(stage_workers or {})
+        memory_limit = None
+        if "render" not in stages:
+            plan = self._plan(workers, memory_per_worker_mb)
+            stages["render"] = plan.workers
+            memory_limit = plan.memory_limit_bytes
+        elif memory_per_worker_mb is not None:
+            memory_limit = memory_per_worker_mb * 1024 * 1024
+        return Pipeline(self, stages, queue_size, memory_limit)
+
+    def _iter_results(
+        self,
+        tasks: Iterable[tuple[Path, Path | None]],
+        workers: int | None,
+        memory_per_worker_mb: int | None,
+        adaptive: bool,
+    ) -> Iterator[GenerationResult]:
+        """Executa tarefas (xml_path, output_path) em série ou em paralelo."""
+        plan = self._plan(workers, memory_per_worker_mb)
 
-            # Calcular output
-            out_path = output_dir / f"{xml_path.stem}.pdf" if output_dir else None
+        if plan.workers > 1:
+            from danfe_generator.core.parallel import run_parallel
 
-            try:
-                result = self.generate(xml_path, out_path)
+            controller = AdaptiveConcurrency(maximum=plan.workers) if adaptive else None
+            return run_parallel(self.config, tasks, plan, controller)
+
+        return (self._generate_safe(xml_path, out_path) for xml_path, out_path in tasks)
+
+    def _collect(
+        self,
+        results: Iterable[GenerationResult],
+        total: int | None = None,
+        registry: KeyRegistry | None = None,
+        on_result: Callable[[GenerationResult], None] | None = None,
+        tracker: ProgressTracker | None = None,
+        cancel: CancellationToken | None = None,
+    ) -> BatchResult:
+        """Consome resultados e monta o BatchResult (total contado se None)."""
+        start = time.perf_counter()
+        batch_result = BatchResult(total=total or 0)
+        duplicates = registry.duplicates if registry is not None else 0
+        skipped = duplicates
+
+        for result in results:
+            if registry is not None:
+                pdf_path = str(result.pdf_path) if result.pdf_path else None
+                registry.complete(str(result.xml_path), result.success, pdf_path)
+            if on_result is not None:
+                on_result(result)
+            if result.success:
                 batch_result.successful += 1
-                batch_result.results.append(result)
-            except Exception as e:
-                logger.error("Erro processando %s: %s", xml_path, e)
+            else:
                 batch_result.failed += 1
-                batch_result.results.append(
-                    GenerationResult(
-                        xml_path=xml_path,
-                        pdf_path=None,
-                        success=False,
-                        error_message=str(e),
-                    )
-                )
+            batch_result.results.append(result)
+            if tracker is not None:
+                current = registry.duplicates if registry is not None else 0
+                tracker.update(result, skipped=current - skipped)
+                skipped = current
+        if tracker is not None and registry is not None and registry.duplicates > skipped:
+            # Duplicatas depois do último documento gerado
+            tracker.update(None, skipped=registry.duplicates - skipped)
+
+        self.writer.sync()
+        # Os resultados são produzidos sob demanda: o consumo cobre o lote inteiro
+        batch_result.elapsed_s = time.perf_counter() - start
+        if registry is not None:
+            batch_result.duplicates = registry.duplicates - duplicates
+        batch_result.cancelled = cancel is not None and cancel.cancelled
+        if total is None or batch_result.cancelled:
+            batch_result.total = len(batch_result.results) + batch_result.duplicates
+        if batch_result.cancelled:
+            logger.warning("Lote cancelado após %d documento(s)", len(batch_result.results))
 
         logger.info(
             "Lote concluído: %d/%d sucesso (%.1f%%)",
@@ -259,14 +756,51 @@ class DANFEGenerator:
         input_dir: str | Path,
         output_dir: str | Path | None = None,
         pattern: str = "*.xml",
+        workers: int | None = 1,
+        memory_per_worker_mb: int | None = None,
+        adaptive: bool = False,
+        shard: Shard | str | None = None,
+        shard_by: str = "path",
+        lease_dir: str | Path | None = None,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        pipeline: bool = False,
+        stage_workers: Mapping[str, int] | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        sink: OutputSink | None = None,
+        registry: KeyRegistry | None = None,
+        on_result: Callable[[GenerationResult], None] | None = None,
+        on_progress: Callable[[Progress], None] | None = None,
+        cancel: CancellationToken | None = None,
     ) -> BatchResult:
         """
         Gera DANFEs para todos XMLs em um diretório.
 
+        Com ``lease_dir``, vários processos (inclusive em máquinas
+        diferentes) podem processar o mesmo diretório compartilhado: cada
+        XML é reivindicado por um lease antes de ser gerado, e o BatchResult
+        contém apenas os XMLs processados por este processo.
+
         Args:
             input_dir: Diretório contendo XMLs
             output_dir: Diretório de saída
             pattern: Padrão glob para filtrar arquivos
+            workers: Quantidade de processos worker (None = automático)
+            memory_per_worker_mb: Limite de memória por worker em MB
+            adaptive: Se True, ajusta a concorrência pela vazão observada
+            shard: Processa apenas o shard ``i/N`` (hash relativo a input_dir)
+            shard_by: Critério de hash do shard ("path" ou "key")
+            lease_dir: Diretório compartilhado de leases (modo coordenado)
+            lease_ttl: Validade dos leases em segundos; leases de nós mortos
+                expiram e são reclamados
+            pipeline: Se True, usa o pipeline em estágios
+            stage_workers: Concorrência por estágio do pipeline
+            queue_size: Capacidade das filas entre estágios do pipeline
+            sink: Destino dos PDFs (ex.: ArchiveSink); substitui ``output_dir``
+            registry: Registro de chaves já geradas (ver ``generate_batch``)
+            on_result: Chamado com cada resultado ao concluir (ver ``generate_batch``)
+            on_progress: Chamado com o progresso do lote (ver ``generate_batch``);
+                no modo coordenado o total é desconhecido (sem ETA)
+            cancel: Token de cancelamento cooperativo (ver ``generate_batch``)
 
         Returns:
             BatchResult com estatísticas
@@ -277,15 +811,477 @@ class DANFEGenerator:
             logger.error("Diretório não encontrado: %s", input_dir)
             raise DirectoryNotFoundError(str(input_dir))
 
-        xml_files = list(input_dir.glob(pattern))
+        if is_archive(input_dir):
+            if lease_dir is not None or pipeline:
+                logger.warning("Leases e pipeline não se aplicam a arquivos compactados; ignorados")
+            return self.generate_from_archive(
+                input_dir,
+                output_dir,
+                pattern,
+                workers,
+                memory_per_worker_mb,
+                shard,
+                shard_by,
+                sink,
+                registry,
+                on_result,
+                on_progress,
+                cancel,
+            )
+
+        xml_files = find_xml_files(input_dir, pattern)
         logger.info("Encontrados %d arquivos em %s", len(xml_files), input_dir)
 
-        return self.generate_batch(xml_files, output_dir)
+        if shard is not None:
+            # Hash sobre o caminho relativo: nós com pontos de montagem
+            # diferentes selecionam o mesmo subconjunto
+            shard = Shard.parse(shard) if isinstance(shard, str) else shard
+            xml_files = list(select_shard(xml_files, shard, input_dir, shard_by))
+            logger.info("Shard %s: %d arquivo(s) selecionado(s)", shard, len(xml_files))
+
+        run = _BatchRun(
+            workers=workers,
+            memory_per_worker_mb=memory_per_worker_mb,
+            adaptive=adaptive,
+            pipeline=pipeline,
+            stage_workers=stage_workers,
+            queue_size=queue_size,
+            sink=sink,
+            registry=registry,
+            on_result=on_result,
+            on_progress=on_progress,
+            cancel=cancel,
+        )
+        if lease_dir is None:
+            return self._batch(xml_files, output_dir, run)
+
+        manager = LeaseManager(lease_dir, ttl=lease_ttl)
+        leases: dict[Path, Lease] = {}
+        renewer = LeaseRenewer(manager)
+
+        def claimed() -> Iterator[Path]:
+            # Cancelado, nenhum lease novo é reivindicado; os pendentes ficam para outros nós
+            for xml_path, lease in claim_items(xml_files, manager, input_dir, cancel=cancel):
+                if registry is not None and not registry.admit(
+                    str(xml_path), *read_document_key(xml_path)
+                ):
+                    # Duplicata: concluída sem gerar, para não ser reivindicada de novo
+                    manager.complete(lease, success=True)
+                    continue
+                leases[xml_path] = lease
+                # Renovado enquanto estiver em andamento (renderizações longas)
+                renewer.add(lease)
+                yield xml_path
+
+        def completed(results: Iterable[GenerationResult]) -> Iterator[GenerationResult]:
+            for result in results:
+                lease = leases.pop(result.xml_path)
+                renewer.discard(lease.item)
+                manager.complete(lease, success=result.success)
+                yield result
+
+        logger.info("Modo coordenado: leases em %s (nó %s)", lease_dir, manager.owner)
+        with renewer:
+            return self._execute(claimed(), output_dir, run, None, completed)
+
+    def generate_from_archive(
+        self,
+        archive_path: str | Path,
+        output_dir: str | Path | None = None,
+        pattern: str = "*.xml",
+        workers: int | None = 1,
+        memory_per_worker_mb: int | None = None,
+        shard: Shard | str | None = None,
+        shard_by: str = "path",
+        sink: OutputSink | None = None,
+        registry: KeyRegistry | None = None,
+        on_result: Callable[[GenerationResult], None] | None = None,
+        on_progress: Callable[[Progress], None] | None = None,
+        cancel: CancellationToken | None = None,
+    ) -> BatchResult:
+        """
+        Gera DANFEs para os XMLs de um arquivo ZIP/TAR, sem extraí-lo.
+
+        Os membros são lidos em sequência e renderizados em memória; apenas
+        os PDFs são gravados. O ``xml_path`` de cada resultado é o nome do
+        membro dentro do arquivo.
+
+        Args:
+            archive_path: Arquivo .zip, .tar, .tar.gz (ou similar)
+            output_dir: Diretório de saída. Se None, usa o diretório do arquivo.
+            pattern: Padrão glob aplicado ao nome de cada membro
+            workers: Quantidade de processos worker (None = automático)
+            memory_per_worker_mb: Limite de memória por worker em MB
+            shard: Processa apenas o shard ``i/N`` dos membros
+            shard_by: Critério de hash do shard: "path" (nome do membro) ou
+                "key" (chave de acesso)
+            sink: Destino dos PDFs (ex.: ArchiveSink). Se None, grava
+                arquivos soltos em ``output_dir``.
+            registry: Registro de chaves já geradas (ver ``generate_batch``)
+            on_result: Chamado com cada resultado ao concluir (ver ``generate_batch``)
+            on_progress: Chamado com o progresso do lote (total desconhecido,
+                pois os membros são lidos sob demanda)
+            cancel: Token de cancelamento cooperativo (ver ``generate_batch``)
+
+        Returns:
+            BatchResult com estatísticas
+
+        Raises:
+            DirectoryNotFoundError: Se o arquivo não existir
+        """
+        archive_path = Path(archive_path)
+
+        if not archive_path.is_file():
+            logger.error("Arquivo não encontrado: %s", archive_path)
+            raise DirectoryNotFoundError(str(archive_path))
+
+        if sink is None:
+            sink = DirectorySink(
+                output_dir or archive_path.parent, self.writer, self.output_template
+            )
+
+        if shard is not None:
+            shard = Shard.parse(shard) if isinstance(shard, str) else shard
+            logger.info("Shard %s de %s", shard, archive_path)
+
+        items = self._archive_items(archive_path, pattern, shard, shard_by)
+        if cancel is not None:
+            items = cancel.guard(items)
+        if registry is not None:
+            items = self._admit_items(items, registry)
+        rendered = self.render_many(items, workers, memory_per_worker_mb)
+        tracker = ProgressTracker(None, on_progress) if on_progress is not None else None
+        return self._collect(
+            self._write_rendered(rendered, sink), None, registry, on_result, tracker, cancel
+        )
+
+    def generate_from_source(
+        self,
+        source: DocumentSource,
+        output_dir: str | Path | None = None,
+        workers: int | None = 1,
+        memory_per_worker_mb: int | None = None,
+        sink: OutputSink | None = None,
+        registry: KeyRegistry | None = None,
+        on_result: Callable[[GenerationResult], None] | None = None,
+    ) -> BatchResult:
+        """
+        Gera DANFEs para os documentos de uma fonte (banco, e-mail...).
+
+        Os XMLs são renderizados em memória em uma única passada e o
+        resultado de cada documento é registrado na fonte (``record``); ao
+        final, a fonte é fechada (``close``) para persistir seu estado. O
+        ``xml_path`` de cada resultado é o nome do documento na fonte.
+
+        Args:
+            source: Fonte de documentos (ex.: DatabaseSource, MailSource)
+            output_dir: Diretório de saída. Se None, usa o diretório atual.
+            workers: Quantidade de processos worker (None = automático)
+            memory_per_worker_mb: Limite de memória por worker em MB
+            sink: Destino dos PDFs (ex.: ArchiveSink)
+            registry: Registro de chaves já geradas (ver ``generate_batch``).
+                Documentos ignorados são registrados na fonte com o PDF já
+                gerado (ou, se a chave estava em andamento no lote, com o
+                resultado da cópia gerada), para não serem lidos de novo.
+            on_result: Chamado com cada resultado ao concluir (ver ``generate_batch``)
+
+        Returns:
+            BatchResult com estatísticas
+        """
+        if sink is None:
+            sink = DirectorySink(output_dir or Path.cwd(), self.writer, self.output_template)
+
+        # Documento admitido → chave; chave em andamento → cópias ignoradas
+        admitted_keys: dict[str, str] = {}
+        skipped: dict[str, list[str]] = {}
+
+        def recorded(results: Iterable[GenerationResult]) -> Iterator[GenerationResult]:
+            for result in results:
+                name = str(result.xml_path)
+                pdf_path = str(result.pdf_path) if result.pdf_path else None
+                source.record(name, pdf_path, result.error_message)
+                for copy in skipped.pop(admitted_keys.pop(name, ""), []):
+                    source.record(copy, pdf_path, result.error_message)
+                yield result
+
+        def admitted(items: Iterable[tuple[str, bytes]]) -> Iterator[tuple[str, bytes]]:
+            assert registry is not None
+            for name, content in items:
+                key = find_access_key(content)
+                if registry.admit(str(Path(name)), key, is_authorized(content)):
+                    if key is not None:
+                        admitted_keys[str(Path(name))] = key
+                    yield name, content
+                elif key is not None and key in registry:
+                    # Gerada em lote anterior: confirmada na fonte (PDF desconhecido
+                    # em registros anteriores à coluna pdf)
+                    source.record(name, registry.pdf_for(key) or "", None)
+                elif key is not None:
+                    # Em andamento neste lote: confirmada com o resultado dela
+                    skipped.setdefault(key, []).append(name)
+
+        items: Iterable[tuple[str, bytes]] = source
+        if registry is not None:
+            items = admitted(items)
+        rendered = self.render_many(items, workers, memory_per_worker_mb)
+        try:
+            return self._collect(
+                recorded(self._write_rendered(rendered, sink)),
+                registry=registry,
+                on_result=on_result,
+            )
+        finally:
+            source.close()
+
+    def generate_from_manifest(
+        self,
+        manifest_path: str | Path,
+        output_dir: str | Path | None = None,
+        workers: int | None = 1,
+        memory_per_worker_mb: int | None = None,
+    ) -> Iterator[tuple[ManifestEntry, GenerationResult]]:
+        """
+        Gera DANFEs a partir de um manifesto CSV/JSONL, sob demanda.
+
+        O manifesto é lido linha a linha e os resultados são produzidos na
+        ordem do manifesto (também com workers), de modo que podem ser
+        gravados em streaming sem materializar o lote. Cada linha pode
+        indicar o caminho do PDF e um perfil de configuração próprio.
+
+        Linhas inválidas saem assim que lidas se nada estiver em andamento;
+        atrás de documentos em renderização, aguardam sua vez, no máximo
+        ``MANIFEST_QUEUE_LIMIT`` linhas (acima disso a passada de
+        renderização é encerrada e retomada após drená-las).
+
+        Args:
+            manifest_path: Caminho do manifesto (.csv ou .jsonl)
+            output_dir: Diretório dos PDFs das linhas sem ``output``. Se
+                None, usa o diretório do XML (ou do manifesto, se inline).
+            workers: Quantidade de processos worker (None = automático)
+            memory_per_worker_mb: Limite de memória por worker em MB
+
+        Yields:
+            (linha do manifesto, GenerationResult), na ordem do manifesto
+        """
+        # Importação tardia: sources.manifest depende de core.config
+        from danfe_generator.sources.manifest import iter_manifest
+
+        entries = iter_manifest(manifest_path, output_dir)
+        queued: deque[ManifestEntry] = deque()
+
+        def items(first: ManifestEntry) -> Iterator[RenderItem]:
+            entry: ManifestEntry | None = first
+            while entry is not None:
+                queued.append(entry)
+                if entry.content is not None:
+                    profile = (
+                        (entry.profile, entry.config) if entry.profile and entry.config else None
+                    )
+                    yield entry.name, entry.content, profile
+                    entry.content = None
+                elif len(queued) >= MANIFEST_QUEUE_LIMIT:
+                    # Muitas linhas inválidas aguardando: encerra a passada
+                    # para drená-las em vez de acumulá-las
+                    return
+                entry = next(entries, None)
+
+        def failed(entry: ManifestEntry, message: str | None) -> GenerationResult:
+            return GenerationResult(
+                xml_path=Path(entry.name),
+                pdf_path=None,
+                success=False,
+                error_message=message,
+            )
+
+        while True:
+            # Linhas inválidas sem nada em andamento saem imediatamente
+            first = next(entries, None)
+            while first is not None and first.error_message is not None:
+                yield first, failed(first, first.error_message)
+                first = next(entries, None)
+            if first is None:
+                break
+
+            rendered = self.render_many(items(first), workers, memory_per_worker_mb, ordered=True)
+            for pdf in rendered:
+                # Linhas inválidas não são renderizadas; mantêm sua posição
+                entry = queued.popleft()
+                while entry.error_message is not None:
+                    yield entry, failed(entry, entry.error_message)
+                    entry = queued.popleft()
+
+                with pdf:
+                    if not pdf.success:
+                        yield entry, failed(entry, pdf.error_message)
+                        continue
+                    try:
+                        with self.writer.open(entry.output_path) as f:
+                            size = pdf.write_to(f)
+                    except OSError as e:
+                        logger.error("Erro gravando PDF de %s: %s", entry.name, e)
+                        yield entry, failed(entry, str(e))
+                        continue
+
+                logger.info("DANFE gerada com sucesso: %s", entry.output_path)
+                yield (
+                    entry,
+                    GenerationResult(
+                        xml_path=Path(entry.name),
+                        pdf_path=entry.output_path,
+                        success=True,
+                        file_size_kb=size / 1024,
+                    ),
+                )
+
+            while queued:
+                entry = queued.popleft()
+                yield entry, failed(entry, entry.error_message)
+
+        self.writer.sync()
+
+    def generate_from_database(
+        self,
+        source: DatabaseSource,
+        output_dir: str | Path | None = None,
+        workers: int | None = 1,
+        memory_per_worker_mb: int | None = None,
+        sink: OutputSink | None = None,
+        registry: KeyRegistry | None = None,
+        on_result: Callable[[GenerationResult], None] | None = None,
+    ) -> BatchResult:
+        """
+        Gera DANFEs para os XMLs lidos de um banco de dados.
+
+        As linhas são lidas em lotes (``fetchmany``) e o resultado de cada
+        uma é gravado de volta no banco se a fonte tiver ``writeback``. Veja
+        ``generate_from_source``.
+
+        Returns:
+            BatchResult com estatísticas
+        """
+        return self.generate_from_source(
+            source, output_dir, workers, memory_per_worker_mb, sink, registry, on_result
+        )
+
+    @staticmethod
+    def _archive_items(
+        archive_path: Path,
+        pattern: str,
+        shard: Shard | None,
+        shard_by: str,
+    ) -> Iterator[tuple[str, bytes]]:
+        """Membros do arquivo, filtrados pelo shard quando informado."""
+        if shard is None or shard.count == 1:
+            yield from iter_archive(archive_path, pattern)
+        elif shard_by == "key":
+            # A chave só é conhecida após ler o membro
+            for name, content in iter_archive(archive_path, pattern):
+                if shard.contains(find_access_key(content) or name):
+                    yield name, content
+        else:
+            yield from iter_archive(archive_path, pattern, accept=shard.contains)
+
+    @staticmethod
+    def _write_rendered(
+        rendered: Iterable[RenderedPDF],
+        sink: OutputSink,
+    ) -> Iterator[GenerationResult]:
+        """
+        Grava PDFs renderizados em memória no destino e produz os resultados.
+
+        Com um ``DeferredSink``, as gravações seguem em segundo plano e o
+        resultado de cada documento (na ordem de entrada) só é produzido
+        quando a sua termina, para que uma falha de envio seja falha daquele
+        documento.
+        """
+        pending: deque[tuple[RenderedPDF, int, float, Future[Path]]] = deque()
+        for pdf in rendered:
+            with pdf:
+                if not pdf.success:
+                    yield GenerationResult(
+                        xml_path=Path(pdf.name),
+                        pdf_path=None,
+                        success=False,
+                        error_message=pdf.error_message,
+                        error_type=pdf.error_type,
+                        error_details=pdf.error_details,
+                        access_key=pdf.access_key,
+                        item_count=pdf.item_count,
+                    )
+                    continue
+
+                start = time.perf_counter()
+                if isinstance(sink, DeferredSink):
+                    pending.append((pdf, pdf.size, start, sink.submit(pdf)))
+                else:
+                    future: Future[Path] = Future()
+                    try:
+                        future.set_result(sink.write(pdf))
+                    except OSError as e:
+                        future.set_exception(e)
+                    yield DANFEGenerator._written(pdf, pdf.size, start, future)
+            while pending and pending[0][3].done():
+                yield DANFEGenerator._written(*pending.popleft())
+        while pending:
+            yield DANFEGenerator._written(*pending.popleft())
+
+    @staticmethod
+    def _written(
+        pdf: RenderedPDF,
+        size: int,
+        start: float,
+        future: Future[Path],
+    ) -> GenerationResult:
+        """Resultado de um PDF gravado (aguarda a gravação, se pendente)."""
+        xml_path = Path(pdf.name)
+        try:
+            pdf_path = future.result()
+        except OSError as e:
+            logger.error("Erro gravando PDF de %s: %s", pdf.name, e)
+            return GenerationResult.failure(xml_path, e)
+
+        logger.info("DANFE gerada com sucesso: %s (%.2f KB)", pdf_path, size / 1024)
+        return GenerationResult(
+            xml_path=xml_path,
+            pdf_path=pdf_path,
+            success=True,
+            file_size_kb=size / 1024,
+            access_key=pdf.access_key,
+            item_count=pdf.item_count,
+            timings={**pdf.timings, "write": time.perf_counter() - start},
+        )
+
+    def _generate_to_sink(
+        self,
+        xml_paths: Iterable[Path],
+        sink: OutputSink,
+        workers: int | None,
+        memory_per_worker_mb: int | None,
+    ) -> Iterator[GenerationResult]:
+        """Lê, renderiza em memória e grava no destino (sem arquivos soltos)."""
+        read_failures: list[GenerationResult] = []
+
+        def items() -> Iterator[tuple[str, bytes]]:
+            for xml_path in xml_paths:
+                try:
+                    yield str(xml_path), read_xml(xml_path)
+                except (OSError, ValueError) as e:
+                    logger.error("Erro lendo %s: %s", xml_path, e)
+                    read_failures.append(GenerationResult.failure(xml_path, e))
+
+        rendered = self.render_many(items(), workers, memory_per_worker_mb)
+        for result in self._write_rendered(rendered, sink):
+            yield from read_failures
+            read_failures.clear()
+            yield result
+        yield from read_failures
 
     def generate_stream(
         self,
         xml_paths: Sequence[str | Path],
         output_dir: str | Path | None = None,
+        on_progress: Callable[[Progress], None] | None = None,
+        cancel: CancellationToken | None = None,
     ) -> Iterator[GenerationResult]:
         """
         Gera DANFEs como generator (memory-efficient para grandes lotes).
@@ -293,22 +1289,23 @@ class DANFEGenerator:
         Args:
             xml_paths: Sequência de caminhos de XMLs
             output_dir: Diretório de saída opcional
+            on_progress: Chamado com o progresso após cada XML processado
+            cancel: Token de cancelamento; acionado, o generator termina
+                após o XML em andamento
 
         Yields:
             GenerationResult para cada XML processado
         """
         output_dir = Path(output_dir) if output_dir else None
+        tracker = ProgressTracker(len(xml_paths), on_progress) if on_progress is not None else None
 
-        for xml_path in xml_paths:
+        for xml_path in cancel.guard(xml_paths) if cancel is not None else xml_paths:
             xml_path = Path(xml_path)
-            out_path = output_dir / f"{xml_path.stem}.pdf" if output_dir else None
+            out_path = self._output_path(output_dir, xml_path) if output_dir else None
 
-            try:
-                yield self.generate(xml_path, out_path)
-            except Exception as e:
-                yield GenerationResult(
-                    xml_path=xml_path,
-                    pdf_path=None,
-                    success=False,
-                    error_message=str(e),
-                )
+            result = self._generate_safe(xml_path, out_path)
+            if tracker is not None:
+                tracker.update(result)
+            yield result
+
+        self.writer.sync()
@@ -0,0 +1,419 @@
+"""Histórico de desempenho dos lotes em produção.
+
+Cada lote pode gravar um resumo das suas métricas em um banco SQLite
+local: vazão (documentos/s), latência p50/p95 por estágio, falhas, host e
+versões (do pacote, do ``brazilfiscalreport`` e do Python). Com o
+histórico é possível ver se a vazão degrada ao longo de semanas (ex.:
+depois de atualizar o ``brazilfiscalreport`` ou com notas de um emitente
+novo).
+
+Cada execução também guarda um modelo de custo simples, ajustado pelos
+documentos do lote: ``ms_per_doc + ms_per_item * itens`` (mínimos
+quadrados sobre o tempo total de cada documento e sua quantidade de
+``det``).
+
+Uma execução é marcada como regressão quando uma métrica piora mais que
+``threshold`` em relação à mediana das execuções anteriores com o mesmo
+rótulo (vazão menor, p95 ou custo por item maior). Execuções pequenas
+(menos de ``MIN_RUN_DOCS`` documentos) e variações de latência abaixo de
+``MIN_LATENCY_DELTA_MS`` são ruído e não são comparadas.
+
+Classes:
+    RunMetrics: Métricas resumidas de uma execução.
+    Regression: Métrica que piorou em relação às execuções anteriores.
+    PerfHistory: Histórico de execuções em SQLite.
+
+Functions:
+    fit_cost_model: Ajusta o custo por documento e por item.
+    summarize_run: Resume as métricas de um BatchResult.
+    find_regressions: Compara cada execução com as anteriores.
+
+Example:
+    >>> batch = generator.generate_from_directory("./xmls", "./output")
+    >>> with PerfHistory(".danfe-perf.db") as history:
+    ...     history.record(summarize_run(batch, label="xmls"))
+    ...     regressions = find_regressions(history.runs())
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import platform
+import socket
+import sqlite3
+import statistics
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from importlib import metadata
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from danfe_generator.core.generator import BatchResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_PATH = ".danfe-perf.db"
+# Piora relativa a partir da qual uma métrica é marcada como regressão
+DEFAULT_THRESHOLD = 0.2
+# Execuções anteriores usadas como referência (mediana)
+DEFAULT_WINDOW = 5
+# Execuções com menos documentos não entram na comparação
+MIN_RUN_DOCS = 20
+# Variação absoluta mínima de latência (ms) para contar como regressão
+MIN_LATENCY_DELTA_MS = 1.0
+STAGES = ("read", "validate", "render", "write")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started TEXT NOT NULL,
+    label TEXT,
+    host TEXT,
+    python TEXT,
+    version TEXT,
+    renderer_version TEXT,
+    workers INTEGER,
+    total INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    elapsed_s REAL NOT NULL,
+    docs_per_s REAL NOT NULL,
+    stages TEXT NOT NULL,
+    ms_per_doc REAL,
+    ms_per_item REAL
+)
+"""
+
+_COLUMNS = (
+    "id",
+    "started",
+    "label",
+    "host",
+    "python",
+    "version",
+    "renderer_version",
+    "workers",
+    "total",
+    "failed",
+    "elapsed_s",
+    "docs_per_s",
+    "stages",
+    "ms_per_doc",
+    "ms_per_item",
+)
+
+
+@dataclass
+class RunMetrics:
+    """Métricas resumidas de uma execução.
+
+    Attributes:
+        total: Documentos processados.
+        failed: Documentos que falharam.
+        elapsed_s: Duração do lote em segundos.
+        docs_per_s: Vazão do lote.
+        stages: Latência por estágio em ms: ``{"render": {"p50": .., "p95": ..}}``.
+        ms_per_doc: Custo fixo estimado por documento (ms).
+        ms_per_item: Custo estimado por item ``det`` (ms).
+        workers: Quantidade de workers do lote.
+        label: Rótulo da execução (ex.: diretório de origem).
+        started: Início da execução (ISO 8601).
+        host: Nome do host.
+        python: Versão do Python.
+        version: Versão do danfe-generator.
+        renderer_version: Versão do brazilfiscalreport.
+        id: Identificador no histórico (após gravado).
+    """
+
+    total: int
+    failed: int
+    elapsed_s: float
+    docs_per_s: float
+    stages: dict[str, dict[str, float]] = field(default_factory=dict)
+    ms_per_doc: float | None = None
+    ms_per_item: float | None = None
+    workers: int | None = None
+    label: str | None = None
+    started: str = field(default_factory=lambda: time.strftime("%Y-%m-%dT%H:%M:%S%z"))
+    host: str = field(default_factory=socket.gethostname)
+    python: str = field(default_factory=platform.python_version)
+    version: str | None = field(default_factory=lambda: _package_version("danfe-generator"))
+    renderer_version: str | None = field(
+        default_factory=lambda: _package_version("brazilfiscalreport")
+    )
+    id: int | None = None
+
+    def p95(self, stage: str) -> float | None:
+        """Latência p95 de um estágio em ms, se medida."""
+        return self.stages.get(stage, {}).get("p95")
+
+
+@dataclass
+class Regression:
+    """Métrica que piorou em relação às execuções anteriores.
+
+    Attributes:
+        run_id: Execução com a regressão.
+        metric: Nome da métrica (ex.: "docs_per_s", "render_p95_ms").
+        baseline: Mediana da métrica nas execuções anteriores.
+        value: Valor na execução.
+        change: Variação relativa (positiva = pior).
+        changes: Diferenças de ambiente em relação à execução anterior
+            (versões, host), que costumam explicar a regressão.
+    """
+
+    run_id: int | None
+    metric: str
+    baseline: float
+    value: float
+    change: float
+    changes: list[str] = field(default_factory=list)
+
+
+def _package_version(name: str) -> str | None:
+    """Versão instalada de um pacote, ou None."""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    """Percentil por posto mais próximo (``values`` não vazio)."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def fit_cost_model(points: Sequence[tuple[int, float]]) -> tuple[float | None, float | None]:
+    """Ajusta ``ms = ms_per_doc + ms_per_item * itens`` sobre (itens, ms)."""
+    if not points:
+        return None, None
+    items = [float(count) for count, _ in points]
+    totals = [total for _, total in points]
+    if len(set(items)) < 2:
+        # Sem variação de itens não há como separar o custo por item
+        return statistics.fmean(totals), None
+    slope, intercept = statistics.linear_regression(items, totals)
+    if slope < 0 or intercept < 0:
+        # Ruído domina: custo médio por item, sem custo fixo
+        return 0.0, sum(totals) / sum(items)
+    return intercept, slope
+
+
+def summarize_run(
+    batch: BatchResult,
+    label: str | None = None,
+    workers: int | None = None,
+) -> RunMetrics:
+    """
+    Resume as métricas de um lote.
+
+    Args:
+        batch: Resultado do lote (usa ``elapsed_s`` e os tempos por estágio)
+        label: Rótulo da execução; regressões são comparadas por rótulo
+        workers: Quantidade de workers usada no lote
+
+    Returns:
+        RunMetrics da execução
+    """
+    stages: dict[str, dict[str, float]] = {}
+    for stage in (*STAGES, "total"):
+        if stage == "total":
+            values = [sum(r.timings.values()) * 1000 for r in batch.results if r.timings]
+        else:
+            values = [r.timings[stage] * 1000 for r in batch.results if stage in r.timings]
+        if values:
+            stages[stage] = {
+                "p50": round(_percentile(values, 0.5), 3),
+                "p95": round(_percentile(values, 0.95), 3),
+            }
+
+    points = [
+        (r.item_count, sum(r.timings.values()) * 1000)
+        for r in batch.results
+        if r.success and r.item_count and r.timings
+    ]
+    ms_per_doc, ms_per_item = fit_cost_model(points)
+    processed = len(batch.results)
+    return RunMetrics(
+        total=processed,
+        failed=batch.failed,
+        elapsed_s=round(batch.elapsed_s, 3),
+        docs_per_s=round(processed / batch.elapsed_s, 3) if batch.elapsed_s > 0 else 0.0,
+        stages=stages,
+        ms_per_doc=round(ms_per_doc, 3) if ms_per_doc is not None else None,
+        ms_per_item=round(ms_per_item, 3) if ms_per_item is not None else None,
+        workers=workers,
+        label=label,
+    )
+
+
+class PerfHistory:
+    """Histórico de execuções em SQLite.
+
+    Attributes:
+        path: Arquivo SQLite.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_HISTORY_PATH) -> None:
+        """
+        Abre (ou cria) o histórico.
+
+        Args:
+            path: Arquivo SQLite
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path))
+        self._connection.execute(_SCHEMA)
+
+    def record(self, metrics: RunMetrics) -> int:
+        """
+        Grava uma execução.
+
+        Args:
+            metrics: Métricas da execução
+
+        Returns:
+            Identificador da execução no histórico
+        """
+        values = [getattr(metrics, column) for column in _COLUMNS[1:]]
+        values[_COLUMNS.index("stages") - 1] = json.dumps(metrics.stages)
+        placeholders = ", ".join("?" * len(values))
+        with self._connection:
+            cursor = self._connection.execute(
+                f"INSERT INTO runs ({', '.join(_COLUMNS[1:])}) VALUES ({placeholders})",
+                values,
+            )
+        metrics.id = cursor.lastrowid
+        logger.info("Execução %s gravada no histórico %s", metrics.id, self.path)
+        return metrics.id or 0
+
+    def runs(self, limit: int | None = None, label: str | None = None) -> list[RunMetrics]:
+        """
+        Execuções gravadas, da mais antiga para a mais recente.
+
+        Args:
+            limit: Apenas as ``limit`` execuções mais recentes
+            label: Apenas execuções com este rótulo
+
+        Returns:
+            Lista de RunMetrics
+        """
+        query = f"SELECT {', '.join(_COLUMNS)} FROM runs"
+        params: list[object] = []
+        if label is not None:
+            query += " WHERE label = ?"
+            params.append(label)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        runs = []
+        for row in self._connection.execute(query, params):
+            values = dict(zip(_COLUMNS, row, strict=True))
+            values["stages"] = json.loads(values["stages"])
+            runs.append(RunMetrics(**values))
+        runs.reverse()
+        return runs
+
+    def close(self) -> None:
+        """Fecha o banco."""
+        self._connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def _metrics(run: RunMetrics) -> dict[str, tuple[float, bool]]:
+    """Métricas comparáveis de uma execução: nome → (valor, maior é melhor)."""
+    values: dict[str, tuple[float, bool]] = {}
+    if run.total:
+        values["docs_per_s"] = (run.docs_per_s, True)
+    for stage in (*STAGES, "total"):
+        p95 = run.p95(stage)
+        if p95 is not None:
+            values[f"{stage}_p95_ms"] = (p95, False)
+    if run.ms_per_item is not None:
+        values["ms_per_item"] = (run.ms_per_item, False)
+    return values
+
+
+def _environment_changes(previous: RunMetrics, run: RunMetrics) -> list[str]:
+    """Diferenças de versões e host entre duas execuções."""
+    fields = {
+        "danfe-generator": "version",
+        "brazilfiscalreport": "renderer_version",
+        "python": "python",
+        "host": "host",
+    }
+    return [
+        f"{name} {getattr(previous, attr)} → {getattr(run, attr)}"
+        for name, attr in fields.items()
+        if getattr(previous, attr) != getattr(run, attr)
+    ]
+
+
+def find_regressions(
+    runs: Iterable[RunMetrics],
+    threshold: float = DEFAULT_THRESHOLD,
+    window: int = DEFAULT_WINDOW,
+) -> list[Regression]:
+    """
+    Compara cada execução com a mediana das anteriores de mesmo rótulo.
+
+    Args:
+        runs: Execuções, da mais antiga para a mais recente
+        threshold: Piora relativa mínima para marcar regressão (0.2 = 20%)
+        window: Quantidade de execuções anteriores usadas como referência
+
+    Returns:
+        Regressões encontradas, na ordem das execuções
+    """
+    previous: dict[str | None, list[RunMetrics]] = {}
+    regressions: list[Regression] = []
+
+    for run in runs:
+        if run.total < MIN_RUN_DOCS:
+            continue
+        baseline_runs = previous.setdefault(run.label, [])[-window:]
+        baseline_metrics = [_metrics(other) for other in baseline_runs]
+        for metric, (value, higher_is_better) in _metrics(run).items():
+            history = [values[metric][0] for values in baseline_metrics if metric in values]
+            if not history:
+                continue
+            baseline = statistics.median(history)
+            if baseline <= 0:
+                continue
+            if metric.endswith("_ms") and value - baseline < MIN_LATENCY_DELTA_MS:
+                continue
+            change = (
+                (baseline - value) / baseline if higher_is_better else (value - baseline) / baseline
+            )
+            if change > threshold:
+                regressions.append(
+                    Regression(
+                        run_id=run.id,
+                        metric=metric,
+                        baseline=baseline,
+                        value=value,
+                        change=change,
+                        changes=_environment_changes(baseline_runs[-1], run),
+                    )
+                )
+        previous[run.label].append(run)
+
+    return regressions
@@ -0,0 +1,479 @@
+"""Distribuição dinâmica de trabalho entre nós via arquivos de lease.
+
+Vários processos ``danfe`` (em máquinas diferentes) processam o mesmo
+diretório compartilhado, cada um reivindicando XMLs por meio de arquivos
+de lease criados atomicamente. Nós rápidos simplesmente reivindicam mais
+arquivos, equilibrando a carga sem nenhum serviço de coordenação além de
+um sistema de arquivos POSIX.
+
+Protocolo:
+    - Reivindicar: o lease é escrito em um arquivo temporário único e
+      publicado com ``os.link``, que falha se o lease já existir (atômico
+      inclusive em NFS). Se ``link`` não for suportado, usa ``O_EXCL``.
+    - Expirar: cada lease carrega ``expires_at``. Um lease vencido é
+      reclamado renomeando-o para um nome único (apenas um nó vence o
+      ``rename``) antes de nova tentativa de reivindicação.
+    - Renovar: enquanto o item está em andamento, ``LeaseRenewer`` estende
+      o lease periodicamente, para que uma renderização longa não o perca.
+      O lease é retirado com ``rename``, conferido e republicado com
+      ``os.link``; ausente ou de outro nó, conta como perdido.
+    - Concluir: com sucesso, um marcador ``.done`` é criado e o lease
+      removido, de modo que o item não é processado novamente. Em caso de
+      falha, o lease é apenas liberado e outro nó (ou a próxima execução)
+      tenta de novo.
+
+Classes:
+    Lease: Lease adquirido sobre um item.
+    LeaseManager: Reivindica, renova e conclui leases.
+    LeaseRenewer: Renova em segundo plano os leases em andamento.
+
+Functions:
+    claim_items: Itera sobre os caminhos cujo lease foi adquirido.
+
+Example:
+    >>> manager = LeaseManager(Path("/mnt/xmls/.danfe-leases"), ttl=300)
+    >>> with LeaseRenewer(manager) as renewer:
+    ...     for path, lease in claim_items(xml_files, manager, Path("/mnt/xmls")):
+    ...         renewer.add(lease)
+    ...         ok = process(path)
+    ...         renewer.discard(lease.item)
+    ...         manager.complete(lease, success=ok)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from danfe_generator.core.progress import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_TTL: float = 300.0
+
+# Intervalo entre passadas sobre itens com lease de outros nós
+DEFAULT_POLL_INTERVAL: float = 5.0
+
+
+@dataclass(frozen=True)
+class Lease:
+    """Lease adquirido sobre um item.
+
+    Attributes:
+        item: Identificador do item (caminho relativo do XML).
+        owner: Identificador do nó dono do lease.
+        expires_at: Instante de expiração (epoch, segundos).
+        path: Arquivo de lease.
+    """
+
+    item: str
+    owner: str
+    expires_at: float
+    path: Path
+
+
+def default_owner() -> str:
+    """Identificador único do processo atual (host, pid e sufixo aleatório)."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class LeaseManager:
+    """
+    Gerencia leases de itens em um diretório compartilhado.
+
+    Attributes:
+        lease_dir: Diretório com os arquivos de lease e marcadores.
+        owner: Identificador deste nó.
+        ttl: Duração do lease em segundos.
+    """
+
+    def __init__(
+        self,
+        lease_dir: str | Path,
+        owner: str | None = None,
+        ttl: float = DEFAULT_LEASE_TTL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Inicializa o gerenciador, criando o diretório de leases.
+
+        Args:
+            lease_dir: Diretório compartilhado entre os nós
+            owner: Identificador deste nó. Se None, gera um único.
+            ttl: Duração do lease em segundos
+            clock: Relógio de parede (deve ser sincronizado entre os nós)
+
+        Raises:
+            ValueError: Se ttl não for positivo
+        """
+        if ttl <= 0:
+            raise ValueError("ttl deve ser positivo")
+
+        self.lease_dir = Path(lease_dir)
+        self.owner = owner or default_owner()
+        self.ttl = ttl
+        self._clock = clock
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+
+    def _base_path(self, item: str) -> Path:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).hexdigest()
+        return self.lease_dir / digest
+
+    def _lease_path(self, item: str) -> Path:
+        return self._base_path(item).with_suffix(".lease")
+
+    def _done_path(self, item: str) -> Path:
+        return self._base_path(item).with_suffix(".done")
+
+    def is_done(self, item: str) -> bool:
+        """Verifica se o item já foi concluído por algum nó."""
+        return self._done_path(item).exists()
+
+    def try_claim(self, item: str) -> Lease | None:
+        """
+        Tenta reivindicar o item.
+
+        Args:
+            item: Identificador do item
+
+        Returns:
+            Lease adquirido, ou None se o item está concluído ou com
+            lease válido de outro nó
+        """
+        if self.is_done(item):
+            return None
+
+        lease_path = self._lease_path(item)
+        for _ in range(2):
+            lease = Lease(
+                item=item,
+                owner=self.owner,
+                expires_at=self._clock() + self.ttl,
+                path=lease_path,
+            )
+            if self._publish(lease, exclusive=True):
+                # Outro nó pode ter concluído entre a checagem e a reivindicação
+                if self.is_done(item):
+                    self.release(lease)
+                    return None
+                logger.debug("Lease adquirido: %s", item)
+                return lease
+
+            if not self._reclaim_if_expired(lease_path):
+                return None
+        return None
+
+    def renew(self, lease: Lease) -> Lease | None:
+        """
+        Estende a validade de um lease próprio.
+
+        O lease nunca é sobrescrito: é retirado do lugar com ``rename``
+        (apenas um nó vence), conferido e republicado com ``os.link``, que
+        falha se outro nó o reivindicou nesse intervalo.
+
+        Args:
+            lease: Lease a renovar
+
+        Returns:
+            Lease com nova expiração, ou None se o lease foi perdido
+            (removido, ou expirou e foi reclamado por outro nó)
+        """
+        held = lease.path.with_name(f"{lease.path.name}.{uuid.uuid4().hex}.renew")
+        try:
+            lease.path.rename(held)
+        except FileNotFoundError:
+            logger.warning("Lease de %s perdido (removido ou reclamado)", lease.item)
+            return None
+
+        try:
+            current = self._read(held)
+            if current is None or current.get("owner") != lease.owner:
+                # Lease de outro nó: devolvido ao lugar
+                with contextlib.suppress(OSError):
+                    os.link(held, lease.path)
+                logger.warning(
+                    "Lease de %s perdido para %s",
+                    lease.item,
+                    (current or {}).get("owner", "desconhecido"),
+                )
+                return None
+
+            renewed = Lease(
+                item=lease.item,
+                owner=lease.owner,
+                expires_at=self._clock() + self.ttl,
+                path=lease.path,
+            )
+            if not self._publish(renewed, exclusive=True):
+                logger.warning("Lease de %s reivindicado durante a renovação", lease.item)
+                return None
+            return renewed
+        finally:
+            held.unlink(missing_ok=True)
+
+    def complete(self, lease: Lease, success: bool = True) -> None:
+        """
+        Conclui o processamento do item.
+
+        Com sucesso, marca o item como concluído e remove o lease; em caso
+        de falha, apenas libera o lease para que o item seja tentado de
+        novo (por outro nó ou na próxima execução).
+
+        Args:
+            lease: Lease do item
+            success: Se o processamento teve sucesso
+        """
+        if not success:
+            logger.info("Falha em %s; lease liberado para nova tentativa", lease.item)
+            self.release(lease)
+            return
+        done = {"item": lease.item, "owner": lease.owner, "success": success}
+        self._done_path(lease.item).write_text(json.dumps(done), encoding="utf-8")
+        self.release(lease)
+
+    def release(self, lease: Lease) -> None:
+        """Remove o lease sem marcar o item como concluído."""
+        current = self._read(lease.path)
+        if current is not None and current.get("owner") != lease.owner:
+            logger.warning("Lease de %s pertence a outro nó; não removido", lease.item)
+            return
+        with contextlib.suppress(FileNotFoundError):
+            lease.path.unlink()
+
+    def _publish(self, lease: Lease, exclusive: bool) -> bool:
+        """Escreve o lease; com exclusive, falha se já existir."""
+        payload = json.dumps(
+            {"item": lease.item, "owner": lease.owner, "expires_at": lease.expires_at}
+        ).encode("utf-8")
+        tmp_path = lease.path.with_name(f"{lease.path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(payload)
+        try:
+            if not exclusive:
+                tmp_path.replace(lease.path)
+                return True
+            try:
+                os.link(tmp_path, lease.path)
+            except FileExistsError:
+                return False
+            except OSError:
+                # Sistemas de arquivos sem hard link: cai para O_EXCL
+                return self._publish_excl(lease.path, payload)
+            return True
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                tmp_path.unlink()
+
+    @staticmethod
+    def _publish_excl(path: Path, payload: bytes) -> bool:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        return True
+
+    @staticmethod
+    def _read(path: Path) -> dict | None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _is_expired(self, data: dict | None, path: Path) -> bool:
+        if data is None:
+            # Lease ilegível (escrita parcial via O_EXCL): usa o mtime
+            try:
+                return path.stat().st_mtime + self.ttl < self._clock()
+            except OSError:
+                return True
+        return float(data.get("expires_at", 0)) < self._clock()
+
+    def _reclaim_if_expired(self, lease_path: Path) -> bool:
+        """
+        Remove um lease vencido de forma atômica.
+
+        Returns:
+            True se o lease foi reclamado (ou sumiu) e vale nova tentativa
+        """
+        data = self._read(lease_path)
+        if not lease_path.exists():
+            return True
+        if not self._is_expired(data, lease_path):
+            return False
+
+        tombstone = lease_path.with_name(f"{lease_path.name}.{uuid.uuid4().hex}.stale")
+        try:
+            lease_path.rename(tombstone)
+        except FileNotFoundError:
+            return True
+
+        # Entre a leitura e o rename outro nó pode ter reclamado e publicado
+        # um lease novo; nesse caso ele é devolvido ao lugar.
+        reclaimed = self._read(tombstone)
+        if not self._is_expired(reclaimed, tombstone):
+            with contextlib.suppress(OSError):
+                os.link(tombstone, lease_path)
+            tombstone.unlink(missing_ok=True)
+            return False
+
+        tombstone.unlink(missing_ok=True)
+        logger.info(
+            "Lease expirado reclamado: %s (dono anterior: %s)",
+            (reclaimed or {}).get("item", lease_path.name),
+            (reclaimed or {}).get("owner", "desconhecido"),
+        )
+        return True
+
+
+class LeaseRenewer:
+    """
+    Renova em segundo plano os leases dos itens em andamento.
+
+    Uma thread renova todos os leases registrados a cada ``interval``
+    segundos (por padrão, um terço do ttl), independentemente de quanto
+    tempo a renderização leve ou de a thread principal estar bloqueada.
+
+    Example:
+        >>> with LeaseRenewer(manager) as renewer:
+        ...     renewer.add(lease)
+        ...     process(path)
+        ...     renewer.discard(lease.item)
+    """
+
+    def __init__(self, manager: LeaseManager, interval: float | None = None) -> None:
+        """
+        Inicializa o renovador (a thread inicia no ``with``).
+
+        Args:
+            manager: Gerenciador dos leases
+            interval: Segundos entre renovações. Se None, usa ``ttl / 3``.
+        """
+        self.manager = manager
+        self.interval = interval if interval is not None else manager.ttl / 3
+        self._leases: dict[str, Lease] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, lease: Lease) -> None:
+        """Passa a renovar o lease."""
+        with self._lock:
+            self._leases[lease.item] = lease
+
+    def discard(self, item: str) -> Lease | None:
+        """Deixa de renovar o lease do item e o devolve (None se não registrado)."""
+        with self._lock:
+            return self._leases.pop(item, None)
+
+    def renew_all(self) -> None:
+        """Renova todos os leases registrados uma vez."""
+        with self._lock:
+            leases = list(self._leases.values())
+        for lease in leases:
+            try:
+                renewed = self.manager.renew(lease)
+            except OSError as e:
+                logger.warning("Erro renovando lease de %s: %s", lease.item, e)
+                continue
+            with self._lock:
+                if renewed is None:
+                    self._leases.pop(lease.item, None)
+                elif lease.item in self._leases:
+                    self._leases[lease.item] = renewed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.renew_all()
+
+    def __enter__(self) -> Self:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lease-renewer", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def claim_items(
+    paths: Iterable[Path],
+    manager: LeaseManager,
+    base_dir: Path | None = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    cancel: CancellationToken | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[tuple[Path, Lease]]:
+    """
+    Itera sobre os caminhos cujo lease este nó conseguiu adquirir.
+
+    A iteração começa em uma posição derivada do dono do lease, para que
+    nós diferentes não disputem sempre os mesmos arquivos. Como os leases
+    são adquiridos sob demanda, um nó só reivindica um item quando está
+    pronto para processá-lo.
+
+    Itens com lease de outro nó são revisitados a cada ``poll_interval``
+    segundos até serem concluídos ou o lease expirar (nó morto) ou ser
+    liberado (falha); só então a iteração termina. Um item já entregue
+    por este iterador não é reivindicado de novo, mesmo que falhe.
+
+    Args:
+        paths: Caminhos dos XMLs
+        manager: Gerenciador de leases
+        base_dir: Diretório base para o identificador relativo do item
+        poll_interval: Segundos entre passadas sobre itens pendentes
+        cancel: Token de cancelamento; acionado, nenhum item novo é
+            reivindicado
+        sleep: Função de espera (injetável em testes)
+
+    Yields:
+        Tuplas (caminho, lease) dos itens reivindicados
+    """
+    items = sorted(paths)
+    if not items:
+        return
+
+    start = int(hashlib.blake2b(manager.owner.encode(), digest_size=4).hexdigest(), 16)
+    start %= len(items)
+
+    pending = [
+        (path, path.relative_to(base_dir).as_posix() if base_dir else path.as_posix())
+        for path in items[start:] + items[:start]
+    ]
+    while pending:
+        waiting: list[tuple[Path, str]] = []
+        for path, item in pending:
+            if cancel is not None and cancel.cancelled:
+                return
+            lease = manager.try_claim(item)
+            if lease is not None:
+                yield path, lease
+            elif not manager.is_done(item):
+                waiting.append((path, item))
+
+        pending = waiting
+        if pending:
+            logger.debug("Aguardando %d item(ns) com lease de outros nós", len(pending))
+            sleep(poll_interval)
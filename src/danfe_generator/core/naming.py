@@ -0,0 +1,102 @@
+"""Modelos de caminho de saída a partir da chave de acesso.
+
+Com milhões de PDFs, um único diretório plano com ``<nome do XML>.pdf``
+torna ``ls`` e backups lentos e mistura notas de emitentes diferentes
+com o mesmo nome de arquivo. Um modelo como::
+
+    {cnpj}/{aaaa}/{mm}/{serie}-{nNF}-{chave}.pdf
+
+distribui os PDFs por emitente e mês de emissão, com nomes únicos. Os
+campos vêm da chave de acesso de 44 dígitos (``infNFe/@Id``), lida sem
+parse completo do XML.
+
+Campos disponíveis: ``chave``, ``cUF``, ``aaaa``, ``aa``, ``mm``,
+``cnpj``, ``mod``, ``serie``, ``nNF``, ``tpEmis``, ``cNF``, ``cDV`` e
+``nome`` (nome do XML sem extensão).
+
+Classes:
+    OutputTemplate: Modelo de caminho relativo para os PDFs.
+
+Example:
+    >>> template = OutputTemplate("{cnpj}/{aaaa}/{mm}/{serie}-{nNF}-{chave}.pdf")
+    >>> template.render("nota.xml", "35231212345678000195550010000000011000000015")
+    '12345678000195/2023/12/001-000000001-35231212345678000195550010000000011000000015.pdf'
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import fields
+from pathlib import PurePosixPath
+from string import Formatter
+
+from danfe_generator.core.access_key import AccessKey
+from danfe_generator.sources.compressed import xml_stem
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_FIELDS: frozenset[str] = frozenset(
+    {field.name for field in fields(AccessKey)} | {"aaaa", "nome"}
+)
+
+
+class OutputTemplate:
+    """Modelo de caminho relativo para os PDFs de saída.
+
+    Documentos sem chave de acesso legível usam ``<nome>.pdf`` na raiz
+    do diretório de saída (com um aviso no log).
+
+    Attributes:
+        template: Modelo no formato de ``str.format``.
+        uses_key: Se o modelo usa campos da chave de acesso.
+    """
+
+    def __init__(self, template: str) -> None:
+        """
+        Inicializa e valida o modelo.
+
+        Args:
+            template: Modelo relativo (ex.: ``{cnpj}/{aaaa}/{mm}/{chave}.pdf``)
+
+        Raises:
+            ValueError: Se o modelo tiver campos desconhecidos ou sair do
+                diretório de saída (caminho absoluto ou ``..``)
+        """
+        try:
+            names = {name for _, name, _, _ in Formatter().parse(template) if name is not None}
+        except ValueError as e:
+            raise ValueError(f"Modelo de saída inválido: {template!r} ({e})") from e
+        unknown = names - TEMPLATE_FIELDS
+        if unknown:
+            raise ValueError(
+                f"Campo(s) desconhecido(s) no modelo de saída: {', '.join(sorted(unknown))}. "
+                f"Válidos: {', '.join(sorted(TEMPLATE_FIELDS))}"
+            )
+        path = PurePosixPath(template)
+        if path.is_absolute() or ".." in path.parts or not template.endswith(".pdf"):
+            raise ValueError(f"Modelo de saída deve ser um caminho relativo .pdf: {template!r}")
+
+        self.template = template
+        self.uses_key = bool(names - {"nome"})
+
+    def render(self, name: str, access_key: str | None) -> str:
+        """
+        Resolve o caminho relativo de um documento.
+
+        Args:
+            name: Nome (ou caminho) do XML de origem
+            access_key: Chave de acesso do documento, se conhecida
+
+        Returns:
+            Caminho relativo do PDF, com ``/`` como separador
+        """
+        stem = xml_stem(PurePosixPath(name))
+        if not self.uses_key:
+            return self.template.format(nome=stem)
+        if access_key is None:
+            logger.warning("Chave de acesso não encontrada em %s; usando %s.pdf", name, stem)
+            return f"{stem}.pdf"
+
+        key = AccessKey.parse(access_key)
+        values = {field.name: getattr(key, field.name) for field in fields(AccessKey)}
+        return self.template.format(aaaa=key.aaaa, nome=stem, **values)
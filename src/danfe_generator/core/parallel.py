@@ -0,0 +1,375 @@
+"""Execução paralela de geração de DANFEs em processos worker.
+
+A renderização do PDF é CPU-bound, então o paralelismo usa processos.
+Cada worker cria um único DANFEGenerator na inicialização (a validação da
+logo é feita uma vez por processo) e, quando o plano define um limite de
+memória, aplica ``RLIMIT_AS`` para que um documento patológico falhe com
+MemoryError em vez de levar o container a um OOM kill. ``RLIMIT_AS`` limita
+o espaço de endereçamento virtual, não a memória residente: bibliotecas que
+reservam regiões grandes falham bem antes de o processo usar o limite de
+fato (ver ``MIN_WORKER_MEMORY_MB`` em ``resources``).
+
+Functions:
+    run_parallel: Processa tarefas em um pool de processos.
+    render_parallel: Renderiza PDFs em memória, devolvidos via memória compartilhada.
+    validate_parallel: Valida XMLs em lotes de caminhos, sem renderizar.
+
+Example:
+    >>> from danfe_generator.core.resources import plan_workers
+    >>> plan = plan_workers()
+    >>> for result in run_parallel(config, tasks, plan):
+    ...     print(result.success)
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable, Generator, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import batched
+from multiprocessing import resource_tracker
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from danfe_generator.core.access_key import count_items, find_access_key
+from danfe_generator.core.buffers import RenderedPDF, SharedPDF
+from danfe_generator.core.validators import XMLValidator
+
+if TYPE_CHECKING:
+    from danfe_generator.core.concurrency import AdaptiveConcurrency
+    from danfe_generator.core.config import DANFEConfig
+    from danfe_generator.core.generator import DANFEGenerator, GenerationResult, Profile, RenderItem
+    from danfe_generator.core.resources import WorkerPlan
+
+logger = logging.getLogger(__name__)
+
+# Gerador do processo worker, criado em _init_worker
+_worker_generator: DANFEGenerator | None = None
+
+# XMLs por tarefa em validate_parallel: a validação leva ~0,1 ms por
+# documento, então uma tarefa por XML gastaria mais em IPC que validando
+VALIDATE_CHUNK_SIZE = 256
+
+
+def _apply_memory_limit(limit_bytes: int) -> None:
+    """
+    Aplica limite de espaço de endereçamento ao processo atual.
+
+    O limite é sobre memória virtual (``RLIMIT_AS``), não residente, e
+    nunca ultrapassa o limite rígido já herdado.
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - plataformas sem resource (Windows)
+        logger.warning("Limite de memória por worker não suportado nesta plataforma")
+        return
+
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit_bytes = min(limit_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, hard))
+
+
+def _init_worker(config: DANFEConfig, memory_limit_bytes: int | None) -> None:
+    """Inicializa o processo worker."""
+    global _worker_generator
+
+    from danfe_generator.core.generator import DANFEGenerator
+
+    if memory_limit_bytes is not None:
+        _apply_memory_limit(memory_limit_bytes)
+    _worker_generator = DANFEGenerator(config)
+    # fsync adiado ("batch"): sincroniza o que restar quando o pool encerra
+    Finalize(None, _worker_generator.writer.sync, exitpriority=10)
+
+
+def _render_task(xml_path: Path, output_path: Path | None) -> GenerationResult:
+    """Gera um DANFE no processo worker."""
+    if _worker_generator is None:
+        raise RuntimeError("Worker não inicializado")
+    return _worker_generator._generate_safe(xml_path, output_path)
+
+
+def _render_shared_task(
+    name: str,
+    xml_content: bytes,
+    validate: bool = True,
+    profile: Profile | None = None,
+) -> tuple[SharedPDF, float]:
+    """Renderiza um PDF no worker e o devolve via memória compartilhada (com a duração)."""
+    if _worker_generator is None:
+        raise RuntimeError("Worker não inicializado")
+    start = time.perf_counter()
+    generator = _worker_generator.for_profile(profile)
+    pdf = generator._render_checked(name, xml_content, validate)
+    return SharedPDF.from_bytes(pdf), time.perf_counter() - start
+
+
+def _init_validate_worker(memory_limit_bytes: int | None) -> None:
+    """Inicializa o processo worker de validação."""
+    if memory_limit_bytes is not None:
+        _apply_memory_limit(memory_limit_bytes)
+
+
+def _validate_task(xml_paths: tuple[Path, ...]) -> list[str | None]:
+    """Valida um lote de XMLs no processo worker (mensagem de erro ou None)."""
+    validator = XMLValidator()
+    return [validator.validate(xml_path).error_message for xml_path in xml_paths]
+
+
+def _create_executor(config: DANFEConfig, plan: WorkerPlan) -> ProcessPoolExecutor:
+    """Cria o pool de processos worker."""
+    # O resource tracker precisa existir antes do fork para ser herdado
+    # pelos workers; caso contrário cada worker inicia o seu e remove os
+    # segmentos de memória compartilhada ainda não lidos ao encerrar.
+    resource_tracker.ensure_running()
+    return ProcessPoolExecutor(
+        max_workers=plan.workers,
+        initializer=_init_worker,
+        initargs=(config, plan.memory_limit_bytes),
+    )
+
+
+def _submit_windowed[K, R](
+    executor: ProcessPoolExecutor,
+    func: Callable[..., R],
+    tasks: Iterable[tuple[K, tuple[Any, ...]]],
+    limit: Callable[[], int],
+    discard: Callable[[R], None] | None = None,
+) -> Generator[tuple[K, Future[R] | BaseException]]:
+    """
+    Submete tarefas mantendo no máximo ``limit()`` em andamento.
+
+    Se a iteração for interrompida, tarefas pendentes são canceladas e
+    ``discard`` é chamado com o resultado das que já estavam em execução.
+
+    Yields:
+        (chave, future concluído) na ordem de conclusão, ou (chave, exceção)
+        se a submissão falhou
+    """
+    task_iter = iter(tasks)
+    pending: dict[Future[R], K] = {}
+    exhausted = False
+
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < limit():
+                try:
+                    key, args = next(task_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                try:
+                    pending[executor.submit(func, *args)] = key
+                except BrokenProcessPool as e:
+                    yield key, e
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+    finally:
+        for future in pending:
+            if not future.cancel() and discard is not None:
+                future.add_done_callback(partial(_discard_result, discard=discard))
+
+
+def _discard_result[R](future: Future[R], discard: Callable[[R], None]) -> None:
+    """Descarta o resultado de um future abandonado."""
+    if not future.cancelled() and future.exception() is None:
+        discard(future.result())
+
+
+def run_parallel(
+    config: DANFEConfig,
+    tasks: Iterable[tuple[Path, Path | None]],
+    plan: WorkerPlan,
+    controller: AdaptiveConcurrency | None = None,
+) -> Iterator[GenerationResult]:
+    """
+    Gera DANFEs em paralelo, na ordem de conclusão.
+
+    As tarefas são consumidas sob demanda, mantendo no máximo
+    ``2 * plan.workers`` em andamento, de modo que iteráveis grandes
+    não são materializados em memória. Com um controlador adaptativo, o
+    limite de tarefas em andamento passa a ser ``controller.limit``,
+    reavaliado a cada documento concluído.
+
+    Args:
+        config: Configuração usada por todos os workers
+        tasks: Pares (xml_path, output_path)
+        plan: Plano com quantidade de workers e limite de memória
+        controller: Controlador adaptativo de concorrência (opcional)
+
+    Yields:
+        GenerationResult para cada tarefa concluída
+    """
+
+    def limit() -> int:
+        return controller.limit if controller else plan.workers * 2
+
+    keyed_tasks = ((xml_path, (xml_path, output_path)) for xml_path, output_path in tasks)
+
+    with _create_executor(config, plan) as executor:
+        for xml_path, outcome in _submit_windowed(executor, _render_task, keyed_tasks, limit):
+            if controller:
+                controller.record_completion()
+            yield _future_result(outcome, xml_path)
+
+
+def render_parallel(
+    config: DANFEConfig,
+    items: Iterable[RenderItem],
+    plan: WorkerPlan,
+    ordered: bool = False,
+) -> Iterator[RenderedPDF]:
+    """
+    Renderiza PDFs em memória em paralelo.
+
+    Os workers devolvem o PDF em memória compartilhada, de modo que o
+    conteúdo não é serializado pelo pipe. Cada RenderedPDF deve ser
+    fechado (``close`` ou ``with``) para liberar o segmento; segmentos de
+    resultados não consumidos são liberados ao interromper a iteração.
+
+    Com ``ordered=True``, os resultados concluídos fora de ordem aguardam
+    em um buffer de reordenação. O buffer conta no limite de tarefas em
+    andamento (``2 * plan.workers``), então um documento lento segura a
+    submissão em vez de acumular PDFs em memória.
+
+    Args:
+        config: Configuração usada por todos os workers
+        items: Pares (nome, conteúdo do XML), opcionalmente com o perfil
+            de configuração do item como terceiro elemento
+        plan: Plano com quantidade de workers e limite de memória
+        ordered: Se True, produz os resultados na ordem de ``items``
+
+    Yields:
+        RenderedPDF para cada item (na ordem de conclusão, ou de entrada
+        com ``ordered``)
+    """
+    # A chave de acesso e os itens são extraídos aqui, onde o XML já está
+    # em memória, para nomear a saída sem devolvê-los do worker
+    keyed_items = (
+        (
+            (seq, item[0], find_access_key(item[1]), count_items(item[1])),
+            (item[0], item[1], True, *item[2:]),
+        )
+        for seq, item in enumerate(items)
+    )
+    reorder: dict[int, RenderedPDF] = {}
+    next_seq = 0
+
+    with _create_executor(config, plan) as executor:
+        outcomes = _submit_windowed(
+            executor,
+            _render_shared_task,
+            keyed_items,
+            lambda: plan.workers * 2 - len(reorder),
+            discard=_release_rendered,
+        )
+        try:
+            for (seq, name, access_key, item_count), outcome in outcomes:
+                pdf = _rendered_pdf(name, outcome)
+                pdf.access_key, pdf.item_count = access_key, item_count
+                if not ordered:
+                    yield pdf
+                    continue
+                reorder[seq] = pdf
+                while next_seq in reorder:
+                    yield reorder.pop(next_seq)
+                    next_seq += 1
+        finally:
+            outcomes.close()
+            for pdf in reorder.values():
+                pdf.close()
+
+
+def validate_parallel(
+    xml_paths: Iterable[Path],
+    plan: WorkerPlan,
+    chunk_size: int = VALIDATE_CHUNK_SIZE,
+) -> Iterator[tuple[Path, str | None]]:
+    """
+    Valida XMLs em paralelo, sem renderizar.
+
+    Os caminhos são enviados aos workers em lotes de ``chunk_size``
+    (amortizando o IPC) e consumidos sob demanda, com no máximo
+    ``2 * plan.workers`` lotes em andamento. Os workers não criam um
+    DANFEGenerator: apenas ``XMLValidator``.
+
+    Args:
+        xml_paths: Caminhos dos XMLs
+        plan: Plano com quantidade de workers e limite de memória
+        chunk_size: XMLs por tarefa
+
+    Yields:
+        (caminho, mensagem de erro ou None se válido), na ordem de
+        conclusão dos lotes
+    """
+    chunks = ((chunk, (chunk,)) for chunk in batched(xml_paths, chunk_size))
+
+    with ProcessPoolExecutor(
+        max_workers=plan.workers,
+        initializer=_init_validate_worker,
+        initargs=(plan.memory_limit_bytes,),
+    ) as executor:
+        for chunk, outcome in _submit_windowed(
+            executor, _validate_task, chunks, lambda: plan.workers * 2
+        ):
+            try:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                errors = outcome.result()
+            except Exception as e:
+                # Worker morto: o lote inteiro é reportado com o erro
+                logger.error("Erro no worker validando %d XML(s): %s", len(chunk), e)
+                errors = [f"Erro no worker: {e}"] * len(chunk)
+            yield from zip(chunk, errors, strict=True)
+
+
+def _release_rendered(rendered: tuple[SharedPDF, float]) -> None:
+    """Libera o segmento de uma renderização abandonada."""
+    rendered[0].release()
+
+
+def _rendered_pdf(
+    name: str,
+    outcome: Future[tuple[SharedPDF, float]] | BaseException,
+) -> RenderedPDF:
+    """Converte o future de uma renderização em RenderedPDF."""
+    try:
+        if isinstance(outcome, BaseException):
+            raise outcome
+        shared, elapsed = outcome.result()
+    except Exception as e:
+        logger.error("Erro renderizando %s: %s", name, e)
+        return RenderedPDF.failed(name, e)
+    return RenderedPDF(name=name, shared=shared, timings={"render": elapsed})
+
+
+def _future_result(
+    outcome: Future[GenerationResult] | BaseException,
+    xml_path: Path,
+) -> GenerationResult:
+    """Extrai o resultado de um future, convertendo falhas do worker em erro."""
+    try:
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome.result()
+    except Exception as e:
+        # Worker morto (ex.: MemoryError fatal) ou falha de serialização
+        return _failed_result(xml_path, e)
+
+
+def _failed_result(xml_path: Path, error: Exception) -> GenerationResult:
+    """Cria resultado de falha para erros fora do gerador."""
+    from danfe_generator.core.generator import GenerationResult
+
+    logger.error("Erro no worker processando %s: %s", xml_path, error)
+    return GenerationResult.failure(xml_path, error)
@@ -0,0 +1,426 @@
+"""Pipeline em estágios para geração de DANFEs em lote.
+
+Em ``generate``, leitura, validação, renderização e escrita acontecem em
+série, então E/S e CPU nunca se sobrepõem. O pipeline separa essas etapas
+em estágios com concorrência própria, ligados por filas limitadas::
+
+    leitura (threads) → validação → renderização (processos) → escrita (threads)
+
+Filas cheias bloqueiam o estágio anterior (backpressure), mantendo a
+memória limitada a ``queue_size`` documentos por fila. Cada estágio
+registra profundidade da fila e utilização, indicando qual deles limita
+a vazão.
+
+Classes:
+    StageStats: Estatísticas de um estágio.
+    Pipeline: Executa o pipeline sobre pares (xml_path, output_path).
+
+Example:
+    >>> pipeline = Pipeline(generator, stage_workers={"render": 4})
+    >>> for result in pipeline.run(tasks):
+    ...     print(result.success)
+    >>> for stats in pipeline.stats().values():
+    ...     print(f"{stats.name}: {stats.utilization:.0%}")
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from danfe_generator.core.access_key import count_items, find_access_key
+from danfe_generator.core.buffers import RenderedPDF
+from danfe_generator.core.resources import WorkerPlan
+from danfe_generator.exceptions import InvalidXMLError, XMLNotFoundError
+from danfe_generator.sources.compressed import read_xml, xml_stem
+
+if TYPE_CHECKING:
+    from danfe_generator.core.generator import DANFEGenerator, GenerationResult
+
+logger = logging.getLogger(__name__)
+
+STAGES: tuple[str, ...] = ("read", "validate", "render", "write")
+
+DEFAULT_STAGE_WORKERS: dict[str, int] = {"read": 2, "validate": 1, "render": 1, "write": 2}
+DEFAULT_QUEUE_SIZE: int = 16
+
+# Intervalo de verificação do sinal de parada em operações bloqueantes
+_POLL_SECONDS = 0.1
+
+# Marca fim de fluxo em uma fila
+_END = object()
+
+
+@dataclass
+class StageStats:
+    """Estatísticas de um estágio do pipeline.
+
+    Attributes:
+        name: Nome do estágio.
+        workers: Concorrência do estágio.
+        processed: Documentos processados.
+        failed: Documentos que falharam neste estágio.
+        busy_seconds: Tempo somado de trabalho dos workers.
+        elapsed_seconds: Tempo de parede desde o início do pipeline.
+        queue_depth: Documentos aguardando na fila de entrada.
+        max_queue_depth: Maior profundidade observada da fila de entrada.
+    """
+
+    name: str
+    workers: int
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    @property
+    def utilization(self) -> float:
+        """Fração do tempo em que os workers do estágio estiveram ocupados."""
+        capacity = self.elapsed_seconds * self.workers
+        if capacity <= 0:
+            return 0.0
+        return min(1.0, self.busy_seconds / capacity)
+
+
+@dataclass
+class _WorkItem:
+    """Documento em trânsito entre os estágios."""
+
+    xml_path: Path
+    output_path: Path
+    data: bytes | None = None
+    pdf: RenderedPDF | None = None
+    pdf_size: int = 0
+    error: Exception | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+    access_key: str | None = None
+    item_count: int | None = None
+
+
+class Pipeline:
+    """
+    Pipeline de geração com estágios concorrentes e filas limitadas.
+
+    A renderização é CPU-bound: com mais de um worker de renderização, ela
+    é executada em processos (as threads do estágio apenas despacham o
+    trabalho). Os demais estágios usam threads.
+    """
+
+    def __init__(
+        self,
+        generator: DANFEGenerator,
+        stage_workers: Mapping[str, int] | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        memory_limit_bytes: int | None = None,
+    ) -> None:
+        """
+        Inicializa o pipeline.
+
+        Args:
+            generator: Gerador usado para validar e renderizar
+            stage_workers: Concorrência por estágio (read, validate, render, write)
+            queue_size: Capacidade de cada fila entre estágios
+            memory_limit_bytes: Limite de memória por processo de renderização
+
+        Raises:
+            ValueError: Se um estágio for desconhecido ou tiver concorrência < 1
+        """
+        workers = dict(DEFAULT_STAGE_WORKERS)
+        for name, count in (stage_workers or {}).items():
+            if name not in STAGES:
+                raise ValueError(f"Estágio desconhecido: {name}. Válidos: {', '.join(STAGES)}")
+            if count < 1:
+                raise ValueError(f"Estágio {name} deve ter ao menos 1 worker")
+            workers[name] = count
+        if queue_size < 1:
+            raise ValueError("queue_size deve ser maior ou igual a 1")
+
+        self._generator = generator
+        self._workers = workers
+        self._queue_size = queue_size
+        self._memory_limit_bytes = memory_limit_bytes
+
+        self._stats = {name: StageStats(name=name, workers=workers[name]) for name in STAGES}
+        self._queues: list[queue.Queue[object]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._feed_error: BaseException | None = None
+
+    def stats(self) -> dict[str, StageStats]:
+        """
+        Retorna um retrato das estatísticas por estágio.
+
+        Pode ser chamado durante a execução (de outra thread) ou ao final.
+        """
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+
+        with self._lock:
+            snapshot = {}
+            for index, name in enumerate(STAGES):
+                depth = self._queues[index].qsize() if self._queues else 0
+                snapshot[name] = replace(
+                    self._stats[name], elapsed_seconds=elapsed, queue_depth=depth
+                )
+            return snapshot
+
+    def bottleneck(self) -> str | None:
+        """Nome do estágio com maior utilização (o que limita a vazão)."""
+        stats = self.stats()
+        if not any(s.processed for s in stats.values()):
+            return None
+        return max(stats.values(), key=lambda s: s.utilization).name
+
+    def run(self, tasks: Iterable[tuple[Path, Path | None]]) -> Iterator[GenerationResult]:
+        """
+        Executa o pipeline, na ordem de conclusão.
+
+        Args:
+            tasks: Pares (xml_path, output_path); output None usa o nome do XML
+
+        Yields:
+            GenerationResult para cada documento
+
+        Raises:
+            Exception: A exceção levantada por ``tasks``, depois que os
+                documentos já admitidos terminam
+        """
+        # Uma fila de entrada por estágio, mais a fila de resultados
+        self._queues = [queue.Queue(maxsize=self._queue_size) for _ in range(len(STAGES) + 1)]
+        self._stop.clear()
+        self._feed_error = None
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+
+        if self._workers["render"] > 1:
+            from danfe_generator.core.parallel import _create_executor
+
+            plan = WorkerPlan(self._workers["render"], self._memory_limit_bytes)
+            self._executor = _create_executor(self._generator.config, plan)
+            # Inicia os processos antes das threads dos estágios, evitando
+            # fork() em processo multi-threaded
+            self._executor.submit(int).result()
+
+        threads = [threading.Thread(target=self._feed, args=(tasks,), daemon=True)]
+        remaining = {name: self._workers[name] for name in STAGES}
+        for index, name in enumerate(STAGES):
+            for _ in range(self._workers[name]):
+                threads.append(
+                    threading.Thread(
+                        target=self._stage_loop,
+                        args=(index, remaining),
+                        name=f"danfe-{name}",
+                        daemon=True,
+                    )
+                )
+        for thread in threads:
+            thread.start()
+
+        results = self._queues[-1]
+        try:
+            while True:
+                item = self._get(results)
+                if item is _END or item is None:
+                    break
+                assert isinstance(item, _WorkItem)
+                yield self._to_result(item)
+            if self._feed_error is not None:
+                raise self._feed_error
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+            self._release_pending()
+            self._finished_at = time.perf_counter()
+            self._log_summary()
+
+    def _feed(self, tasks: Iterable[tuple[Path, Path | None]]) -> None:
+        """Alimenta o primeiro estágio e sinaliza o fim do fluxo."""
+        first = self._queues[0]
+        try:
+            for xml_path, output_path in tasks:
+                xml_path = Path(xml_path)
+                item = _WorkItem(
+                    xml_path=xml_path,
+                    output_path=(
+                        Path(output_path)
+                        if output_path
+                        else xml_path.with_name(f"{xml_stem(xml_path)}.pdf")
+                    ),
+                )
+                if not self._put(first, item):
+                    return
+        except Exception as e:
+            # Relançada por run() depois que os estágios esvaziam
+            self._feed_error = e
+        finally:
+            for _ in range(self._workers[STAGES[0]]):
+                self._put(first, _END)
+
+    def _stage_loop(self, index: int, remaining: dict[str, int]) -> None:
+        """Laço de um worker do estágio ``index``."""
+        name = STAGES[index]
+        handler = self._handlers()[name]
+        inbox, outbox = self._queues[index], self._queues[index + 1]
+        stats = self._stats[name]
+
+        while True:
+            depth = inbox.qsize()
+            item = self._get(inbox)
+            if item is _END or item is None:
+                break
+            assert isinstance(item, _WorkItem)
+
+            with self._lock:
+                stats.max_queue_depth = max(stats.max_queue_depth, depth)
+
+            if item.error is None:
+                start = time.perf_counter()
+                try:
+                    handler(item)
+                except Exception as e:
+                    item.error = e
+                elapsed = time.perf_counter() - start
+                item.timings[name] = elapsed
+                with self._lock:
+                    stats.busy_seconds += elapsed
+                    stats.processed += 1
+                    if item.error is not None:
+                        stats.failed += 1
+
+            if not self._put(outbox, item):
+                return
+
+        # O último worker do estágio propaga o fim do fluxo
+        with self._lock:
+            remaining[name] -= 1
+            last = remaining[name] == 0
+        if last:
+            downstream = self._workers[STAGES[index + 1]] if index + 1 < len(STAGES) else 1
+            for _ in range(downstream):
+                self._put(outbox, _END)
+
+    def _handlers(self) -> dict[str, Callable[[_WorkItem], None]]:
+        return {
+            "read": self._read,
+            "validate": self._validate,
+            "render": self._render,
+            "write": self._write,
+        }
+
+    def _read(self, item: _WorkItem) -> None:
+        try:
+            item.data = read_xml(item.xml_path)
+            item.access_key = find_access_key(item.data)
+            item.item_count = count_items(item.data)
+        except FileNotFoundError:
+            raise XMLNotFoundError(str(item.xml_path)) from None
+        except ValueError as e:
+            raise InvalidXMLError(str(item.xml_path), str(e)) from None
+
+    def _validate(self, item: _WorkItem) -> None:
+        assert item.data is not None
+        result = self._generator._xml_validator.validate_bytes(item.data)
+        if not result.is_valid:
+            raise InvalidXMLError(str(item.xml_path), result.error_message or "Erro desconhecido")
+
+    def _render(self, item: _WorkItem) -> None:
+        assert item.data is not None
+        name = str(item.xml_path)
+        if self._executor is not None:
+            # O PDF volta do worker em memória compartilhada, sem pickle
+            from danfe_generator.core.parallel import _render_shared_task
+
+            shared, _ = self._executor.submit(_render_shared_task, name, item.data, False).result()
+            item.pdf = RenderedPDF(name=name, shared=shared)
+        else:
+            pdf = self._generator._render_checked(name, item.data, validate=False)
+            item.pdf = RenderedPDF(name=name, data=pdf)
+        item.data = None
+
+    def _write(self, item: _WorkItem) -> None:
+        assert item.pdf is not None
+        with item.pdf, self._generator.writer.open(item.output_path) as f:
+            item.pdf_size = item.pdf.write_to(f)
+
+    def _release_pending(self) -> None:
+        """Libera PDFs em memória compartilhada retidos nas filas."""
+        for pending in self._queues:
+            while True:
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, _WorkItem) and item.pdf is not None:
+                    item.pdf.close()
+
+    def _to_result(self, item: _WorkItem) -> GenerationResult:
+        from danfe_generator.core.generator import GenerationResult
+
+        if item.error is not None:
+            logger.error("Erro processando %s: %s", item.xml_path, item.error)
+            result = GenerationResult.failure(item.xml_path, item.error)
+            result.access_key, result.timings = item.access_key, item.timings
+            result.item_count = item.item_count
+            return result
+
+        return GenerationResult(
+            xml_path=item.xml_path,
+            pdf_path=item.output_path,
+            success=True,
+            file_size_kb=item.pdf_size / 1024,
+            access_key=item.access_key,
+            item_count=item.item_count,
+            timings=item.timings,
+        )
+
+    def _put(self, target: queue.Queue[object], item: object) -> bool:
+        """Coloca na fila, bloqueando enquanto cheia (backpressure)."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue[object]) -> object | None:
+        """Retira da fila, retornando None se o pipeline foi interrompido."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return None
+
+    def _log_summary(self) -> None:
+        for stats in self.stats().values():
+            logger.info(
+                "Estágio %-8s workers=%d processados=%d falhas=%d utilização=%.0f%% fila máx=%d",
+                stats.name,
+                stats.workers,
+                stats.processed,
+                stats.failed,
+                stats.utilization * 100,
+                stats.max_queue_depth,
+            )
+        bottleneck = self.bottleneck()
+        if bottleneck:
+            logger.info("Estágio limitante: %s", bottleneck)
@@ -0,0 +1,165 @@
+"""Progresso e cancelamento cooperativo de lotes.
+
+As APIs de lote (``generate_batch``, ``generate_from_directory`` e
+``generate_stream``) aceitam ``on_progress``, chamado a cada documento
+concluído com um ``Progress`` (concluídos/total, vazão e ETA), e
+``cancel``, um ``CancellationToken`` que pode ser acionado de outra
+thread (UI, handler de sinal, serviço).
+
+O cancelamento é cooperativo: ao ser acionado, o lote para de admitir
+documentos novos, os que já estão em andamento (inclusive em workers)
+terminam normalmente e o ``BatchResult`` volta com ``cancelled=True``.
+
+Classes:
+    Progress: Instantâneo do progresso de um lote.
+    ProgressTracker: Calcula o progresso a partir dos resultados.
+    CancellationToken: Sinal de cancelamento cooperativo.
+
+Example:
+    >>> token = CancellationToken()
+    >>> def show(progress: Progress) -> None:
+    ...     print(f"{progress.done}/{progress.total} ETA {progress.eta_s:.0f}s")
+    ...     if progress.failed > 100:
+    ...         token.cancel()
+    >>> batch = generator.generate_batch(paths, "./output", on_progress=show, cancel=token)
+    >>> batch.cancelled
+    True
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from danfe_generator.core.generator import GenerationResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Progress:
+    """Instantâneo do progresso de um lote.
+
+    Attributes:
+        done: Documentos concluídos (inclusive falhas e duplicatas ignoradas).
+        total: Total de documentos, ou None se desconhecido (iterável sob demanda).
+        failed: Documentos que falharam.
+        elapsed_s: Segundos desde o início do lote.
+        docs_per_s: Vazão média desde o início.
+        eta_s: Segundos estimados até o fim, ou None sem total ou vazão.
+    """
+
+    done: int
+    total: int | None
+    failed: int
+    elapsed_s: float
+    docs_per_s: float
+    eta_s: float | None
+
+    @property
+    def fraction(self) -> float | None:
+        """Fração concluída (0 a 1), ou None sem total."""
+        if self.total is None:
+            return None
+        if self.total <= 0:
+            return 1.0
+        return min(self.done / self.total, 1.0)
+
+
+class ProgressTracker:
+    """Calcula o progresso de um lote e notifica ``on_progress``."""
+
+    def __init__(
+        self,
+        total: int | None,
+        on_progress: Callable[[Progress], None] | None = None,
+    ) -> None:
+        """
+        Inicia a contagem.
+
+        Args:
+            total: Total de documentos, ou None se desconhecido
+            on_progress: Chamado com o Progress a cada atualização
+        """
+        self.total = total
+        self.on_progress = on_progress
+        self.done = 0
+        self.failed = 0
+        self._start = time.perf_counter()
+
+    def update(self, result: GenerationResult | None = None, skipped: int = 0) -> Progress:
+        """
+        Registra um documento concluído e notifica ``on_progress``.
+
+        Args:
+            result: Resultado do documento (None para apenas contar ``skipped``)
+            skipped: Documentos ignorados desde a última atualização
+                (ex.: duplicatas)
+
+        Returns:
+            O progresso atualizado
+        """
+        if result is not None:
+            self.done += 1
+            if not result.success:
+                self.failed += 1
+        self.done += skipped
+
+        progress = self.snapshot()
+        if self.on_progress is not None:
+            self.on_progress(progress)
+        return progress
+
+    def snapshot(self) -> Progress:
+        """Progresso atual, sem notificar."""
+        elapsed = time.perf_counter() - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(self.total - self.done, 0) / rate
+        return Progress(
+            done=self.done,
+            total=self.total,
+            failed=self.failed,
+            elapsed_s=elapsed,
+            docs_per_s=rate,
+            eta_s=eta,
+        )
+
+
+class CancellationToken:
+    """Sinal de cancelamento cooperativo, seguro entre threads."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Aciona o cancelamento (idempotente)."""
+        if not self._event.is_set():
+            logger.info("Cancelamento solicitado; concluindo documentos em andamento")
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Se o cancelamento foi acionado."""
+        return self._event.is_set()
+
+    def guard[T](self, items: Iterable[T]) -> Iterator[T]:
+        """
+        Repassa ``items`` até o cancelamento ser acionado.
+
+        Args:
+            items: Entradas do lote
+
+        Yields:
+            Cada entrada, enquanto não houver cancelamento
+        """
+        for item in items:
+            if self.cancelled:
+                return
+            yield item
@@ -0,0 +1,244 @@
+"""Quarentena de entradas que falharam e reprocessamento por execução.
+
+Em lotes grandes, algumas notas sempre falham (XML truncado, schema
+desconhecido, disco cheio). Reexecutar o lote inteiro para recuperá-las
+é caro; a quarentena guarda, por execução (``run_id``), a lista das
+entradas que falharam e o motivo estruturado de cada uma::
+
+    .danfe-quarantine/
+        20240115-093012-a1b2c3/
+            run.json                      # origem e diretório de saída
+            failures.jsonl                # uma falha por linha
+            inputs/00001/nota.xml         # cópia da entrada
+            inputs/00001/nota.xml.reason.json
+
+O motivo vem de ``GenerationResult.error_type`` e
+``GenerationResult.error_details`` (o ``DANFEError.details`` da exceção).
+Entradas que não são arquivos (membros de ``.zip``, linhas de banco,
+anexos de e-mail) são registradas sem cópia.
+
+Classes:
+    FailureRecord: Uma entrada que falhou em uma execução.
+    Quarantine: Registro das falhas de uma execução.
+
+Functions:
+    new_run_id: Gera o identificador de uma execução.
+    load_run: Lê os metadados e as falhas de uma execução.
+    retry_inputs: Caminhos a reprocessar de uma execução.
+
+Example:
+    >>> quarantine = Quarantine(".danfe-quarantine", output_dir="./output")
+    >>> quarantine.record_batch(generator.generate_from_directory("./xmls", "./output"))
+    >>> paths = retry_inputs(".danfe-quarantine", quarantine.run_id)
+    >>> generator.generate_batch(paths, "./output")
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import secrets
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from danfe_generator.utils.file_handlers import safe_write_file
+
+if TYPE_CHECKING:
+    from danfe_generator.core.generator import BatchResult, GenerationResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUARANTINE_DIR = ".danfe-quarantine"
+RUN_FILE = "run.json"
+FAILURES_FILE = "failures.jsonl"
+INPUTS_DIR = "inputs"
+
+
+@dataclass
+class FailureRecord:
+    """Uma entrada que falhou em uma execução.
+
+    Attributes:
+        input: Caminho (ou nome) original da entrada.
+        error_message: Mensagem de erro.
+        error_type: Nome da exceção, se conhecida.
+        details: ``DANFEError.details`` da exceção.
+        quarantined: Cópia da entrada, relativa ao diretório da execução.
+    """
+
+    input: str
+    error_message: str | None
+    error_type: str | None = None
+    details: dict[str, Any] = field(default_factory=dict)
+    quarantined: str | None = None
+
+
+def new_run_id() -> str:
+    """Gera o identificador de uma execução (data, hora e sufixo aleatório)."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+
+
+class Quarantine:
+    """Registro das falhas de uma execução.
+
+    Attributes:
+        directory: Diretório raiz da quarentena.
+        run_id: Identificador desta execução.
+        run_dir: Diretório desta execução.
+        failures: Falhas registradas até agora.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_QUARANTINE_DIR,
+        run_id: str | None = None,
+        output_dir: str | Path | None = None,
+        source: str | None = None,
+    ) -> None:
+        """
+        Cria o diretório da execução e grava seus metadados.
+
+        Args:
+            directory: Diretório raiz da quarentena
+            run_id: Identificador da execução. Se None, gera um novo.
+            output_dir: Diretório de saída do lote (reusado no reprocessamento)
+            source: Origem do lote (diretório, arquivo ou lista)
+        """
+        self.directory = Path(directory)
+        self.run_id = run_id or new_run_id()
+        self.run_dir = self.directory / self.run_id
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.failures = 0
+
+        metadata = {
+            "run_id": self.run_id,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "source": source,
+            "output_dir": str(output_dir) if output_dir is not None else None,
+        }
+        safe_write_file(self.run_dir / RUN_FILE, json.dumps(metadata, ensure_ascii=False))
+
+    def record(self, result: GenerationResult, copy_input: bool = True) -> FailureRecord | None:
+        """
+        Registra um resultado; sucessos são ignorados.
+
+        Args:
+            result: Resultado da geração
+            copy_input: Copia a entrada para a quarentena (se for um arquivo)
+
+        Returns:
+            FailureRecord registrado, ou None se o resultado foi sucesso
+        """
+        if result.success:
+            return None
+
+        self.failures += 1
+        is_file = result.xml_path.is_file()
+        record = FailureRecord(
+            # Caminho absoluto: o reprocessamento pode rodar de outro diretório
+            input=str(result.xml_path.resolve() if is_file else result.xml_path),
+            error_message=result.error_message,
+            error_type=result.error_type,
+            details=result.error_details,
+        )
+        if copy_input and is_file:
+            record.quarantined = self._copy(result.xml_path, record)
+
+        with (self.run_dir / FAILURES_FILE).open("a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(record), ensure_ascii=False, default=str) + "\n")
+        return record
+
+    def record_batch(self, batch: BatchResult, copy_inputs: bool = True) -> int:
+        """
+        Registra as falhas de um lote.
+
+        Args:
+            batch: Resultado do lote
+            copy_inputs: Copia as entradas para a quarentena
+
+        Returns:
+            Quantidade de falhas registradas
+        """
+        recorded = sum(self.record(result, copy_inputs) is not None for result in batch.results)
+        if recorded:
+            logger.info("%d falha(s) em quarentena: %s", recorded, self.run_dir)
+        return recorded
+
+    def _copy(self, path: Path, record: FailureRecord) -> str | None:
+        """Copia a entrada e grava o arquivo de motivo ao lado dela."""
+        # Um diretório por falha preserva o nome (e o nome do PDF no reprocessamento)
+        relative = Path(INPUTS_DIR) / f"{self.failures:05d}" / path.name
+        target = self.run_dir / relative
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+            reason = {key: value for key, value in asdict(record).items() if key != "quarantined"}
+            safe_write_file(
+                target.with_name(f"{target.name}.reason.json"),
+                json.dumps(reason, ensure_ascii=False, indent=2, default=str),
+            )
+        except OSError as e:
+            logger.warning("Não foi possível copiar %s para a quarentena: %s", path, e)
+            return None
+        return relative.as_posix()
+
+
+def load_run(
+    directory: str | Path,
+    run_id: str,
+) -> tuple[dict[str, Any], list[FailureRecord]]:
+    """
+    Lê os metadados e as falhas de uma execução.
+
+    Args:
+        directory: Diretório raiz da quarentena
+        run_id: Identificador da execução
+
+    Returns:
+        Tupla (metadados de run.json, falhas registradas)
+
+    Raises:
+        FileNotFoundError: Se a execução não existir
+    """
+    run_dir = Path(directory) / run_id
+    metadata = json.loads((run_dir / RUN_FILE).read_text(encoding="utf-8"))
+
+    failures_path = run_dir / FAILURES_FILE
+    if not failures_path.exists():
+        return metadata, []
+    with failures_path.open(encoding="utf-8") as f:
+        failures = [FailureRecord(**json.loads(line)) for line in f if line.strip()]
+    return metadata, failures
+
+
+def retry_inputs(directory: str | Path, run_id: str) -> list[Path]:
+    """
+    Caminhos a reprocessar de uma execução.
+
+    Usa o arquivo original se ainda existir (pode ter sido corrigido) e,
+    senão, a cópia em quarentena. Entradas sem arquivo (membros de
+    ``.zip``, linhas de banco) são ignoradas com um aviso.
+
+    Args:
+        directory: Diretório raiz da quarentena
+        run_id: Identificador da execução
+
+    Returns:
+        Caminhos dos XMLs, na ordem em que falharam
+    """
+    run_dir = Path(directory) / run_id
+    _, failures = load_run(directory, run_id)
+
+    paths: list[Path] = []
+    for record in failures:
+        original = Path(record.input)
+        if original.is_file():
+            paths.append(original)
+        elif record.quarantined is not None and (run_dir / record.quarantined).is_file():
+            paths.append(run_dir / record.quarantined)
+        else:
+            logger.warning("Entrada %s indisponível para reprocessamento", record.input)
+    return paths
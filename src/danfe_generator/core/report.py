@@ -0,0 +1,300 @@
+"""Relatório de execução de lote, gravado em streaming.
+
+Depois de um lote grande, ``BatchResult.success_rate`` diz pouco: o
+relatório grava uma linha por documento à medida que cada um termina
+(CSV, JSONL ou Parquet) e, ao final, um resumo em
+``<relatório>.summary.json`` com:
+
+- histograma de erros por classe de exceção;
+- vazão ao longo do tempo (documentos por intervalo);
+- os N documentos mais lentos e os N maiores, com a quantidade de itens
+  e o CNPJ do emitente, para encontrar notas patológicas.
+
+Cada linha tem o XML, o PDF, o resultado, o tamanho, os itens, a chave de
+acesso, o emitente e os tempos por estágio em milissegundos. O formato
+Parquet depende do pacote opcional ``pyarrow``
+(``pip install danfe-generator[parquet]``).
+
+Classes:
+    BatchReport: Relatório de um lote (use ``add`` como ``on_result``).
+
+Functions:
+    summary_path: Caminho do resumo de um relatório.
+
+Example:
+    >>> with BatchReport("./relatorio.csv") as report:
+    ...     generator.generate_from_directory("./xmls", "./output", on_result=report.add)
+    >>> report.summary()["slowest"][0]["xml"]
+    'xmls/nota_com_900_itens.xml'
+"""
+
+from __future__ import annotations
+
+import csv
+import heapq
+import importlib.util
+import json
+import logging
+import time
+from collections import Counter
+from pathlib import Path
+from types import TracebackType
+from typing import IO, TYPE_CHECKING, Any, Self
+
+from danfe_generator.core.access_key import AccessKey
+from danfe_generator.utils.file_handlers import safe_write_file
+
+if TYPE_CHECKING:
+    from danfe_generator.core.generator import GenerationResult
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS: tuple[str, ...] = ("csv", "jsonl")
+if importlib.util.find_spec("pyarrow") is not None:
+    REPORT_FORMATS += ("parquet",)
+
+STAGE_COLUMNS = ("read_ms", "validate_ms", "render_ms", "write_ms")
+REPORT_FIELDS: tuple[str, ...] = (
+    "xml",
+    "pdf",
+    "success",
+    "error_type",
+    "error",
+    "size_kb",
+    "items",
+    "access_key",
+    "cnpj",
+    *STAGE_COLUMNS,
+    "total_ms",
+    "finished_s",
+)
+DEFAULT_TOP_N = 10
+# Largura (em segundos) de cada ponto da vazão ao longo do tempo
+DEFAULT_THROUGHPUT_INTERVAL = 10.0
+# Linhas por row group no formato Parquet
+PARQUET_ROW_GROUP = 10_000
+
+
+def summary_path(path: str | Path) -> Path:
+    """Caminho do resumo de um relatório (``<relatório>.summary.json``)."""
+    path = Path(path)
+    return path.with_name(f"{path.name}.summary.json")
+
+
+class BatchReport:
+    """Relatório de um lote, gravado em streaming.
+
+    Attributes:
+        path: Arquivo do relatório.
+        report_format: Formato ("csv", "jsonl" ou "parquet").
+        top_n: Quantidade de documentos nas listas de mais lentos/maiores.
+        interval: Largura, em segundos, de cada ponto da vazão.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        report_format: str | None = None,
+        top_n: int = DEFAULT_TOP_N,
+        interval: float = DEFAULT_THROUGHPUT_INTERVAL,
+    ) -> None:
+        """
+        Cria o relatório e abre o arquivo.
+
+        Args:
+            path: Arquivo do relatório
+            report_format: Formato. Se None, usa a extensão de ``path``.
+            top_n: Documentos nas listas de mais lentos e maiores
+            interval: Largura, em segundos, de cada ponto da vazão
+
+        Raises:
+            ValueError: Se o formato não for suportado
+        """
+        self.path = Path(path)
+        self.report_format = report_format or self.path.suffix.lstrip(".").lower()
+        if self.report_format not in REPORT_FORMATS:
+            raise ValueError(
+                f"Formato de relatório inválido: {self.report_format!r}. "
+                f"Válidos: {', '.join(REPORT_FORMATS)}"
+            )
+        self.top_n = top_n
+        self.interval = interval
+
+        self._start = time.perf_counter()
+        self._count = 0
+        self._successful = 0
+        self._errors: Counter[str] = Counter()
+        self._buckets: Counter[int] = Counter()
+        # Heaps de mínimo limitados a top_n: (valor, sequência, linha)
+        self._slowest: list[tuple[float, int, dict[str, Any]]] = []
+        self._largest: list[tuple[float, int, dict[str, Any]]] = []
+        self._rows: list[dict[str, Any]] = []
+        self._summary: dict[str, Any] | None = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._stream: IO[str] | None = None
+        self._csv: csv.DictWriter[str] | None = None
+        self._parquet: Any = None
+        if self.report_format == "csv":
+            # Com buffer de linha, cada documento fica visível assim que termina
+            self._stream = self.path.open("w", encoding="utf-8", newline="", buffering=1)
+            self._csv = csv.DictWriter(self._stream, fieldnames=REPORT_FIELDS)
+            self._csv.writeheader()
+        elif self.report_format == "jsonl":
+            self._stream = self.path.open("w", encoding="utf-8", buffering=1)
+
+    def add(self, result: GenerationResult) -> None:
+        """
+        Registra o resultado de um documento (compatível com ``on_result``).
+
+        Args:
+            result: Resultado da geração
+        """
+        elapsed = time.perf_counter() - self._start
+        row = self._row(result, elapsed)
+
+        self._count += 1
+        if result.success:
+            self._successful += 1
+        else:
+            self._errors[result.error_type or "Erro"] += 1
+        self._buckets[int(elapsed // self.interval)] += 1
+        self._push(self._slowest, row["total_ms"], row)
+        if result.success:
+            self._push(self._largest, row["size_kb"], row)
+
+        if self._csv is not None:
+            self._csv.writerow(row)
+        elif self._stream is not None:
+            self._stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            self._rows.append(row)
+            if len(self._rows) >= PARQUET_ROW_GROUP:
+                self._flush_parquet()
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Resumo do lote até agora.
+
+        Returns:
+            Dicionário com totais, histograma de erros, vazão ao longo do
+            tempo e os documentos mais lentos e maiores
+        """
+        if self._summary is not None:
+            return self._summary
+
+        elapsed = time.perf_counter() - self._start
+        last = max(self._buckets, default=-1)
+        throughput = [
+            {
+                "start_s": bucket * self.interval,
+                "docs": self._buckets[bucket],
+                "docs_per_s": round(self._buckets[bucket] / self.interval, 3),
+            }
+            for bucket in range(last + 1)
+        ]
+        return {
+            "total": self._count,
+            "successful": self._successful,
+            "failed": self._count - self._successful,
+            "elapsed_s": round(elapsed, 3),
+            "docs_per_s": round(self._count / elapsed, 3) if elapsed > 0 else 0.0,
+            "errors": dict(self._errors.most_common()),
+            "throughput": throughput,
+            "slowest": [row for _, _, row in sorted(self._slowest, reverse=True)],
+            "largest": [row for _, _, row in sorted(self._largest, reverse=True)],
+        }
+
+    def close(self) -> dict[str, Any]:
+        """
+        Fecha o relatório e grava o resumo em ``<relatório>.summary.json``.
+
+        Returns:
+            O resumo gravado
+        """
+        if self._summary is not None:
+            return self._summary
+
+        if self._stream is not None:
+            self._stream.close()
+        if self.report_format == "parquet":
+            self._flush_parquet()
+            if self._parquet is not None:
+                self._parquet.close()
+
+        summary = self.summary()
+        safe_write_file(summary_path(self.path), json.dumps(summary, ensure_ascii=False, indent=2))
+        self._summary = summary
+        logger.info("Relatório gravado: %s (%d documento(s))", self.path, self._count)
+        return summary
+
+    def _push(
+        self, heap: list[tuple[float, int, dict[str, Any]]], value: float, row: dict[str, Any]
+    ) -> None:
+        """Mantém em ``heap`` as ``top_n`` linhas de maior ``value``."""
+        if self.top_n <= 0:
+            return
+        entry = (value, self._count, row)
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def _flush_parquet(self) -> None:
+        """Grava as linhas acumuladas como um row group Parquet."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows and self._parquet is not None:
+            return
+        table = pa.Table.from_pylist(self._rows, schema=_parquet_schema(pa))
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.path, table.schema)
+        self._parquet.write_table(table)
+        self._rows = []
+
+    @staticmethod
+    def _row(result: GenerationResult, elapsed: float) -> dict[str, Any]:
+        """Linha do relatório para um resultado."""
+        timings = {f"{stage}_ms": seconds * 1000 for stage, seconds in result.timings.items()}
+        cnpj = None
+        if result.access_key is not None:
+            cnpj = AccessKey.parse(result.access_key).cnpj
+        return {
+            "xml": str(result.xml_path),
+            "pdf": str(result.pdf_path) if result.pdf_path else None,
+            "success": result.success,
+            "error_type": result.error_type,
+            "error": result.error_message,
+            "size_kb": round(result.file_size_kb, 3),
+            "items": result.item_count,
+            "access_key": result.access_key,
+            "cnpj": cnpj,
+            **{column: round(timings.get(column, 0.0), 3) for column in STAGE_COLUMNS},
+            "total_ms": round(sum(timings.values()), 3),
+            "finished_s": round(elapsed, 3),
+        }
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def _parquet_schema(pa: Any) -> Any:
+    """Esquema Parquet das linhas do relatório."""
+    types = {
+        "success": pa.bool_(),
+        "size_kb": pa.float64(),
+        "items": pa.int64(),
+        "total_ms": pa.float64(),
+        "finished_s": pa.float64(),
+        **{column: pa.float64() for column in STAGE_COLUMNS},
+    }
+    return pa.schema([(name, types.get(name, pa.string())) for name in REPORT_FIELDS])
@@ -0,0 +1,299 @@
+"""Detecção de limites de recursos e dimensionamento de workers.
+
+Em containers (Docker/Kubernetes), ``os.cpu_count()`` retorna o número de
+CPUs do host, não a cota do container. Este módulo lê os limites de CPU e
+memória do cgroup (v1 ou v2) e calcula quantos workers o processamento
+paralelo deve usar e quanta memória cada um pode consumir.
+
+Classes:
+    ResourceLimits: Limites efetivos de CPU e memória do processo.
+    WorkerPlan: Quantidade de workers e limite de memória por worker.
+
+Functions:
+    detect_limits: Lê os limites do cgroup (com fallback para o host).
+    plan_workers: Calcula o plano de workers a partir dos limites.
+
+Example:
+    >>> from danfe_generator.core.resources import plan_workers
+    >>> plan = plan_workers()
+    >>> print(f"{plan.workers} workers, {plan.memory_per_worker_mb} MB cada")
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+PROC_SELF_CGROUP = Path("/proc/self/cgroup")
+
+# Memória estimada por worker de renderização (fpdf2 + árvore XML + PDF em memória)
+DEFAULT_WORKER_MEMORY_MB: int = 256
+
+# Piso do limite calculado por worker. O limite é aplicado como
+# ``RLIMIT_AS``, que conta o espaço de endereçamento virtual (não a memória
+# residente): o interpretador, as bibliotecas carregadas e as arenas do
+# malloc reservam bem mais do que usam, e abaixo disso os workers falham
+# com MemoryError antes de renderizar qualquer documento.
+MIN_WORKER_MEMORY_MB: int = 256
+
+# Fração da memória do container reservada aos workers (o restante fica
+# para o processo pai e para o page cache)
+MEMORY_HEADROOM: float = 0.8
+
+# cgroup v1 usa um valor próximo de 2**63 para indicar "sem limite"
+_CGROUP_V1_UNLIMITED = 1 << 60
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """Limites efetivos de recursos do processo.
+
+    Attributes:
+        cpus: Quantidade de CPUs disponíveis (pode ser fracionária com cota).
+        memory_bytes: Limite de memória em bytes, ou None se ilimitado.
+        source: Origem dos limites ("cgroup2", "cgroup1" ou "host").
+    """
+
+    cpus: float
+    memory_bytes: int | None = None
+    source: str = "host"
+
+
+@dataclass(frozen=True)
+class WorkerPlan:
+    """Plano de execução paralela.
+
+    Attributes:
+        workers: Quantidade de processos worker.
+        memory_limit_bytes: Limite de memória por worker, ou None.
+    """
+
+    workers: int
+    memory_limit_bytes: int | None = None
+
+    @property
+    def memory_per_worker_mb(self) -> int | None:
+        """Limite de memória por worker em MB."""
+        if self.memory_limit_bytes is None:
+            return None
+        return self.memory_limit_bytes // (1024 * 1024)
+
+
+def _read_text(path: Path) -> str | None:
+    """Lê arquivo de controle do cgroup, retornando None se inexistente."""
+    try:
+        return path.read_text(encoding="ascii").strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _cgroup_paths(root: Path, proc_cgroup: Path) -> dict[str, Path]:
+    """Mapeia controladores para seus diretórios a partir de /proc/self/cgroup.
+
+    A chave "" representa a hierarquia unificada (cgroup v2).
+    """
+    paths: dict[str, Path] = {}
+    content = _read_text(proc_cgroup)
+    if not content:
+        return paths
+
+    for line in content.splitlines():
+        parts = line.split(":", 2)
+        if len(parts) != 3:
+            continue
+        _, controllers, rel_path = parts
+        for controller in controllers.split(",") if controllers else [""]:
+            base = root / controller if controller else root
+            paths[controller] = base / rel_path.lstrip("/")
+    return paths
+
+
+def _candidates(root: Path, relative: Path | None, subdir: str = "") -> list[Path]:
+    """Diretórios candidatos: o caminho do processo e a raiz montada."""
+    base = root / subdir if subdir else root
+    candidates = [relative] if relative is not None else []
+    candidates.append(base)
+    return candidates
+
+
+def _cpu_from_cgroup2(directories: list[Path]) -> float | None:
+    for directory in directories:
+        content = _read_text(directory / "cpu.max")
+        if content is None:
+            continue
+        quota, _, period = content.partition(" ")
+        if quota == "max":
+            return None
+        try:
+            return int(quota) / int(period or "100000")
+        except ValueError:
+            return None
+    return None
+
+
+def _memory_from_cgroup2(directories: list[Path]) -> int | None:
+    for directory in directories:
+        content = _read_text(directory / "memory.max")
+        if content is None:
+            continue
+        if content == "max":
+            return None
+        try:
+            return int(content)
+        except ValueError:
+            return None
+    return None
+
+
+def _cpu_from_cgroup1(directories: list[Path]) -> float | None:
+    for directory in directories:
+        quota = _read_text(directory / "cpu.cfs_quota_us")
+        period = _read_text(directory / "cpu.cfs_period_us")
+        if quota is None or period is None:
+            continue
+        try:
+            quota_us, period_us = int(quota), int(period)
+        except ValueError:
+            return None
+        if quota_us <= 0 or period_us <= 0:
+            return None
+        return quota_us / period_us
+    return None
+
+
+def _memory_from_cgroup1(directories: list[Path]) -> int | None:
+    for directory in directories:
+        content = _read_text(directory / "memory.limit_in_bytes")
+        if content is None:
+            continue
+        try:
+            limit = int(content)
+        except ValueError:
+            return None
+        return None if limit >= _CGROUP_V1_UNLIMITED else limit
+    return None
+
+
+def _host_cpus() -> int:
+    """CPUs visíveis ao processo (respeita cpuset/afinidade quando disponível)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def detect_limits(
+    root: Path = CGROUP_ROOT,
+    proc_cgroup: Path = PROC_SELF_CGROUP,
+) -> ResourceLimits:
+    """
+    Detecta limites de CPU e memória do processo.
+
+    Tenta cgroup v2 (``cpu.max``/``memory.max``) e depois cgroup v1
+    (``cpu.cfs_quota_us``/``memory.limit_in_bytes``). Sem cgroup, usa as
+    CPUs visíveis do host e memória ilimitada.
+
+    Args:
+        root: Ponto de montagem do cgroup
+        proc_cgroup: Arquivo com a associação de cgroups do processo
+
+    Returns:
+        ResourceLimits com os limites efetivos
+    """
+    host_cpus = _host_cpus()
+    paths = _cgroup_paths(root, proc_cgroup)
+
+    if (root / "cgroup.controllers").exists():
+        directories = _candidates(root, paths.get(""))
+        cpu_quota = _cpu_from_cgroup2(directories)
+        memory = _memory_from_cgroup2(directories)
+        source = "cgroup2"
+    else:
+        cpu_quota = _cpu_from_cgroup1(
+            _candidates(root, paths.get("cpu"), "cpu")
+            + _candidates(root, paths.get("cpu"), "cpu,cpuacct")
+        )
+        memory = _memory_from_cgroup1(_candidates(root, paths.get("memory"), "memory"))
+        source = "cgroup1" if cpu_quota is not None or memory is not None else "host"
+
+    cpus = min(float(host_cpus), cpu_quota) if cpu_quota is not None else float(host_cpus)
+    limits = ResourceLimits(cpus=cpus, memory_bytes=memory, source=source)
+    logger.debug("Limites detectados: %s", limits)
+    return limits
+
+
+def plan_workers(
+    jobs: int | None = None,
+    memory_per_worker_mb: int | None = None,
+    limits: ResourceLimits | None = None,
+) -> WorkerPlan:
+    """
+    Calcula quantidade de workers e limite de memória por worker.
+
+    Sem ``jobs``, usa uma CPU por worker (arredondando a cota para baixo) e
+    reduz a quantidade se a memória do container não comportar todos os
+    workers. Com ``jobs``, a quantidade informada é respeitada.
+
+    O limite por worker vira ``RLIMIT_AS`` (espaço de endereçamento
+    virtual), por isso o valor calculado nunca fica abaixo de
+    ``MIN_WORKER_MEMORY_MB``; um ``memory_per_worker_mb`` explícito é
+    aplicado como informado. Quem contém a memória residente do lote
+    continua sendo o limite do cgroup.
+
+    Args:
+        jobs: Quantidade de workers forçada. Se None, calcula automaticamente.
+        memory_per_worker_mb: Limite de memória por worker forçado, em MB.
+        limits: Limites de recursos. Se None, usa detect_limits().
+
+    Returns:
+        WorkerPlan com o dimensionamento calculado
+
+    Raises:
+        ValueError: Se jobs ou memory_per_worker_mb forem menores que 1
+    """
+    if jobs is not None and jobs < 1:
+        raise ValueError("jobs deve ser maior ou igual a 1")
+    if memory_per_worker_mb is not None and memory_per_worker_mb < 1:
+        raise ValueError("memory_per_worker_mb deve ser maior ou igual a 1")
+
+    limits = limits or detect_limits()
+    usable_memory = (
+        int(limits.memory_bytes * MEMORY_HEADROOM) if limits.memory_bytes is not None else None
+    )
+
+    if jobs is not None:
+        workers = jobs
+    else:
+        workers = max(1, math.floor(limits.cpus))
+        if usable_memory is not None:
+            per_worker = (memory_per_worker_mb or DEFAULT_WORKER_MEMORY_MB) * 1024 * 1024
+            workers = max(1, min(workers, usable_memory // per_worker))
+
+    if memory_per_worker_mb is not None:
+        memory_limit: int | None = memory_per_worker_mb * 1024 * 1024
+        if memory_per_worker_mb < MIN_WORKER_MEMORY_MB:
+            logger.warning(
+                "Limite de %d MB por worker abaixo de %d MB: o limite é de espaço de "
+                "endereçamento virtual e os workers podem falhar com MemoryError",
+                memory_per_worker_mb,
+                MIN_WORKER_MEMORY_MB,
+            )
+    elif usable_memory is not None:
+        memory_limit = max(usable_memory // workers, MIN_WORKER_MEMORY_MB * 1024 * 1024)
+    else:
+        memory_limit = None
+
+    plan = WorkerPlan(workers=workers, memory_limit_bytes=memory_limit)
+    logger.info(
+        "Plano de workers: %d worker(s), memória/worker: %s (origem: %s, CPUs: %.2f)",
+        plan.workers,
+        f"{plan.memory_per_worker_mb} MB" if plan.memory_per_worker_mb else "ilimitada",
+        limits.source,
+        limits.cpus,
+    )
+    return plan
@@ -0,0 +1,463 @@
+"""Destino de PDFs em armazenamento de objetos compatível com S3.
+
+Envia os PDFs renderizados em memória diretamente ao bucket, sem gravar
+em disco e subir depois (o que dobraria a E/S). Usa apenas a biblioteca
+padrão: requisições assinadas com AWS Signature V4 sobre ``http.client``,
+com endereçamento por caminho (``endpoint/bucket/chave``), compatível com
+AWS S3, MinIO, Ceph e similares.
+
+- Conexões HTTP são reutilizadas a partir de um pool (keep-alive);
+- os envios rodam em threads, com no máximo ``max_concurrency`` em
+  andamento: ``submit`` bloqueia quando o limite é atingido, limitando a
+  memória ocupada por PDFs ainda não enviados;
+- respostas 5xx (inclusive ``SlowDown``), respostas 200 com documento
+  ``<Error>`` (possíveis no ``CompleteMultipartUpload``) e erros de rede
+  são repetidos com backoff exponencial, exceto a criação do multipart
+  upload, que não é idempotente;
+- PDFs maiores que ``part_size`` são enviados em multipart upload
+  (abortado em caso de falha).
+
+``submit`` retorna um ``Future`` por PDF; o gerador só produz o
+``GenerationResult`` de cada documento quando o envio termina, de modo que
+um envio que falhou aparece como falha daquele documento (registro de
+chaves, quarentena e relatório). ``write`` envia e aguarda.
+
+Classes:
+    S3Sink: Grava PDFs em um bucket compatível com S3.
+
+Functions:
+    parse_s3_url: Separa ``s3://bucket/prefixo`` em bucket e prefixo.
+
+Example:
+    >>> with S3Sink("notas", prefix="2024/01", endpoint="http://localhost:9000") as sink:
+    ...     generator.generate_batch(xml_files, sink=sink)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import http.client
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+from urllib.parse import quote, urlsplit
+from xml.etree import ElementTree
+
+from danfe_generator.core.buffers import RenderedPDF
+from danfe_generator.core.naming import OutputTemplate
+from danfe_generator.core.sinks import output_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGION = "us-east-1"
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_RETRIES = 4
+DEFAULT_RETRY_BACKOFF = 0.5
+
+_ALGORITHM = "AWS4-HMAC-SHA256"
+
+
+def parse_s3_url(url: str) -> tuple[str, str]:
+    """
+    Separa uma URL ``s3://bucket/prefixo`` em (bucket, prefixo).
+
+    Raises:
+        ValueError: Se a URL não for ``s3://`` ou não tiver bucket
+    """
+    parts = urlsplit(url)
+    if parts.scheme != "s3" or not parts.netloc:
+        raise ValueError(f"URL S3 inválida (esperado s3://bucket/prefixo): {url}")
+    return parts.netloc, parts.path.strip("/")
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+class S3Sink:
+    """Grava PDFs em um bucket compatível com S3.
+
+    A chave de cada PDF é ``<prefix>/<nome>.pdf`` (ou ``<prefix>/`` seguido
+    do caminho do ``template``). Credenciais e região
+    ausentes são lidas de ``AWS_ACCESS_KEY_ID``, ``AWS_SECRET_ACCESS_KEY``,
+    ``AWS_SESSION_TOKEN`` e ``AWS_REGION``; o endpoint, de
+    ``AWS_ENDPOINT_URL`` (padrão: AWS S3 da região).
+
+    Attributes:
+        bucket: Nome do bucket.
+        prefix: Prefixo das chaves.
+        uploaded: Quantidade de PDFs enviados com sucesso.
+        failures: Chaves cujo envio falhou (após as retentativas), com a
+            mensagem de erro.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint: str | None = None,
+        region: str | None = None,
+        access_key: str | None = None,
+        secret_key: str | None = None,
+        session_token: str | None = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        template: OutputTemplate | None = None,
+    ) -> None:
+        """
+        Inicializa o destino.
+
+        Args:
+            bucket: Nome do bucket
+            prefix: Prefixo das chaves (ex.: "danfes/2024/01")
+            endpoint: URL do serviço (ex.: "http://localhost:9000")
+            region: Região usada na assinatura
+            access_key: Access key ID
+            secret_key: Secret access key
+            session_token: Token de sessão (credenciais temporárias)
+            part_size: PDFs maiores que isto usam multipart upload (o S3
+                exige partes de pelo menos 5 MiB, exceto a última)
+            max_concurrency: Envios simultâneos (e conexões no pool)
+            timeout: Timeout de cada requisição, em segundos
+            retries: Retentativas de cada requisição após resposta 5xx ou
+                erro de rede
+            retry_backoff: Espera antes da primeira retentativa, em
+                segundos (dobra a cada tentativa)
+            template: Modelo da chave de cada PDF (após o prefixo), a
+                partir da chave de acesso
+
+        Raises:
+            ValueError: Se faltarem credenciais ou os limites forem inválidos
+        """
+        if part_size < 1 or max_concurrency < 1:
+            raise ValueError("part_size e max_concurrency devem ser positivos")
+        if retries < 0 or retry_backoff < 0:
+            raise ValueError("retries e retry_backoff não podem ser negativos")
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.template = template
+        self.region = region or os.environ.get("AWS_REGION", DEFAULT_REGION)
+        self.endpoint = (
+            endpoint
+            or os.environ.get("AWS_ENDPOINT_URL")
+            or f"https://s3.{self.region}.amazonaws.com"
+        )
+        self.access_key = access_key or os.environ.get("AWS_ACCESS_KEY_ID")
+        self.secret_key = secret_key or os.environ.get("AWS_SECRET_ACCESS_KEY")
+        self.session_token = session_token or os.environ.get("AWS_SESSION_TOKEN")
+        if not self.access_key or not self.secret_key:
+            raise ValueError("Credenciais S3 ausentes (AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY)")
+
+        self.part_size = part_size
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.uploaded = 0
+        self.failures: dict[str, str] = {}
+
+        endpoint_parts = urlsplit(self.endpoint)
+        self._secure = endpoint_parts.scheme == "https"
+        self._host = endpoint_parts.netloc
+        self._base_path = endpoint_parts.path.rstrip("/")
+        self._connections: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix="s3-upload")
+        self._lock = threading.Lock()
+        self._keys: set[str] = set()
+
+    def key_for(self, pdf: RenderedPDF) -> str:
+        """Chave do objeto para um PDF."""
+        filename = output_name(pdf, self.template)
+        return f"{self.prefix}/{filename}" if self.prefix else filename
+
+    def write(self, pdf: RenderedPDF) -> Path:
+        """
+        Envia o PDF e aguarda o fim do envio.
+
+        Returns:
+            Localização do PDF: ``<bucket>/<chave>``
+
+        Raises:
+            OSError: Se o envio falhou
+        """
+        return self.submit(pdf).result()
+
+    def submit(self, pdf: RenderedPDF) -> Future[Path]:
+        """
+        Agenda o envio do PDF (bloqueia se houver ``max_concurrency`` envios).
+
+        Returns:
+            Future com a localização do PDF (``<bucket>/<chave>``), ou com o
+            OSError do envio
+        """
+        key = self._unique_key(self.key_for(pdf))
+        # Cópia necessária: a memória compartilhada do PDF é liberada ao retornar
+        data = pdf.tobytes()
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._upload, key, data)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._finished(key, f))
+        return future
+
+    def _unique_key(self, key: str) -> str:
+        """Evita sobrescrever PDFs de mesmo nome no mesmo lote."""
+        candidate, counter = key, 1
+        while candidate in self._keys:
+            counter += 1
+            stem, _, suffix = key.rpartition(".")
+            candidate = f"{stem}-{counter}.{suffix}"
+        self._keys.add(candidate)
+        return candidate
+
+    def _finished(self, key: str, future: Future[Path]) -> None:
+        self._slots.release()
+        error = future.exception()
+        with self._lock:
+            if error is None:
+                self.uploaded += 1
+            else:
+                logger.error("Erro enviando %s: %s", key, error)
+                self.failures[key] = str(error)
+
+    def _upload(self, key: str, data: bytes) -> Path:
+        """Envia um objeto, em uma requisição ou em multipart upload."""
+        location = Path(self.bucket) / key
+        if len(data) <= self.part_size:
+            self._request("PUT", key, body=data, headers={"Content-Type": "application/pdf"})
+            return location
+
+        # Sem retentativa: cada repetição poderia deixar um upload órfão
+        response, _ = self._request(
+            "POST",
+            key,
+            query={"uploads": ""},
+            headers={"Content-Type": "application/pdf"},
+            retry=False,
+        )
+        upload_id = _find_text(response, "UploadId")
+        if not upload_id:
+            raise OSError(f"POST {key}: resposta sem UploadId")
+        try:
+            etags = []
+            for number, offset in enumerate(range(0, len(data), self.part_size), start=1):
+                part = data[offset : offset + self.part_size]
+                query = {"partNumber": str(number), "uploadId": upload_id}
+                _, etag = self._request("PUT", key, query=query, body=part)
+                etags.append(etag)
+            parts = "".join(
+                f"<Part><PartNumber>{n}</PartNumber><ETag>{etag}</ETag></Part>"
+                for n, etag in enumerate(etags, start=1)
+            )
+            body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode()
+            self._request("POST", key, query={"uploadId": upload_id}, body=body)
+        except Exception:
+            try:
+                self._request("DELETE", key, query={"uploadId": upload_id})
+            except Exception as e:  # pragma: no cover - melhor esforço
+                logger.warning("Falha abortando multipart de %s: %s", key, e)
+            raise
+        return location
+
+    def _request(
+        self,
+        method: str,
+        key: str,
+        query: dict[str, str] | None = None,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+        retry: bool = True,
+    ) -> tuple[bytes, str]:
+        """
+        Executa uma requisição assinada usando uma conexão do pool.
+
+        Com ``retry``, respostas 5xx (``InternalError``, ``SlowDown``),
+        respostas de sucesso com documento ``<Error>`` e erros de rede são
+        repetidos até ``retries`` vezes, com backoff exponencial.
+
+        Returns:
+            Corpo e ETag da resposta
+
+        Raises:
+            OSError: Em erro de rede ou resposta HTTP de erro (esgotadas as
+                retentativas, se for o caso)
+        """
+        attempt = 0
+        while True:
+            try:
+                return self._send(method, key, query, body, headers)
+            except _RetryableError as e:
+                if not retry or attempt >= self.retries:
+                    raise OSError(str(e)) from e
+                delay = self.retry_backoff * 2**attempt
+                logger.warning("%s; nova tentativa em %.1fs", e, delay)
+                time.sleep(delay)
+                attempt += 1
+
+    def _send(
+        self,
+        method: str,
+        key: str,
+        query: dict[str, str] | None,
+        body: bytes,
+        headers: dict[str, str] | None,
+    ) -> tuple[bytes, str]:
+        """Uma tentativa de ``_request`` (erros transitórios como ``_RetryableError``)."""
+        path = quote(f"{self._base_path}/{self.bucket}/{key}", safe="/-_.~")
+        query_string = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}"
+            for k, v in sorted((query or {}).items())
+        )
+        request_headers = self._sign(method, path, query_string, body, headers or {})
+        target = f"{path}?{query_string}" if query_string else path
+
+        connection = self._acquire()
+        try:
+            connection.request(method, target, body=body, headers=request_headers)
+            response = connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            connection.close()
+            raise _RetryableError(f"{method} {key}: {e}") from e
+        self._connections.put(connection)
+
+        if response.status >= 300:
+            message = _find_text(content, "Message") if content else ""
+            error = f"{method} {key}: HTTP {response.status} {response.reason} {message}"
+            if response.status >= 500:
+                raise _RetryableError(error)
+            raise OSError(error)
+        code = _error_code(content) if content else None
+        if code is not None:
+            # Ex.: CompleteMultipartUpload responde 200 e reporta o erro no corpo
+            message = _find_text(content, "Message")
+            raise _RetryableError(f"{method} {key}: HTTP {response.status} {code} {message}")
+        return content, response.getheader("ETag", "")
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        """Conexão do pool (keep-alive), ou uma nova se não houver livre."""
+        try:
+            return self._connections.get_nowait()
+        except queue.Empty:
+            if self._secure:
+                return http.client.HTTPSConnection(self._host, timeout=self.timeout)
+            return http.client.HTTPConnection(self._host, timeout=self.timeout)
+
+    def _sign(
+        self,
+        method: str,
+        path: str,
+        query_string: str,
+        body: bytes,
+        headers: dict[str, str],
+    ) -> dict[str, str]:
+        """Cabeçalhos da requisição assinados com AWS Signature V4."""
+        assert self.access_key is not None and self.secret_key is not None
+        now = time.gmtime()
+        amz_date = time.strftime("%Y%m%dT%H%M%SZ", now)
+        date = amz_date[:8]
+
+        signed = {
+            "host": self._host,
+            "x-amz-content-sha256": hashlib.sha256(body).hexdigest(),
+            "x-amz-date": amz_date,
+        }
+        if self.session_token:
+            signed["x-amz-security-token"] = self.session_token
+        signed_headers = ";".join(sorted(signed))
+        canonical_request = "\n".join(
+            [
+                method,
+                path,
+                query_string,
+                "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+                signed_headers,
+                signed["x-amz-content-sha256"],
+            ]
+        )
+
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(
+            [_ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()]
+        )
+        key = _hmac(f"AWS4{self.secret_key}".encode(), date)
+        for part in (self.region, "s3", "aws4_request"):
+            key = _hmac(key, part)
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        return {
+            **headers,
+            **{name: value for name, value in signed.items() if name != "host"},
+            "Authorization": (
+                f"{_ALGORITHM} Credential={self.access_key}/{scope}, "
+                f"SignedHeaders={signed_headers}, Signature={signature}"
+            ),
+        }
+
+    def close(self) -> None:
+        """
+        Aguarda os envios pendentes e fecha as conexões.
+
+        Falhas de envio não são levantadas aqui: cada uma já foi entregue
+        no ``Future`` do respectivo PDF (e fica em ``failures``).
+        """
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except queue.Empty:
+                break
+        logger.info("S3: %d PDF(s) enviado(s), %d falha(s)", self.uploaded, len(self.failures))
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class _RetryableError(OSError):
+    """Erro transitório (rede ou HTTP 5xx) que justifica nova tentativa."""
+
+
+def _error_code(document: bytes) -> str | None:
+    """``Code`` da resposta, se ela for um documento ``<Error>``."""
+    try:
+        root = ElementTree.fromstring(document)
+    except ElementTree.ParseError:
+        return None
+    if root.tag != "Error" and not root.tag.endswith("}Error"):
+        return None
+    return _find_text(document, "Code") or "Error"
+
+
+def _find_text(document: bytes, tag: str) -> str:
+    """Texto do primeiro elemento ``tag`` (com ou sem namespace) de uma resposta XML."""
+    try:
+        root = ElementTree.fromstring(document)
+    except ElementTree.ParseError:
+        return ""
+    for element in root.iter():
+        if element.tag == tag or element.tag.endswith(f"}}{tag}"):
+            return element.text or ""
+    return ""
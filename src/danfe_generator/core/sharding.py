@@ -0,0 +1,114 @@
+"""Sharding determinístico de lotes entre máquinas.
+
+Permite dividir o processamento de um mesmo diretório compartilhado entre
+N nós independentes, sem coordenação: cada nó processa apenas os XMLs
+cujo hash (da chave de acesso ou do caminho relativo) cai no seu shard.
+O hash é estável entre execuções e máquinas, então os shards nunca se
+sobrepõem e juntos cobrem todos os arquivos.
+
+Classes:
+    Shard: Identifica o shard i de N.
+
+Functions:
+    select_shard: Filtra caminhos pertencentes a um shard.
+
+Example:
+    >>> shard = Shard.parse("3/8")
+    >>> mine = list(select_shard(xml_files, shard, base_dir=Path("./xmls")))
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+from danfe_generator.core.access_key import read_access_key
+
+SHARD_BY_CHOICES: tuple[str, ...] = ("path", "key")
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Shard ``index`` de ``count`` (índice começando em 1)."""
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        """Valida o shard."""
+        if self.count < 1:
+            raise ValueError("Quantidade de shards deve ser maior ou igual a 1")
+        if not 1 <= self.index <= self.count:
+            raise ValueError(f"Shard deve estar entre 1 e {self.count}")
+
+    @classmethod
+    def parse(cls, value: str) -> Self:
+        """Cria Shard a partir de texto no formato ``i/N``."""
+        index, sep, count = value.partition("/")
+        if not sep or not index.strip().isdigit() or not count.strip().isdigit():
+            raise ValueError(f"Shard inválido: {value!r} (esperado i/N)")
+        return cls(index=int(index), count=int(count))
+
+    def contains(self, key: str) -> bool:
+        """Verifica se a chave pertence a este shard."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.count == self.index - 1
+
+    def __str__(self) -> str:
+        """Retorna representação ``i/N``."""
+        return f"{self.index}/{self.count}"
+
+
+def shard_key(path: Path, base_dir: Path | None = None, by: str = "path") -> str:
+    """
+    Calcula a chave de sharding de um arquivo.
+
+    Args:
+        path: Caminho do XML
+        base_dir: Diretório base para calcular o caminho relativo
+        by: "path" (caminho relativo) ou "key" (chave de acesso, com
+            fallback para o caminho relativo se não encontrada)
+
+    Returns:
+        Texto usado no hash do shard
+    """
+    if by not in SHARD_BY_CHOICES:
+        raise ValueError(f"shard_by deve ser um de: {', '.join(SHARD_BY_CHOICES)}")
+
+    if by == "key":
+        access_key = read_access_key(path)
+        if access_key:
+            return access_key
+
+    if base_dir is not None:
+        try:
+            return path.relative_to(base_dir).as_posix()
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+def select_shard(
+    paths: Iterable[Path],
+    shard: Shard,
+    base_dir: Path | None = None,
+    by: str = "path",
+) -> Iterator[Path]:
+    """
+    Filtra os caminhos que pertencem ao shard.
+
+    Args:
+        paths: Caminhos dos XMLs
+        shard: Shard deste nó
+        base_dir: Diretório base para caminhos relativos
+        by: Critério de hash ("path" ou "key")
+
+    Yields:
+        Caminhos pertencentes ao shard
+    """
+    for path in paths:
+        if shard.count == 1 or shard.contains(shard_key(path, base_dir, by)):
+            yield path
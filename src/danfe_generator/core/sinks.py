@@ -0,0 +1,401 @@
+"""Destinos de saída para PDFs renderizados em lote.
+
+Gravar cada PDF como um arquivo solto exige ``mkdir``/``stat`` por
+documento e, em lotes grandes, sobrecarrega o sistema de arquivos (e
+ainda obriga a compactar tudo antes da entrega). Os destinos aqui recebem
+PDFs já renderizados em memória:
+
+- ``DirectorySink`` grava arquivos soltos (escrita atômica), criando cada
+  diretório uma única vez, opcionalmente distribuídos por um modelo de
+  caminho (``OutputTemplate``);
+- ``MemorySink`` mantém os PDFs em memória (testes, respostas HTTP);
+- ``ArchiveSink`` grava em arquivos ZIP/TAR sequenciais, trocando de
+  arquivo ao atingir um limite de tamanho ou de quantidade, e mantém um
+  índice JSONL (PDF → arquivo compactado); o nome dos membros também
+  pode seguir um ``OutputTemplate``;
+- ``S3Sink`` (em ``danfe_generator.core.s3``) envia a um bucket
+  compatível com S3.
+
+Destinos que gravam em segundo plano implementam ``DeferredSink``
+(``submit`` retorna um ``Future``): o gerador só produz o resultado de
+cada documento quando a gravação termina.
+
+Arquivos compactados em escrita têm o sufixo ``.part`` e só recebem o
+nome final quando fechados, de modo que consumidores nunca leem um
+arquivo incompleto.
+
+Classes:
+    OutputSink: Protocolo dos destinos.
+    DeferredSink: Protocolo dos destinos com gravação em segundo plano.
+    DirectorySink: Grava PDFs como arquivos em um diretório.
+    MemorySink: Mantém PDFs em memória, por nome.
+    ArchiveSink: Grava PDFs em arquivos ZIP/TAR com rollover e índice.
+
+Example:
+    >>> with ArchiveSink("./output", fmt="zip", max_files=10_000) as sink:
+    ...     generator.generate_batch(xml_files, sink=sink)
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import re
+import tarfile
+import time
+import zipfile
+from collections.abc import Buffer
+from concurrent.futures import Future
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+from typing import IO, Protocol, Self, runtime_checkable
+
+from danfe_generator.core.buffers import RenderedPDF
+from danfe_generator.core.naming import OutputTemplate
+from danfe_generator.sources.compressed import xml_stem
+from danfe_generator.utils.atomic import AtomicWriter
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS: tuple[str, ...] = ("zip", "tar", "tar.gz")
+DEFAULT_ARCHIVE_PREFIX = "danfes"
+
+
+class OutputSink(Protocol):
+    """Destino de PDFs renderizados."""
+
+    def write(self, pdf: RenderedPDF) -> Path:
+        """Grava o PDF e retorna sua localização."""
+        ...
+
+    def close(self) -> None:
+        """Finaliza o destino."""
+        ...
+
+
+@runtime_checkable
+class DeferredSink(OutputSink, Protocol):
+    """Destino que grava PDFs em segundo plano (ex.: ``S3Sink``)."""
+
+    def submit(self, pdf: RenderedPDF) -> Future[Path]:
+        """Agenda a gravação; o Future resolve com a localização ou com o erro."""
+        ...
+
+
+def pdf_name(source: str) -> str:
+    """Nome do PDF para um documento de origem (``pasta/nota.xml.gz`` → ``nota.pdf``)."""
+    return f"{xml_stem(PurePosixPath(source))}.pdf"
+
+
+def output_name(pdf: RenderedPDF, template: OutputTemplate | None) -> str:
+    """Caminho relativo (com ``/``) do PDF: o do modelo, ou ``<nome>.pdf``."""
+    if template is None:
+        return pdf_name(pdf.name)
+    return template.render(pdf.name, pdf.access_key)
+
+
+class DirectorySink:
+    """Grava PDFs como arquivos soltos em um diretório.
+
+    Cada diretório é criado uma única vez (cache do escritor), em vez de a
+    cada documento. Cada PDF é gravado de forma atômica (temporário
+    exclusivo + rename), com a política de fsync do escritor. Documentos
+    de mesmo nome (ex.: membros ``jan/nota.xml`` e ``fev/nota.xml`` de um
+    ZIP) recebem sufixo numérico (``nota-2.pdf``) em vez de se sobrescreverem.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        writer: AtomicWriter | None = None,
+        template: OutputTemplate | None = None,
+    ) -> None:
+        """
+        Inicializa o destino.
+
+        Args:
+            directory: Diretório de saída (criado se não existir)
+            writer: Escritor atômico compartilhado (padrão: sem fsync)
+            template: Modelo do caminho relativo de cada PDF, a partir da
+                chave de acesso (padrão: ``<nome>.pdf``)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.writer = writer or AtomicWriter()
+        self.template = template
+        self._written: set[Path] = set()
+
+    def write(self, pdf: RenderedPDF) -> Path:
+        """Grava o PDF em ``directory/<nome>.pdf`` (ou no caminho do modelo)."""
+        path = self._unique_path(self.directory / output_name(pdf, self.template))
+        with self.writer.open(path) as stream:
+            pdf.write_to(stream)
+        return path
+
+    def _unique_path(self, path: Path) -> Path:
+        """Caminho ainda não gravado por este destino (``nota-2.pdf``...)."""
+        unique, counter = path, 1
+        while unique in self._written:
+            counter += 1
+            unique = path.with_name(f"{path.stem}-{counter}{path.suffix}")
+        self._written.add(unique)
+        return unique
+
+    def close(self) -> None:
+        """Sincroniza os PDFs com fsync adiado (política "batch")."""
+        self.writer.sync()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class MemorySink:
+    """Mantém os PDFs em memória, indexados pelo nome do PDF.
+
+    Attributes:
+        files: Conteúdo de cada PDF, por nome (``nota.pdf``).
+    """
+
+    def __init__(self) -> None:
+        """Inicializa o destino vazio."""
+        self.files: dict[str, bytes] = {}
+
+    def write(self, pdf: RenderedPDF) -> Path:
+        """Copia o PDF para ``files`` e retorna o nome como localização."""
+        name, counter = pdf_name(pdf.name), 1
+        while name in self.files:
+            counter += 1
+            name = f"{xml_stem(PurePosixPath(pdf.name))}-{counter}.pdf"
+        self.files[name] = pdf.tobytes()
+        return Path(name)
+
+    def close(self) -> None:
+        """Nada a finalizar (o conteúdo continua disponível em ``files``)."""
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class _MemoryReader(io.RawIOBase):
+    """Leitor sobre um memoryview, para ``TarFile.addfile`` sem cópia inicial."""
+
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Buffer) -> int:
+        target = memoryview(buffer).cast("B")
+        size = min(len(target), len(self._view) - self._pos)
+        target[:size] = self._view[self._pos : self._pos + size]
+        self._pos += size
+        return size
+
+
+class ArchiveSink:
+    """Grava PDFs em arquivos ZIP/TAR sequenciais, com rollover e índice.
+
+    Os arquivos se chamam ``<prefix>-0001.zip``, ``<prefix>-0002.zip``...
+    Em um diretório que já tem arquivos (execução anterior), a numeração
+    continua após o maior existente; um arquivo existente nunca é
+    sobrescrito. Um novo arquivo é iniciado quando o atual atingiria ``max_bytes``
+    (soma dos PDFs) ou ``max_files`` documentos. Cada PDF gravado gera uma
+    linha em ``<prefix>-index.jsonl`` com o documento de origem, o arquivo
+    compactado, o nome do membro e o tamanho.
+
+    Attributes:
+        directory: Diretório onde os arquivos são criados.
+        archives: Arquivos já finalizados.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        fmt: str = "zip",
+        max_bytes: int | None = None,
+        max_files: int | None = None,
+        prefix: str = DEFAULT_ARCHIVE_PREFIX,
+        template: OutputTemplate | None = None,
+    ) -> None:
+        """
+        Inicializa o destino.
+
+        Args:
+            directory: Diretório de saída (criado se não existir)
+            fmt: Formato: "zip", "tar" ou "tar.gz"
+            max_bytes: Tamanho máximo (em bytes de PDF) por arquivo
+            max_files: Quantidade máxima de PDFs por arquivo
+            prefix: Prefixo dos nomes dos arquivos e do índice
+            template: Modelo do nome de cada membro, a partir da chave de
+                acesso (padrão: ``<nome>.pdf``)
+
+        Raises:
+            ValueError: Se o formato ou os limites forem inválidos
+        """
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Formato deve ser um de: {', '.join(ARCHIVE_FORMATS)}")
+        if (max_bytes is not None and max_bytes < 1) or (max_files is not None and max_files < 1):
+            raise ValueError("Limites de rollover devem ser positivos")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.prefix = prefix
+        self.template = template
+        self.archives: list[Path] = []
+
+        self._index: IO[str] = self.index_path.open("a", encoding="utf-8")
+        self._sequence = self._last_sequence()
+        self._zip: zipfile.ZipFile | None = None
+        self._tar: tarfile.TarFile | None = None
+        self._current: Path | None = None
+        self._members: set[str] = set()
+        self._bytes = 0
+
+    @property
+    def index_path(self) -> Path:
+        """Caminho do índice JSONL."""
+        return self.directory / f"{self.prefix}-index.jsonl"
+
+    def _last_sequence(self) -> int:
+        """Maior número de sequência já usado no diretório (0 se nenhum)."""
+        pattern = re.compile(rf"{re.escape(self.prefix)}-(\d+)\.")
+        numbers = [
+            int(match.group(1))
+            for path in self.directory.iterdir()
+            if (match := pattern.match(path.name))
+        ]
+        return max(numbers, default=0)
+
+    def write(self, pdf: RenderedPDF) -> Path:
+        """
+        Grava o PDF no arquivo atual (iniciando outro se necessário).
+
+        Returns:
+            Localização do PDF: ``<arquivo final>/<membro>``
+        """
+        size = pdf.size
+        if self._current is None or self._should_roll(size):
+            self._roll()
+        assert self._current is not None
+
+        member = self._unique_member(output_name(pdf, self.template))
+        if self._zip is not None:
+            with self._zip.open(member, "w") as stream:
+                pdf.write_to(stream)
+        else:
+            assert self._tar is not None
+            info = tarfile.TarInfo(member)
+            info.size = size
+            info.mtime = int(time.time())
+            with pdf.view() as view:
+                self._tar.addfile(info, _MemoryReader(view))
+
+        self._bytes += size
+        archive = self._final_path(self._current)
+        self._index.write(
+            json.dumps(
+                {"source": pdf.name, "archive": archive.name, "member": member, "size": size},
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+        return archive / member
+
+    def _should_roll(self, size: int) -> bool:
+        if not self._members:
+            return False
+        if self.max_files is not None and len(self._members) >= self.max_files:
+            return True
+        return self.max_bytes is not None and self._bytes + size > self.max_bytes
+
+    def _unique_member(self, member: str) -> str:
+        """Evita membros duplicados (mesmo nome de origem em pastas diferentes)."""
+        candidate, counter = member, 1
+        while candidate in self._members:
+            counter += 1
+            path = PurePosixPath(member)
+            candidate = str(path.with_name(f"{path.stem}-{counter}.pdf"))
+        self._members.add(candidate)
+        return candidate
+
+    def _final_path(self, part_path: Path) -> Path:
+        return part_path.with_name(part_path.name.removesuffix(".part"))
+
+    def _roll(self) -> None:
+        """Finaliza o arquivo atual e abre o próximo."""
+        self._finish_current()
+        self._sequence += 1
+        self._current = self.directory / f"{self.prefix}-{self._sequence:04d}.{self.fmt}.part"
+        while self._current.exists() or self._final_path(self._current).exists():
+            # Criado por outro processo desde a abertura
+            self._sequence += 1
+            self._current = self.directory / f"{self.prefix}-{self._sequence:04d}.{self.fmt}.part"
+        if self.fmt == "zip":
+            # PDFs já são comprimidos internamente: armazenar sem deflate
+            self._zip = zipfile.ZipFile(self._current, "w", compression=zipfile.ZIP_STORED)
+        elif self.fmt == "tar.gz":
+            self._tar = tarfile.TarFile.gzopen(self._current, "w")
+        else:
+            self._tar = tarfile.TarFile(self._current, "w")
+        self._members = set()
+        self._bytes = 0
+        logger.debug("Novo arquivo de saída: %s", self._current)
+
+    def _finish_current(self) -> None:
+        if self._current is None:
+            return
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+        final = self._final_path(self._current)
+        if final.exists():
+            raise FileExistsError(
+                f"Arquivo de saída já existe, mantido em {self._current}: {final}"
+            )
+        os.replace(self._current, final)
+        self.archives.append(final)
+        self._index.flush()
+        logger.info("Arquivo finalizado: %s (%d PDFs)", final, len(self._members))
+        self._current = None
+
+    def close(self) -> None:
+        """Finaliza o arquivo atual e o índice."""
+        self._finish_current()
+        self._index.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
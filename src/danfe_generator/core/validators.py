@@ -33,10 +33,17 @@ Example:
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from io import BufferedIOBase
 from pathlib import Path
 from xml.etree import ElementTree
+from xml.parsers import expat
 
 from danfe_generator.exceptions import InvalidLogoError, InvalidXMLError, XMLNotFoundError
+from danfe_generator.sources.compressed import XML_SUFFIXES, is_xml_path, open_xml, read_xml
+from danfe_generator.sources.encoding import recode_legacy
+
+# Bytes lidos por vez no parse incremental de XMLValidator.validate
+PARSE_CHUNK_SIZE = 64 * 1024
 
 
 @dataclass
@@ -133,53 +140,138 @@ class XMLValidator(Validator[Path]):
                 error_message=f"Arquivo não encontrado: {path}",
             )
 
-        if path.suffix.lower() != ".xml":
+        if not is_xml_path(path):
             return ValidationResult(
                 is_valid=False,
-                error_message=f"Extensão inválida: {path.suffix}. Esperado: .xml",
+                error_message=(
+                    f"Extensão inválida: {path.suffix}. Esperado: {', '.join(XML_SUFFIXES)}"
+                ),
             )
 
         # Validação básica de conteúdo usando parser
         try:
-            # Parse iterativo para não carregar tudo na memória se for muito grande
-            # Mas para validação estrutural básica, parse direto é suficiente e seguro
-            # pois ElementTree é robusto.
-            tree = ElementTree.parse(path)
-            root = tree.getroot()
-
-            # Remove namespace para verificação simples
-            root_tag = root.tag.split("}")[-1] if "}" in root.tag else root.tag
-
-            valid_root = root_tag in self.REQUIRED_TAGS
-
-            # Se a raiz não for válida, verifica se tem filhos válidos (ex: nfeProc contendo NFe)
-            if not valid_root:
-                # Verifica primeiro nível de filhos
-                for child in root:
-                    child_tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
-                    if child_tag in self.REQUIRED_TAGS:
-                        valid_root = True
-                        break
-
-            if not valid_root:
+            # XMLs comprimidos são descomprimidos como stream, sem cópia em disco
+            with open_xml(path) as stream:
+                error_message = self._parse_stream(stream)
+
+        except ElementTree.ParseError as e:
+            # Pode ser um XML em encoding legado não declarado
+            recoded = self._recode(path)
+            if recoded is None:
                 return ValidationResult(
                     is_valid=False,
-                    error_message="XML não parece ser uma NFe válida (tags NFe/nfeProc não encontradas)",
+                    error_message=f"XML malformado: {e}",
                 )
-
-        except ElementTree.ParseError as e:
-            return ValidationResult(
-                is_valid=False,
-                error_message=f"XML malformado: {e}",
-            )
-        except (OSError, UnicodeDecodeError) as e:
+            result = self.validate_bytes(recoded)
+            if not result.is_valid:
+                return ValidationResult(is_valid=False, error_message=result.error_message)
+            error_message = None
+        except (OSError, EOFError, UnicodeDecodeError) as e:
             return ValidationResult(
                 is_valid=False,
                 error_message=f"Erro ao ler arquivo: {e}",
             )
 
+        if error_message:
+            return ValidationResult(is_valid=False, error_message=error_message)
+
         return ValidationResult(is_valid=True, value=path)
 
+    def validate_bytes(self, data: bytes) -> ValidationResult[bytes]:
+        """
+        Valida conteúdo XML já carregado em memória.
+
+        Args:
+            data: Bytes do XML
+
+        Returns:
+            ValidationResult com resultado da validação
+        """
+        try:
+            root = ElementTree.fromstring(data)
+        except ElementTree.ParseError as e:
+            recoded = recode_legacy(data)
+            if recoded is None:
+                return ValidationResult(
+                    is_valid=False,
+                    error_message=f"XML malformado: {e}",
+                )
+            return self.validate_bytes(recoded)
+
+        error_message = self._check_root(root)
+
+        if error_message:
+            return ValidationResult(is_valid=False, error_message=error_message)
+
+        return ValidationResult(is_valid=True, value=data)
+
+    @staticmethod
+    def _recode(path: Path) -> bytes | None:
+        """Lê o arquivo e o converte de encoding legado, se aplicável."""
+        try:
+            return recode_legacy(read_xml(path))
+        except (OSError, ValueError):
+            return None
+
+    def _parse_stream(self, stream: BufferedIOBase) -> str | None:
+        """
+        Verifica a raiz e a boa formação do XML com parse incremental.
+
+        Nenhuma árvore é construída (memória constante mesmo em XMLs
+        grandes): os callbacks só acompanham a raiz e seus filhos diretos e
+        são removidos assim que uma tag de NFe aparece, de modo que o resto
+        do documento é verificado pelo expat sem voltar ao Python. A
+        leitura para no primeiro erro de sintaxe.
+
+        Raises:
+            ElementTree.ParseError: Se o XML for malformado
+        """
+        parser = expat.ParserCreate(namespace_separator="}")
+        depth = 0
+        found = False
+
+        def start(tag: str, _attrs: object) -> None:
+            nonlocal depth, found
+            # Raiz (depth 0) ou filho direto (depth 1), como em _check_root
+            if depth <= 1 and tag.rsplit("}", 1)[-1] in self.REQUIRED_TAGS:
+                found = True
+                parser.StartElementHandler = None
+                parser.EndElementHandler = None
+            depth += 1
+
+        def end(_tag: str) -> None:
+            nonlocal depth
+            depth -= 1
+
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        try:
+            while chunk := stream.read(PARSE_CHUNK_SIZE):
+                parser.Parse(chunk, False)
+            parser.Parse(b"", True)
+        except expat.ExpatError as e:
+            raise ElementTree.ParseError(str(e)) from e
+
+        if found:
+            return None
+        return "XML não parece ser uma NFe válida (tags NFe/nfeProc não encontradas)"
+
+    def _check_root(self, root: ElementTree.Element) -> str | None:
+        """Verifica se a raiz (ou um filho direto) é uma tag de NFe."""
+        # Remove namespace para verificação simples
+        root_tag = root.tag.split("}")[-1] if "}" in root.tag else root.tag
+
+        if root_tag in self.REQUIRED_TAGS:
+            return None
+
+        # Se a raiz não for válida, verifica se tem filhos válidos (ex: nfeProc contendo NFe)
+        for child in root:
+            child_tag = child.tag.split("}")[-1] if "}" in child.tag else child.tag
+            if child_tag in self.REQUIRED_TAGS:
+                return None
+
+        return "XML não parece ser uma NFe válida (tags NFe/nfeProc não encontradas)"
+
     def validate_or_raise(self, path: Path) -> Path:
         """Valida e levanta exceção se inválido."""
         # Check existence first explicitly to raise correct exception type
@@ -63,6 +63,25 @@ class DANFEError(Exception):
             return f"{self.message} - Detalhes: {self.details}"
         return self.message
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Permite serializar (pickle) subclasses com ``__init__`` próprio.
+
+        Necessário para que exceções levantadas em processos worker
+        cheguem ao processo pai sem quebrar o pool.
+        """
+        return _restore_error, (type(self), self.message, self.details)
+
+
+def _restore_error(
+    cls: type[DANFEError],
+    message: str,
+    details: dict[str, Any],
+) -> DANFEError:
+    """Recria uma exceção serializada sem chamar o ``__init__`` da subclasse."""
+    error = cls.__new__(cls)
+    DANFEError.__init__(error, message, details)
+    return error
+
 
 class XMLNotFoundError(DANFEError):
     """Exceção quando arquivo XML não é encontrado.
@@ -0,0 +1,57 @@
+"""Módulo de fontes de entrada - XMLs fora do sistema de arquivos.
+
+Fontes fornecem o conteúdo dos XMLs em bytes, que o gerador renderiza em
+memória, sem arquivos intermediários:
+
+    - iter_archive: Membros de arquivos ZIP/TAR (sem extração)
+    - read_xml / map_xml: XMLs soltos ou comprimidos (.xml.gz, .xml.bz2, .xml.zst)
+    - recode_legacy: Correção de XMLs em encoding legado não declarado
+    - DatabaseSource: Linhas de uma consulta SQL (DB-API), com writeback
+    - MailSource: Anexos de e-mails em Maildir/mbox, incremental e sem duplicatas
+    - iter_manifest: Linhas de um manifesto CSV/JSONL, com opções por linha
+
+``DatabaseSource`` e ``MailSource`` seguem o protocolo ``DocumentSource``.
+"""
+
+from danfe_generator.sources.archive import (
+    ARCHIVE_SUFFIXES,
+    is_archive,
+    iter_archive,
+    iter_zip_bytes,
+)
+from danfe_generator.sources.base import DocumentSource
+from danfe_generator.sources.compressed import (
+    XML_SUFFIXES,
+    find_xml_files,
+    is_xml_path,
+    map_xml,
+    open_xml,
+    read_xml,
+    xml_stem,
+)
+from danfe_generator.sources.database import DatabaseSource, connect
+from danfe_generator.sources.encoding import declared_encoding, recode_legacy
+from danfe_generator.sources.mail import MailSource
+from danfe_generator.sources.manifest import ManifestEntry, iter_manifest
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "XML_SUFFIXES",
+    "DatabaseSource",
+    "DocumentSource",
+    "MailSource",
+    "ManifestEntry",
+    "connect",
+    "declared_encoding",
+    "find_xml_files",
+    "is_archive",
+    "is_xml_path",
+    "iter_archive",
+    "iter_manifest",
+    "iter_zip_bytes",
+    "map_xml",
+    "open_xml",
+    "read_xml",
+    "recode_legacy",
+    "xml_stem",
+]
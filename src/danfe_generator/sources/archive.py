@@ -0,0 +1,161 @@
+"""Leitura de XMLs diretamente de arquivos ZIP/TAR, sem extração.
+
+Os membros são lidos um de cada vez e entregues ao renderizador como
+bytes, então o conteúdo nunca é gravado em disco. Arquivos TAR são lidos
+em modo stream (``r|*``), inclusive quando comprimidos (gzip, bz2, xz).
+
+Como em ``read_xml``, cada membro é limitado a ``MAX_XML_BYTES``
+descomprimidos: membros maiores (ou um "zip bomb") são ignorados com erro
+no log, sem serem carregados em memória.
+
+Functions:
+    is_archive: Verifica se o caminho é um arquivo ZIP/TAR suportado.
+    iter_archive: Itera sobre (nome do membro, conteúdo) dos XMLs.
+    iter_zip_bytes: Itera sobre os XMLs de um ZIP já carregado em memória.
+
+Example:
+    >>> for name, content in iter_archive(Path("notas_2024_01.zip")):
+    ...     print(name, len(content))
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import io
+import logging
+import tarfile
+import zipfile
+from collections.abc import Callable, Iterator
+from pathlib import Path, PurePosixPath
+from typing import IO
+
+from danfe_generator.sources.compressed import MAX_XML_BYTES
+
+logger = logging.getLogger(__name__)
+
+ZIP_SUFFIXES: tuple[str, ...] = (".zip",)
+TAR_SUFFIXES: tuple[str, ...] = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ARCHIVE_SUFFIXES: tuple[str, ...] = ZIP_SUFFIXES + TAR_SUFFIXES
+
+
+def _has_suffix(path: Path, suffixes: tuple[str, ...]) -> bool:
+    name = path.name.lower()
+    return any(name.endswith(suffix) for suffix in suffixes)
+
+
+def is_archive(path: str | Path) -> bool:
+    """Verifica se o caminho é um arquivo ZIP/TAR suportado (pela extensão)."""
+    path = Path(path)
+    return path.is_file() and _has_suffix(path, ARCHIVE_SUFFIXES)
+
+
+def _matches(name: str, pattern: str) -> bool:
+    return fnmatch.fnmatch(PurePosixPath(name).name.lower(), pattern.lower())
+
+
+def iter_archive(
+    path: str | Path,
+    pattern: str = "*.xml",
+    accept: Callable[[str], bool] | None = None,
+    max_bytes: int = MAX_XML_BYTES,
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Itera sobre os XMLs de um arquivo ZIP/TAR sem extraí-lo.
+
+    Args:
+        path: Caminho do arquivo compactado
+        pattern: Padrão glob aplicado ao nome (sem diretórios) de cada membro
+        accept: Filtro adicional por nome do membro, aplicado antes de ler o
+            conteúdo (ex.: seleção de shard)
+        max_bytes: Tamanho máximo descomprimido de cada membro; membros
+            maiores são ignorados
+
+    Yields:
+        Tuplas (nome do membro, conteúdo em bytes)
+
+    Raises:
+        ValueError: Se o formato não for suportado
+    """
+    path = Path(path)
+
+    if _has_suffix(path, ZIP_SUFFIXES):
+        yield from _iter_zip(path, pattern, accept, max_bytes)
+    elif _has_suffix(path, TAR_SUFFIXES):
+        yield from _iter_tar(path, pattern, accept, max_bytes)
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {path.name}")
+
+
+def iter_zip_bytes(
+    data: bytes,
+    pattern: str = "*.xml",
+    max_bytes: int = MAX_XML_BYTES,
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Itera sobre os XMLs de um ZIP em memória (ex.: anexo de e-mail).
+
+    Args:
+        data: Conteúdo do arquivo ZIP
+        pattern: Padrão glob aplicado ao nome (sem diretórios) de cada membro
+        max_bytes: Tamanho máximo descomprimido de cada membro; membros
+            maiores são ignorados
+
+    Yields:
+        Tuplas (nome do membro, conteúdo em bytes)
+
+    Raises:
+        zipfile.BadZipFile: Se o conteúdo não for um ZIP válido
+    """
+    yield from _iter_zip(io.BytesIO(data), pattern, None, max_bytes)
+
+
+def _read_member(stream: IO[bytes], name: str, declared: int, max_bytes: int) -> bytes | None:
+    """Lê um membro até ``max_bytes`` (None, com erro no log, se exceder)."""
+    # O tamanho declarado no cabeçalho pode mentir: a leitura também é limitada
+    data = stream.read(max_bytes + 1) if declared <= max_bytes else b""
+    if declared > max_bytes or len(data) > max_bytes:
+        logger.error(
+            "Membro %s ignorado: excede %d MB descomprimido", name, max_bytes // (1024 * 1024)
+        )
+        return None
+    return data
+
+
+def _iter_zip(
+    source: Path | IO[bytes],
+    pattern: str,
+    accept: Callable[[str], bool] | None,
+    max_bytes: int,
+) -> Iterator[tuple[str, bytes]]:
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not _matches(info.filename, pattern):
+                continue
+            if accept is not None and not accept(info.filename):
+                continue
+            with archive.open(info) as stream:
+                data = _read_member(stream, info.filename, info.file_size, max_bytes)
+            if data is not None:
+                yield info.filename, data
+
+
+def _iter_tar(
+    path: Path,
+    pattern: str,
+    accept: Callable[[str], bool] | None,
+    max_bytes: int,
+) -> Iterator[tuple[str, bytes]]:
+    # Modo stream: lê o arquivo sequencialmente, sem índice em memória
+    with tarfile.open(path, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile() or not _matches(member.name, pattern):
+                continue
+            if accept is not None and not accept(member.name):
+                continue
+            extracted = archive.extractfile(member)
+            if extracted is None:
+                continue
+            with extracted:
+                data = _read_member(extracted, member.name, member.size, max_bytes)
+            if data is not None:
+                yield member.name, data
@@ -0,0 +1,30 @@
+"""Interface comum das fontes de documentos com registro de resultado.
+
+Classes:
+    DocumentSource: Protocolo de fontes que recebem o resultado de cada documento.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Protocol
+
+
+class DocumentSource(Protocol):
+    """Fonte de (nome, conteúdo do XML) que registra o resultado de cada documento.
+
+    Implementada por ``DatabaseSource`` e ``MailSource`` e consumida por
+    ``DANFEGenerator.generate_from_source``.
+    """
+
+    def __iter__(self) -> Iterator[tuple[str, bytes]]:
+        """Itera sobre (nome, conteúdo do XML)."""
+        ...
+
+    def record(self, name: str, pdf_path: str | None, error_message: str | None) -> None:
+        """Registra o resultado de um documento."""
+        ...
+
+    def close(self) -> None:
+        """Persiste o estado pendente e libera recursos."""
+        ...
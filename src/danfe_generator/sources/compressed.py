@@ -0,0 +1,188 @@
+"""Leitura transparente de XMLs comprimidos (.xml.gz, .xml.bz2, .xml.zst).
+
+Os arquivos são descomprimidos como stream, sem cópia descompactada em
+disco. A leitura completa (``read_xml``) é limitada por ``MAX_XML_BYTES``
+para que um arquivo malicioso ("zip bomb") não esgote a memória.
+
+O suporte a zstd depende do pacote opcional ``zstandard``
+(``pip install danfe-generator[zstd]``); sem ele, ``.xml.zst`` não é
+reconhecido como XML.
+
+Functions:
+    is_xml_path: Verifica se o nome é de um XML (comprimido ou não).
+    xml_stem: Nome do documento sem as extensões (``nota.xml.gz`` → ``nota``).
+    open_xml: Abre o XML como stream binário descomprimido.
+    read_xml: Lê o XML descomprimido, com limite de tamanho.
+    map_xml: Fornece o XML em bytes, mapeando em memória arquivos grandes.
+    find_xml_files: Lista XMLs de um diretório, incluindo os comprimidos.
+
+Example:
+    >>> with open_xml(Path("nota.xml.gz")) as stream:
+    ...     tree = ElementTree.parse(stream)
+"""
+
+from __future__ import annotations
+
+import bz2
+import contextlib
+import gzip
+import importlib.util
+import logging
+import mmap
+import zlib
+from collections.abc import Buffer, Callable, Iterator
+from io import BufferedIOBase
+from pathlib import Path, PurePath
+
+logger = logging.getLogger(__name__)
+
+# Limite do XML descomprimido (NF-e reais têm poucas centenas de KB)
+MAX_XML_BYTES = 50 * 1024 * 1024
+
+# A partir deste tamanho, XMLs não comprimidos são mapeados em memória (mmap)
+MMAP_THRESHOLD = 1024 * 1024
+
+
+def _open_zstd(path: Path) -> BufferedIOBase:
+    import zstandard
+
+    reader: BufferedIOBase = zstandard.ZstdDecompressor().stream_reader(
+        path.open("rb"), closefd=True
+    )
+    return reader
+
+
+_OPENERS: dict[str, Callable[[Path], BufferedIOBase]] = {
+    ".gz": lambda path: gzip.GzipFile(path, "rb"),
+    ".bz2": lambda path: bz2.BZ2File(path, "rb"),
+}
+# Erros de conteúdo comprimido corrompido que não são OSError
+# (bz2 já levanta OSError; gzip e zstd, não)
+DECOMPRESSION_ERRORS: tuple[type[Exception], ...] = (EOFError, zlib.error)
+
+if importlib.util.find_spec("zstandard") is not None:
+    from zstandard import ZstdError
+
+    _OPENERS[".zst"] = _open_zstd
+    DECOMPRESSION_ERRORS += (ZstdError,)
+
+COMPRESSION_SUFFIXES: tuple[str, ...] = tuple(_OPENERS)
+XML_SUFFIXES: tuple[str, ...] = (".xml",) + tuple(f".xml{s}" for s in COMPRESSION_SUFFIXES)
+
+
+def _compression(path: PurePath) -> str | None:
+    """Sufixo de compressão suportado do caminho, se houver."""
+    suffix = path.suffix.lower()
+    return suffix if suffix in _OPENERS else None
+
+
+def is_xml_path(path: PurePath) -> bool:
+    """Verifica se o nome é de um XML, comprimido ou não (``.xml``, ``.xml.gz``...)."""
+    return path.name.lower().endswith(XML_SUFFIXES)
+
+
+def xml_stem(path: PurePath) -> str:
+    """Nome do documento sem extensão de compressão e ``.xml``."""
+    if _compression(path):
+        path = path.with_suffix("")
+    return path.stem
+
+
+def open_xml(path: Path) -> BufferedIOBase:
+    """
+    Abre o XML como stream binário, descomprimindo se necessário.
+
+    Args:
+        path: Caminho do XML (``.xml`` ou comprimido)
+
+    Returns:
+        Stream binário com o conteúdo descomprimido
+    """
+    compression = _compression(path)
+    if compression is None:
+        return path.open("rb")
+    return _OPENERS[compression](path)
+
+
+def read_xml(path: Path, max_bytes: int = MAX_XML_BYTES) -> bytes:
+    """
+    Lê o conteúdo descomprimido de um XML.
+
+    Args:
+        path: Caminho do XML (``.xml`` ou comprimido)
+        max_bytes: Tamanho máximo do conteúdo descomprimido
+
+    Returns:
+        Bytes do XML
+
+    Raises:
+        OSError: Se o arquivo não puder ser lido ou descomprimido
+        ValueError: Se o conteúdo exceder ``max_bytes``
+    """
+    try:
+        with open_xml(path) as stream:
+            data = stream.read(max_bytes + 1)
+    except EOFError as e:
+        raise OSError(f"Arquivo comprimido truncado: {path}") from e
+    except DECOMPRESSION_ERRORS as e:
+        raise OSError(f"Arquivo comprimido corrompido: {path}: {e}") from e
+    if len(data) > max_bytes:
+        raise ValueError(f"XML descomprimido excede {max_bytes // (1024 * 1024)} MB: {path}")
+    return data
+
+
+@contextlib.contextmanager
+def map_xml(
+    path: Path,
+    threshold: int = MMAP_THRESHOLD,
+    max_bytes: int = MAX_XML_BYTES,
+) -> Iterator[Buffer]:
+    """
+    Fornece o conteúdo do XML sem decodificá-lo.
+
+    XMLs não comprimidos a partir de ``threshold`` bytes são mapeados em
+    memória (somente leitura) em vez de copiados para o heap; os demais
+    são lidos com ``read_xml``. O mapeamento vale apenas dentro do bloco
+    ``with``.
+
+    Args:
+        path: Caminho do XML (``.xml`` ou comprimido)
+        threshold: Tamanho mínimo para usar mmap
+        max_bytes: Tamanho máximo do conteúdo
+
+    Yields:
+        Bytes (ou mmap) com o conteúdo do XML
+
+    Raises:
+        OSError: Se o arquivo não puder ser lido
+        ValueError: Se o conteúdo exceder ``max_bytes``
+    """
+    size = path.stat().st_size
+    if _compression(path) is not None or size < max(threshold, 1):
+        yield read_xml(path, max_bytes)
+        return
+
+    if size > max_bytes:
+        raise ValueError(f"XML excede {max_bytes // (1024 * 1024)} MB: {path}")
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def find_xml_files(directory: Path, pattern: str = "*.xml") -> list[Path]:
+    """
+    Lista os XMLs de um diretório, incluindo versões comprimidas.
+
+    O padrão se aplica ao nome sem compressão: ``*.xml`` também encontra
+    ``nota.xml.gz`` e ``nota.xml.bz2``.
+
+    Args:
+        directory: Diretório a buscar
+        pattern: Padrão glob
+
+    Returns:
+        Lista de Paths encontrados
+    """
+    files = list(directory.glob(pattern))
+    for suffix in COMPRESSION_SUFFIXES:
+        files.extend(directory.glob(f"{pattern}{suffix}"))
+    return files
@@ -0,0 +1,175 @@
+"""Leitura de XMLs de NF-e armazenados em banco de dados (DB-API 2.0).
+
+Os XMLs são lidos em lotes com ``fetchmany`` e renderizados em memória,
+sem arquivos intermediários. Com ``server_side=True``, o cursor é criado
+com nome (cursor do lado do servidor em drivers como psycopg), de modo
+que a tabela inteira nunca é carregada pelo cliente. Opcionalmente, o
+caminho do PDF (ou o erro) de cada linha é gravado de volta no banco.
+
+SQLite funciona sem dependências; outros drivers DB-API são carregados
+pelo nome do módulo (ex.: ``psycopg``, ``pymysql``).
+
+Classes:
+    DatabaseSource: Fonte de XMLs lida de uma consulta SQL.
+
+Functions:
+    connect: Abre uma conexão DB-API a partir do nome do driver e DSN.
+
+Example:
+    >>> connection = connect("notas.db")
+    >>> source = DatabaseSource(
+    ...     connection,
+    ...     "SELECT chave, xml FROM nfe WHERE pdf IS NULL",
+    ...     writeback="UPDATE nfe SET pdf = ?, erro = ? WHERE chave = ?",
+    ... )
+    >>> generator.generate_from_database(source, "./output")
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+from collections.abc import Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DRIVER = "sqlite3"
+DEFAULT_FETCH_SIZE = 100
+
+
+def connect(dsn: str, driver: str = DEFAULT_DRIVER) -> Any:
+    """
+    Abre uma conexão DB-API.
+
+    Args:
+        dsn: Caminho do banco (SQLite) ou string de conexão do driver
+        driver: Nome do módulo DB-API (ex.: "sqlite3", "psycopg")
+
+    Returns:
+        Conexão DB-API
+    """
+    module = importlib.import_module(driver)
+    return module.connect(dsn)
+
+
+def _to_bytes(value: Any) -> bytes:
+    """Normaliza o valor da coluna XML (TEXT, BLOB, bytea) para bytes."""
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return bytes(value)
+
+
+class DatabaseSource:
+    """Fonte de XMLs lida de uma consulta SQL.
+
+    A consulta deve retornar duas colunas: um identificador (ex.: chave de
+    acesso) e o conteúdo do XML. O identificador vira o nome do documento
+    (``xml_path`` do resultado e nome do PDF).
+
+    A instrução de ``writeback`` recebe três parâmetros posicionais:
+    caminho do PDF (ou None), mensagem de erro (ou None) e identificador.
+    Com uma conexão de ``writeback`` separada, as gravações são confirmadas
+    a cada lote; na mesma conexão da leitura, ao final (``close``). No
+    SQLite, a conexão separada exige o banco em modo WAL.
+
+    Attributes:
+        processed: Quantidade de linhas lidas.
+    """
+
+    def __init__(
+        self,
+        connection: Any,
+        query: str,
+        params: tuple[Any, ...] = (),
+        fetch_size: int = DEFAULT_FETCH_SIZE,
+        writeback: str | None = None,
+        writeback_connection: Any | None = None,
+        server_side: bool = False,
+    ) -> None:
+        """
+        Inicializa a fonte.
+
+        Args:
+            connection: Conexão DB-API usada na leitura
+            query: Consulta que retorna (identificador, xml)
+            params: Parâmetros da consulta
+            fetch_size: Linhas por ``fetchmany``
+            writeback: Instrução SQL para gravar o resultado de cada linha
+            writeback_connection: Conexão para o writeback (padrão: a mesma)
+            server_side: Usa cursor nomeado (do lado do servidor), se o
+                driver suportar
+
+        Raises:
+            ValueError: Se ``fetch_size`` não for positivo
+        """
+        if fetch_size < 1:
+            raise ValueError("fetch_size deve ser positivo")
+
+        self.connection = connection
+        self.query = query
+        self.params = params
+        self.fetch_size = fetch_size
+        self.writeback = writeback
+        self.writeback_connection = writeback_connection or connection
+        self.server_side = server_side
+        self.processed = 0
+        self._writeback_cursor: Any | None = None
+        self._pending_writes = 0
+
+    def _cursor(self) -> Any:
+        if self.server_side:
+            try:
+                return self.connection.cursor(name="danfe_source")
+            except TypeError:
+                logger.warning("Driver não suporta cursor nomeado; usando cursor comum")
+        return self.connection.cursor()
+
+    def __iter__(self) -> Iterator[tuple[str, bytes]]:
+        """Itera sobre (identificador, xml) em lotes de ``fetch_size``."""
+        cursor = self._cursor()
+        try:
+            cursor.arraysize = self.fetch_size
+            cursor.execute(self.query, self.params)
+            while rows := cursor.fetchmany(self.fetch_size):
+                for key, xml in rows:
+                    if xml is None:
+                        logger.warning("Linha %s sem XML; ignorada", key)
+                        continue
+                    self.processed += 1
+                    yield str(key), _to_bytes(xml)
+                self._commit_batch()
+        finally:
+            cursor.close()
+
+    def record(self, key: str, pdf_path: str | None, error_message: str | None) -> None:
+        """
+        Grava o resultado de uma linha (se houver ``writeback``).
+
+        Args:
+            key: Identificador da linha
+            pdf_path: Localização do PDF gerado, ou None se falhou
+            error_message: Mensagem de erro, ou None se teve sucesso
+        """
+        if self.writeback is None:
+            return
+        if self._writeback_cursor is None:
+            self._writeback_cursor = self.writeback_connection.cursor()
+        self._writeback_cursor.execute(self.writeback, (pdf_path, error_message, key))
+        self._pending_writes += 1
+
+    def _commit_batch(self) -> None:
+        # Na mesma conexão, confirmar encerraria o cursor de leitura em
+        # alguns drivers (ex.: cursores nomeados do PostgreSQL)
+        if self._pending_writes and self.writeback_connection is not self.connection:
+            self.writeback_connection.commit()
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        """Confirma gravações pendentes e fecha o cursor de writeback."""
+        if self._pending_writes:
+            self.writeback_connection.commit()
+            self._pending_writes = 0
+        if self._writeback_cursor is not None:
+            self._writeback_cursor.close()
+            self._writeback_cursor = None
@@ -0,0 +1,94 @@
+"""Tratamento de encoding de XMLs de NF-e.
+
+O parser XML respeita a declaração ``<?xml ... encoding="..."?>``, então
+os XMLs são mantidos em bytes do início ao fim. O problema são ERPs
+antigos que gravam ISO-8859-1/Windows-1252 sem declarar o encoding (ou
+declarando UTF-8): para esses, ``recode_legacy`` converte o conteúdo para
+UTF-8 — apenas quando o parse falha, sem custo para XMLs corretos.
+
+Functions:
+    declared_encoding: Encoding declarado no prólogo do XML.
+    recode_legacy: Converte para UTF-8 um XML em encoding legado mal declarado.
+
+Example:
+    >>> try:
+    ...     root = ElementTree.fromstring(data)
+    ... except ElementTree.ParseError:
+    ...     root = ElementTree.fromstring(recode_legacy(data) or data)
+"""
+
+from __future__ import annotations
+
+import codecs
+import logging
+import re
+from collections.abc import Buffer
+
+logger = logging.getLogger(__name__)
+
+# Encodings tentados, em ordem, para XMLs que não são UTF-8 válido
+LEGACY_ENCODINGS: tuple[str, ...] = ("cp1252", "iso-8859-1")
+
+_DECLARATION = re.compile(
+    rb"""^(\xef\xbb\xbf)?\s*<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z0-9._-]+)["']"""
+)
+_DECLARATION_TEXT = re.compile(r"""^(\s*<\?xml[^>]*?encoding\s*=\s*["'])[A-Za-z0-9._-]+""")
+_PROLOG_SIZE = 256
+
+
+def declared_encoding(data: Buffer) -> str | None:
+    """
+    Encoding declarado no prólogo do XML.
+
+    Args:
+        data: Conteúdo do XML
+
+    Returns:
+        Nome do encoding declarado, ou None se não houver declaração
+    """
+    match = _DECLARATION.match(bytes(memoryview(data)[:_PROLOG_SIZE]))
+    return match.group(2).decode("ascii") if match else None
+
+
+def _is_utf8(name: str) -> bool:
+    try:
+        return codecs.lookup(name).name == "utf-8"
+    except LookupError:
+        return False
+
+
+def recode_legacy(data: Buffer) -> bytes | None:
+    """
+    Converte para UTF-8 um XML em encoding legado não declarado.
+
+    Só atua quando o XML declara UTF-8 (ou não declara encoding) mas não é
+    UTF-8 válido; XMLs com outro encoding declarado já são lidos
+    corretamente pelo parser.
+
+    Args:
+        data: Conteúdo do XML
+
+    Returns:
+        XML em UTF-8 com a declaração ajustada, ou None se não houver o que
+        converter
+    """
+    declared = declared_encoding(data)
+    if declared is not None and not _is_utf8(declared):
+        return None
+
+    raw = bytes(data)
+    try:
+        raw.decode("utf-8")
+        return None
+    except UnicodeDecodeError:
+        pass
+
+    for encoding in LEGACY_ENCODINGS:
+        try:
+            text = raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        logger.warning("XML não é UTF-8 válido; convertido a partir de %s", encoding)
+        return _DECLARATION_TEXT.sub(r"\g<1>UTF-8", text, count=1).encode("utf-8")
+
+    return None
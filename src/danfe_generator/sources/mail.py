@@ -0,0 +1,241 @@
+"""Leitura de XMLs de NF-e anexados a e-mails (Maildir ou mbox).
+
+Fornecedores enviam os XMLs por e-mail; esta fonte varre uma caixa local
+(Maildir ou arquivo mbox) e extrai os anexos ``.xml`` — inclusive dentro
+de anexos ``.zip`` — em uma única passada, sem gravar os anexos em disco.
+
+A varredura é incremental: os Message-IDs já processados e as chaves de
+acesso já geradas ficam em um arquivo de estado JSON, de modo que cada
+execução processa apenas mensagens novas e a mesma NF-e enviada mais de
+uma vez (reencaminhada, em cópia para várias pessoas) é gerada uma só vez.
+
+O chamador confirma o resultado de cada documento com ``record``: uma
+mensagem só é marcada como processada quando todos os seus anexos foram
+gerados com sucesso, e só as chaves confirmadas entram no estado. Um
+anexo que falha é tentado de novo na próxima execução.
+
+Classes:
+    MailSource: Fonte de XMLs extraídos de uma caixa de e-mail local.
+
+Example:
+    >>> source = MailSource(Path("~/Maildir").expanduser())
+    >>> generator.generate_from_source(source, "./output")
+"""
+
+from __future__ import annotations
+
+import email.policy
+import hashlib
+import json
+import logging
+import mailbox
+import zipfile
+from collections import deque
+from collections.abc import Iterator
+from email.message import EmailMessage, Message
+from email.parser import BytesParser
+from pathlib import Path
+from typing import Any
+
+from danfe_generator.sources.archive import iter_zip_bytes
+from danfe_generator.utils.file_handlers import safe_write_file
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = ".danfe-mail-state.json"
+
+_PARSER = BytesParser(policy=email.policy.default)
+
+
+def default_state_path(mailbox_path: Path) -> Path:
+    """Arquivo de estado padrão: dentro do Maildir, ou ao lado do mbox."""
+    if mailbox_path.is_dir():
+        return mailbox_path / STATE_FILENAME
+    return mailbox_path.with_name(f"{mailbox_path.name}{STATE_FILENAME}")
+
+
+class MailSource:
+    """Fonte de XMLs extraídos de anexos de uma caixa de e-mail local.
+
+    Cada documento recebe como nome a chave de acesso (ou, sem chave, o
+    nome do anexo). O resultado de cada documento deve ser informado em
+    ``record`` (``generate_from_source`` já o faz); o estado é gravado em
+    ``close``.
+
+    Attributes:
+        path: Maildir (diretório) ou arquivo mbox.
+        state_path: Arquivo JSON com Message-IDs e chaves processados.
+        messages: Mensagens novas lidas nesta execução.
+        duplicates: Anexos ignorados por chave de acesso repetida.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        state_path: str | Path | None = None,
+        dedupe: bool = True,
+    ) -> None:
+        """
+        Inicializa a fonte.
+
+        Args:
+            path: Maildir (diretório com cur/new/tmp) ou arquivo mbox
+            state_path: Arquivo de estado. Se None, usa o padrão.
+            dedupe: Se True, ignora chaves de acesso já vistas
+
+        Raises:
+            FileNotFoundError: Se a caixa não existir
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Caixa de e-mail não encontrada: {self.path}")
+
+        self.state_path = Path(state_path) if state_path else default_state_path(self.path)
+        self.dedupe = dedupe
+        self.messages = 0
+        self.duplicates = 0
+
+        state = self._load_state()
+        self._processed: set[str] = set(state.get("messages", []))
+        self._keys: set[str] = set(state.get("keys", []))
+        self._seen: set[str] = set()
+        # Documentos entregues e ainda não confirmados, por mensagem
+        self._outstanding: dict[str, int] = {}
+        # Mensagem de cada documento entregue, na ordem de entrega (por nome)
+        self._waiting: dict[str, deque[str]] = {}
+        # Mensagens com anexo duplicado de uma chave ainda não confirmada
+        self._dependents: dict[str, list[str]] = {}
+
+    def _load_state(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Estado de e-mail ilegível (%s); recomeçando: %s", self.state_path, e)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _open(self) -> mailbox.Mailbox[Any]:
+        if self.path.is_dir():
+            return mailbox.Maildir(self.path, factory=None, create=False)
+        return mailbox.mbox(self.path, create=False)
+
+    @staticmethod
+    def _message_id(message: Message) -> str:
+        message_id = message.get("Message-ID")
+        if message_id:
+            return str(message_id).strip()
+        # Sem Message-ID: identifica pelo conteúdo dos cabeçalhos principais
+        fingerprint = "|".join(str(message.get(h, "")) for h in ("From", "Date", "Subject"))
+        return "sha256:" + hashlib.sha256(fingerprint.encode()).hexdigest()
+
+    def __iter__(self) -> Iterator[tuple[str, bytes]]:
+        """Itera sobre (nome, XML) dos anexos de mensagens ainda não processadas."""
+        box = self._open()
+        try:
+            for key in box.iterkeys():
+                raw = box.get_bytes(key)
+                # Cabeçalhos primeiro: mensagens já processadas não são decodificadas
+                headers = _PARSER.parsebytes(raw, headersonly=True)
+                message_id = self._message_id(headers)
+                if message_id in self._processed:
+                    continue
+                self.messages += 1
+                message = _PARSER.parsebytes(raw)
+                assert isinstance(message, EmailMessage)
+                # A própria leitura conta como pendente até o último anexo
+                self._outstanding[message_id] = 1
+                for filename, content in self._attachments(message):
+                    item = self._accept(message_id, filename, content)
+                    if item is not None:
+                        self._outstanding[message_id] += 1
+                        self._waiting.setdefault(item[0], deque()).append(message_id)
+                        yield item
+                self._resolve(message_id, success=True)
+        finally:
+            box.close()
+
+    def _attachments(self, message: EmailMessage) -> Iterator[tuple[str, bytes]]:
+        """Anexos XML da mensagem, incluindo XMLs dentro de anexos ZIP."""
+        for part in message.walk():
+            filename = part.get_filename()
+            if not filename or part.is_multipart():
+                continue
+            content = part.get_payload(decode=True)
+            if not isinstance(content, bytes):
+                continue
+            lower = filename.lower()
+            if lower.endswith(".xml"):
+                yield filename, content
+            elif lower.endswith(".zip"):
+                try:
+                    yield from iter_zip_bytes(content)
+                except zipfile.BadZipFile:
+                    logger.warning("Anexo ZIP inválido ignorado: %s", filename)
+
+    def _accept(self, message_id: str, filename: str, content: bytes) -> tuple[str, bytes] | None:
+        """Aplica a deduplicação por chave de acesso."""
+        # Importação tardia: core.access_key depende deste pacote
+        from danfe_generator.core.access_key import find_access_key
+
+        key = find_access_key(content)
+        if key is None:
+            return filename, content
+        if self.dedupe and (key in self._keys or key in self._seen):
+            self.duplicates += 1
+            logger.info("NF-e %s já processada; anexo %s ignorado", key, filename)
+            if key not in self._keys:
+                # Ainda em andamento: a mensagem depende do resultado da chave
+                self._outstanding[message_id] += 1
+                self._dependents.setdefault(key, []).append(message_id)
+            return None
+        self._seen.add(key)
+        return key, content
+
+    def _resolve(self, message_id: str, success: bool) -> None:
+        """Conta um documento confirmado; marca a mensagem ao confirmar todos."""
+        if message_id not in self._outstanding:
+            return  # Já falhou: fica para a próxima execução
+        if not success:
+            del self._outstanding[message_id]
+            return
+        self._outstanding[message_id] -= 1
+        if self._outstanding[message_id] == 0:
+            del self._outstanding[message_id]
+            self._processed.add(message_id)
+
+    def record(self, name: str, pdf_path: str | None, error_message: str | None) -> None:
+        """
+        Confirma o resultado de um documento entregue pela iteração.
+
+        Com sucesso, memoriza a chave de acesso; a mensagem de origem é
+        marcada como processada quando todos os seus anexos forem
+        confirmados. Com falha, a mensagem (e as que repetem a mesma
+        chave) será lida de novo na próxima execução.
+
+        Args:
+            name: Nome do documento (chave de acesso ou nome do anexo)
+            pdf_path: PDF gerado, ou None em caso de falha
+            error_message: Mensagem de erro, ou None em caso de sucesso
+        """
+        success = pdf_path is not None and error_message is None
+        if success and name in self._seen:
+            self._keys.add(name)
+        waiting = self._waiting.get(name)
+        if waiting:
+            self._resolve(waiting.popleft(), success)
+            if not waiting:
+                del self._waiting[name]
+        for message_id in self._dependents.pop(name, []):
+            self._resolve(message_id, success)
+
+    def close(self) -> None:
+        """Grava o estado (Message-IDs e chaves) de forma atômica."""
+        state = {"messages": sorted(self._processed), "keys": sorted(self._keys)}
+        safe_write_file(self.state_path, json.dumps(state))
+        logger.info(
+            "E-mail: %d mensagem(ns) nova(s), %d anexo(s) duplicado(s)",
+            self.messages,
+            self.duplicates,
+        )
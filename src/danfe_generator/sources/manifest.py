@@ -0,0 +1,172 @@
+"""Leitura de manifestos de lote (CSV ou JSONL) com opções por linha.
+
+Um manifesto descreve exatamente quais notas gerar e onde gravar cada PDF.
+Cada linha tem as colunas (ou chaves JSON):
+
+    - ``xml``: caminho do XML (relativo ao diretório do manifesto), ou
+    - ``xml_base64``: conteúdo do XML em base64
+    - ``output``: caminho do PDF (opcional; relativo ao manifesto)
+    - ``profile``: arquivo YAML de configuração da linha (opcional)
+    - ``id``: identificador devolvido no resultado (opcional)
+
+O manifesto é lido linha a linha, sob demanda: manifestos com milhões de
+linhas nunca são carregados inteiros em memória. Arquivos ``.csv`` são
+lidos como CSV com cabeçalho; os demais, como JSON Lines.
+
+Classes:
+    ManifestEntry: Uma linha do manifesto, com o XML já lido.
+
+Functions:
+    iter_manifest: Itera sobre as linhas de um manifesto.
+
+Example:
+    >>> for entry in iter_manifest(Path("jobs.jsonl"), "./output"):
+    ...     print(entry.line, entry.name, entry.output_path)
+"""
+
+from __future__ import annotations
+
+import base64
+import csv
+import json
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from danfe_generator.core.config import DANFEConfig
+from danfe_generator.sources.compressed import read_xml, xml_stem
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ManifestEntry:
+    """Linha do manifesto pronta para renderização.
+
+    Attributes:
+        line: Número da linha no manifesto (a partir de 1, sem o cabeçalho CSV).
+        name: Nome do documento: caminho do XML, ou ``id``/``linha-N`` se inline.
+        output_path: Caminho do PDF (informado na linha ou derivado do nome).
+        id: Identificador informado na linha, se houver.
+        content: Conteúdo do XML, ou None se a linha é inválida.
+        profile: Arquivo de configuração informado na linha, se houver.
+        config: Configuração carregada de ``profile``, se houver.
+        error_message: Motivo pelo qual a linha não pode ser processada.
+    """
+
+    line: int
+    name: str
+    output_path: Path
+    id: str | None = None
+    content: bytes | None = None
+    profile: str | None = None
+    config: DANFEConfig | None = None
+    error_message: str | None = None
+
+    def to_record(self) -> dict[str, Any]:
+        """Campos de identificação da linha para o arquivo de resultados."""
+        return {"line": self.line, "id": self.id, "xml": self.name}
+
+
+def _rows(path: Path) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """Linhas brutas do manifesto: (número, campos, erro de leitura)."""
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                yield number, {k: v for k, v in row.items() if k and v}, None
+            return
+
+        for number, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                yield number, None, f"JSON inválido: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield number, None, "Linha deve ser um objeto JSON"
+                continue
+            yield number, row, None
+
+
+def iter_manifest(
+    path: str | Path,
+    output_dir: str | Path | None = None,
+) -> Iterator[ManifestEntry]:
+    """
+    Itera sobre as linhas de um manifesto, lendo o XML de cada uma.
+
+    Linhas inválidas (sem XML, arquivo ausente, base64 ou perfil inválido)
+    são produzidas com ``error_message`` em vez de interromper o lote, para
+    que o resultado mantenha uma linha por linha do manifesto. Perfis são
+    carregados uma única vez.
+
+    Args:
+        path: Caminho do manifesto (.csv ou .jsonl)
+        output_dir: Diretório dos PDFs das linhas sem ``output``. Se None,
+            usa o diretório do XML (ou do manifesto, se inline).
+
+    Yields:
+        ManifestEntry para cada linha, na ordem do manifesto
+
+    Raises:
+        FileNotFoundError: Se o manifesto não existir
+    """
+    path = Path(path)
+    base_dir = path.parent
+    output_dir = Path(output_dir) if output_dir else None
+    profiles: dict[str, DANFEConfig | str] = {}
+
+    for number, row, error in _rows(path):
+        if row is None:
+            name = f"linha-{number}"
+            output_path = (output_dir or base_dir) / f"{name}.pdf"
+            entry = ManifestEntry(number, name, output_path, error_message=error)
+            logger.error("Linha %d do manifesto: %s", number, error)
+            yield entry
+            continue
+
+        row_id = str(row["id"]) if row.get("id") is not None else None
+        xml_path = base_dir / str(row["xml"]) if row.get("xml") else None
+        if xml_path is not None:
+            name, stem = str(xml_path), xml_stem(xml_path)
+            default_dir = output_dir or xml_path.parent
+        else:
+            name = stem = row_id or f"linha-{number}"
+            default_dir = output_dir or base_dir
+        if row.get("output"):
+            output_path = base_dir / str(row["output"])
+        else:
+            output_path = default_dir / f"{stem}.pdf"
+
+        entry = ManifestEntry(number, name, output_path, id=row_id)
+        try:
+            if xml_path is not None:
+                entry.content = read_xml(xml_path)
+            elif row.get("xml_base64"):
+                entry.content = base64.b64decode(str(row["xml_base64"]), validate=True)
+            else:
+                entry.error_message = "Linha sem 'xml' nem 'xml_base64'"
+        except (OSError, ValueError) as e:
+            entry.error_message = str(e)
+
+        if row.get("profile"):
+            entry.profile = str(row["profile"])
+            if entry.profile not in profiles:
+                try:
+                    profiles[entry.profile] = DANFEConfig.from_yaml(base_dir / entry.profile)
+                except (OSError, ValueError, AttributeError) as e:
+                    profiles[entry.profile] = f"Perfil inválido {entry.profile}: {e}"
+            loaded = profiles[entry.profile]
+            if isinstance(loaded, str):
+                entry.error_message = entry.error_message or loaded
+            else:
+                entry.config = loaded
+
+        if entry.error_message:
+            entry.content = None
+            logger.error("Linha %d do manifesto: %s", number, entry.error_message)
+        yield entry
@@ -0,0 +1,74 @@
+"""Entrada por pipes: XML pelo stdin e listas de caminhos separados por NUL.
+
+Permite usar o gerador em pipelines de shell sem arquivos temporários::
+
+    cat nota.xml | danfe - -o - > nota.pdf
+    find /arquivo -name '*.xml' -print0 | danfe --batch --files0-from -
+
+A lista de caminhos é lida em blocos conforme chega (``read1``), de modo
+que a geração começa enquanto o ``find`` ainda está varrendo o disco.
+
+Functions:
+    read_stream: Lê um XML inteiro de um stream, com limite de tamanho.
+    iter_nul_paths: Itera sobre caminhos separados por NUL de um stream.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+
+from danfe_generator.sources.compressed import MAX_XML_BYTES
+
+# Nome usado na linha de comando para stdin/stdout
+STDIO = "-"
+CHUNK_SIZE = 64 * 1024
+
+
+def read_stream(stream: IO[bytes], max_bytes: int = MAX_XML_BYTES) -> bytes:
+    """
+    Lê um XML de um stream (ex.: stdin) até o fim.
+
+    Args:
+        stream: Stream binário de entrada
+        max_bytes: Tamanho máximo aceito
+
+    Returns:
+        Conteúdo lido
+
+    Raises:
+        ValueError: Se o conteúdo exceder ``max_bytes``
+    """
+    data = stream.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"Entrada excede o limite de {max_bytes} bytes")
+    return data
+
+
+def iter_nul_paths(stream: IO[bytes], chunk_size: int = CHUNK_SIZE) -> Iterator[Path]:
+    """
+    Itera sobre caminhos separados por NUL (``find -print0``), sob demanda.
+
+    Cada caminho é produzido assim que seu terminador chega; o último
+    caminho não precisa de terminador. Nomes são decodificados como o
+    sistema de arquivos (``os.fsdecode``), preservando bytes inválidos.
+
+    Args:
+        stream: Stream binário com a lista de caminhos
+        chunk_size: Tamanho máximo de cada leitura
+
+    Yields:
+        Path para cada caminho não vazio
+    """
+    # read1 retorna o que já está disponível no pipe, sem esperar encher o bloco
+    read = getattr(stream, "read1", stream.read)
+    pending = b""
+    while chunk := read(chunk_size):
+        *names, pending = (pending + chunk).split(b"\0")
+        for name in names:
+            if name:
+                yield Path(os.fsdecode(name))
+    if pending:
+        yield Path(os.fsdecode(pending))
@@ -9,6 +9,7 @@ Manipulação de cores:
 Manipulação de arquivos:
     - ensure_directory: Cria diretório se não existir
     - safe_write_file: Escrita atômica com backup opcional
+    - AtomicWriter: Escrita atômica concorrente com política de fsync
 
 Example:
     >>> from danfe_generator.utils import hex_to_rgb, ensure_directory
@@ -16,6 +17,7 @@ Example:
     >>> ensure_directory("./output/pdfs")
 """
 
+from danfe_generator.utils.atomic import AtomicWriter
 from danfe_generator.utils.colors import hex_to_rgb, rgb_to_hex
 from danfe_generator.utils.file_handlers import ensure_directory, safe_write_file
 
@@ -24,4 +26,5 @@ __all__ = [
     "rgb_to_hex",
     "ensure_directory",
     "safe_write_file",
+    "AtomicWriter",
 ]
@@ -0,0 +1,190 @@
+"""Escrita atômica de arquivos, segura entre processos, com política de fsync.
+
+Cada escrita vai para um arquivo temporário oculto no mesmo diretório,
+com nome único criado com ``O_EXCL`` (dois workers gravando o mesmo
+destino nunca compartilham o temporário), e é movida para o destino com
+``os.replace``. Um processo interrompido deixa no máximo um temporário
+órfão, nunca um PDF truncado com o nome final.
+
+Diretórios de destino são criados sob demanda e memorizados: com
+milhões de PDFs distribuídos em poucos milhares de diretórios, evita-se
+um ``mkdir(parents=True)`` por arquivo.
+
+A durabilidade é uma escolha explícita (``fsync``):
+
+- ``none``: sem fsync; o arquivo é atômico, mas pode se perder em uma
+  queda de energia (padrão, como antes);
+- ``file``: fsync do arquivo e do diretório a cada escrita (mais lento);
+- ``batch``: fsync adiado e agrupado; ``sync`` sincroniza os arquivos
+  pendentes e cada diretório uma única vez (chamado ao final do lote, e
+  automaticamente a cada ``batch_size`` arquivos).
+
+Classes:
+    AtomicWriter: Escritor atômico com política de fsync.
+
+Example:
+    >>> writer = AtomicWriter(fsync="batch")
+    >>> for name, pdf in pdfs:
+    ...     writer.write_bytes(output_dir / name, pdf)
+    >>> writer.sync()
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import secrets
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO
+
+FSYNC_POLICIES: tuple[str, ...] = ("none", "file", "batch")
+DEFAULT_SYNC_BATCH = 1000
+
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def _fsync_path(path: Path, directory: bool = False) -> None:
+    """Sincroniza um arquivo (ou diretório, onde suportado) já gravado."""
+    if directory and not hasattr(os, "O_DIRECTORY"):
+        return  # pragma: no cover - Windows não sincroniza diretórios
+    flags = os.O_RDONLY | (os.O_DIRECTORY if directory else 0)
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class AtomicWriter:
+    """Escritor atômico com política de fsync.
+
+    Seguro para uso por várias threads; processos distintos podem gravar
+    no mesmo diretório (ou no mesmo destino) sem colisão de temporários.
+    Os diretórios já criados ficam em cache; se um deles for removido
+    externamente, é recriado na escrita seguinte.
+
+    Attributes:
+        fsync: Política de fsync ("none", "file" ou "batch").
+        batch_size: Arquivos pendentes que disparam ``sync`` no modo "batch".
+    """
+
+    def __init__(self, fsync: str = "none", batch_size: int = DEFAULT_SYNC_BATCH) -> None:
+        """
+        Inicializa o escritor.
+
+        Args:
+            fsync: Política de fsync ("none", "file" ou "batch")
+            batch_size: No modo "batch", sincroniza ao acumular este número
+                de arquivos, limitando a memória e o trabalho de ``sync``
+
+        Raises:
+            ValueError: Se a política for inválida
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Política de fsync deve ser uma de: {', '.join(FSYNC_POLICIES)}")
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self._pending: list[Path] = []
+        self._directories: set[Path] = set()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def open(self, path: str | Path) -> Iterator[IO[bytes]]:
+        """
+        Abre o destino para escrita atômica.
+
+        O conteúdo só aparece em ``path`` ao sair do bloco sem exceção; em
+        caso de erro, o temporário é removido e o destino fica intacto.
+
+        Args:
+            path: Caminho final do arquivo (o diretório é criado se necessário)
+
+        Yields:
+            Stream binário do arquivo temporário
+        """
+        path = Path(path)
+        tmp_path, fd = self._create_temp(path)
+        try:
+            with os.fdopen(fd, "wb") as stream:
+                yield stream
+                if self.fsync == "file":
+                    stream.flush()
+                    os.fsync(stream.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                tmp_path.unlink()
+            raise
+
+        if self.fsync == "file":
+            _fsync_path(path.parent, directory=True)
+        elif self.fsync == "batch":
+            self._defer(path)
+
+    def write_bytes(self, path: str | Path, data: bytes) -> Path:
+        """
+        Grava ``data`` em ``path`` de forma atômica.
+
+        Returns:
+            Caminho gravado
+        """
+        with self.open(path) as stream:
+            stream.write(data)
+        return Path(path)
+
+    def _create_temp(self, path: Path) -> tuple[Path, int]:
+        """Cria um temporário oculto e exclusivo ao lado do destino."""
+        parent = path.parent
+        if parent not in self._directories:
+            self._make_directory(parent)
+        retried = False
+        while True:
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+            try:
+                return tmp_path, os.open(tmp_path, _OPEN_FLAGS, 0o644)
+            except FileExistsError:  # pragma: no cover - colisão improvável
+                continue
+            except FileNotFoundError:
+                # Diretório em cache removido por fora: recria uma vez
+                if retried:
+                    raise
+                retried = True
+                self._make_directory(parent)
+
+    def _make_directory(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._directories.add(directory)
+
+    def _defer(self, path: Path) -> None:
+        with self._lock:
+            self._pending.append(path)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.sync()
+
+    def sync(self) -> int:
+        """
+        Sincroniza os arquivos pendentes (modo "batch") e seus diretórios.
+
+        Cada diretório é sincronizado uma única vez, depois de todos os
+        seus arquivos. Nos demais modos, não faz nada.
+
+        Returns:
+            Quantidade de arquivos sincronizados
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        directories: set[Path] = set()
+        for path in pending:
+            try:
+                _fsync_path(path)
+            except FileNotFoundError:
+                continue  # substituído ou removido depois de gravado
+            directories.add(path.parent)
+        for directory in directories:
+            _fsync_path(directory, directory=True)
+        return len(pending)
@@ -20,6 +20,8 @@ from __future__ import annotations
 import shutil
 from pathlib import Path
 
+from danfe_generator.utils.atomic import AtomicWriter
+
 
 def _validate_path(path: str | Path, base_dir: Path | None = None) -> Path:
     """
@@ -67,6 +69,7 @@ def safe_write_file(
     content: str | bytes,
     encoding: str = "utf-8",
     backup: bool = False,
+    fsync: str = "none",
 ) -> Path:
     """
     Escreve arquivo de forma segura (atômica).
@@ -76,6 +79,8 @@ def safe_write_file(
         content: Conteúdo a escrever
         encoding: Encoding para texto
         backup: Se True, faz backup do arquivo existente
+        fsync: Política de fsync ("none", "file" ou "batch"; em uma
+            escrita isolada, "batch" equivale a "file")
 
     Returns:
         Path do arquivo escrito
@@ -97,22 +102,11 @@ def safe_write_file(
         else:
             shutil.copy2(path, backup_path, follow_symlinks=False)
 
-    # Escrever via arquivo temporário para atomicidade
-    # Usar with_name para garantir que o tmp fique no mesmo diretório
-    tmp_path = path.with_name(f"{path.name}.tmp")
-
-    try:
-        if isinstance(content, bytes):
-            tmp_path.write_bytes(content)
-        else:
-            tmp_path.write_text(content, encoding=encoding)
-
-        # Mover atomicamente
-        tmp_path.replace(path)
-    finally:
-        # Limpar tmp se ainda existir
-        if tmp_path.exists():
-            tmp_path.unlink()
+    # Temporário exclusivo no mesmo diretório, movido atomicamente
+    data = content if isinstance(content, bytes) else content.encode(encoding)
+    writer = AtomicWriter(fsync)
+    writer.write_bytes(path, data)
+    writer.sync()
 
     return path
 
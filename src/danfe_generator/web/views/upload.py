@@ -7,8 +7,6 @@ para geração de DANFE a partir de XMLs existentes.
 from __future__ import annotations
 
 import tempfile
-from collections.abc import Iterator
-from contextlib import contextmanager
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -25,18 +23,8 @@ from danfe_generator.web.components.layout import (
 if TYPE_CHECKING:
     from streamlit.runtime.uploaded_file_manager import UploadedFile
 
-
-@contextmanager
-def temporary_file(suffix: str = "") -> Iterator[Path]:
-    """Context manager para arquivos temporários com limpeza automática."""
-    tmp_path = None
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp_path = Path(tmp.name)
-        yield tmp_path
-    finally:
-        if tmp_path and tmp_path.exists():
-            tmp_path.unlink()
+    from danfe_generator.core.generator import GenerationResult
+    from danfe_generator.core.progress import Progress
 
 
 def render_upload_view(
@@ -106,47 +94,47 @@ def _process_files(
     status_text = st.empty()
 
     results_container = st.container()
-    success_count = 0
-    error_count = 0
 
-    for idx, uploaded_file in enumerate(uploaded_files):
+    def show_progress(state: Progress) -> None:
+        progress.progress(state.fraction or 0.0)
+        eta = f" • ~{state.eta_s:.0f}s restantes" if state.eta_s is not None else ""
         with status_text:
-            render_processing_status(uploaded_file.name)
-        progress.progress((idx + 1) / len(uploaded_files))
-
-        try:
-            with temporary_file(suffix=".xml") as xml_path:
-                xml_path.write_bytes(uploaded_file.getvalue())
-
-                with temporary_file(suffix=".pdf") as pdf_path:
-                    result = generator.generate(xml_path, pdf_path)
-
-                    if result.success:
-                        pdf_bytes = pdf_path.read_bytes()
-
-                        with results_container:
-                            col1, col2 = st.columns([4, 1])
-                            with col1:
-                                st.success(f"◆ {uploaded_file.name}")
-                            with col2:
-                                # Usar índice para garantir chave única
-                                st.download_button(
-                                    label="Download PDF",
-                                    data=pdf_bytes,
-                                    file_name=f"{Path(uploaded_file.name).stem}.pdf",
-                                    mime="application/pdf",
-                                    key=f"download_{idx}_{uploaded_file.name}",
-                                )
-                        success_count += 1
-                    else:
-                        with results_container:
-                            st.error(f"✕ {uploaded_file.name}: {result.error_message}")
-                        error_count += 1
-
-        except Exception as e:
-            with results_container:
-                st.error(f"✕ Erro em {uploaded_file.name}: {e}")
-            error_count += 1
+            render_processing_status(
+                f"{state.done}/{state.total} • {state.docs_per_s:.1f} doc/s{eta}"
+            )
+
+    def show_result(result: GenerationResult) -> None:
+        # O diretório de cada XML é o índice do upload (nomes repetidos não colidem)
+        idx = int(result.xml_path.parent.name)
+        name = uploaded_files[idx].name
+        with results_container:
+            if not result.success or result.pdf_path is None:
+                st.error(f"✕ {name}: {result.error_message}")
+                return
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.success(f"◆ {name}")
+            with col2:
+                # Usar índice para garantir chave única
+                st.download_button(
+                    label="Download PDF",
+                    data=result.pdf_path.read_bytes(),
+                    file_name=f"{Path(name).stem}.pdf",
+                    mime="application/pdf",
+                    key=f"download_{idx}_{name}",
+                )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        xml_paths = []
+        for idx, uploaded_file in enumerate(uploaded_files):
+            xml_path = Path(tmp_dir) / str(idx) / "upload.xml"
+            xml_path.parent.mkdir()
+            xml_path.write_bytes(uploaded_file.getvalue())
+            xml_paths.append(xml_path)
+
+        batch = generator.generate_batch(
+            xml_paths, on_result=show_result, on_progress=show_progress
+        )
 
     progress.empty()
     status_text.empty()
@@ -159,8 +147,8 @@ def _process_files(
     with col_s1:
         st.metric("TOTAL", len(uploaded_files))
     with col_s2:
-        st.metric("SUCESSO", success_count)
+        st.metric("SUCESSO", batch.successful)
     with col_s3:
-        st.metric("ERROS", error_count)
+        st.metric("ERROS", batch.failed)
 
     # Cleanup temp logo is handled by app.py now
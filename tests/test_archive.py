@@ -0,0 +1,127 @@
+"""Testes para leitura de XMLs diretamente de arquivos ZIP/TAR."""
+
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.sources import archive as archive_module
+from danfe_generator.sources import is_archive, iter_archive
+
+
+def make_zip(path: Path, members: dict[str, bytes]) -> Path:
+    """Cria um arquivo ZIP com os membros informados."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return path
+
+
+def make_tar(path: Path, members: dict[str, bytes]) -> Path:
+    """Cria um arquivo TAR (comprimido conforme a extensão)."""
+    with tarfile.open(path, "w:gz" if path.name.endswith(".gz") else "w") as archive:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return path
+
+
+class TestIterArchive:
+    """Testes para iter_archive."""
+
+    @pytest.mark.parametrize("name", ["notas.zip", "notas.tar", "notas.tar.gz"])
+    def test_reads_members(self, temp_dir: Path, name: str):
+        """Testa leitura de membros XML de ZIP, TAR e TAR.GZ."""
+        members = {"2024/01/a.xml": b"<a/>", "b.XML": b"<b/>", "leia-me.txt": b"texto"}
+        maker = make_zip if name.endswith(".zip") else make_tar
+        path = maker(temp_dir / name, members)
+
+        assert is_archive(path)
+        assert dict(iter_archive(path)) == {"2024/01/a.xml": b"<a/>", "b.XML": b"<b/>"}
+
+    def test_accept_filter(self, temp_dir: Path):
+        """Testa filtro por nome aplicado antes da leitura."""
+        path = make_zip(temp_dir / "notas.zip", {"a.xml": b"<a/>", "b.xml": b"<b/>"})
+
+        names = [name for name, _ in iter_archive(path, accept=lambda n: n == "b.xml")]
+        assert names == ["b.xml"]
+
+    @pytest.mark.parametrize("name", ["notas.zip", "notas.tar.gz"])
+    def test_oversized_member_skipped(self, temp_dir: Path, name: str):
+        """Testa que membros acima do limite são ignorados sem serem carregados."""
+        members = {"grande.xml": b"<a>" + b" " * 2048 + b"</a>", "ok.xml": b"<b/>"}
+        maker = make_zip if name.endswith(".zip") else make_tar
+        path = maker(temp_dir / name, members)
+
+        assert dict(iter_archive(path, max_bytes=1024)) == {"ok.xml": b"<b/>"}
+
+    def test_understated_size(self):
+        """Testa leitura limitada mesmo se o tamanho declarado no cabeçalho mentir."""
+        stream = io.BytesIO(b"x" * 4096)
+
+        assert archive_module._read_member(stream, "bomba.xml", 10, max_bytes=1024) is None
+        assert stream.tell() == 1025
+
+    def test_unsupported_format(self, temp_dir: Path):
+        """Testa formato não suportado."""
+        path = temp_dir / "notas.rar"
+        path.write_bytes(b"x")
+
+        assert not is_archive(path)
+        with pytest.raises(ValueError):
+            list(iter_archive(path))
+
+
+class TestGenerateFromArchive:
+    """Testes para geração a partir de arquivos compactados."""
+
+    def test_generate_from_zip(
+        self, generator: DANFEGenerator, temp_dir: Path, sample_xml_content: str
+    ):
+        """Testa geração sem extrair, mantendo o nome do membro."""
+        path = make_zip(
+            temp_dir / "notas.zip",
+            {"jan/nota1.xml": sample_xml_content.encode(), "ruim.xml": b"<root/>"},
+        )
+        output_dir = temp_dir / "output"
+
+        result = generator.generate_from_directory(path, output_dir)
+
+        assert result.total == 2
+        assert result.successful == 1
+        by_name = {r.xml_path: r for r in result.results}
+        assert by_name[Path("jan/nota1.xml")].pdf_path == output_dir / "nota1.pdf"
+        assert (output_dir / "nota1.pdf").read_bytes().startswith(b"%PDF")
+        assert not by_name[Path("ruim.xml")].success
+        assert sorted(p.name for p in temp_dir.iterdir()) == ["notas.zip", "output"]
+
+    def test_generate_from_tar_gz_shard(
+        self, generator: DANFEGenerator, temp_dir: Path, sample_xml_content: str
+    ):
+        """Testa que os shards de um TAR.GZ particionam os membros."""
+        members = {f"nota{i}.xml": sample_xml_content.encode() for i in range(4)}
+        path = make_tar(temp_dir / "notas.tar.gz", members)
+
+        names = []
+        for index in (1, 2):
+            result = generator.generate_from_archive(path, temp_dir / "out", shard=f"{index}/2")
+            names.extend(str(r.xml_path) for r in result.results)
+
+        assert sorted(names) == sorted(members)
+
+    def test_same_name_members_do_not_overwrite(
+        self, generator: DANFEGenerator, temp_dir: Path, sample_xml_content: str
+    ):
+        """Testa membros de mesmo nome em pastas diferentes."""
+        content = sample_xml_content.encode()
+        path = make_zip(temp_dir / "notas.zip", {"jan/nota.xml": content, "fev/nota.xml": content})
+
+        result = generator.generate_from_archive(path, temp_dir / "out")
+
+        assert result.successful == 2
+        pdfs = sorted(r.pdf_path.name for r in result.results)
+        assert pdfs == ["nota-2.pdf", "nota.pdf"]
@@ -0,0 +1,110 @@
+"""Testes para a escrita atômica com política de fsync."""
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEConfig, DANFEGenerator
+from danfe_generator.utils.atomic import AtomicWriter
+
+
+@pytest.fixture
+def fsync_calls(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Registra as chamadas a os.fsync (sem sincronizar de fato)."""
+    calls: list[int] = []
+    monkeypatch.setattr(os, "fsync", calls.append)
+    return calls
+
+
+class TestAtomicWriter:
+    """Testes para AtomicWriter."""
+
+    def test_concurrent_writers_same_target(self, temp_dir: Path):
+        """Testa escritores concorrentes no mesmo destino, sem temporários órfãos."""
+        target = temp_dir / "nota.pdf"
+        writer = AtomicWriter()
+        payloads = [bytes([i]) * 4096 for i in range(8)]
+
+        def write(data: bytes) -> None:
+            for _ in range(20):
+                writer.write_bytes(target, data)
+
+        threads = [threading.Thread(target=write, args=(data,)) for data in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert target.read_bytes() in payloads
+        assert [p.name for p in temp_dir.iterdir()] == ["nota.pdf"]
+
+    def test_error_keeps_target(self, temp_dir: Path):
+        """Testa que uma falha na escrita preserva o destino e remove o temporário."""
+        target = temp_dir / "nota.pdf"
+        target.write_bytes(b"original")
+
+        with pytest.raises(RuntimeError), AtomicWriter().open(target) as stream:
+            stream.write(b"parcial")
+            raise RuntimeError("falha")
+
+        assert target.read_bytes() == b"original"
+        assert [p.name for p in temp_dir.iterdir()] == ["nota.pdf"]
+
+    def test_fsync_per_file(self, temp_dir: Path, fsync_calls: list[int]):
+        """Testa fsync do arquivo e do diretório a cada escrita."""
+        writer = AtomicWriter(fsync="file")
+
+        writer.write_bytes(temp_dir / "a.pdf", b"a")
+        writer.write_bytes(temp_dir / "b.pdf", b"b")
+
+        assert len(fsync_calls) == 4
+
+    def test_fsync_batch(self, temp_dir: Path, fsync_calls: list[int]):
+        """Testa fsync adiado: arquivos e cada diretório uma única vez no sync."""
+        (temp_dir / "sub").mkdir()
+        writer = AtomicWriter(fsync="batch")
+
+        for name in ("a.pdf", "b.pdf", "sub/c.pdf"):
+            writer.write_bytes(temp_dir / name, b"x")
+        assert fsync_calls == []
+
+        assert writer.sync() == 3
+        assert len(fsync_calls) == 5
+        assert writer.sync() == 0
+
+    def test_fsync_batch_size(self, temp_dir: Path, fsync_calls: list[int]):
+        """Testa sincronização automática ao atingir batch_size."""
+        writer = AtomicWriter(fsync="batch", batch_size=2)
+
+        writer.write_bytes(temp_dir / "a.pdf", b"a")
+        writer.write_bytes(temp_dir / "b.pdf", b"b")
+
+        assert len(fsync_calls) == 3
+
+    def test_invalid_policy(self):
+        """Testa política de fsync inválida."""
+        with pytest.raises(ValueError):
+            AtomicWriter(fsync="sempre")
+        with pytest.raises(ValueError):
+            DANFEConfig(fsync="sempre")
+
+
+class TestGeneratorFsync:
+    """Testes da política de fsync no gerador."""
+
+    def test_batch_synced_at_end(
+        self,
+        sample_xml_file: Path,
+        temp_dir: Path,
+        fsync_calls: list[int],
+    ):
+        """Testa lote com fsync "batch": uma sincronização ao final do lote."""
+        generator = DANFEGenerator(DANFEConfig(fsync="batch"))
+
+        result = generator.generate_batch([sample_xml_file], temp_dir / "output")
+
+        assert result.successful == 1
+        assert len(fsync_calls) == 2
+        assert [p.name for p in (temp_dir / "output").iterdir()] == ["test_nfe.pdf"]
@@ -0,0 +1,90 @@
+"""Testes para transferência de PDFs via memória compartilhada."""
+
+import io
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.buffers import RenderedPDF, SharedPDF
+
+
+def segment_exists(name: str) -> bool:
+    """Verifica se um segmento de memória compartilhada ainda existe."""
+    try:
+        segment = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return False
+    segment.close()
+    return True
+
+
+class TestSharedPDF:
+    """Testes para SharedPDF."""
+
+    def test_roundtrip(self):
+        """Testa escrita e leitura do segmento."""
+        shared = SharedPDF.from_bytes(b"%PDF-1.4 conteudo")
+        try:
+            with shared.view() as view:
+                assert bytes(view) == b"%PDF-1.4 conteudo"
+            assert shared.size == 17
+        finally:
+            shared.release()
+
+        assert not segment_exists(shared.name)
+
+    def test_release_is_idempotent(self):
+        """Testa liberar o mesmo segmento duas vezes."""
+        shared = SharedPDF.from_bytes(b"x")
+        shared.release()
+        shared.release()
+
+
+class TestRenderedPDF:
+    """Testes para RenderedPDF."""
+
+    def test_write_local_data(self):
+        """Testa escrita de PDF renderizado localmente."""
+        pdf = RenderedPDF(name="nota.xml", data=b"%PDF")
+        stream = io.BytesIO()
+
+        assert pdf.write_to(stream) == 4
+        assert stream.getvalue() == b"%PDF"
+
+    def test_context_manager_releases_shared(self):
+        """Testa que sair do with libera o segmento."""
+        shared = SharedPDF.from_bytes(b"%PDF")
+        with RenderedPDF(name="nota.xml", shared=shared) as pdf:
+            assert pdf.tobytes() == b"%PDF"
+
+        assert not segment_exists(shared.name)
+
+    def test_failed_render_has_no_view(self):
+        """Testa erro ao acessar PDF de renderização falha."""
+        pdf = RenderedPDF(name="nota.xml", error_message="falhou")
+        assert not pdf.success
+        with pytest.raises(ValueError):
+            pdf.write_to(io.BytesIO())
+
+
+class TestRenderMany:
+    """Testes para DANFEGenerator.render_many."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_render_many(self, generator: DANFEGenerator, sample_xml_file: Path, workers: int):
+        """Testa renderização em memória, local e em processos worker."""
+        content = sample_xml_file.read_bytes()
+        items = [("a.xml", content), ("b.xml", content), ("ruim.xml", b"<root/>")]
+
+        rendered = {}
+        for pdf in generator.render_many(items, workers=workers):
+            with pdf:
+                rendered[pdf.name] = (pdf.success, pdf.tobytes() if pdf.success else None)
+                if workers > 1 and pdf.success:
+                    assert pdf.shared is not None
+
+        assert rendered["a.xml"][0]
+        assert rendered["a.xml"][1].startswith(b"%PDF")
+        assert not rendered["ruim.xml"][0]
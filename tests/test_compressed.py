@@ -0,0 +1,108 @@
+"""Testes para leitura de XMLs comprimidos (.xml.gz, .xml.bz2, .xml.zst)."""
+
+import bz2
+import gzip
+from pathlib import Path, PurePosixPath
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator, XMLValidator
+from danfe_generator.sources.compressed import (
+    find_xml_files,
+    is_xml_path,
+    read_xml,
+    xml_stem,
+)
+
+COMPRESSORS = {".gz": gzip.compress, ".bz2": bz2.compress}
+
+
+@pytest.fixture(params=sorted(COMPRESSORS))
+def compressed_xml_file(request, temp_dir: Path, sample_xml_content: str) -> Path:
+    """Cria um XML de NFe comprimido (gzip e bz2)."""
+    path = temp_dir / f"nota.xml{request.param}"
+    path.write_bytes(COMPRESSORS[request.param](sample_xml_content.encode()))
+    return path
+
+
+class TestCompressedPaths:
+    """Testes para nomes de arquivos comprimidos."""
+
+    @pytest.mark.parametrize(
+        ("name", "stem", "is_xml"),
+        [
+            ("nota.xml", "nota", True),
+            ("nota.XML.gz", "nota", True),
+            ("nota.xml.bz2", "nota", True),
+            ("nota.tar.gz", "nota", False),
+            ("nota.txt", "nota", False),
+        ],
+    )
+    def test_names(self, name: str, stem: str, is_xml: bool):
+        """Testa reconhecimento e nome-base."""
+        assert is_xml_path(PurePosixPath(name)) is is_xml
+        assert xml_stem(PurePosixPath(name)) == stem
+
+    def test_find_xml_files(self, temp_dir: Path):
+        """Testa que o padrão também encontra versões comprimidas."""
+        for name in ("a.xml", "b.xml.gz", "c.xml.bz2", "d.txt.gz"):
+            (temp_dir / name).write_bytes(b"")
+
+        found = sorted(p.name for p in find_xml_files(temp_dir))
+        assert found == ["a.xml", "b.xml.gz", "c.xml.bz2"]
+
+
+class TestReadXML:
+    """Testes para read_xml."""
+
+    def test_read_compressed(self, compressed_xml_file: Path, sample_xml_content: str):
+        """Testa descompressão transparente."""
+        assert read_xml(compressed_xml_file) == sample_xml_content.encode()
+
+    def test_size_limit(self, temp_dir: Path):
+        """Testa limite do conteúdo descomprimido."""
+        path = temp_dir / "bomba.xml.gz"
+        path.write_bytes(gzip.compress(b"0" * 4096))
+
+        with pytest.raises(ValueError):
+            read_xml(path, max_bytes=1024)
+
+    def test_truncated(self, temp_dir: Path, sample_xml_content: str):
+        """Testa arquivo gzip truncado."""
+        path = temp_dir / "truncado.xml.gz"
+        path.write_bytes(gzip.compress(sample_xml_content.encode())[:100])
+
+        with pytest.raises(OSError):
+            read_xml(path)
+
+    def test_zstd(self, temp_dir: Path, sample_xml_content: str):
+        """Testa .xml.zst quando zstandard está instalado."""
+        zstandard = pytest.importorskip("zstandard")
+        path = temp_dir / "nota.xml.zst"
+        path.write_bytes(zstandard.ZstdCompressor().compress(sample_xml_content.encode()))
+
+        assert read_xml(path) == sample_xml_content.encode()
+
+
+class TestCompressedGeneration:
+    """Testes de validação e geração a partir de XMLs comprimidos."""
+
+    def test_validate(self, compressed_xml_file: Path):
+        """Testa validação de XML comprimido."""
+        assert XMLValidator().validate(compressed_xml_file).is_valid
+
+    def test_generate(self, generator: DANFEGenerator, compressed_xml_file: Path):
+        """Testa geração com nome de saída sem as extensões."""
+        result = generator.generate(compressed_xml_file)
+
+        assert result.success
+        assert result.pdf_path == compressed_xml_file.parent / "nota.pdf"
+
+    @pytest.mark.usefixtures("compressed_xml_file")
+    def test_generate_from_directory(self, generator: DANFEGenerator, temp_dir: Path):
+        """Testa que o lote inclui XMLs comprimidos."""
+        result = generator.generate_from_directory(temp_dir, temp_dir / "output")
+
+        assert result.total == 1
+        assert result.successful == 1
+        assert (temp_dir / "output" / "nota.pdf").exists()
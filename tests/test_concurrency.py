@@ -0,0 +1,124 @@
+"""Testes para o controlador adaptativo de concorrência."""
+
+import pytest
+
+from danfe_generator.core.concurrency import AdaptiveConcurrency
+
+
+class FakeClock:
+    """Relógio controlado manualmente."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run_window(controller: AdaptiveConcurrency, clock: FakeClock, docs: int, seconds: float):
+    """Simula uma janela com `docs` documentos concluídos em `seconds`."""
+    clock.now += seconds
+    return controller.record_completion(docs)
+
+
+class TestAdaptiveConcurrency:
+    """Testes para AdaptiveConcurrency."""
+
+    def test_initial_limit_is_half_of_maximum(self):
+        """Testa limite inicial padrão."""
+        assert AdaptiveConcurrency(maximum=8).limit == 4
+        assert AdaptiveConcurrency(maximum=1).limit == 1
+
+    def test_no_decision_before_window_closes(self):
+        """Testa que nada muda antes de completar a janela."""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(maximum=8, clock=clock)
+
+        assert run_window(controller, clock, docs=10, seconds=0.5) is None
+        assert controller.limit == 4
+
+    def test_additive_increase(self):
+        """Testa aumento aditivo enquanto a vazão não cai."""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(maximum=8, clock=clock)
+
+        decision = run_window(controller, clock, docs=20, seconds=2.0)
+        assert decision is not None
+        assert decision.action == "increase"
+        assert controller.limit == 5
+
+        run_window(controller, clock, docs=24, seconds=2.0)
+        assert controller.limit == 6
+
+    def test_multiplicative_decrease(self):
+        """Testa redução multiplicativa quando a vazão cai."""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(maximum=16, initial=8, clock=clock)
+
+        run_window(controller, clock, docs=40, seconds=2.0)
+        assert controller.limit == 9
+
+        decision = run_window(controller, clock, docs=20, seconds=2.0)
+        assert decision is not None
+        assert decision.action == "decrease"
+        assert controller.limit == 6
+
+    def test_decrease_resets_baseline(self):
+        """Testa que uma janela ruidosa não reduz em cascata e o limite se recupera."""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(maximum=8, initial=8, clock=clock)
+
+        # Vazão proporcional ao limite, com uma única queda de 7% (ruído)
+        run_window(controller, clock, docs=80, seconds=2.0)
+        run_window(controller, clock, docs=74, seconds=2.0)
+        assert controller.limit == 6
+
+        for _ in range(4):
+            run_window(controller, clock, docs=controller.limit * 10, seconds=2.0)
+
+        assert [d.action for d in controller.decisions] == [
+            "hold",
+            "decrease",
+            "increase",
+            "increase",
+            "hold",
+            "hold",
+        ]
+        assert controller.limit == 8
+
+    def test_respects_maximum(self):
+        """Testa que o limite nunca passa do máximo configurado."""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(maximum=3, initial=3, clock=clock)
+
+        decision = run_window(controller, clock, docs=10, seconds=2.0)
+        assert decision is not None
+        assert decision.action == "hold"
+        assert controller.limit == 3
+
+    def test_respects_minimum(self):
+        """Testa que o limite nunca fica abaixo do mínimo."""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(maximum=4, initial=1, clock=clock)
+
+        run_window(controller, clock, docs=40, seconds=2.0)
+        run_window(controller, clock, docs=4, seconds=2.0)
+        assert controller.limit == 1
+
+    def test_decisions_are_recorded(self):
+        """Testa histórico de decisões."""
+        clock = FakeClock()
+        controller = AdaptiveConcurrency(maximum=8, clock=clock)
+
+        run_window(controller, clock, docs=10, seconds=2.0)
+        run_window(controller, clock, docs=10, seconds=2.0)
+
+        assert len(controller.decisions) == 2
+        assert controller.decisions[0].throughput == pytest.approx(5.0)
+
+    def test_invalid_limits(self):
+        """Testa erro com limites inválidos."""
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(maximum=0)
+        with pytest.raises(ValueError):
+            AdaptiveConcurrency(maximum=4, decrease_factor=1.5)
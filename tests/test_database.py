@@ -0,0 +1,93 @@
+"""Testes para a fonte de XMLs em banco de dados."""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.sources.database import DatabaseSource, connect
+
+QUERY = "SELECT chave, xml FROM nfe ORDER BY chave"
+WRITEBACK = "UPDATE nfe SET pdf = ?, erro = ? WHERE chave = ?"
+
+
+@pytest.fixture
+def database(temp_dir: Path, sample_xml_content: str) -> Path:
+    """Banco SQLite com duas NF-e válidas (TEXT e BLOB) e uma inválida."""
+    path = temp_dir / "notas.db"
+    with sqlite3.connect(path) as connection:
+        # WAL permite confirmar o writeback em outra conexão durante a leitura
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE nfe (chave TEXT, xml BLOB, pdf TEXT, erro TEXT)")
+        connection.executemany(
+            "INSERT INTO nfe (chave, xml) VALUES (?, ?)",
+            [
+                ("1", sample_xml_content),
+                ("2", sample_xml_content.encode()),
+                ("3", b"<root/>"),
+            ],
+        )
+    connection.close()
+    return path
+
+
+class TestDatabaseSource:
+    """Testes para DatabaseSource."""
+
+    def test_iterates_in_batches(self, database: Path):
+        """Testa leitura em lotes, normalizando TEXT e BLOB para bytes."""
+        connection = connect(str(database))
+        source = DatabaseSource(connection, QUERY, fetch_size=2)
+
+        items = list(source)
+
+        assert [key for key, _ in items] == ["1", "2", "3"]
+        assert all(isinstance(xml, bytes) for _, xml in items)
+        assert items[0][1] == items[1][1]
+        connection.close()
+
+    def test_invalid_fetch_size(self, database: Path):
+        """Testa fetch_size inválido."""
+        with pytest.raises(ValueError):
+            DatabaseSource(connect(str(database)), QUERY, fetch_size=0)
+
+
+class TestGenerateFromDatabase:
+    """Testes para DANFEGenerator.generate_from_database."""
+
+    @pytest.mark.parametrize("separate_writeback", [False, True])
+    def test_generate_with_writeback(
+        self,
+        generator: DANFEGenerator,
+        database: Path,
+        temp_dir: Path,
+        separate_writeback: bool,
+    ):
+        """Testa geração em memória e gravação do resultado no banco."""
+        connection = connect(str(database))
+        writeback_connection = connect(str(database)) if separate_writeback else None
+        source = DatabaseSource(
+            connection,
+            QUERY,
+            fetch_size=1,
+            writeback=WRITEBACK,
+            writeback_connection=writeback_connection,
+        )
+        output_dir = temp_dir / "output"
+
+        result = generator.generate_from_database(source, output_dir)
+        connection.close()
+        if writeback_connection is not None:
+            writeback_connection.close()
+
+        assert result.total == 3
+        assert result.successful == 2
+        assert sorted(p.name for p in output_dir.iterdir()) == ["1.pdf", "2.pdf"]
+
+        with sqlite3.connect(database) as check:
+            query = check.execute("SELECT chave, pdf, erro FROM nfe")
+            rows = {key: (pdf, erro) for key, pdf, erro in query}
+        assert rows["1"] == (str(output_dir / "1.pdf"), None)
+        assert rows["3"][0] is None
+        assert "XML" in rows["3"][1]
@@ -0,0 +1,152 @@
+"""Testes para a detecção de NF-e duplicadas pela chave de acesso."""
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.access_key import is_authorized, read_document_key
+from danfe_generator.core.dedupe import KeyRegistry
+
+KEY = "35231212345678000195550010000000011000000015"
+
+
+@pytest.fixture
+def corrupt_gz_file(sample_xml_content: str, temp_dir: Path) -> Path:
+    """``.xml.gz`` com cabeçalho gzip válido e stream deflate corrompido."""
+    data = gzip.compress(sample_xml_content.encode())
+    path = temp_dir / "corrompida.xml.gz"
+    path.write_bytes(data[:10] + b"\xff" * 20 + data[30:])
+    return path
+
+
+@pytest.fixture
+def bare_xml_file(sample_xml_content: str, temp_dir: Path) -> Path:
+    """A mesma NF-e do sample_xml_file, sem o protocolo (raiz NFe)."""
+    start = sample_xml_content.index("<NFe")
+    end = sample_xml_content.index("</NFe>") + len("</NFe>")
+    path = temp_dir / "pura.xml"
+    path.write_text(
+        f'<?xml version="1.0" encoding="UTF-8"?>\n{sample_xml_content[start:end]}',
+        encoding="utf-8",
+    )
+    return path
+
+
+class TestDocumentKey:
+    """Testes para a leitura da chave e da versão autorizada."""
+
+    def test_read_document_key(self, sample_xml_file: Path, bare_xml_file: Path):
+        """Testa nfeProc (autorizada) e NF-e pura."""
+        assert read_document_key(sample_xml_file) == (KEY, True)
+        assert read_document_key(bare_xml_file) == (KEY, False)
+        assert not is_authorized(b"<NFe><infNFe/></NFe>")
+
+    def test_corrupt_gzip(self, corrupt_gz_file: Path):
+        """Testa que deflate corrompido é tratado como chave ilegível."""
+        assert read_document_key(corrupt_gz_file) == (None, False)
+
+
+class TestKeyRegistry:
+    """Testes para KeyRegistry."""
+
+    def test_duplicates_in_flight_and_done(self):
+        """Testa cópias em andamento e já geradas."""
+        with KeyRegistry() as registry:
+            assert registry.admit("a.xml", KEY, False)
+            assert not registry.admit("b.xml", KEY, False)
+            registry.complete("a.xml", success=True)
+            assert not registry.admit("c.xml", KEY, False)
+            assert registry.admit("sem_chave.xml", None, False)
+
+            assert registry.duplicates == 2
+            assert KEY in registry
+
+    def test_authorized_supersedes_bare(self):
+        """Testa que a versão nfeProc substitui a NF-e pura, e não o contrário."""
+        with KeyRegistry() as registry:
+            assert registry.admit("pura.xml", KEY, False)
+            registry.complete("pura.xml", success=True)
+            assert registry.admit("proc.xml", KEY, True)
+            registry.complete("proc.xml", success=True)
+            assert not registry.admit("pura-2.xml", KEY, False)
+            assert not registry.admit("proc-2.xml", KEY, True)
+
+            assert registry.superseded == 1
+
+    def test_failure_not_recorded(self):
+        """Testa que uma falha não marca a chave como gerada."""
+        with KeyRegistry() as registry:
+            registry.admit("a.xml", KEY, False)
+            registry.complete("a.xml", success=False)
+
+            assert registry.admit("b.xml", KEY, False)
+
+    def test_persistent(self, temp_dir: Path):
+        """Testa chaves lembradas entre lotes."""
+        with KeyRegistry(temp_dir / "chaves.db") as registry:
+            registry.admit("a.xml", KEY, True)
+            registry.complete("a.xml", success=True)
+
+        with KeyRegistry(temp_dir / "chaves.db") as registry:
+            assert not registry.admit("a.xml", KEY, True)
+
+
+class TestGeneratorDedupe:
+    """Testes do registro de chaves no gerador."""
+
+    def test_generate_batch(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        bare_xml_file: Path,
+        temp_dir: Path,
+    ):
+        """Testa NF-e pura, versão autorizada e cópia repetida no mesmo lote."""
+        output_dir = temp_dir / "output"
+        paths = [bare_xml_file, sample_xml_file, bare_xml_file]
+
+        with KeyRegistry(temp_dir / "chaves.db") as registry:
+            result = generator.generate_batch(paths, output_dir, registry=registry)
+
+        assert (result.total, result.successful, result.duplicates) == (3, 2, 1)
+        assert result.success_rate == 100.0
+
+        with KeyRegistry(temp_dir / "chaves.db") as registry:
+            again = generator.generate_batch([sample_xml_file], output_dir, registry=registry)
+
+        assert (again.successful, again.duplicates) == (0, 1)
+
+    def test_corrupt_gzip_fails_only_its_document(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        corrupt_gz_file: Path,
+        temp_dir: Path,
+    ):
+        """Testa que um .xml.gz corrompido falha sozinho, sem abortar o lote."""
+        with KeyRegistry() as registry:
+            result = generator.generate_batch(
+                [corrupt_gz_file, sample_xml_file], temp_dir / "output", registry=registry
+            )
+
+        assert (result.total, result.successful, result.failed) == (2, 1, 1)
+        assert result.results[0].xml_path == corrupt_gz_file
+        assert not result.results[0].success
+
+    def test_progress_counts_trailing_duplicates(
+        self, generator: DANFEGenerator, sample_xml_file: Path, temp_dir: Path
+    ):
+        """Testa que duplicatas após o último documento gerado chegam ao progresso."""
+        seen = []
+
+        with KeyRegistry() as registry:
+            generator.generate_batch(
+                [sample_xml_file] * 3,
+                temp_dir / "output",
+                registry=registry,
+                on_progress=seen.append,
+            )
+
+        assert (seen[-1].done, seen[-1].total) == (3, 3)
@@ -0,0 +1,89 @@
+"""Testes para entrada em bytes, encodings legados e mmap."""
+
+import mmap
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator, XMLValidator
+from danfe_generator.sources.compressed import map_xml
+from danfe_generator.sources.encoding import declared_encoding, recode_legacy
+
+UTF8_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+
+
+@pytest.fixture
+def latin1_content(sample_xml_content: str) -> str:
+    """XML de NFe com acentuação no nome do emitente."""
+    return sample_xml_content.replace("EMPRESA TESTE LTDA", "EMPRESA AÇÃO LTDA")
+
+
+class TestEncodingDetection:
+    """Testes para declared_encoding e recode_legacy."""
+
+    @pytest.mark.parametrize(
+        ("data", "expected"),
+        [
+            (b'<?xml version="1.0" encoding="ISO-8859-1"?><NFe/>', "ISO-8859-1"),
+            (b"\xef\xbb\xbf<?xml version='1.0' encoding='utf-8'?><NFe/>", "utf-8"),
+            (b'<?xml version="1.0"?><NFe/>', None),
+            (b"<NFe/>", None),
+        ],
+    )
+    def test_declared_encoding(self, data: bytes, expected: str | None):
+        """Testa leitura da declaração de encoding."""
+        assert declared_encoding(data) == expected
+
+    def test_recode_mislabelled(self):
+        """Testa conversão de Latin-1 declarado como UTF-8."""
+        data = '<?xml version="1.0" encoding="UTF-8"?><x>AÇÃO</x>'.encode("latin-1")
+
+        assert recode_legacy(data) == '<?xml version="1.0" encoding="UTF-8"?><x>AÇÃO</x>'.encode()
+
+    def test_no_recode_needed(self):
+        """Testa que XMLs válidos ou declarados não são convertidos."""
+        assert recode_legacy("<x>AÇÃO</x>".encode()) is None
+        declared = '<?xml version="1.0" encoding="ISO-8859-1"?><x>AÇÃO</x>'.encode("latin-1")
+        assert recode_legacy(declared) is None
+
+
+class TestLegacyEncodingGeneration:
+    """Testes de validação e geração com XMLs ISO-8859-1."""
+
+    @pytest.mark.parametrize(
+        "declaration",
+        ['<?xml version="1.0" encoding="ISO-8859-1"?>', UTF8_DECLARATION, ""],
+    )
+    def test_generate_latin1(
+        self, generator: DANFEGenerator, temp_dir: Path, latin1_content: str, declaration: str
+    ):
+        """Testa XML Latin-1 declarado, mal declarado e sem declaração."""
+        path = temp_dir / "nota.xml"
+        path.write_bytes(latin1_content.replace(UTF8_DECLARATION, declaration).encode("latin-1"))
+
+        assert XMLValidator().validate(path).is_valid
+        assert XMLValidator().validate_bytes(path.read_bytes()).is_valid
+        assert generator.generate(path).success
+
+
+class TestMapXML:
+    """Testes para map_xml."""
+
+    def test_small_file_is_read(self, sample_xml_file: Path):
+        """Testa leitura direta abaixo do limite."""
+        with map_xml(sample_xml_file) as content:
+            assert isinstance(content, bytes)
+
+    def test_large_file_is_mapped(
+        self, generator: DANFEGenerator, sample_xml_file: Path, sample_xml_content: str
+    ):
+        """Testa mmap acima do limite e renderização do conteúdo mapeado."""
+        with map_xml(sample_xml_file, threshold=1) as content:
+            assert isinstance(content, mmap.mmap)
+            assert bytes(content) == sample_xml_content.encode()
+            assert generator.render(content).startswith(b"%PDF")
+
+    def test_size_limit(self, sample_xml_file: Path):
+        """Testa limite de tamanho com mmap."""
+        with pytest.raises(ValueError), map_xml(sample_xml_file, threshold=1, max_bytes=10):
+            pass
@@ -0,0 +1,125 @@
+"""Testes para a estimativa de duração de lotes."""
+
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import cmd_estimate, format_duration
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.estimate import (
+    CorpusStats,
+    CostModel,
+    calibrate,
+    cost_from_history,
+    estimate_duration,
+    scan_corpus,
+)
+from danfe_generator.core.history import RunMetrics
+
+
+def _write(path: Path, items: int) -> Path:
+    """XML mínimo com ``items`` itens."""
+    dets = "".join(f'<det nItem="{i}"><prod/></det>' for i in range(items))
+    path.write_text(f"<NFe><infNFe>{dets}<pag><detPag/></pag></infNFe></NFe>")
+    return path
+
+
+def _run(ms_per_doc: float, host: str) -> RunMetrics:
+    """Execução do histórico com custo por documento e host dados."""
+    return RunMetrics(
+        total=100, failed=0, elapsed_s=1, docs_per_s=100, ms_per_doc=ms_per_doc, host=host
+    )
+
+
+class TestScanCorpus:
+    """Testes para scan_corpus."""
+
+    def test_full_sample(self, temp_dir: Path):
+        """Testa contagem de itens com a amostra cobrindo o corpus."""
+        paths = [_write(temp_dir / f"{n}.xml", n) for n in (1, 4, 10)]
+
+        stats = scan_corpus(paths)
+
+        assert (stats.files, stats.sampled, stats.sampled_items) == (3, 3, 15)
+        assert stats.items == 15
+        assert stats.total_bytes == sum(p.stat().st_size for p in paths)
+
+    def test_partial_sample(self, temp_dir: Path):
+        """Testa extrapolação pela razão itens/byte a partir da amostra."""
+        paths = [_write(temp_dir / f"{n}.xml", 5) for n in range(10)]
+
+        stats = scan_corpus(paths, sample_size=2, seed=1)
+
+        assert (stats.files, stats.sampled, len(stats.sample)) == (10, 2, 2)
+        assert stats.items == 50
+
+
+class TestCostModel:
+    """Testes para a origem do modelo de custo."""
+
+    def test_from_history(self):
+        """Testa que prefere a execução mais recente do mesmo host."""
+        runs = [_run(10, "a"), _run(20, "b"), _run(30, "a"), RunMetrics(1, 0, 1, 1, host="a")]
+
+        assert cost_from_history(runs, host="a").ms_per_doc == 30
+        assert cost_from_history(runs, host="c").ms_per_doc == 30
+        assert cost_from_history([]) is None
+
+    def test_calibrate(self, generator: DANFEGenerator, sample_xml_file: Path, temp_dir: Path):
+        """Testa calibração com um XML válido e outro inválido (ignorado)."""
+        broken = temp_dir / "quebrada.xml"
+        broken.write_text("<NFe>")
+
+        model = calibrate(generator, [sample_xml_file, broken])
+
+        assert model.ms_per_doc > 0
+        assert model.source == "calibração (1 XML(s))"
+
+    def test_calibrate_without_valid_xml(self, generator: DANFEGenerator, temp_dir: Path):
+        """Testa calibração sem nenhum XML renderizável."""
+        broken = temp_dir / "quebrada.xml"
+        broken.write_text("<NFe>")
+
+        with pytest.raises(ValueError, match="calibração"):
+            calibrate(generator, [broken])
+
+
+class TestEstimateDuration:
+    """Testes para estimate_duration."""
+
+    @pytest.mark.parametrize(
+        ("workers", "cpus", "wall_s"), [(1, 4, 12.0), (4, 4, 3.0), (8, 2, 6.0)]
+    )
+    def test_wall_time(self, workers: int, cpus: float, wall_s: float):
+        """Testa tempo de CPU dividido pelo paralelismo limitado às CPUs."""
+        stats = CorpusStats(
+            files=100, total_bytes=1000, sampled=10, sampled_bytes=100, sampled_items=50
+        )
+        model = CostModel(ms_per_doc=20, ms_per_item=20, source="teste")
+
+        estimate = estimate_duration(stats, model, workers, cpus=cpus)
+
+        assert estimate.items == 500
+        assert estimate.cpu_s == pytest.approx(12.0)
+        assert estimate.wall_s == pytest.approx(wall_s)
+
+    def test_format_duration(self):
+        """Testa a formatação da duração."""
+        assert [format_duration(s) for s in (1.25, 200, 7500)] == ["1.2s", "3min 20s", "2h 05min"]
+
+
+class TestEstimateCLI:
+    """Testes de danfe estimate."""
+
+    @pytest.mark.usefixtures("sample_xml_file")
+    def test_cmd_estimate(self, temp_dir: Path, capsys: pytest.CaptureFixture[str]):
+        """Testa a estimativa com calibração."""
+        code = cmd_estimate(str(temp_dir), jobs=2, calibration_size=1)
+
+        out = capsys.readouterr().out
+        assert code == 0
+        assert "1 XML(s)" in out and "calibração" in out and "2 worker(s)" in out
+
+    def test_missing_directory(self, temp_dir: Path):
+        """Testa diretório inexistente."""
+        assert cmd_estimate(str(temp_dir / "nao_existe")) == 1
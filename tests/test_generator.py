@@ -1,13 +1,19 @@
 """Testes para o módulo do gerador DANFE."""
 
+import json
 from pathlib import Path
 
 import pytest
 
+from danfe_generator.cli.main import OutputFormat, cmd_batch
 from danfe_generator.core import DANFEConfig, DANFEGenerator
+from danfe_generator.core.concurrency import AdaptiveConcurrency
 from danfe_generator.core.generator import BatchResult, GenerationResult
+from danfe_generator.core.progress import CancellationToken, Progress
 from danfe_generator.exceptions import DirectoryNotFoundError, XMLNotFoundError
 
+KEY = "35231212345678000195550010000000011000000015"
+
 
 class TestGenerationResult:
     """Testes para GenerationResult."""
@@ -168,6 +174,67 @@ class TestDANFEGenerator:
         assert result.successful == 1
         assert result.failed == 1
 
+    def test_generate_batch_parallel(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        temp_dir: Path,
+    ):
+        """Testa geração em lote com workers paralelos."""
+        xml2 = temp_dir / "test2.xml"
+        xml2.write_text(sample_xml_file.read_text())
+        invalid_xml = temp_dir / "invalid.xml"
+        invalid_xml.write_text("<root>not a nfe</root>")
+
+        output_dir = temp_dir / "output"
+
+        result = generator.generate_batch(
+            [sample_xml_file, xml2, invalid_xml],
+            output_dir,
+            workers=2,
+        )
+
+        assert result.total == 3
+        assert result.successful == 2
+        assert result.failed == 1
+        assert (output_dir / "test2.pdf").exists()
+
+    def test_generate_batch_adaptive(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Testa geração em lote com concorrência adaptativa."""
+        xml_paths = [sample_xml_file]
+        for i in range(3):
+            xml_copy = temp_dir / f"copy{i}.xml"
+            xml_copy.write_text(sample_xml_file.read_text())
+            xml_paths.append(xml_copy)
+
+        controllers: list[AdaptiveConcurrency] = []
+
+        def controller(maximum: int) -> AdaptiveConcurrency:
+            # Janela mínima: uma decisão por documento concluído
+            controllers.append(AdaptiveConcurrency(maximum, window_seconds=0, min_samples=1))
+            return controllers[-1]
+
+        monkeypatch.setattr("danfe_generator.core.generator.AdaptiveConcurrency", controller)
+
+        result = generator.generate_batch(
+            xml_paths,
+            temp_dir / "output",
+            workers=2,
+            adaptive=True,
+        )
+
+        assert result.successful == 4
+        decisions = controllers[0].decisions
+        assert len(decisions) == 4
+        assert all(1 <= d.limit <= 2 for d in decisions)
+        assert decisions[0].previous == 1
+
     def test_generate_from_directory(
         self,
         generator: DANFEGenerator,
@@ -211,3 +278,109 @@ class TestDANFEGenerator:
         # Cleanup
         if results[0].pdf_path and results[0].pdf_path.exists():
             results[0].pdf_path.unlink()
+
+
+class TestResultStreaming:
+    """Testes para a emissão de resultados por documento (on_result e jsonl)."""
+
+    @pytest.mark.parametrize("pipeline", [False, True])
+    def test_on_result(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        temp_dir: Path,
+        pipeline: bool,
+    ):
+        """Testa callback por documento com chave de acesso e tempos por estágio."""
+        seen: list[GenerationResult] = []
+        missing = temp_dir / "nao_existe.xml"
+
+        generator.generate_batch(
+            [sample_xml_file, missing],
+            temp_dir / "output",
+            pipeline=pipeline,
+            on_result=seen.append,
+        )
+
+        by_path = {result.xml_path: result for result in seen}
+        assert by_path[sample_xml_file].access_key == KEY
+        assert {"validate", "render", "write"} <= by_path[sample_xml_file].timings.keys()
+        assert by_path[missing].error_type == "XMLNotFoundError"
+
+    @pytest.mark.usefixtures("sample_xml_file")
+    def test_cli_jsonl(self, temp_dir: Path, capsys: pytest.CaptureFixture[str]):
+        """Testa --format jsonl: registros no stdout, resumo no stderr."""
+        code = cmd_batch(str(temp_dir), str(temp_dir / "output"), format_type=OutputFormat.JSONL)
+
+        captured = capsys.readouterr()
+        (record,) = [json.loads(line) for line in captured.out.splitlines()]
+        assert code == 0
+        assert record["success"] and record["access_key"] == KEY
+        assert record["pdf"] == str(temp_dir / "output" / "test_nfe.pdf")
+        assert "render" in record["timings_ms"]
+        assert "Resumo" in captured.err
+
+
+@pytest.fixture
+def xml_files(sample_xml_content: str, temp_dir: Path) -> list[Path]:
+    """Três XMLs válidos."""
+    paths = [temp_dir / f"nota_{i}.xml" for i in range(3)]
+    for path in paths:
+        path.write_text(sample_xml_content, encoding="utf-8")
+    return paths
+
+
+class TestProgressAndCancellation:
+    """Testes para on_progress e o cancelamento cooperativo."""
+
+    def test_on_progress(self, generator: DANFEGenerator, xml_files: list[Path], temp_dir: Path):
+        """Testa progresso por documento com total, vazão e ETA."""
+        seen: list[Progress] = []
+
+        generator.generate_batch(xml_files, temp_dir / "output", on_progress=seen.append)
+
+        assert [(p.done, p.total) for p in seen] == [(1, 3), (2, 3), (3, 3)]
+        assert seen[0].docs_per_s > 0 and seen[0].eta_s is not None
+        assert seen[-1].fraction == 1.0 and seen[-1].eta_s == 0
+
+    def test_cancel_batch(self, generator: DANFEGenerator, xml_files: list[Path], temp_dir: Path):
+        """Testa que o lote para de admitir XMLs após o cancelamento."""
+        token = CancellationToken()
+
+        batch = generator.generate_batch(
+            xml_files, temp_dir / "output", on_progress=lambda _: token.cancel(), cancel=token
+        )
+
+        assert batch.cancelled
+        assert (batch.total, batch.successful) == (1, 1)
+
+    @pytest.mark.usefixtures("xml_files")
+    @pytest.mark.parametrize("pipeline", [False, True])
+    def test_cancel_before_start(self, generator: DANFEGenerator, temp_dir: Path, pipeline: bool):
+        """Testa token já acionado: nada é gerado."""
+        token = CancellationToken()
+        token.cancel()
+
+        batch = generator.generate_from_directory(
+            temp_dir, temp_dir / "output", pipeline=pipeline, cancel=token
+        )
+
+        assert batch.cancelled and batch.results == []
+        assert not (temp_dir / "output").exists() or not any((temp_dir / "output").iterdir())
+
+    def test_stream(self, generator: DANFEGenerator, xml_files: list[Path]):
+        """Testa progresso e cancelamento em generate_stream."""
+        token = CancellationToken()
+        seen: list[Progress] = []
+
+        for result in generator.generate_stream(xml_files, on_progress=seen.append, cancel=token):
+            assert result.success
+            token.cancel()
+
+        assert [(p.done, p.total) for p in seen] == [(1, 3)]
+
+    def test_not_cancelled(self, generator: DANFEGenerator, xml_files: list[Path]):
+        """Testa que o lote sem cancelamento não é marcado como cancelado."""
+        batch = generator.generate_batch(xml_files, cancel=CancellationToken())
+
+        assert not batch.cancelled and batch.total == 3
@@ -0,0 +1,128 @@
+"""Testes para o histórico de desempenho dos lotes."""
+
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import cmd_batch, cmd_perf_history
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.generator import BatchResult, GenerationResult
+from danfe_generator.core.history import (
+    PerfHistory,
+    RunMetrics,
+    find_regressions,
+    summarize_run,
+)
+
+
+def _run(docs_per_s: float, renderer_version: str = "2.0", label: str = "lote") -> RunMetrics:
+    """Execução com vazão e versão do renderizador dadas."""
+    return RunMetrics(
+        total=100,
+        failed=0,
+        elapsed_s=100 / docs_per_s,
+        docs_per_s=docs_per_s,
+        stages={"render": {"p50": 50.0, "p95": 80.0}},
+        label=label,
+        renderer_version=renderer_version,
+    )
+
+
+class TestSummarizeRun:
+    """Testes para summarize_run."""
+
+    def test_from_batch(self, generator: DANFEGenerator, sample_xml_file: Path, temp_dir: Path):
+        """Testa vazão e percentis por estágio de um lote real."""
+        batch = generator.generate_batch([sample_xml_file], temp_dir / "out")
+
+        metrics = summarize_run(batch, label="xmls", workers=1)
+
+        assert batch.elapsed_s > 0
+        assert metrics.total == 1 and metrics.docs_per_s > 0
+        assert {"validate", "render", "write", "total"} <= metrics.stages.keys()
+        assert metrics.stages["render"]["p95"] > 0
+
+    def test_cost_model(self):
+        """Testa o ajuste de custo fixo por documento e custo por item."""
+        batch = BatchResult(elapsed_s=1.0)
+        batch.results = [
+            GenerationResult(
+                xml_path=Path(f"{items}.xml"),
+                pdf_path=Path(f"{items}.pdf"),
+                success=True,
+                item_count=items,
+                timings={"render": (10 + 2 * items) / 1000},
+            )
+            for items in (1, 5, 20, 100)
+        ]
+
+        metrics = summarize_run(batch)
+
+        assert metrics.ms_per_doc == pytest.approx(10, abs=0.01)
+        assert metrics.ms_per_item == pytest.approx(2, abs=0.01)
+
+
+class TestPerfHistory:
+    """Testes para PerfHistory e find_regressions."""
+
+    def test_record_and_runs(self, temp_dir: Path):
+        """Testa gravação, ordem cronológica e filtro por rótulo."""
+        with PerfHistory(temp_dir / "perf.db") as history:
+            first = history.record(_run(10))
+            history.record(_run(20, label="outro"))
+            history.record(_run(12))
+
+            runs = history.runs(label="lote")
+            latest = history.runs(limit=1)
+
+        assert [run.docs_per_s for run in runs] == [10, 12]
+        assert runs[0].id == first
+        assert runs[0].stages == {"render": {"p50": 50.0, "p95": 80.0}}
+        assert latest[0].label == "lote" and latest[0].host
+
+    def test_find_regressions(self):
+        """Testa regressão de vazão com a mudança de versão que a explica."""
+        runs = [_run(10), _run(11), _run(10), _run(6, renderer_version="2.1"), _run(5, label="x")]
+        for run_id, run in enumerate(runs, 1):
+            run.id = run_id
+
+        (regression,) = find_regressions(runs)
+
+        assert (regression.run_id, regression.metric) == (4, "docs_per_s")
+        assert regression.baseline == 10
+        assert regression.change == pytest.approx(0.4)
+        assert regression.changes == ["brazilfiscalreport 2.0 → 2.1"]
+
+
+class TestPerfHistoryCLI:
+    """Testes do histórico pela CLI."""
+
+    def test_batch_records_history(
+        self, sample_xml_file: Path, temp_dir: Path, capsys: pytest.CaptureFixture[str]
+    ):
+        """Testa --perf-history no lote e danfe perf history."""
+        db = temp_dir / "perf.db"
+        for _ in range(2):
+            cmd_batch(str(sample_xml_file.parent), str(temp_dir / "out"), perf_history=str(db))
+
+        with PerfHistory(db) as history:
+            runs = history.runs()
+        capsys.readouterr()
+
+        assert [run.label for run in runs] == [str(temp_dir.resolve())] * 2
+        assert cmd_perf_history(str(db)) == 0
+        assert str(temp_dir.resolve()) in capsys.readouterr().out
+
+    def test_check_regression(self, temp_dir: Path):
+        """Testa --check: código 1 se a última execução regrediu."""
+        db = temp_dir / "perf.db"
+        with PerfHistory(db) as history:
+            for docs_per_s in (10, 10, 4):
+                history.record(_run(docs_per_s))
+
+        assert cmd_perf_history(str(db), check=True) == 1
+        assert cmd_perf_history(str(db), check=True, threshold=0.9) == 0
+
+    def test_missing_history(self, temp_dir: Path):
+        """Testa histórico inexistente."""
+        assert cmd_perf_history(str(temp_dir / "nao_existe.db")) == 1
@@ -0,0 +1,299 @@
+"""Testes para distribuição de trabalho via arquivos de lease."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.leases import LeaseManager, LeaseRenewer, claim_items
+from danfe_generator.core.progress import CancellationToken
+
+
+class FakeClock:
+    """Relógio de parede controlado manualmente."""
+
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def lease_dir(temp_dir: Path) -> Path:
+    return temp_dir / "leases"
+
+
+class TestLeaseManager:
+    """Testes para LeaseManager."""
+
+    def test_claim_is_exclusive(self, lease_dir: Path):
+        """Testa que apenas um nó adquire o lease."""
+        node_a = LeaseManager(lease_dir, owner="a")
+        node_b = LeaseManager(lease_dir, owner="b")
+
+        lease = node_a.try_claim("nota.xml")
+
+        assert lease is not None
+        assert lease.owner == "a"
+        assert node_b.try_claim("nota.xml") is None
+
+    def test_completed_item_is_not_reclaimed(self, lease_dir: Path):
+        """Testa que item concluído não é reivindicado de novo."""
+        node_a = LeaseManager(lease_dir, owner="a")
+        node_b = LeaseManager(lease_dir, owner="b")
+
+        lease = node_a.try_claim("nota.xml")
+        assert lease is not None
+        node_a.complete(lease)
+
+        assert node_a.is_done("nota.xml")
+        assert not lease.path.exists()
+        assert node_b.try_claim("nota.xml") is None
+
+    def test_released_item_can_be_claimed(self, lease_dir: Path):
+        """Testa que lease liberado pode ser adquirido por outro nó."""
+        node_a = LeaseManager(lease_dir, owner="a")
+        node_b = LeaseManager(lease_dir, owner="b")
+
+        lease = node_a.try_claim("nota.xml")
+        assert lease is not None
+        node_a.release(lease)
+
+        assert node_b.try_claim("nota.xml") is not None
+
+    def test_expired_lease_is_reclaimed(self, lease_dir: Path):
+        """Testa que lease de nó morto expira e é reclamado."""
+        clock = FakeClock()
+        dead = LeaseManager(lease_dir, owner="dead", ttl=10, clock=clock)
+        alive = LeaseManager(lease_dir, owner="alive", ttl=10, clock=clock)
+
+        assert dead.try_claim("nota.xml") is not None
+        assert alive.try_claim("nota.xml") is None
+
+        clock.now += 11
+        lease = alive.try_claim("nota.xml")
+
+        assert lease is not None
+        assert lease.owner == "alive"
+        assert not list(lease_dir.glob("*.stale"))
+
+    def test_failed_item_is_released(self, lease_dir: Path):
+        """Testa que falha libera o lease sem marcar o item como concluído."""
+        node_a = LeaseManager(lease_dir, owner="a")
+        node_b = LeaseManager(lease_dir, owner="b")
+
+        lease = node_a.try_claim("nota.xml")
+        assert lease is not None
+        node_a.complete(lease, success=False)
+
+        assert not node_a.is_done("nota.xml")
+        assert node_b.try_claim("nota.xml") is not None
+
+    def test_renew_extends_expiration(self, lease_dir: Path):
+        """Testa renovação de lease."""
+        clock = FakeClock()
+        owner = LeaseManager(lease_dir, owner="a", ttl=10, clock=clock)
+        other = LeaseManager(lease_dir, owner="b", ttl=10, clock=clock)
+
+        lease = owner.try_claim("nota.xml")
+        assert lease is not None
+
+        clock.now += 8
+        renewed = owner.renew(lease)
+        clock.now += 8
+
+        assert renewed.expires_at > lease.expires_at
+        assert other.try_claim("nota.xml") is None
+
+    def test_renew_lost_lease(self, lease_dir: Path):
+        """Testa que não renova lease já reclamado por outro nó."""
+        clock = FakeClock()
+        owner = LeaseManager(lease_dir, owner="a", ttl=10, clock=clock)
+        other = LeaseManager(lease_dir, owner="b", ttl=10, clock=clock)
+
+        lease = owner.try_claim("nota.xml")
+        assert lease is not None
+        clock.now += 11
+        assert other.try_claim("nota.xml") is not None
+
+        assert owner.renew(lease) is None
+        assert owner.try_claim("nota.xml") is None
+
+    def test_renew_missing_lease(self, lease_dir: Path):
+        """Testa que lease removido não é recriado pela renovação."""
+        owner = LeaseManager(lease_dir, owner="a")
+        lease = owner.try_claim("nota.xml")
+        assert lease is not None
+        lease.path.unlink()
+
+        assert owner.renew(lease) is None
+        assert not lease.path.exists()
+
+    def test_renew_races_with_reclaim(self, lease_dir: Path, monkeypatch: pytest.MonkeyPatch):
+        """Testa outro nó reivindicando no meio da renovação: o lease dele é mantido."""
+        clock = FakeClock()
+        owner = LeaseManager(lease_dir, owner="a", ttl=10, clock=clock)
+        other = LeaseManager(lease_dir, owner="b", ttl=10, clock=clock)
+        lease = owner.try_claim("nota.xml")
+        assert lease is not None
+        read = owner._read
+        claimed = []
+
+        def read_then_lose(path: Path) -> dict | None:
+            data = read(path)
+            claimed.append(other.try_claim("nota.xml"))
+            return data
+
+        monkeypatch.setattr(owner, "_read", read_then_lose)
+
+        assert owner.renew(lease) is None
+        assert claimed[0] is not None
+        assert read(lease.path)["owner"] == "b"
+        assert not list(lease_dir.glob("*.renew"))
+
+    def test_renewer_keeps_lease_alive(self, lease_dir: Path):
+        """Testa que o renovador mantém o lease além do ttl."""
+        owner = LeaseManager(lease_dir, owner="a", ttl=0.3)
+        other = LeaseManager(lease_dir, owner="b", ttl=0.3)
+
+        lease = owner.try_claim("nota.xml")
+        assert lease is not None
+        with LeaseRenewer(owner, interval=0.05) as renewer:
+            renewer.add(lease)
+            time.sleep(0.6)
+            assert other.try_claim("nota.xml") is None
+            assert renewer.discard("nota.xml") is not None
+
+    def test_invalid_ttl(self, lease_dir: Path):
+        """Testa erro com ttl inválido."""
+        with pytest.raises(ValueError):
+            LeaseManager(lease_dir, ttl=0)
+
+
+class TestClaimItems:
+    """Testes para claim_items."""
+
+    def test_nodes_split_items_without_overlap(self, lease_dir: Path, temp_dir: Path):
+        """Testa que dois nós intercalados processam cada item uma vez."""
+        paths = [temp_dir / f"nota_{i}.xml" for i in range(20)]
+        node_a = LeaseManager(lease_dir, owner="a")
+        node_b = LeaseManager(lease_dir, owner="b")
+
+        iter_a = claim_items(paths, node_a, temp_dir)
+        iter_b = claim_items(paths, node_b, temp_dir)
+        processed: list[Path] = []
+
+        for claims, manager in ((iter_a, node_a), (iter_b, node_b)) * 20:
+            claimed = next(claims, None)
+            if claimed:
+                path, lease = claimed
+                processed.append(path)
+                manager.complete(lease)
+
+        assert sorted(processed) == sorted(paths)
+
+    def test_waits_for_dead_node_lease(self, lease_dir: Path, temp_dir: Path):
+        """Testa que itens com lease de nó morto são processados após expirar."""
+        clock = FakeClock()
+        paths = [temp_dir / f"nota_{i}.xml" for i in range(3)]
+        dead = LeaseManager(lease_dir, owner="dead", ttl=10, clock=clock)
+        alive = LeaseManager(lease_dir, owner="alive", ttl=10, clock=clock)
+        assert dead.try_claim("nota_1.xml") is not None
+
+        def sleep(seconds: float) -> None:
+            clock.now += seconds
+
+        claimed = []
+        for path, lease in claim_items(paths, alive, temp_dir, poll_interval=4, sleep=sleep):
+            claimed.append(path)
+            alive.complete(lease)
+
+        assert sorted(claimed) == paths
+        assert clock.now > 1_000_010
+
+    def test_waits_until_other_node_completes(self, lease_dir: Path, temp_dir: Path):
+        """Testa que item em andamento em outro nó não é reprocessado."""
+        paths = [temp_dir / "nota.xml"]
+        node_a = LeaseManager(lease_dir, owner="a")
+        node_b = LeaseManager(lease_dir, owner="b")
+        lease = node_b.try_claim("nota.xml")
+        assert lease is not None
+
+        def sleep(_seconds: float) -> None:
+            node_b.complete(lease)
+
+        assert list(claim_items(paths, node_a, temp_dir, sleep=sleep)) == []
+
+    def test_failed_item_not_retried_by_same_iteration(self, lease_dir: Path, temp_dir: Path):
+        """Testa que o nó não repete o item que ele mesmo falhou."""
+        paths = [temp_dir / "nota.xml"]
+        manager = LeaseManager(lease_dir, owner="a")
+
+        claimed = []
+        for path, lease in claim_items(paths, manager, temp_dir):
+            claimed.append(path)
+            manager.complete(lease, success=False)
+
+        assert claimed == paths
+        assert not manager.is_done("nota.xml")
+
+    def test_cancel_stops_polling(self, lease_dir: Path, temp_dir: Path):
+        """Testa que o cancelamento interrompe a espera por outros nós."""
+        paths = [temp_dir / "nota.xml"]
+        manager = LeaseManager(lease_dir, owner="a")
+        assert LeaseManager(lease_dir, owner="b").try_claim("nota.xml") is not None
+        token = CancellationToken()
+
+        def sleep(_seconds: float) -> None:
+            token.cancel()
+
+        assert list(claim_items(paths, manager, temp_dir, cancel=token, sleep=sleep)) == []
+
+
+class TestGeneratorLeases:
+    """Testes do modo coordenado no gerador."""
+
+    def test_generate_from_directory_with_leases(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        temp_dir: Path,
+        lease_dir: Path,
+    ):
+        """Testa que uma segunda execução não reprocessa itens concluídos."""
+        (temp_dir / "copy.xml").write_text(sample_xml_file.read_text())
+
+        first = generator.generate_from_directory(
+            temp_dir, temp_dir / "output", lease_dir=lease_dir
+        )
+        second = generator.generate_from_directory(
+            temp_dir, temp_dir / "output", lease_dir=lease_dir
+        )
+
+        assert first.total == 2
+        assert first.successful == 2
+        assert second.total == 0
+        assert len(list(lease_dir.glob("*.done"))) == 2
+
+    @pytest.mark.usefixtures("sample_xml_file")
+    def test_failed_items_retried_on_next_run(
+        self,
+        generator: DANFEGenerator,
+        temp_dir: Path,
+        lease_dir: Path,
+    ):
+        """Testa que XMLs com falha não são marcados como concluídos."""
+        (temp_dir / "quebrada.xml").write_text("<NFe>")
+
+        first = generator.generate_from_directory(
+            temp_dir, temp_dir / "output", lease_dir=lease_dir
+        )
+        second = generator.generate_from_directory(
+            temp_dir, temp_dir / "output", lease_dir=lease_dir
+        )
+
+        assert (first.successful, first.failed) == (1, 1)
+        assert (second.total, second.failed) == (1, 1)
+        assert not list(lease_dir.glob("*.lease"))
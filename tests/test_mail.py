@@ -0,0 +1,204 @@
+"""Testes para a fonte de XMLs anexados a e-mails."""
+
+import io
+import json
+import mailbox
+import zipfile
+from email.message import EmailMessage
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import cli_app
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.dedupe import KeyRegistry
+from danfe_generator.sources.mail import MailSource, default_state_path
+
+ACCESS_KEY = "35231212345678000195550010000000011000000015"
+
+
+def make_message(subject: str, attachments: list[tuple[str, bytes]]) -> EmailMessage:
+    """Cria uma mensagem com os anexos informados."""
+    message = EmailMessage()
+    message["From"] = "fornecedor@example.com"
+    message["To"] = "fiscal@example.com"
+    message["Subject"] = subject
+    message["Message-ID"] = f"<{subject}@example.com>"
+    message.set_content("Segue a NF-e em anexo.")
+    for filename, content in attachments:
+        subtype = "zip" if filename.endswith(".zip") else "xml"
+        maintype = "application" if subtype == "zip" else "text"
+        message.add_attachment(content, maintype=maintype, subtype=subtype, filename=filename)
+    return message
+
+
+def zip_bytes(members: dict[str, bytes]) -> bytes:
+    """Cria um ZIP em memória."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def messages(sample_xml_content: str) -> list[EmailMessage]:
+    """Mensagens com XML solto, XML em ZIP (mesma chave) e XML sem chave."""
+    xml = sample_xml_content.encode()
+    return [
+        make_message("nota", [("nota.xml", xml)]),
+        make_message("reenvio", [("notas.zip", zip_bytes({"nota.xml": xml, "leia.txt": b"x"}))]),
+        make_message("invalido", [("outro.xml", b"<root/>"), ("foto.png", b"\x89PNG")]),
+    ]
+
+
+@pytest.fixture(params=["maildir", "mbox"])
+def mail_path(request: pytest.FixtureRequest, temp_dir: Path, messages: list[EmailMessage]) -> Path:
+    """Caixa de e-mail (Maildir ou mbox) com as mensagens de teste."""
+    if request.param == "maildir":
+        path = temp_dir / "Maildir"
+        box: mailbox.Mailbox = mailbox.Maildir(path, create=True)
+    else:
+        path = temp_dir / "caixa.mbox"
+        box = mailbox.mbox(path, create=True)
+    for message in messages:
+        box.add(message)
+    box.close()
+    return path
+
+
+class TestMailSource:
+    """Testes para MailSource."""
+
+    def test_extracts_and_dedupes(self, mail_path: Path):
+        """Testa extração de anexos (inclusive em ZIP) e deduplicação por chave."""
+        source = MailSource(mail_path)
+
+        names = [name for name, _ in source]
+
+        assert sorted(names) == [ACCESS_KEY, "outro.xml"]
+        assert source.messages == 3
+        assert source.duplicates == 1
+
+    def test_incremental_state(self, mail_path: Path, sample_xml_content: str):
+        """Testa que a segunda varredura ignora mensagens e chaves já processadas."""
+        first = MailSource(mail_path)
+        for name, _ in first:
+            first.record(name, f"{name}.pdf", None)
+        first.close()
+
+        state = json.loads(default_state_path(mail_path).read_text())
+        assert state["keys"] == [ACCESS_KEY]
+        assert len(state["messages"]) == 3
+
+        box = mailbox.Maildir(mail_path) if mail_path.is_dir() else mailbox.mbox(mail_path)
+        box.add(make_message("nova", [("copia.xml", sample_xml_content.encode())]))
+        box.close()
+
+        second = MailSource(mail_path)
+        assert list(second) == []
+        assert second.messages == 1
+        assert second.duplicates == 1
+
+    def test_failed_attachment_is_retried(self, mail_path: Path):
+        """Testa que mensagem com anexo que falhou não é marcada como processada."""
+        first = MailSource(mail_path)
+        for name, _ in first:
+            # A NF-e falha na primeira execução
+            if name == ACCESS_KEY:
+                first.record(name, None, "erro")
+            else:
+                first.record(name, f"{name}.pdf", None)
+        first.close()
+
+        state = json.loads(default_state_path(mail_path).read_text())
+        assert state["keys"] == []
+        # Só a mensagem com o XML sem chave foi concluída
+        assert len(state["messages"]) == 1
+
+        second = MailSource(mail_path)
+        assert [name for name, _ in second] == [ACCESS_KEY]
+        assert second.messages == 2
+
+    def test_unconfirmed_documents_keep_message_pending(self, mail_path: Path):
+        """Testa que sem ``record`` nenhuma mensagem com anexo é concluída."""
+        source = MailSource(mail_path)
+        list(source)
+        source.close()
+
+        state = json.loads(default_state_path(mail_path).read_text())
+        assert state == {"messages": [], "keys": []}
+
+    def test_missing_mailbox(self, temp_dir: Path):
+        """Testa caixa inexistente."""
+        with pytest.raises(FileNotFoundError):
+            MailSource(temp_dir / "nao_existe")
+
+
+class TestGenerateFromMail:
+    """Testes para a geração a partir de e-mails."""
+
+    def test_generate_from_source(self, generator: DANFEGenerator, mail_path: Path, temp_dir: Path):
+        """Testa geração em memória a partir da caixa."""
+        output_dir = temp_dir / "output"
+
+        result = generator.generate_from_source(MailSource(mail_path), output_dir)
+
+        assert result.total == 2
+        assert result.successful == 1
+        assert [p.name for p in output_dir.iterdir()] == [f"{ACCESS_KEY}.pdf"]
+
+    def test_registry_duplicate_in_batch(
+        self, generator: DANFEGenerator, mail_path: Path, temp_dir: Path
+    ):
+        """Testa que a cópia ignorada pelo registro conclui a sua mensagem."""
+        source = MailSource(mail_path, dedupe=False)
+
+        with KeyRegistry() as registry:
+            result = generator.generate_from_source(source, temp_dir / "output", registry=registry)
+
+        assert (result.successful, result.duplicates) == (1, 1)
+        state = json.loads(default_state_path(mail_path).read_text())
+        # "nota" e "reenvio" concluídas; "invalido" falhou
+        assert len(state["messages"]) == 2
+
+    def test_registry_duplicate_of_previous_batch(
+        self, generator: DANFEGenerator, mail_path: Path, temp_dir: Path
+    ):
+        """Testa que a chave gerada em lote anterior conclui a mensagem com o PDF existente."""
+        output_dir = temp_dir / "output"
+        with KeyRegistry(temp_dir / "chaves.db") as registry:
+            generator.generate_from_source(MailSource(mail_path), output_dir, registry=registry)
+        recorded: list[tuple[str, str | None, str | None]] = []
+        source = MailSource(mail_path, state_path=temp_dir / "outro-estado.json")
+        record = source.record
+
+        def spy(name: str, pdf_path: str | None, error_message: str | None) -> None:
+            recorded.append((name, pdf_path, error_message))
+            record(name, pdf_path, error_message)
+
+        source.record = spy  # type: ignore[method-assign]
+
+        with KeyRegistry(temp_dir / "chaves.db") as registry:
+            result = generator.generate_from_source(source, output_dir, registry=registry)
+
+        assert result.duplicates == 1
+        assert (ACCESS_KEY, str(output_dir / f"{ACCESS_KEY}.pdf"), None) in recorded
+        state = json.loads((temp_dir / "outro-estado.json").read_text())
+        assert len(state["messages"]) == 2
+
+    def test_cli_ingest_mail(
+        self, mail_path: Path, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Testa o subcomando ``danfe ingest-mail``."""
+        output_dir = temp_dir / "output"
+        argv = ["danfe", "ingest-mail", str(mail_path), "-o", str(output_dir)]
+        monkeypatch.setattr("sys.argv", argv)
+
+        assert cli_app() == 1  # o anexo sem chave é um XML inválido
+        assert (output_dir / f"{ACCESS_KEY}.pdf").exists()
+        (output_dir / f"{ACCESS_KEY}.pdf").unlink()
+
+        # Só a mensagem com falha é lida de novo; a NF-e gerada não se repete
+        assert cli_app() == 1
+        assert not (output_dir / f"{ACCESS_KEY}.pdf").exists()
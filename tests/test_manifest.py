@@ -0,0 +1,169 @@
+"""Testes para lotes dirigidos por manifesto (CSV/JSONL)."""
+
+import base64
+import json
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import cli_app
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.sources.manifest import iter_manifest
+
+
+@pytest.fixture
+def manifest(temp_dir: Path, sample_xml_file: Path, sample_xml_content: str) -> Path:
+    """Manifesto JSONL com linhas válidas (arquivo, inline, perfil) e inválidas."""
+    (temp_dir / "perfil.yaml").write_text("margins:\n  top: 20\n", encoding="utf-8")
+    inline = base64.b64encode(sample_xml_content.encode()).decode()
+    rows = [
+        {"id": "a", "xml": sample_xml_file.name, "output": "pdfs/a.pdf"},
+        {"id": "b", "xml_base64": inline, "profile": "perfil.yaml"},
+        {"id": "c", "xml": "nao_existe.xml"},
+        "não é json",
+        {"id": "d", "xml_base64": base64.b64encode(b"<root/>").decode()},
+        {"id": "e", "xml": sample_xml_file.name, "profile": "ausente.yaml"},
+        {"xml": sample_xml_file.name},
+    ]
+    path = temp_dir / "jobs.jsonl"
+    lines = [row if isinstance(row, str) else json.dumps(row) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+class TestIterManifest:
+    """Testes para iter_manifest."""
+
+    def test_jsonl(self, manifest: Path, temp_dir: Path):
+        """Testa leitura das linhas, caminhos de saída e erros por linha."""
+        entries = list(iter_manifest(manifest))
+
+        assert [e.line for e in entries] == [1, 2, 3, 4, 5, 6, 7]
+        assert entries[0].output_path == temp_dir / "pdfs" / "a.pdf"
+        assert entries[1].output_path == temp_dir / "b.pdf"
+        assert entries[1].config is not None
+        assert entries[1].config.margins.top == 20
+        assert entries[2].error_message is not None
+        assert "JSON" in (entries[3].error_message or "")
+        assert entries[4].content == b"<root/>"
+        assert "ausente.yaml" in (entries[5].error_message or "")
+        assert entries[6].output_path == temp_dir / "test_nfe.pdf"
+
+    def test_csv(self, temp_dir: Path, sample_xml_file: Path):
+        """Testa manifesto CSV com colunas vazias e diretório de saída."""
+        path = temp_dir / "jobs.csv"
+        path.write_text(f"id,xml,output\n1,{sample_xml_file.name},\n", encoding="utf-8")
+
+        entries = list(iter_manifest(path, temp_dir / "out"))
+
+        assert len(entries) == 1
+        assert entries[0].id == "1"
+        assert entries[0].output_path == temp_dir / "out" / "test_nfe.pdf"
+
+
+class TestGenerateFromManifest:
+    """Testes para DANFEGenerator.generate_from_manifest."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_results_in_manifest_order(
+        self, generator: DANFEGenerator, manifest: Path, temp_dir: Path, workers: int
+    ):
+        """Testa resultados na ordem do manifesto, também com workers."""
+        results = list(generator.generate_from_manifest(manifest, workers=workers))
+
+        assert [entry.line for entry, _ in results] == [1, 2, 3, 4, 5, 6, 7]
+        assert [result.success for _, result in results] == [
+            True,
+            True,
+            False,
+            False,
+            False,
+            False,
+            True,
+        ]
+        assert (temp_dir / "pdfs" / "a.pdf").read_bytes().startswith(b"%PDF")
+        assert (temp_dir / "b.pdf").exists()
+        assert results[0][1].file_size_kb > 0
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_invalid_rows_are_not_accumulated(
+        self,
+        generator: DANFEGenerator,
+        temp_dir: Path,
+        sample_xml_file: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        workers: int,
+    ):
+        """Testa que linhas inválidas não se acumulam atrás das válidas."""
+        monkeypatch.setattr("danfe_generator.core.generator.MANIFEST_QUEUE_LIMIT", 3)
+        rows = [{"xml": sample_xml_file.name}]
+        rows += [{"id": str(i), "xml": "nao_existe.xml"} for i in range(10)]
+        rows += [{"xml": sample_xml_file.name}]
+        path = temp_dir / "jobs.jsonl"
+        path.write_text("\n".join(json.dumps(row) for row in rows) + "\n", encoding="utf-8")
+
+        read = 0
+
+        def counted(*args, **kwargs):
+            nonlocal read
+            for entry in iter_manifest(*args, **kwargs):
+                read += 1
+                yield entry
+
+        monkeypatch.setattr("danfe_generator.sources.manifest.iter_manifest", counted)
+        results = generator.generate_from_manifest(path, workers=workers)
+
+        lines, max_ahead = [], 0
+        for entry, _ in results:
+            lines.append(entry.line)
+            max_ahead = max(max_ahead, read - len(lines))
+
+        assert lines == list(range(1, 13))
+        assert max_ahead <= 3
+
+    def test_leading_invalid_rows_yield_immediately(
+        self, generator: DANFEGenerator, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Testa que linha inválida sem nada em andamento sai antes de ler a próxima."""
+        path = temp_dir / "jobs.jsonl"
+        path.write_text("não é json\n" * 5, encoding="utf-8")
+        read = 0
+
+        def counted(*args, **kwargs):
+            nonlocal read
+            for entry in iter_manifest(*args, **kwargs):
+                read += 1
+                yield entry
+
+        monkeypatch.setattr("danfe_generator.sources.manifest.iter_manifest", counted)
+        results = generator.generate_from_manifest(path)
+
+        next(results)
+        assert read == 1
+
+    def test_profile_generator_is_cached(self, generator: DANFEGenerator, default_config):
+        """Testa que cada perfil cria um único gerador."""
+        first = generator.for_profile(("perfil", default_config))
+
+        assert generator.for_profile(("perfil", default_config)) is first
+        assert generator.for_profile(None) is generator
+
+
+class TestManifestCLI:
+    """Testes para ``danfe --manifest``."""
+
+    def test_writes_results_jsonl(
+        self, manifest: Path, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Testa o arquivo de resultados JSONL, uma linha por linha do manifesto."""
+        monkeypatch.setattr("sys.argv", ["danfe", "--manifest", str(manifest)])
+
+        assert cli_app() == 1
+
+        lines = (temp_dir / "jobs.results.jsonl").read_text(encoding="utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r["line"] for r in records] == [1, 2, 3, 4, 5, 6, 7]
+        assert records[0]["id"] == "a"
+        assert records[0]["output"] == str(temp_dir / "pdfs" / "a.pdf")
+        assert records[2]["success"] is False
+        assert records[2]["error"]
@@ -0,0 +1,151 @@
+"""Testes para os modelos de caminho de saída pela chave de acesso."""
+
+import gzip
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import build_sink
+from danfe_generator.core import DANFEConfig, DANFEGenerator
+from danfe_generator.core.access_key import AccessKey
+from danfe_generator.core.buffers import RenderedPDF
+from danfe_generator.core.naming import OutputTemplate
+from danfe_generator.core.s3 import S3Sink
+from danfe_generator.core.sinks import ArchiveSink
+
+KEY = "35231212345678000195550010000000011000000015"
+TEMPLATE = "{cnpj}/{aaaa}/{mm}/{serie}-{nNF}-{chave}.pdf"
+EXPECTED = Path(f"12345678000195/2023/12/001-000000001-{KEY}.pdf")
+
+
+class TestAccessKey:
+    """Testes para AccessKey."""
+
+    def test_parse(self):
+        """Testa separação dos campos da chave."""
+        key = AccessKey.parse(KEY)
+
+        assert (key.cUF, key.aaaa, key.mm, key.cnpj) == ("35", "2023", "12", "12345678000195")
+        assert (key.mod, key.serie, key.nNF, key.cDV) == ("55", "001", "000000001", "5")
+
+    def test_invalid(self):
+        """Testa chave com tamanho inválido."""
+        with pytest.raises(ValueError):
+            AccessKey.parse("123")
+
+
+class TestOutputTemplate:
+    """Testes para OutputTemplate."""
+
+    def test_render(self):
+        """Testa resolução do caminho a partir da chave e do nome do XML."""
+        assert Path(OutputTemplate(TEMPLATE).render("a/nota.xml.gz", KEY)) == EXPECTED
+        assert OutputTemplate("{nome}-{nNF}.pdf").render("nota.xml", KEY) == "nota-000000001.pdf"
+
+    def test_missing_key_fallback(self):
+        """Testa documento sem chave de acesso: nome do XML na raiz."""
+        assert OutputTemplate(TEMPLATE).render("nota.xml", None) == "nota.pdf"
+
+    @pytest.mark.parametrize(
+        "template", ["{cpf}.pdf", "/tmp/{chave}.pdf", "../{chave}.pdf", "{chave}"]
+    )
+    def test_invalid(self, template: str):
+        """Testa campos desconhecidos e caminhos fora do diretório de saída."""
+        with pytest.raises(ValueError):
+            OutputTemplate(template)
+
+
+class TestGeneratorTemplate:
+    """Testes do modelo de caminho no gerador."""
+
+    def test_generate_batch(self, sample_xml_file: Path, temp_dir: Path):
+        """Testa lote de arquivos distribuído em diretórios pela chave."""
+        generator = DANFEGenerator(DANFEConfig(output_template=TEMPLATE))
+
+        result = generator.generate_batch([sample_xml_file], temp_dir / "output")
+
+        assert result.results[0].pdf_path == temp_dir / "output" / EXPECTED
+        assert (temp_dir / "output" / EXPECTED).exists()
+
+    def test_generate_from_archive(self, sample_xml_content: str, temp_dir: Path):
+        """Testa documentos em memória (ZIP) nomeados pela chave."""
+        archive = temp_dir / "notas.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("nota.xml", sample_xml_content)
+        generator = DANFEGenerator(DANFEConfig(output_template=TEMPLATE))
+
+        result = generator.generate_from_archive(archive, temp_dir / "output")
+
+        assert result.successful == 1
+        assert (temp_dir / "output" / EXPECTED).exists()
+
+    def test_directory_recreated(self, sample_xml_file: Path, temp_dir: Path):
+        """Testa que um diretório em cache removido externamente é recriado."""
+        generator = DANFEGenerator(DANFEConfig(output_template="{cnpj}/{chave}.pdf"))
+        output_dir = temp_dir / "output"
+        generator.generate_batch([sample_xml_file], output_dir)
+        pdf = next(output_dir.rglob("*.pdf"))
+        pdf.unlink()
+        pdf.parent.rmdir()
+
+        result = generator.generate_batch([sample_xml_file], output_dir)
+
+        assert result.successful == 1
+        assert pdf.exists()
+
+    def test_corrupt_gzip(self, sample_xml_file: Path, sample_xml_content: str, temp_dir: Path):
+        """Testa que um .xml.gz corrompido não aborta o lote com modelo pela chave."""
+        data = gzip.compress(sample_xml_content.encode())
+        corrupt = temp_dir / "corrompida.xml.gz"
+        corrupt.write_bytes(data[:10] + b"\xff" * 20 + data[30:])
+        generator = DANFEGenerator(DANFEConfig(output_template="{chave}.pdf"))
+
+        result = generator.generate_batch([corrupt, sample_xml_file], temp_dir / "output")
+
+        assert [r.success for r in result.results] == [False, True]
+        assert (temp_dir / "output" / f"{KEY}.pdf").exists()
+
+
+class TestSinkTemplate:
+    """Testes do modelo de caminho nos destinos compactado e S3."""
+
+    def test_archive_members(self, temp_dir: Path):
+        """Testa membros do ZIP nomeados pelo modelo, com sufixo em repetições."""
+        pdf = RenderedPDF(name="nota.xml", data=b"%PDF", access_key=KEY)
+        with ArchiveSink(temp_dir, "zip", template=OutputTemplate(TEMPLATE)) as sink:
+            sink.write(pdf)
+            location = sink.write(pdf)
+
+        repeated = EXPECTED.with_name(f"{EXPECTED.stem}-2.pdf")
+        assert location == temp_dir / "danfes-0001.zip" / repeated
+        with zipfile.ZipFile(sink.archives[0]) as archive:
+            assert archive.namelist() == [EXPECTED.as_posix(), repeated.as_posix()]
+
+    def test_s3_key(self):
+        """Testa a chave S3 resolvida pelo modelo após o prefixo."""
+        sink = S3Sink(
+            "notas",
+            prefix="danfes",
+            endpoint="http://127.0.0.1:1",
+            access_key="teste",
+            secret_key="segredo",
+            template=OutputTemplate(TEMPLATE),
+        )
+        sink.close()
+
+        pdf = RenderedPDF(name="nota.xml", data=b"%PDF", access_key=KEY)
+        assert sink.key_for(pdf) == f"danfes/{EXPECTED.as_posix()}"
+
+    def test_build_sink(self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch):
+        """Testa que --output-template chega aos destinos da CLI."""
+        monkeypatch.setenv("AWS_ACCESS_KEY_ID", "teste")
+        monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "segredo")
+        template = OutputTemplate(TEMPLATE)
+
+        s3 = build_sink(None, "s3://notas/danfes", template=template)
+        archive = build_sink("zip", temp_dir, template=template)
+        for sink in (s3, archive):
+            assert sink is not None
+            sink.close()
+            assert sink.template is template
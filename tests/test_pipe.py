@@ -0,0 +1,104 @@
+"""Testes para o modo pipe (stdin/stdout) e listas de caminhos NUL."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import cli_app
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.sources.pipe import iter_nul_paths, read_stream
+
+
+class TestIterNulPaths:
+    """Testes para iter_nul_paths."""
+
+    def test_split_across_chunks(self):
+        """Testa caminhos divididos entre leituras, vazios e sem terminador final."""
+        stream = io.BytesIO(b"a/um.xml\0\0b/dois.xml\0c/tr\xeas.xml")
+
+        paths = list(iter_nul_paths(stream, chunk_size=3))
+
+        assert paths[:2] == [Path("a/um.xml"), Path("b/dois.xml")]
+        assert len(paths) == 3
+
+    def test_yields_before_end_of_stream(self):
+        """Testa que cada caminho é produzido antes de o stream terminar."""
+        stream = io.BytesIO(b"um.xml\0" + b"x" * 1000)
+
+        first = next(iter_nul_paths(stream, chunk_size=8))
+
+        assert first == Path("um.xml")
+        assert stream.tell() < 100
+
+
+class TestReadStream:
+    """Testes para read_stream."""
+
+    def test_size_limit(self):
+        """Testa limite de tamanho da entrada."""
+        assert read_stream(io.BytesIO(b"<x/>"), max_bytes=4) == b"<x/>"
+        with pytest.raises(ValueError):
+            read_stream(io.BytesIO(b"<x/>!"), max_bytes=4)
+
+
+class TestPipeCLI:
+    """Testes para ``danfe -`` e ``--files0-from``."""
+
+    def test_stdin_to_stdout(self, sample_xml_content: str, monkeypatch: pytest.MonkeyPatch):
+        """Testa XML pelo stdin e PDF no stdout, sem arquivos."""
+        stdout = io.TextIOWrapper(io.BytesIO())
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(sample_xml_content.encode())))
+        monkeypatch.setattr("sys.stdout", stdout)
+        monkeypatch.setattr("sys.argv", ["danfe", "-", "-o", "-"])
+
+        assert cli_app() == 0
+        assert stdout.buffer.getvalue().startswith(b"%PDF")  # type: ignore[attr-defined]
+
+    def test_invalid_stdin(self, monkeypatch: pytest.MonkeyPatch):
+        """Testa XML inválido pelo stdin."""
+        monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(b"<root/>")))
+        monkeypatch.setattr("sys.argv", ["danfe", "-", "-o", "-"])
+
+        assert cli_app() == 1
+
+    def test_files0_from(
+        self, sample_xml_file: Path, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Testa lote a partir de uma lista de caminhos separados por NUL."""
+        listing = temp_dir / "lista.bin"
+        listing.write_bytes(f"{sample_xml_file}\0{temp_dir / 'nao_existe.xml'}\0".encode())
+        output_dir = temp_dir / "output"
+        argv = ["danfe", "--files0-from", str(listing), "-o", str(output_dir)]
+        monkeypatch.setattr("sys.argv", argv)
+
+        assert cli_app() == 1
+        assert (output_dir / "test_nfe.pdf").exists()
+
+    def test_files0_from_rejects_lease_dir(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ):
+        """Testa que --lease-dir não é ignorado silenciosamente com --files0-from."""
+        listing = temp_dir / "lista.bin"
+        listing.write_bytes(b"")
+        argv = ["danfe", "--files0-from", str(listing), "--lease-dir", str(temp_dir / "leases")]
+        monkeypatch.setattr("sys.argv", argv)
+
+        with pytest.raises(SystemExit) as excinfo:
+            cli_app()
+
+        assert excinfo.value.code == 2
+        assert "--lease-dir" in capsys.readouterr().err
+
+
+class TestGenerateBatchIterable:
+    """Testes para generate_batch com iterável sob demanda."""
+
+    def test_total_counted_from_iterator(
+        self, generator: DANFEGenerator, sample_xml_file: Path, temp_dir: Path
+    ):
+        """Testa que o total é contado ao final quando não há len()."""
+        result = generator.generate_batch(iter([sample_xml_file]), temp_dir / "output")
+
+        assert result.total == 1
+        assert result.successful == 1
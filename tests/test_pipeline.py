@@ -0,0 +1,186 @@
+"""Testes para o pipeline em estágios."""
+
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.pipeline import STAGES, Pipeline
+
+
+@pytest.fixture
+def xml_files(sample_xml_file: Path, temp_dir: Path) -> list[Path]:
+    """Cria alguns XMLs válidos e um inválido."""
+    paths = [sample_xml_file]
+    for i in range(4):
+        path = temp_dir / f"copy{i}.xml"
+        path.write_text(sample_xml_file.read_text())
+        paths.append(path)
+    invalid = temp_dir / "invalid.xml"
+    invalid.write_text("<root>not a nfe</root>")
+    paths.append(invalid)
+    return paths
+
+
+class TestPipeline:
+    """Testes para Pipeline."""
+
+    def test_run_generates_all(
+        self, generator: DANFEGenerator, xml_files: list[Path], temp_dir: Path
+    ):
+        """Testa geração pelo pipeline com threads em todos os estágios."""
+        output_dir = temp_dir / "output"
+        pipeline = Pipeline(generator, {"read": 2, "write": 2}, queue_size=2)
+
+        results = list(pipeline.run((p, output_dir / f"{p.stem}.pdf") for p in xml_files))
+
+        assert len(results) == len(xml_files)
+        assert sum(r.success for r in results) == 5
+        failed = [r for r in results if not r.success]
+        assert failed[0].xml_path.name == "invalid.xml"
+        assert (output_dir / "copy0.pdf").exists()
+
+    def test_stats_per_stage(
+        self, generator: DANFEGenerator, xml_files: list[Path], temp_dir: Path
+    ):
+        """Testa estatísticas por estágio."""
+        pipeline = Pipeline(generator)
+        list(pipeline.run((p, temp_dir / "out" / f"{p.stem}.pdf") for p in xml_files))
+
+        stats = pipeline.stats()
+
+        assert list(stats) == list(STAGES)
+        assert stats["read"].processed == len(xml_files)
+        assert stats["validate"].failed == 1
+        # Documento inválido não chega à renderização
+        assert stats["render"].processed == len(xml_files) - 1
+        assert all(0.0 <= s.utilization <= 1.0 for s in stats.values())
+        assert all(s.queue_depth == 0 for s in stats.values())
+        assert pipeline.bottleneck() in STAGES
+
+    def test_preserves_order_with_single_workers(
+        self, generator: DANFEGenerator, xml_files: list[Path], temp_dir: Path
+    ):
+        """Testa que, com um worker por estágio, a saída segue a ordem da entrada."""
+        pipeline = Pipeline(generator, dict.fromkeys(STAGES, 1), queue_size=1)
+
+        results = list(pipeline.run((p, temp_dir / "out" / f"{p.stem}.pdf") for p in xml_files))
+
+        assert [r.xml_path for r in results] == xml_files
+
+    def test_each_task_yields_once(
+        self, generator: DANFEGenerator, xml_files: list[Path], temp_dir: Path
+    ):
+        """Testa que, com vários workers, cada documento sai exatamente uma vez."""
+        pipeline = Pipeline(generator, {"read": 3, "validate": 2, "write": 3}, queue_size=1)
+
+        results = list(pipeline.run((p, temp_dir / "out" / f"{p.stem}.pdf") for p in xml_files))
+
+        assert sorted(r.xml_path for r in results) == sorted(xml_files)
+
+    def test_render_error_propagates(
+        self,
+        generator: DANFEGenerator,
+        xml_files: list[Path],
+        temp_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Testa que erro na renderização vira falha do documento, sem gravar o PDF."""
+        render = generator._render_checked
+
+        def flaky_render(name: str, content: bytes, validate: bool = True) -> bytes:
+            if name.endswith("copy2.xml"):
+                raise RuntimeError("fonte corrompida")
+            return render(name, content, validate)
+
+        monkeypatch.setattr(generator, "_render_checked", flaky_render)
+        output_dir = temp_dir / "out"
+        pipeline = Pipeline(generator)
+
+        results = {
+            r.xml_path.name: r
+            for r in pipeline.run((p, output_dir / f"{p.stem}.pdf") for p in xml_files)
+        }
+
+        failed = results["copy2.xml"]
+        assert not failed.success
+        assert failed.error_type == "RuntimeError"
+        assert failed.error_message == "fonte corrompida"
+        assert "render" in failed.timings and "write" not in failed.timings
+        assert not (output_dir / "copy2.pdf").exists()
+        assert sum(r.success for r in results.values()) == 4
+        stats = pipeline.stats()
+        assert stats["render"].failed == 1
+        assert stats["write"].processed == 4
+
+    def test_missing_file(self, generator: DANFEGenerator, temp_dir: Path):
+        """Testa XML inexistente."""
+        results = list(Pipeline(generator).run([(temp_dir / "nao_existe.xml", None)]))
+        assert not results[0].success
+        assert "não encontrado" in results[0].error_message
+
+    def test_early_exit_stops_threads(self, generator: DANFEGenerator, xml_files: list[Path]):
+        """Testa que abandonar a iteração encerra o pipeline."""
+        pipeline = Pipeline(generator, queue_size=1)
+        results = pipeline.run((p, p.with_suffix(".pdf")) for p in xml_files)
+
+        next(results)
+        results.close()
+
+        assert pipeline.stats()["read"].processed <= len(xml_files)
+
+    def test_task_error_propagates(
+        self, generator: DANFEGenerator, xml_files: list[Path], temp_dir: Path
+    ):
+        """Testa que erro ao produzir as tarefas é relançado após os documentos admitidos."""
+
+        def tasks():
+            yield xml_files[0], temp_dir / "primeiro.pdf"
+            raise OSError("lista de entrada ilegível")
+
+        seen = []
+        with pytest.raises(OSError, match="lista de entrada"):
+            for result in Pipeline(generator).run(tasks()):
+                seen.append(result)
+
+        assert [r.success for r in seen] == [True]
+        assert (temp_dir / "primeiro.pdf").exists()
+
+    def test_invalid_stage(self, generator: DANFEGenerator):
+        """Testa erro com estágio desconhecido."""
+        with pytest.raises(ValueError, match="Estágio desconhecido"):
+            Pipeline(generator, {"compress": 2})
+
+
+class TestGeneratorPipeline:
+    """Testes do pipeline integrado ao gerador."""
+
+    def test_generate_batch_pipeline(
+        self,
+        generator: DANFEGenerator,
+        xml_files: list[Path],
+        temp_dir: Path,
+    ):
+        """Testa generate_batch com pipeline e renderização em processos."""
+        result = generator.generate_batch(
+            xml_files,
+            temp_dir / "output",
+            pipeline=True,
+            stage_workers={"render": 2},
+        )
+
+        assert result.total == 6
+        assert result.successful == 5
+        assert result.failed == 1
+        assert result.stage_stats["render"].workers == 2
+        assert result.stage_stats["write"].processed == 5
+
+    def test_generate_batch_input_error(self, generator: DANFEGenerator, sample_xml_file: Path):
+        """Testa que o erro do iterável de entrada não vira um lote truncado com sucesso."""
+
+        def paths():
+            yield sample_xml_file
+            raise OSError("pipe fechado")
+
+        with pytest.raises(OSError, match="pipe fechado"):
+            generator.generate_batch(paths(), pipeline=True)
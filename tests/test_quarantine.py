@@ -0,0 +1,109 @@
+"""Testes para a quarentena de falhas e o reprocessamento por execução."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import cmd_retry
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.generator import GenerationResult
+from danfe_generator.core.quarantine import Quarantine, load_run, retry_inputs
+from danfe_generator.exceptions import InvalidXMLError
+
+
+@pytest.fixture
+def broken_xml_file(temp_dir: Path) -> Path:
+    """XML truncado (falha na validação)."""
+    path = temp_dir / "quebrada.xml"
+    path.write_text("<nfeProc><NFe>truncado", encoding="utf-8")
+    return path
+
+
+class TestGenerationFailure:
+    """Testes para o tipo e os detalhes do erro no resultado."""
+
+    def test_failure_details(self, generator: DANFEGenerator, broken_xml_file: Path):
+        """Testa que a falha guarda o tipo da exceção e o DANFEError.details."""
+        result = generator.generate_batch([broken_xml_file]).results[0]
+
+        assert result.error_type == "InvalidXMLError"
+        assert result.error_details["path"] == str(broken_xml_file)
+
+    def test_failure_from_exception(self):
+        """Testa GenerationResult.failure com DANFEError e com exceção comum."""
+        danfe = GenerationResult.failure(Path("a.xml"), InvalidXMLError("a.xml", "vazio"))
+        other = GenerationResult.failure(Path("b.xml"), OSError("disco cheio"))
+
+        assert (danfe.error_type, danfe.error_details["reason"]) == ("InvalidXMLError", "vazio")
+        assert (other.error_type, other.error_details) == ("OSError", {})
+
+
+class TestQuarantine:
+    """Testes para Quarantine."""
+
+    def test_record_batch(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        broken_xml_file: Path,
+        temp_dir: Path,
+    ):
+        """Testa cópia da entrada, arquivo de motivo e sucessos ignorados."""
+        batch = generator.generate_batch([sample_xml_file, broken_xml_file], temp_dir / "out")
+        quarantine = Quarantine(temp_dir / "quarentena", output_dir=temp_dir / "out")
+
+        assert quarantine.record_batch(batch) == 1
+
+        metadata, failures = load_run(temp_dir / "quarentena", quarantine.run_id)
+        assert metadata["output_dir"] == str(temp_dir / "out")
+        assert [f.input for f in failures] == [str(broken_xml_file.resolve())]
+        copy = quarantine.run_dir / failures[0].quarantined
+        assert copy.read_bytes() == broken_xml_file.read_bytes()
+        reason = json.loads(copy.with_name("quebrada.xml.reason.json").read_text())
+        assert reason["error_type"] == "InvalidXMLError"
+        assert "reason" in reason["details"]
+
+    def test_retry_inputs(self, broken_xml_file: Path, temp_dir: Path):
+        """Testa que o reprocessamento prefere o original e recorre à cópia."""
+        quarantine = Quarantine(temp_dir / "quarentena")
+        quarantine.record(GenerationResult.failure(broken_xml_file, "falha"))
+        quarantine.record(GenerationResult.failure(Path("notas.zip/membro.xml"), "falha"))
+
+        assert retry_inputs(temp_dir / "quarentena", quarantine.run_id) == [
+            broken_xml_file.resolve()
+        ]
+
+        broken_xml_file.unlink()
+        (copy,) = retry_inputs(temp_dir / "quarentena", quarantine.run_id)
+        assert copy.parent.parent.parent == quarantine.run_dir
+        assert copy.name == "quebrada.xml"
+
+
+class TestRetryFailed:
+    """Testes do reprocessamento pela CLI."""
+
+    def test_retry_only_failed(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        sample_xml_content: str,
+        broken_xml_file: Path,
+        temp_dir: Path,
+    ):
+        """Testa que apenas as falhas (corrigidas) são reprocessadas."""
+        output_dir = temp_dir / "out"
+        batch = generator.generate_batch([sample_xml_file, broken_xml_file], output_dir)
+        quarantine = Quarantine(temp_dir / "quarentena", output_dir=output_dir)
+        quarantine.record_batch(batch)
+        (output_dir / "test_nfe.pdf").unlink()
+        broken_xml_file.write_text(sample_xml_content, encoding="utf-8")
+
+        code = cmd_retry(quarantine.run_id, str(temp_dir / "quarentena"))
+
+        assert code == 0
+        assert sorted(p.name for p in output_dir.iterdir()) == ["quebrada.pdf"]
+
+    def test_unknown_run(self, temp_dir: Path):
+        """Testa execução inexistente."""
+        assert cmd_retry("inexistente", str(temp_dir / "quarentena")) == 1
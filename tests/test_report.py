@@ -0,0 +1,112 @@
+"""Testes para o relatório de execução de lote."""
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import cmd_batch
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.access_key import count_items
+from danfe_generator.core.generator import GenerationResult
+from danfe_generator.core.report import REPORT_FIELDS, BatchReport, summary_path
+from danfe_generator.exceptions import InvalidXMLError
+
+KEY = "35231212345678000195550010000000011000000015"
+
+
+def _result(name: str, total_ms: float, size_kb: float, items: int) -> GenerationResult:
+    """Resultado de sucesso com tempos e tamanho dados."""
+    return GenerationResult(
+        xml_path=Path(f"{name}.xml"),
+        pdf_path=Path(f"{name}.pdf"),
+        success=True,
+        file_size_kb=size_kb,
+        access_key=KEY,
+        item_count=items,
+        timings={"render": total_ms / 1000},
+    )
+
+
+class TestCountItems:
+    """Testes para count_items."""
+
+    def test_count_items(self):
+        """Testa que conta det (com prefixo) e ignora detPag."""
+        data = b"<NFe><det nItem='1'/><nfe:det nItem='2'></nfe:det><detPag/></NFe>"
+        assert count_items(data) == 2
+
+    def test_sample(self, sample_xml_content: str):
+        """Testa o XML de exemplo (um item)."""
+        assert count_items(sample_xml_content.encode()) == 1
+
+
+class TestBatchReport:
+    """Testes para BatchReport."""
+
+    @pytest.mark.parametrize("suffix", ["csv", "jsonl"])
+    def test_rows(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        temp_dir: Path,
+        suffix: str,
+    ):
+        """Testa uma linha por documento, com itens, emitente e tempos."""
+        path = temp_dir / f"relatorio.{suffix}"
+        with BatchReport(path) as report:
+            generator.generate_batch([sample_xml_file], temp_dir / "out", on_result=report.add)
+
+        with path.open(encoding="utf-8") as f:
+            rows = list(csv.DictReader(f)) if suffix == "csv" else [json.loads(line) for line in f]
+        assert len(rows) == 1
+        assert set(rows[0]) == set(REPORT_FIELDS)
+        assert str(rows[0]["items"]) == "1"
+        assert rows[0]["cnpj"] == "12345678000195"
+        assert float(rows[0]["render_ms"]) > 0
+        assert summary_path(path).exists()
+
+    def test_summary(self, temp_dir: Path):
+        """Testa histograma de erros, vazão e os mais lentos e maiores."""
+        report = BatchReport(temp_dir / "relatorio.jsonl", top_n=2)
+        for name, total_ms, size_kb, items in [
+            ("a", 10, 300, 5),
+            ("b", 900, 50, 900),
+            ("c", 40, 80, 20),
+        ]:
+            report.add(_result(name, total_ms, size_kb, items))
+        report.add(GenerationResult.failure(Path("d.xml"), InvalidXMLError("d.xml", "vazio")))
+        report.add(GenerationResult.failure(Path("e.xml"), OSError("disco cheio")))
+        report.add(GenerationResult.failure(Path("f.xml"), OSError("disco cheio")))
+
+        summary = report.close()
+
+        assert (summary["total"], summary["successful"], summary["failed"]) == (6, 3, 3)
+        assert summary["errors"] == {"OSError": 2, "InvalidXMLError": 1}
+        assert [(r["xml"], r["items"]) for r in summary["slowest"]] == [
+            ("b.xml", 900),
+            ("c.xml", 20),
+        ]
+        assert [r["xml"] for r in summary["largest"]] == ["a.xml", "c.xml"]
+        assert sum(point["docs"] for point in summary["throughput"]) == 6
+
+    def test_invalid_format(self, temp_dir: Path):
+        """Testa formato não suportado."""
+        with pytest.raises(ValueError, match="Formato de relatório"):
+            BatchReport(temp_dir / "relatorio.xlsx")
+
+
+class TestReportCLI:
+    """Testes do relatório pela CLI."""
+
+    def test_cmd_batch_report(self, sample_xml_file: Path, temp_dir: Path):
+        """Testa --report no modo lote."""
+        path = temp_dir / "relatorio.jsonl"
+
+        code = cmd_batch(str(sample_xml_file.parent), str(temp_dir / "out"), report_path=str(path))
+
+        assert code == 0
+        summary = json.loads(summary_path(path).read_text(encoding="utf-8"))
+        assert summary["total"] == 1
+        assert summary["slowest"][0]["access_key"] == KEY
@@ -0,0 +1,164 @@
+"""Testes para detecção de limites e dimensionamento de workers."""
+
+import argparse
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.cli.main import parse_worker_memory
+from danfe_generator.core.resources import (
+    MIN_WORKER_MEMORY_MB,
+    ResourceLimits,
+    WorkerPlan,
+    detect_limits,
+    plan_workers,
+)
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def proc_cgroup(temp_dir: Path) -> Path:
+    """Arquivo /proc/self/cgroup vazio (processo na raiz do cgroup)."""
+    path = temp_dir / "proc_cgroup"
+    path.write_text("")
+    return path
+
+
+class TestDetectLimits:
+    """Testes para detect_limits."""
+
+    def test_cgroup2_quota(self, temp_dir: Path, proc_cgroup: Path):
+        """Testa leitura de cpu.max e memory.max do cgroup v2."""
+        root = temp_dir / "cgroup"
+        root.mkdir()
+        (root / "cgroup.controllers").write_text("cpu memory")
+        (root / "cpu.max").write_text("200000 100000\n")
+        (root / "memory.max").write_text(f"{1024 * MB}\n")
+
+        limits = detect_limits(root, proc_cgroup)
+
+        assert limits.source == "cgroup2"
+        assert limits.cpus <= 2.0
+        assert limits.memory_bytes == 1024 * MB
+
+    def test_cgroup2_unlimited(self, temp_dir: Path, proc_cgroup: Path):
+        """Testa cgroup v2 sem cota ('max')."""
+        root = temp_dir / "cgroup"
+        root.mkdir()
+        (root / "cgroup.controllers").write_text("cpu memory")
+        (root / "cpu.max").write_text("max 100000\n")
+        (root / "memory.max").write_text("max\n")
+
+        limits = detect_limits(root, proc_cgroup)
+
+        assert limits.memory_bytes is None
+        assert limits.cpus >= 1
+
+    def test_cgroup2_process_path(self, temp_dir: Path):
+        """Testa que o caminho do processo em /proc/self/cgroup tem prioridade."""
+        root = temp_dir / "cgroup"
+        nested = root / "kubepods" / "pod1"
+        nested.mkdir(parents=True)
+        (root / "cgroup.controllers").write_text("cpu memory")
+        (nested / "memory.max").write_text(f"{512 * MB}\n")
+        proc = temp_dir / "proc_cgroup"
+        proc.write_text("0::/kubepods/pod1\n")
+
+        limits = detect_limits(root, proc)
+
+        assert limits.memory_bytes == 512 * MB
+
+    def test_cgroup1_quota(self, temp_dir: Path, proc_cgroup: Path):
+        """Testa leitura de cfs_quota_us e limit_in_bytes do cgroup v1."""
+        root = temp_dir / "cgroup"
+        (root / "cpu").mkdir(parents=True)
+        (root / "memory").mkdir()
+        (root / "cpu" / "cpu.cfs_quota_us").write_text("100000\n")
+        (root / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+        (root / "memory" / "memory.limit_in_bytes").write_text(f"{2048 * MB}\n")
+
+        limits = detect_limits(root, proc_cgroup)
+
+        assert limits.source == "cgroup1"
+        assert limits.cpus == 1.0
+        assert limits.memory_bytes == 2048 * MB
+
+    def test_cgroup1_unlimited(self, temp_dir: Path, proc_cgroup: Path):
+        """Testa cgroup v1 sem limites (quota -1, memória enorme)."""
+        root = temp_dir / "cgroup"
+        (root / "cpu").mkdir(parents=True)
+        (root / "memory").mkdir()
+        (root / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+        (root / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+        (root / "memory" / "memory.limit_in_bytes").write_text("9223372036854771712\n")
+
+        limits = detect_limits(root, proc_cgroup)
+
+        assert limits.source == "host"
+        assert limits.memory_bytes is None
+
+    def test_no_cgroup(self, temp_dir: Path, proc_cgroup: Path):
+        """Testa fallback para o host sem cgroup montado."""
+        limits = detect_limits(temp_dir / "missing", proc_cgroup)
+        assert limits.source == "host"
+        assert limits.cpus >= 1
+
+
+class TestPlanWorkers:
+    """Testes para plan_workers."""
+
+    def test_uses_cpu_quota(self):
+        """Testa que a cota de CPU define a quantidade de workers."""
+        plan = plan_workers(limits=ResourceLimits(cpus=4.0))
+        assert plan == WorkerPlan(workers=4)
+
+    def test_fractional_quota_rounds_down(self):
+        """Testa arredondamento para baixo com mínimo de 1 worker."""
+        assert plan_workers(limits=ResourceLimits(cpus=2.5)).workers == 2
+        assert plan_workers(limits=ResourceLimits(cpus=0.5)).workers == 1
+
+    def test_memory_bounds_workers(self):
+        """Testa que pouca memória reduz a quantidade de workers."""
+        limits = ResourceLimits(cpus=64.0, memory_bytes=1024 * MB)
+        plan = plan_workers(limits=limits)
+
+        # 80% de 1GB / 256MB = 3 workers
+        assert plan.workers == 3
+        assert plan.memory_limit_bytes is not None
+        assert plan.workers * plan.memory_limit_bytes <= 1024 * MB
+
+    def test_jobs_override(self):
+        """Testa que jobs explícito prevalece sobre a detecção."""
+        plan = plan_workers(jobs=8, limits=ResourceLimits(cpus=2.0, memory_bytes=4096 * MB))
+        assert plan.workers == 8
+        assert plan.memory_limit_bytes == int(4096 * MB * 0.8) // 8
+
+    def test_computed_memory_floor(self):
+        """Testa o piso do limite calculado (espaço de endereçamento virtual)."""
+        plan = plan_workers(jobs=64, limits=ResourceLimits(cpus=2.0, memory_bytes=1024 * MB))
+        assert plan.memory_per_worker_mb == MIN_WORKER_MEMORY_MB
+
+    def test_memory_override(self):
+        """Testa limite de memória por worker explícito."""
+        plan = plan_workers(memory_per_worker_mb=300, limits=ResourceLimits(cpus=2.0))
+        assert plan.memory_per_worker_mb == 300
+
+    def test_invalid_jobs(self):
+        """Testa erro com jobs inválido."""
+        with pytest.raises(ValueError, match="jobs"):
+            plan_workers(jobs=0, limits=ResourceLimits(cpus=1.0))
+
+
+class TestParseWorkerMemory:
+    """Testes para o argumento --worker-memory."""
+
+    def test_valid(self):
+        """Testa inteiro positivo."""
+        assert parse_worker_memory("512") == 512
+
+    @pytest.mark.parametrize("value", ["0", "-256", "abc"])
+    def test_invalid(self, value: str):
+        """Testa zero, negativo e não numérico."""
+        with pytest.raises(argparse.ArgumentTypeError, match="--worker-memory"):
+            parse_worker_memory(value)
@@ -0,0 +1,109 @@
+"""Testes para sharding determinístico e extração da chave de acesso."""
+
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.access_key import find_access_key, read_access_key
+from danfe_generator.core.sharding import Shard, select_shard, shard_key
+
+SAMPLE_KEY = "35231212345678000195550010000000011000000015"
+
+
+class TestAccessKey:
+    """Testes para extração da chave de acesso."""
+
+    def test_read_from_id_attribute(self, sample_xml_file: Path):
+        """Testa leitura do atributo Id de infNFe."""
+        assert read_access_key(sample_xml_file) == SAMPLE_KEY
+
+    def test_find_from_chnfe(self):
+        """Testa leitura de protNFe/infProt/chNFe."""
+        data = f"<protNFe><infProt><chNFe>{SAMPLE_KEY}</chNFe></infProt></protNFe>".encode()
+        assert find_access_key(data) == SAMPLE_KEY
+
+    def test_missing_key(self, temp_dir: Path):
+        """Testa XML sem chave de acesso."""
+        path = temp_dir / "sem_chave.xml"
+        path.write_text("<root>sem chave</root>")
+        assert read_access_key(path) is None
+
+    def test_missing_file(self, temp_dir: Path):
+        """Testa arquivo inexistente."""
+        assert read_access_key(temp_dir / "nao_existe.xml") is None
+
+
+class TestShard:
+    """Testes para Shard."""
+
+    def test_parse(self):
+        """Testa parse do formato i/N."""
+        assert Shard.parse("3/8") == Shard(index=3, count=8)
+        assert str(Shard.parse("1/1")) == "1/1"
+
+    @pytest.mark.parametrize("value", ["3", "a/8", "0/8", "9/8", "1/0"])
+    def test_parse_invalid(self, value: str):
+        """Testa erro com shards inválidos."""
+        with pytest.raises(ValueError):
+            Shard.parse(value)
+
+    def test_shards_partition_without_overlap(self):
+        """Testa que os shards cobrem todos os arquivos sem sobreposição."""
+        paths = [Path(f"xmls/nota_{i}.xml") for i in range(200)]
+        count = 4
+
+        selected = [
+            set(select_shard(paths, Shard(i, count), base_dir=Path("xmls")))
+            for i in range(1, count + 1)
+        ]
+
+        assert set().union(*selected) == set(paths)
+        assert sum(len(s) for s in selected) == len(paths)
+        assert all(selected)
+
+    def test_selection_is_stable_across_base_dirs(self):
+        """Testa que o caminho relativo torna a seleção independente da montagem."""
+        names = [f"2024/01/nota_{i}.xml" for i in range(50)]
+        shard = Shard(2, 3)
+
+        node_a = select_shard([Path("/mnt/a") / n for n in names], shard, Path("/mnt/a"))
+        node_b = select_shard([Path("/data") / n for n in names], shard, Path("/data"))
+
+        assert [p.name for p in node_a] == [p.name for p in node_b]
+
+    def test_shard_by_key(self, sample_xml_file: Path, temp_dir: Path):
+        """Testa hash pela chave de acesso, independente do nome do arquivo."""
+        copy = temp_dir / "outro_nome.xml"
+        copy.write_text(sample_xml_file.read_text())
+
+        assert shard_key(sample_xml_file, temp_dir, by="key") == SAMPLE_KEY
+        assert shard_key(copy, temp_dir, by="key") == SAMPLE_KEY
+
+    def test_shard_by_key_fallback(self, temp_dir: Path):
+        """Testa fallback para o caminho relativo sem chave de acesso."""
+        path = temp_dir / "sub" / "x.xml"
+        path.parent.mkdir()
+        path.write_text("<root/>")
+        assert shard_key(path, temp_dir, by="key") == "sub/x.xml"
+
+
+class TestGeneratorSharding:
+    """Testes de sharding integrados ao gerador."""
+
+    def test_generate_from_directory_shards(
+        self,
+        generator: DANFEGenerator,
+        sample_xml_file: Path,
+        temp_dir: Path,
+    ):
+        """Testa que os shards juntos processam todo o diretório uma única vez."""
+        for i in range(3):
+            (temp_dir / f"copy{i}.xml").write_text(sample_xml_file.read_text())
+
+        totals = [
+            generator.generate_from_directory(temp_dir, temp_dir / "output", shard=f"{i}/2").total
+            for i in (1, 2)
+        ]
+
+        assert sum(totals) == 4
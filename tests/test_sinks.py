@@ -0,0 +1,140 @@
+"""Testes para os destinos de saída (diretório e arquivos ZIP/TAR)."""
+
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.buffers import RenderedPDF
+from danfe_generator.core.sinks import ArchiveSink, DirectorySink
+
+
+def read_index(sink: ArchiveSink) -> list[dict]:
+    """Lê as entradas do índice JSONL."""
+    return [json.loads(line) for line in sink.index_path.read_text().splitlines()]
+
+
+class TestDirectorySink:
+    """Testes para DirectorySink."""
+
+    def test_write(self, temp_dir: Path):
+        """Testa gravação de PDF solto."""
+        sink = DirectorySink(temp_dir / "out")
+        path = sink.write(RenderedPDF(name="pasta/nota.xml", data=b"%PDF"))
+
+        assert path == temp_dir / "out" / "nota.pdf"
+        assert path.read_bytes() == b"%PDF"
+
+    def test_duplicate_names(self, temp_dir: Path):
+        """Testa que documentos de mesmo nome não se sobrescrevem."""
+        sink = DirectorySink(temp_dir / "out")
+        first = sink.write(RenderedPDF(name="jan/nota.xml", data=b"%PDF-1"))
+        second = sink.write(RenderedPDF(name="fev/nota.xml", data=b"%PDF-2"))
+
+        assert (first.name, second.name) == ("nota.pdf", "nota-2.pdf")
+        assert first.read_bytes() == b"%PDF-1"
+        assert second.read_bytes() == b"%PDF-2"
+
+
+class TestArchiveSink:
+    """Testes para ArchiveSink."""
+
+    def test_zip_rollover_by_count(self, temp_dir: Path):
+        """Testa rollover por quantidade e índice."""
+        with ArchiveSink(temp_dir, "zip", max_files=2) as sink:
+            for i in range(5):
+                sink.write(RenderedPDF(name=f"nota{i}.xml", data=b"%PDF"))
+
+        assert [p.name for p in sink.archives] == [
+            "danfes-0001.zip",
+            "danfes-0002.zip",
+            "danfes-0003.zip",
+        ]
+        with zipfile.ZipFile(sink.archives[0]) as archive:
+            assert archive.namelist() == ["nota0.pdf", "nota1.pdf"]
+            assert archive.read("nota1.pdf") == b"%PDF"
+
+        index = read_index(sink)
+        assert len(index) == 5
+        assert index[4] == {
+            "source": "nota4.xml",
+            "archive": "danfes-0003.zip",
+            "member": "nota4.pdf",
+            "size": 4,
+        }
+        assert not list(temp_dir.glob("*.part"))
+
+    def test_rerun_continues_sequence(self, temp_dir: Path):
+        """Testa que uma segunda execução no mesmo diretório não sobrescreve a primeira."""
+        with ArchiveSink(temp_dir, "zip") as sink:
+            sink.write(RenderedPDF(name="a.xml", data=b"%PDF-a"))
+        with ArchiveSink(temp_dir, "zip") as sink:
+            sink.write(RenderedPDF(name="c.xml", data=b"%PDF-c"))
+
+        assert [p.name for p in sink.archives] == ["danfes-0002.zip"]
+        with zipfile.ZipFile(temp_dir / "danfes-0001.zip") as archive:
+            assert archive.read("a.pdf") == b"%PDF-a"
+        with zipfile.ZipFile(temp_dir / "danfes-0002.zip") as archive:
+            assert archive.namelist() == ["c.pdf"]
+        assert [(row["member"], row["archive"]) for row in read_index(sink)] == [
+            ("a.pdf", "danfes-0001.zip"),
+            ("c.pdf", "danfes-0002.zip"),
+        ]
+
+    def test_tar_rollover_by_size(self, temp_dir: Path):
+        """Testa rollover por tamanho em TAR.GZ."""
+        with ArchiveSink(temp_dir, "tar.gz", max_bytes=10) as sink:
+            for i in range(3):
+                sink.write(RenderedPDF(name=f"nota{i}.xml", data=b"%PDF-1.4"))
+
+        assert len(sink.archives) == 3
+        with tarfile.open(sink.archives[0]) as archive:
+            member = archive.extractfile("nota0.pdf")
+            assert member is not None
+            assert member.read() == b"%PDF-1.4"
+
+    def test_duplicate_names(self, temp_dir: Path):
+        """Testa membros com o mesmo nome de origem."""
+        with ArchiveSink(temp_dir, "zip") as sink:
+            first = sink.write(RenderedPDF(name="a/nota.xml", data=b"1"))
+            second = sink.write(RenderedPDF(name="b/nota.xml", data=b"2"))
+
+        assert first == temp_dir / "danfes-0001.zip" / "nota.pdf"
+        assert second == temp_dir / "danfes-0001.zip" / "nota-2.pdf"
+
+    def test_invalid_format(self, temp_dir: Path):
+        """Testa formato inválido."""
+        with pytest.raises(ValueError):
+            ArchiveSink(temp_dir, "rar")
+
+
+class TestGenerateToArchive:
+    """Testes para geração em lote direto para arquivos compactados."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_generate_batch_with_sink(
+        self, generator: DANFEGenerator, sample_xml_file: Path, temp_dir: Path, workers: int
+    ):
+        """Testa lote gravado em ZIP, sem PDFs soltos."""
+        invalid = temp_dir / "ruim.xml"
+        invalid.write_text("<root/>")
+        output_dir = temp_dir / "output"
+
+        with ArchiveSink(output_dir, "zip") as sink:
+            result = generator.generate_batch(
+                [sample_xml_file, invalid, temp_dir / "faltando.xml"],
+                workers=workers,
+                sink=sink,
+            )
+
+        assert result.total == 3
+        assert result.successful == 1
+        assert sorted(p.name for p in output_dir.iterdir()) == [
+            "danfes-0001.zip",
+            "danfes-index.jsonl",
+        ]
+        with zipfile.ZipFile(output_dir / "danfes-0001.zip") as archive:
+            assert archive.read(f"{sample_xml_file.stem}.pdf").startswith(b"%PDF")
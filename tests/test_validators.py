@@ -1,12 +1,15 @@
 """Testes para o módulo de validadores."""
 
+import json
 import os
 from pathlib import Path
 
 import pytest
 from PIL import Image
 
-from danfe_generator.core.validators import LogoValidator, XMLValidator
+from danfe_generator.cli.main import cmd_validate
+from danfe_generator.core import DANFEGenerator
+from danfe_generator.core.validators import PARSE_CHUNK_SIZE, LogoValidator, XMLValidator
 from danfe_generator.exceptions import InvalidLogoError, InvalidXMLError, XMLNotFoundError
 
 
@@ -120,3 +123,56 @@ class TestXMLValidator:
         invalid_xml.write_text("<root>test</root>")
         with pytest.raises(InvalidXMLError):
             validator.validate_or_raise(invalid_xml)
+
+    def test_validate_nested_in_wrapper(self, validator: XMLValidator, temp_dir: Path):
+        """Testa NFe como filho direto de uma raiz desconhecida."""
+        xml = temp_dir / "envelope.xml"
+        xml.write_text('<lote><NFe xmlns="http://www.portalfiscal.inf.br/nfe"/></lote>')
+        assert validator.validate(xml).is_valid
+
+    def test_validate_large_document(self, validator: XMLValidator, temp_dir: Path):
+        """Testa XML maior que o bloco de leitura, válido e truncado no fim."""
+        body = "<det><prod>x</prod></det>" * (PARSE_CHUNK_SIZE // 10)
+        xml = temp_dir / "grande.xml"
+        xml.write_text(f"<nfeProc><NFe>{body}</NFe></nfeProc>")
+        assert validator.validate(xml).is_valid
+
+        xml.write_text(f"<nfeProc><NFe>{body}</NFe>")
+        result = validator.validate(xml)
+        assert not result.is_valid
+        assert "XML malformado" in result.error_message
+
+
+class TestValidateMany:
+    """Testes para a validação de lotes sem renderização (preflight)."""
+
+    @pytest.fixture
+    def xml_dir(self, sample_xml_content: str, temp_dir: Path) -> Path:
+        """Diretório com dois XMLs válidos e dois inválidos."""
+        xml_dir = temp_dir / "xmls"
+        xml_dir.mkdir()
+        for name in ("a.xml", "b.xml"):
+            (xml_dir / name).write_text(sample_xml_content, encoding="utf-8")
+        (xml_dir / "truncado.xml").write_text("<nfeProc><NFe>")
+        (xml_dir / "outro.xml").write_text("<root/>")
+        return xml_dir
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_validate_many(self, generator: DANFEGenerator, xml_dir: Path, workers: int):
+        """Testa validação serial e em processos worker."""
+        results = dict(generator.validate_many(sorted(xml_dir.iterdir()), workers))
+
+        assert results[xml_dir / "a.xml"] is None
+        assert "XML malformado" in results[xml_dir / "truncado.xml"]
+        assert "não parece ser uma NFe" in results[xml_dir / "outro.xml"]
+        assert len(results) == 4
+
+    def test_cmd_validate_report(self, xml_dir: Path, temp_dir: Path):
+        """Testa o relatório JSONL apenas com os inválidos, sem gerar PDFs."""
+        report = temp_dir / "invalidos.jsonl"
+
+        assert cmd_validate(str(xml_dir), str(report), jobs=1) == 1
+
+        records = [json.loads(line) for line in report.read_text().splitlines()]
+        assert sorted(Path(r["input"]).name for r in records) == ["outro.xml", "truncado.xml"]
+        assert not list(xml_dir.glob("*.pdf"))